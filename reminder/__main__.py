@@ -1,16 +1,152 @@
-"""アプリケーションのエントリーポイント。Tk ウィンドウを生成してイベントループを起動する。"""
+"""アプリケーションのエントリーポイント。Tk ウィンドウを生成してイベントループを起動する。
+
+サブコマンド:
+    (なし)  GUI を起動する（--profile-dir でプロファイリング有効化）
+    stats   記録済みメトリクスの要約を表示する
+    history 発火履歴の集計（時間あたりの発火回数・スヌーズ受け入れ率・平均遅延）を表示する
+    serve   複数利用者向けの HTTP サーバーを起動する
+"""
+from __future__ import annotations
+
+import argparse
 import logging
+import os
+import sys
 import tkinter as tk
+from typing import Callable
 
+from . import history, metrics, profiling, server
 from .app import ReminderApp
+from .catchup import CatchUpPolicy
+from .log_pipeline import SamplingFilter, configure_logging, shutdown_logging
+from .store import STORE_PATH
+from .watchdog import StallWatchdog
+
+
+def _catch_up_policy(spec: str) -> CatchUpPolicy:
+    try:
+        return CatchUpPolicy.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _env_number(name: str, convert: Callable[[str], float]) -> float | None:
+    """環境変数を数値として読む。未設定・0 なら None。読めなければ警告して無視する（stats などは動かす）。"""
+    raw = os.environ.get(name, "")
+    try:
+        return (convert(raw) or None) if raw else None
+    except ValueError:
+        print(f"環境変数 {name} の値を数値として読めないため無視します: {raw!r}", file=sys.stderr)
+        return None
+
+
+def _env_catch_up() -> CatchUpPolicy:
+    """環境変数 REMINDER_CATCH_UP を方針として読む。読めなければ警告して既定（all）にする（stats などは動かす）。"""
+    raw = os.environ.get("REMINDER_CATCH_UP", "")
+    try:
+        return CatchUpPolicy.parse(raw) if raw else CatchUpPolicy()
+    except ValueError as e:
+        print(f"環境変数 REMINDER_CATCH_UP の値を読めないため無視します: {e}", file=sys.stderr)
+        return CatchUpPolicy()
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="reminder", description="時刻指定リマインダー")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=_env_number("REMINDER_METRICS_PORT", int),
+        help="localhost で /metrics を公開するポート（環境変数 REMINDER_METRICS_PORT でも指定可）",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=None,
+        help=f"cProfile / tracemalloc の結果を保存するディレクトリ（環境変数 {profiling.PROFILE_DIR_ENV} でも指定可）",
+    )
+    parser.add_argument(
+        "--stall-threshold",
+        type=float,
+        default=_env_number("REMINDER_STALL_THRESHOLD", float),
+        help="イベントループ停止を検出するしきい値（秒）。指定時のみ監視する（環境変数 REMINDER_STALL_THRESHOLD でも指定可）",
+    )
+    parser.add_argument("--log-file", default=None, help="JSON Lines でローテーション出力するログファイル")
+    parser.add_argument("--log-json", action="store_true", help="標準エラーのログも JSON Lines で出力する")
+    parser.add_argument(
+        "--log-sample-every",
+        type=int,
+        default=1,
+        help="同じ INFO ログが大量に出た場合に N 件に 1 件だけ出力する（1 で間引かない）",
+    )
+    parser.add_argument(
+        "--catch-up",
+        type=_catch_up_policy,
+        default=_env_catch_up(),
+        help="停止中に期限を過ぎた通知の扱い: all / latest / drop-older:秒（環境変数 REMINDER_CATCH_UP でも指定可）",
+    )
+    parser.add_argument(
+        "--background",
+        action="store_true",
+        help="通知を設定したらウィンドウを最小化して UI を破棄し、開き直すか通知時に作り直す",
+    )
+    sub = parser.add_subparsers(dest="command")
+    stats = sub.add_parser("stats", help="記録済みメトリクスの要約を表示する")
+    stats.add_argument("--path", default=metrics.METRICS_PATH, help="メトリクスファイルのパス")
+    hist = sub.add_parser("history", help="発火履歴の集計を表示する")
+    hist.add_argument("--dir", default=history.HISTORY_DIR, help="発火履歴のディレクトリ")
+    hist.add_argument("--hours", type=int, default=24, help="集計する直近の時間数")
+    hist.add_argument("--recent", type=int, default=10, help="表示する最近の発火の件数")
+    serve = sub.add_parser("serve", help="複数利用者向けの HTTP サーバーを起動する")
+    serve.add_argument("--host", default=server.DEFAULT_HOST, help="待ち受けるアドレス")
+    serve.add_argument("--port", type=int, default=server.DEFAULT_PORT, help="待ち受けるポート")
+    serve.add_argument("--db", default=STORE_PATH, help="リマインダーを保存する SQLite ファイル")
+    serve.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=None,
+        help="同じ --db を共有するインスタンス間でリーダー選出するリース期間（秒）。指定時のみ選出する",
+    )
+    serve.add_argument("--instance-id", default=None, help="リースに記録するインスタンス名（省略時は自動生成）")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if args.command == "stats":
+        return metrics.print_stats(args.path)
+    if args.command == "history":
+        return history.print_history(args.dir, args.hours, args.recent)
 
+    listener = configure_logging(
+        logging.INFO,
+        json_lines=args.log_json,
+        log_file=args.log_file,
+        sampling=SamplingFilter(every=args.log_sample_every) if args.log_sample_every > 1 else None,
+    )
+    if args.command == "serve":
+        try:
+            return server.serve(args.host, args.port, args.db, args.lease_ttl, args.instance_id, args.catch_up)
+        finally:
+            shutdown_logging(listener)
 
-def main() -> None:
-    logging.basicConfig(level=logging.INFO)
-    root = tk.Tk()
-    ReminderApp(root)
-    root.mainloop()
+    metrics.enable_textfile()
+    if args.metrics_port:
+        metrics.serve_metrics(args.metrics_port)
+    session = profiling.install_from_env(args.profile_dir)
+    fire_history = history.FireHistory()
+    try:
+        root = tk.Tk()
+        ReminderApp(root, catch_up=args.catch_up, history=fire_history, background=args.background)
+        if args.stall_threshold:
+            StallWatchdog(root, threshold_s=args.stall_threshold).start()
+        root.mainloop()
+    finally:
+        if session is not None:
+            session.dump()
+        fire_history.close()
+        metrics.flush()
+        shutdown_logging(listener)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
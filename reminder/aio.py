@@ -0,0 +1,223 @@
+"""asyncio ネイティブのスケジューラと Tk との統合アダプター。
+
+Scheduler のコアはそのままに、Clock / Timer を asyncio のイベントループ上に実装する。
+各リマインダーは loop.call_at() で絶対的な単調時刻の期限に登録されるため、
+数千件を同時に保持してもループのタイマーヒープ 1 本で管理できる。
+
+統合パターン:
+    - asyncio サービス内: AsyncScheduler を直接使う
+    - Tk の mainloop 内で asyncio を動かす: pump_asyncio_in_tk()
+    - asyncio の中で Tk を動かす: await run_tk_in_asyncio(root)
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import inspect
+import logging
+import tkinter as tk
+from typing import Awaitable, Callable, Hashable, Iterable, Sequence, Union
+
+from .scheduler import BatchItem, BatchResult, Reminder, Scheduler
+from .time_utils import DEFAULT_SNOOZE_MINUTES
+
+# 発火ハンドラー。同期関数・コルーチン関数のどちらでもよい。戻り値はスヌーズ受け入れ可否
+FireHandler = Callable[[Reminder], Union[bool, Awaitable[bool]]]
+
+# Tk と asyncio を相互に駆動する際のポーリング間隔（ミリ秒）
+DEFAULT_PUMP_INTERVAL_MS = 10
+
+
+class AsyncioTimer:
+    """asyncio のイベントループに載せた Clock 兼 Timer。
+
+    monotonic() は loop.time() を返し、after() は loop.call_at() で絶対期限に登録する。
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def monotonic(self) -> float:
+        return self.loop.time()
+
+    def after(self, delay_ms: int, callback: Callable[[], object]) -> Hashable:
+        return self.call_at(self.loop.time() + max(0, delay_ms) / 1000, callback)
+
+    def call_at(self, deadline: float, callback: Callable[[], object]) -> asyncio.TimerHandle:
+        """loop.time() 基準の絶対期限 deadline にジョブを登録する。"""
+        return self.loop.call_at(deadline, callback)
+
+    def after_cancel(self, job_id: Hashable) -> None:
+        job_id.cancel()  # type: ignore[attr-defined]
+
+
+class AsyncScheduler:
+    """Scheduler を asyncio ループ上で動かす非同期ファサード。
+
+    発火ハンドラーがコルーチン関数の場合は Task として実行し、完了後に
+    スヌーズ可否を Scheduler.resolve() で確定する。実行中もリマインダーは保持される。
+
+    Attributes:
+        scheduler: 内部で使う Scheduler。
+        timer: ループに載せた Clock 兼 Timer。
+    """
+
+    def __init__(self, on_fire: FireHandler | None = None, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.timer = AsyncioTimer(loop or asyncio.get_running_loop())
+        self._handler = on_fire
+        self._tasks: set[asyncio.Task] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.scheduler = Scheduler(self.timer, self.timer, on_fire=self._on_fire)
+
+    def __len__(self) -> int:
+        return len(self.scheduler)
+
+    async def add(
+        self,
+        message: str,
+        *,
+        target: datetime.time | None = None,
+        delay_ms: int | None = None,
+        at: float | None = None,
+        snooze_minutes: int = DEFAULT_SNOOZE_MINUTES,
+        snooze_count: int = 0,
+        reminder_id: int | None = None,
+        slack_ms: int = 0,
+        tags: Sequence[str] = (),
+    ) -> int:
+        """リマインダーを登録して ID を返す。
+
+        Args:
+            message: 通知メッセージ。
+            target: 通知時刻（過ぎていれば翌日）。
+            delay_ms: 現在からの待機時間（ミリ秒）。
+            at: loop.time() 基準の絶対期限（秒）。
+            snooze_minutes: スヌーズ間隔（分）。
+            snooze_count: 既存のスヌーズ回数。
+            reminder_id: 外部で採番した ID。省略時は Scheduler が採番する。
+            slack_ms: 期限から遅れて発火してよい時間（ミリ秒）。Timer が CoalescingTimer でなければ使わない。
+            tags: タグ。
+
+        Raises:
+            ValueError: 入力が不正な場合。
+        """
+        if at is not None:
+            if delay_ms is not None:
+                raise ValueError("delay_ms と at は同時に指定できません")
+            delay_ms = max(0, round((at - self.timer.loop.time()) * 1000))
+        reminder_id = self.scheduler.add(
+            message, target=target, delay_ms=delay_ms, snooze_minutes=snooze_minutes,
+            snooze_count=snooze_count, reminder_id=reminder_id, slack_ms=slack_ms, tags=tags,
+        )
+        self._idle.clear()
+        return reminder_id
+
+    async def add_many(self, items: Iterable[BatchItem], *, all_or_nothing: bool = False) -> list[BatchResult]:
+        """複数のリマインダーをまとめて登録する（Scheduler.add_many() 参照）。"""
+        results = self.scheduler.add_many(items, all_or_nothing=all_or_nothing)
+        if any(result.ok for result in results):
+            self._idle.clear()
+        return results
+
+    async def cancel(self, reminder_id: int) -> bool:
+        """リマインダーを取り消す。"""
+        cancelled = self.scheduler.cancel(reminder_id)
+        self._update_idle()
+        return cancelled
+
+    async def snooze(self, reminder_id: int, minutes: int | None = None) -> bool:
+        """発火待ちのリマインダーを延期する。"""
+        return self.scheduler.snooze(reminder_id, minutes)
+
+    async def cancel_tag(self, tag: str) -> list[int]:
+        """タグが付いたリマインダーをすべて取り消す（Scheduler.cancel_tag() 参照）。"""
+        cancelled = self.scheduler.cancel_tag(tag)
+        self._update_idle()
+        return cancelled
+
+    async def snooze_tag(self, tag: str, minutes: int | None = None) -> list[int]:
+        """タグが付いたリマインダーをすべて延期する（Scheduler.snooze_tag() 参照）。"""
+        return self.scheduler.snooze_tag(tag, minutes)
+
+    async def wait_idle(self) -> None:
+        """発火待ち・処理中のリマインダーがなくなるまで待つ。"""
+        await self._idle.wait()
+
+    def _update_idle(self) -> None:
+        if not len(self.scheduler) and not self._tasks:
+            self._idle.set()
+
+    def _on_fire(self, reminder: Reminder) -> bool | None:
+        """Scheduler からの同期コールバック。コルーチンなら Task に委ねて判断を保留する。"""
+        # Scheduler が破棄処理を終えた後に空き状態を確認する
+        self.timer.loop.call_soon(self._update_idle)
+        if self._handler is None:
+            return False
+        result = self._handler(reminder)
+        if not inspect.isawaitable(result):
+            return bool(result)
+        task = asyncio.ensure_future(self._dispatch(reminder.reminder_id, result))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda _t: self._update_idle())
+        return None
+
+    async def _dispatch(self, reminder_id: int, pending: Awaitable[bool]) -> None:
+        accepted = False
+        try:
+            accepted = bool(await pending)
+        except Exception:
+            logging.exception("リマインダー %d の非同期通知処理で例外が発生しました", reminder_id)
+        self.scheduler.resolve(reminder_id, accepted)
+
+
+# ------------------------------------------------------------ Tk 統合
+
+
+def pump_asyncio_in_tk(
+    root: tk.Misc, loop: asyncio.AbstractEventLoop, interval_ms: int = DEFAULT_PUMP_INTERVAL_MS
+) -> Callable[[], None]:
+    """Tk の mainloop から asyncio ループを定期的に 1 周ずつ回す。
+
+    GUI を主、asyncio を従にする構成。AsyncScheduler のタイマーや Task は
+    interval_ms 以内の遅れで実行される。
+
+    Returns:
+        ポンプを停止する関数。
+    """
+    state: dict[str, object] = {"job": None, "stopped": False}
+
+    def step() -> None:
+        if state["stopped"]:
+            return
+        # stop() を予約してから run_forever() すると、準備済みのコールバックを 1 周だけ処理して戻る
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+        state["job"] = root.after(interval_ms, step)
+
+    def stop() -> None:
+        state["stopped"] = True
+        if state["job"] is not None:
+            root.after_cancel(state["job"])
+            state["job"] = None
+
+    state["job"] = root.after(0, step)
+    return stop
+
+
+async def run_tk_in_asyncio(root: tk.Misc, interval_ms: int = DEFAULT_PUMP_INTERVAL_MS) -> None:
+    """asyncio ループから Tk のイベントを処理し続ける。ウィンドウが破棄されたら戻る。
+
+    asyncio を主、GUI を従にする構成。root.mainloop() の代わりに await する。
+    """
+    while True:
+        try:
+            root.update()
+        except tk.TclError:
+            # ウィンドウが破棄された
+            return
+        await asyncio.sleep(interval_ms / 1000)
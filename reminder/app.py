@@ -11,16 +11,48 @@ tkinter を使用したシングルウィンドウ構成。
                              _schedule_snooze() → [スケジュール済み]
                                     ↓ スヌーズ拒否 / 上限到達
                                   [アイドル]
+
+発火待ちの間は絶対期限を設定ファイルに保存し、アプリが終了・クラッシュしても
+次回起動時に復元する。停止中に期限を過ぎていた場合は CatchUpPolicy に従って
+通知するか破棄する。
+
+通知ジョブの登録・取り消しは Scheduler（reminder.scheduler）に委ねる。ReminderApp が持つのは
+発火待ちの 1 件の ID だけで、負荷試験（reminder.loadgen）と同じスケジューリング経路を通る。
+
+コードから複数の通知を登録する場合は schedule_many() を使う。画面の発火待ちとは別に
+Scheduler.add_many() でまとめて登録し、不正な項目はダイアログを出さずに項目ごとのエラーで返す。
+設定ファイルの保存と UI の更新は 1 回の呼び出しにつき 1 回だけ行う。
+
+history を渡すと、通知のたびに発火時刻・遅延・スヌーズ回数・応答を FireHistory に記録する。
+
+最近設定したメッセージは設定ファイルに残し、ウィンドウ下部の検索欄から
+全文検索（reminder.search）で探してメッセージ欄に呼び戻せる。
+
+background=True（バックグラウンドモード）では、発火待ちの間はウィンドウを最小化して
+ウィジェットとアイコン画像を破棄し、Tk のルートと Scheduler だけを残す。
+タスクバー（Dock）から開き直すか通知の時刻になると、保存済みの設定と
+入力値の変数から UI を作り直す。開き直した後も発火待ちがあれば、もう一度最小化した
+時点で再び UI を破棄する。
 """
 from __future__ import annotations
 
+import dataclasses
 import datetime
+import itertools
 import logging
+import time
 import tkinter as tk
 from tkinter import messagebox, ttk
-
-from .config import Settings, load_settings, save_settings
-from .notifications import _set_window_icon, play_notification_sound
+from typing import Iterable
+
+from . import metrics
+from .catchup import CatchUpPolicy
+from .clock import SYSTEM_CLOCK, Clock, Timer, TkTimer
+from .config import MAX_RECENT_MESSAGES, Settings, load_settings, save_settings
+from .history import OUTCOME_DISMISSED, OUTCOME_LIMIT, OUTCOME_SNOOZED, FireHistory
+from .notifications import _release_window_icon, _set_window_icon, play_notification_sound
+from .scheduler import BatchItem, BatchResult, Reminder, Scheduler
+from .search import SearchIndex
 from .time_utils import (
     DEFAULT_SNOOZE_MINUTES,
     MAX_SNOOZE_COUNT,
@@ -29,6 +61,13 @@ from .time_utils import (
     STATUS_IDLE,
     STATUS_NOTIFIED,
     calculate_delay_ms,
+    snooze_delay_ms,
+)
+
+# バックグラウンドモードで破棄するウィジェットの属性名
+_WIDGET_ATTRIBUTES = (
+    "message_text", "hour_menu", "minute_menu", "snooze_menu",
+    "schedule_button", "cancel_button", "status_var", "search_entry", "search_results",
 )
 
 
@@ -37,29 +76,71 @@ class ReminderApp:
 
     Attributes:
         root: tkinter のルートウィンドウ。
-        scheduled_job_id: root.after() が返すジョブ ID。未スケジュール時は None。
+        clock: 現在時刻の取得元。既定は OS の時計。
+        timer: ジョブの登録先。既定は root.after() に委譲する TkTimer。
+        catch_up: 停止中に期限を過ぎた通知の扱い方。
+        history: 発火の記録先。None なら記録しない。
+        scheduler: 通知ジョブを管理する Scheduler。clock と timer を共有する。
+        background: True なら発火待ちの間は UI を破棄して最小化する。
         hour_var: 通知時刻の「時」を保持する StringVar。
         minute_var: 通知時刻の「分」を保持する StringVar。
         snooze_var: スヌーズ間隔（分）を保持する StringVar。
+        search_var: 最近のメッセージの検索語を保持する StringVar。
     """
 
-    def __init__(self, root: tk.Tk) -> None:
+    def __init__(self, root: tk.Tk, clock: Clock | None = None, timer: Timer | None = None,
+                 catch_up: CatchUpPolicy | None = None, history: FireHistory | None = None,
+                 background: bool = False) -> None:
         self.root = root
-        # root.after() が返すジョブ ID。None はスケジュールなしを意味する
-        self.scheduled_job_id: str | None = None
+        # テストや負荷試験では VirtualClock を渡して仮想時間で動かす
+        self.clock: Clock = clock or SYSTEM_CLOCK
+        self.timer: Timer = timer or TkTimer(root)
+        self.catch_up = catch_up or CatchUpPolicy()
+        self.history = history
+        self.background = background
+        self.scheduler = Scheduler(self.clock, self.timer, on_fire=self._on_fire)
+        # 発火待ちのリマインダーの Scheduler 上の ID。None はスケジュールなしを意味する
+        self._reminder_id: int | None = None
+        # 発火予定の monotonic 時刻（秒）。発火遅延の計測に使用する
+        self._deadline: float | None = None
+        # schedule_many() で登録した発火待ちの Scheduler 上の ID
+        self._batch_ids: set[int] = set()
 
         saved = load_settings()
+        # 発火待ちの期限を保存する際に他の項目を書き戻すため保持する
+        self._saved = saved
         # 入力欄の初期値: 保存済み設定があればそれを使用、なければ現在時刻
-        now = datetime.datetime.now()
+        now = self.clock.now()
         self.hour_var = tk.StringVar(value=saved.hour if saved.hour != "00" or saved.minute != "00" else f"{now.hour:02d}")
         self.minute_var = tk.StringVar(value=saved.minute if saved.hour != "00" or saved.minute != "00" else f"{now.minute:02d}")
         self.snooze_var = tk.StringVar(value=saved.snooze_minutes)
+        self.search_var = tk.StringVar(value="")
+
+        # 最近のメッセージ。ID は設定した順に振り、大きいほど新しい
+        self._recent: dict[int, str] = {}
+        self._recent_index = SearchIndex()
+        self._recent_ids = itertools.count()
+        self._search_matches: list[str] = []
+        # 構築済みの UI のフレーム（None は UI を破棄した状態）と、破棄時に引き継ぐステータス表示
+        self._frame: ttk.Frame | None = None
+        self._status = STATUS_IDLE
+        for message in reversed(saved.recent_messages):
+            if isinstance(message, str):
+                self._remember_message(message)
 
         self._build_ui()
 
         if saved.message:
             self.message_text.insert("1.0", saved.message)
 
+        self._restore_pending(saved)
+        self._restore_batch(saved)
+        if background:
+            # タスクバーから開き直されたら UI を作り直し、最小化されたら再び破棄する
+            self.root.bind("<Map>", self._on_map)
+            self.root.bind("<Unmap>", self._on_unmap)
+            self._enter_background()
+
     # ------------------------------------------------------------------ UI 構築
 
     def _build_ui(self) -> None:
@@ -86,7 +167,7 @@ class ReminderApp:
         style.configure("TSpinbox", font=("system", 11))
         style.configure("Status.TLabel", font=("system", 10), foreground="#666")
 
-        frame = ttk.Frame(self.root, padding=20)
+        frame = self._frame = ttk.Frame(self.root, padding=20)
         frame.grid(sticky="nsew")
         frame.columnconfigure(1, weight=1)
 
@@ -95,6 +176,7 @@ class ReminderApp:
         self._build_snooze_section(frame)    # row 3:   スヌーズ間隔
         self._build_buttons_section(frame)   # row 4:   設定・解除ボタン
         self._build_status_section(frame)    # row 5:   ステータスラベル
+        self._build_search_section(frame)    # row 6-7: 最近のメッセージ検索
 
         # Enter キーでリマインダーを設定できるようにする
         self.root.bind("<Return>", lambda _event: self.schedule())
@@ -182,11 +264,74 @@ class ReminderApp:
 
         status_var の内容が変わると自動的に再描画される。
         """
-        self.status_var = tk.StringVar(value=STATUS_IDLE)
+        # UI を作り直す場合（バックグラウンドモード）は破棄前の表示を引き継ぐ
+        self.status_var = tk.StringVar(value=self._status)
         ttk.Label(frame, textvariable=self.status_var, style="Status.TLabel").grid(
             row=5, column=0, columnspan=4, sticky="w", pady=(4, 0)
         )
 
+    def _build_search_section(self, frame: ttk.Frame) -> None:
+        """最近のメッセージの検索欄と結果リストを生成する（row 6-7）。
+
+        入力のたびに結果を絞り込み、結果のダブルクリックか Enter でメッセージ欄に呼び戻す。
+        Enter はウィンドウ全体の「リマインダーを設定」に伝わらないよう "break" で止める。
+        """
+        ttk.Label(frame, text="最近のメッセージを検索").grid(row=6, column=0, sticky="w", pady=(14, 6))
+        self.search_entry = ttk.Entry(frame, textvariable=self.search_var, width=24)
+        self.search_entry.grid(row=6, column=1, columnspan=3, sticky="ew", pady=(14, 6))
+        self.search_entry.bind("<KeyRelease>", lambda _event: self._refresh_search_results())
+        self.search_entry.bind("<Return>", self._use_search_result)
+        self.search_results = tk.Listbox(frame, height=4, activestyle="dotbox", font=("system", 10))
+        self.search_results.grid(row=7, column=0, columnspan=4, sticky="ew")
+        self.search_results.bind("<Double-Button-1>", self._use_search_result)
+        self.search_results.bind("<Return>", self._use_search_result)
+        self._refresh_search_results()
+
+    # ------------------------------------------------------------ バックグラウンドモード
+
+    def _enter_background(self) -> None:
+        """バックグラウンドモードで発火待ちがあれば、UI を破棄してウィンドウを最小化する。
+
+        破棄するのはウィジェット・フレーム・ウィンドウアイコンの画像で、入力値の変数・
+        最近のメッセージ・Scheduler と保存済みの設定は残す（reopen() でそこから作り直す）。
+        """
+        if not self.background or (self._reminder_id is None and not self._batch_ids) or self._frame is None:
+            return
+        self._status = self.status_var.get()
+        # Enter キーの schedule() が破棄したウィジェットに触れないよう、_build_ui() のバインドを外す
+        self.root.unbind("<Return>")
+        self._frame.destroy()
+        self._frame = None
+        for name in _WIDGET_ATTRIBUTES:
+            setattr(self, name, None)
+        self._search_matches = []
+        _release_window_icon(self.root)
+        self.root.iconify()
+        logging.info("バックグラウンドで待機します（UI を破棄しました）")
+
+    def reopen(self) -> None:
+        """UI を破棄していれば、保存済みの設定と入力値の変数から作り直して表示する。"""
+        if self._frame is None:
+            started = time.perf_counter()
+            self._build_ui()
+            if self._saved.message:
+                self.message_text.insert("1.0", self._saved.message)
+            if self._reminder_id is not None:
+                self.schedule_button.configure(state=tk.DISABLED)
+                self.cancel_button.configure(state=tk.NORMAL)
+            metrics.UI_REBUILD_MS.observe((time.perf_counter() - started) * 1000)
+        self.root.deiconify()
+
+    def _on_map(self, event: tk.Event) -> None:
+        """ルートウィンドウが表示されたとき（最小化からの復帰）に UI を作り直す。"""
+        if event.widget is self.root:
+            self.reopen()
+
+    def _on_unmap(self, event: tk.Event) -> None:
+        """ルートウィンドウが最小化されたとき、発火待ちがあれば UI を破棄する。"""
+        if event.widget is self.root:
+            self._enter_background()
+
     # ------------------------------------------------------------ フォーカス制御
 
     def _focus_next(self, _event: tk.Event) -> str:
@@ -242,6 +387,54 @@ class ReminderApp:
             return min_value
         return max(min_value, min(max_value, value))
 
+    # ------------------------------------------------------------ 最近のメッセージ
+
+    def _remember_message(self, message: str) -> None:
+        """メッセージを最近のメッセージの先頭に加え、MAX_RECENT_MESSAGES 件を超えた古いものを捨てる。"""
+        for recent_id, recent in list(self._recent.items()):
+            if recent == message:
+                del self._recent[recent_id]
+                self._recent_index.remove(recent_id)
+        recent_id = next(self._recent_ids)
+        self._recent[recent_id] = message
+        self._recent_index.add(recent_id, message)
+        while len(self._recent) > MAX_RECENT_MESSAGES:
+            oldest = next(iter(self._recent))
+            del self._recent[oldest]
+            self._recent_index.remove(oldest)
+
+    def recent_messages(self) -> list[str]:
+        """最近設定したメッセージを新しい順に返す。"""
+        return list(reversed(self._recent.values()))
+
+    def search_recent_messages(self, query: str) -> list[str]:
+        """最近のメッセージから検索語の区切りをすべて含むものを新しい順に返す。空の検索語なら全件。"""
+        if not query.strip():
+            return self.recent_messages()
+        return [self._recent[recent_id] for recent_id in reversed(self._recent_index.search(query))]
+
+    def _refresh_search_results(self) -> None:
+        """検索欄の内容で結果リストを作り直す。"""
+        self._search_matches = self.search_recent_messages(self.search_var.get())
+        self.search_results.delete(0, tk.END)
+        for message in self._search_matches:
+            # 複数行のメッセージも 1 行で見えるよう空白をそろえる
+            self.search_results.insert(tk.END, " ".join(message.split()))
+
+    def _use_search_result(self, _event: tk.Event | None = None) -> str:
+        """選択中（未選択なら先頭）の検索結果をメッセージ欄に入れる。
+
+        Returns:
+            "break": Enter がウィンドウ全体のバインドに伝わらないようにする。
+        """
+        selection = self.search_results.curselection()
+        index = selection[0] if selection else 0
+        if index < len(self._search_matches):
+            self.message_text.delete("1.0", tk.END)
+            self.message_text.insert("1.0", self._search_matches[index])
+            self.message_text.focus_set()
+        return "break"
+
     # ------------------------------------------------------------ スケジュール
 
     def schedule(self) -> None:
@@ -249,7 +442,7 @@ class ReminderApp:
 
         メッセージが空の場合は警告ダイアログを表示して処理を中断する。
         既存のジョブがあればキャンセルしてから新規スケジュールを登録する。
-        root.after() の呼び出しに失敗した場合は UI をアイドル状態にリセットして例外を再送出する。
+        timer.after() の呼び出しに失敗した場合は UI をアイドル状態にリセットして例外を再送出する。
         """
         message = self.message_text.get("1.0", tk.END).strip()
         if not message:
@@ -258,41 +451,223 @@ class ReminderApp:
 
         self._normalize_time_inputs()
         target = datetime.time(hour=int(self.hour_var.get()), minute=int(self.minute_var.get()))
-        delay_ms = calculate_delay_ms(datetime.datetime.now(), target)
+        delay_ms = calculate_delay_ms(self.clock.now(), target)
 
         snooze_minutes = self._normalize_snooze_input()
 
         self._cancel_job()
         try:
-            self.scheduled_job_id = self.root.after(
-                delay_ms, lambda: self.show_reminder(message, snooze_minutes)
-            )
+            self._add_job(message, delay_ms, snooze_minutes)
         except Exception:
-            # after() が失敗した場合、ジョブ ID は None のままなのでボタン状態だけリセットする
+            # after() が失敗した場合、Scheduler はリマインダーを保持しないのでボタン状態だけリセットする
             self._reset_to_idle()
             raise
 
         self._set_active_state(f"{target.hour:02d}:{target.minute:02d} に通知予定です（スヌーズ: {snooze_minutes}分）。")
         logging.info("リマインダーを設定: %02d:%02d（スヌーズ: %d 分）", target.hour, target.minute, snooze_minutes)
 
-        save_settings(Settings(
+        self._remember_message(message)
+        self._refresh_search_results()
+        self._saved = Settings(
             message=message,
             hour=self.hour_var.get(),
             minute=self.minute_var.get(),
             snooze_minutes=self.snooze_var.get(),
-        ))
+            deadline=(self.clock.now() + datetime.timedelta(milliseconds=delay_ms)).isoformat(),
+            recent_messages=self.recent_messages(),
+            batch=self._saved.batch,
+        )
+        save_settings(self._saved)
+        self._enter_background()
+
+    def schedule_many(self, items: Iterable[BatchItem], *, all_or_nothing: bool = False) -> list[BatchResult]:
+        """複数の通知をまとめて登録し、入力と同じ順で結果を返す。
+
+        画面の発火待ち（schedule() の 1 件）とは別に Scheduler.add_many() で登録する。
+        target の遅延は同じ現在時刻から計算し、不正な項目は警告ダイアログを出さずに
+        BatchResult.error で返す。設定ファイルの保存とステータス表示・検索結果の更新は 1 回だけ行う。
+
+        Args:
+            items: 登録内容。
+            all_or_nothing: True なら 1 件でも不正な項目があれば何も登録しない。
+
+        Raises:
+            Exception: timer.after() が失敗した場合（この呼び出しで登録した分はすべて取り消される）。
+        """
+        items = list(items)
+        results = self.scheduler.add_many(items, all_or_nothing=all_or_nothing)
+        added = 0
+        for item, result in zip(items, results):
+            if result.ok:
+                self._batch_ids.add(result.reminder_id)  # type: ignore[arg-type]
+                self._remember_message(item.message)
+                added += 1
+        failed = sum(result.error is not None for result in results)
+        if added:
+            self._persist_batch()
+        metrics.QUEUE_DEPTH.set(len(self.scheduler))
+        status = f"{added} 件の通知を予定しました。" + (f"{failed} 件は登録できませんでした。" if failed else "")
+        if self.status_var is None:
+            # バックグラウンドで UI を破棄している間は、作り直すときに表示する
+            self._status = status
+        else:
+            self.status_var.set(status)
+            self._refresh_search_results()
+        logging.info("リマインダーを一括設定: %d 件（失敗: %d 件）", added, failed)
+        self._enter_background()
+        return results
+
+    def _persist_batch(self) -> None:
+        """schedule_many() で登録した発火待ちと最近のメッセージを設定ファイルに保存する。"""
+        now = self.clock.now()
+        monotonic = self.clock.monotonic()
+        batch = []
+        for reminder_id in sorted(self._batch_ids):
+            reminder = self.scheduler.get(reminder_id)
+            if reminder is None:
+                continue
+            deadline = now + datetime.timedelta(seconds=reminder.deadline - monotonic)
+            batch.append({
+                "message": reminder.message,
+                "deadline": deadline.isoformat(),
+                "snooze_minutes": reminder.snooze_minutes,
+                "snooze_count": reminder.snooze_count,
+            })
+        self._saved = dataclasses.replace(self._saved, batch=batch, recent_messages=self.recent_messages())
+        save_settings(self._saved)
+
+    def _persist_deadline(self, deadline: datetime.datetime | None, snooze_count: int = 0) -> None:
+        """発火待ちの絶対期限を設定ファイルに保存する。None の場合は発火待ちなしとして消去する。"""
+        self._saved = dataclasses.replace(
+            self._saved,
+            deadline=deadline.isoformat() if deadline is not None else "",
+            snooze_count=str(snooze_count),
+        )
+        save_settings(self._saved)
+
+    def _restore_pending(self, saved: Settings) -> None:
+        """前回終了時に発火待ちだった通知を、保存済みの絶対期限から復元する。
+
+        期限が未来ならその時刻に再登録する。停止中に過ぎていれば catch_up に従い、
+        通知する場合は見逃した旨を添えて直ちに 1 回だけ表示し、破棄する場合は期限を消去する。
+        """
+        if not saved.deadline or not saved.message:
+            return
+        try:
+            deadline = datetime.datetime.fromisoformat(saved.deadline)
+            snooze_count = int(saved.snooze_count)
+        except (ValueError, TypeError):
+            logging.warning("保存済みの通知期限を読み取れないため破棄します: %s", saved.deadline)
+            self._persist_deadline(None)
+            return
+        snooze_minutes = self._normalize_snooze_input()
+        message = saved.message
+        now = self.clock.now()
+
+        if deadline > now:
+            delay_ms = int((deadline - now).total_seconds() * 1000)
+            self._add_job(message, delay_ms, snooze_minutes, snooze_count)
+            self._set_active_state(f"前回の設定を復元しました。{deadline:%H:%M} に通知予定です（スヌーズ: {snooze_minutes}分）。")
+            logging.info("発火待ちの通知を復元: %s", saved.deadline)
+            return
+
+        deliver, _missed = self.catch_up.split([deadline], now.timestamp(), datetime.datetime.timestamp)
+        if not deliver:
+            self._persist_deadline(None)
+            self.status_var.set(f"停止中に期限（{deadline:%m/%d %H:%M}）を過ぎた通知を破棄しました。")
+            logging.info("停止中に期限を過ぎた通知を破棄: %s", saved.deadline)
+            return
+        # 期限は表示時に消去されるため、表示前に再び終了しても次回また通知される
+        overdue_message = f"{message}\n\n（{deadline:%m/%d %H:%M} の通知を停止中に見逃しました）"
+        self._add_job(overdue_message, 0, snooze_minutes, snooze_count)
+        self._set_active_state(f"停止中に期限（{deadline:%H:%M}）を過ぎた通知を表示します。")
+        logging.info("停止中に期限を過ぎた通知を配信: %s", saved.deadline)
+
+    def _restore_batch(self, saved: Settings) -> None:
+        """前回終了時に発火待ちだった schedule_many() の通知を、保存済みの絶対期限から復元する。
+
+        期限が未来のものはその時刻に、停止中に過ぎたものは catch_up に従って直ちに通知するか破棄し、
+        まとめて 1 回の add_many() で登録し直す。読み取れない項目は破棄する。
+        """
+        if not saved.batch:
+            return
+        now = self.clock.now()
+        items: list[BatchItem] = []
+        overdue: list[tuple[BatchItem, datetime.datetime]] = []
+        for entry in saved.batch if isinstance(saved.batch, list) else ():
+            try:
+                deadline = datetime.datetime.fromisoformat(entry["deadline"])
+                if not isinstance(entry["message"], str):
+                    raise TypeError(entry["message"])
+                item = BatchItem(entry["message"], delay_ms=0, snooze_minutes=entry["snooze_minutes"],
+                                 snooze_count=entry["snooze_count"])
+            except (KeyError, TypeError, ValueError):
+                logging.warning("保存済みの一括登録の通知を読み取れないため破棄します: %r", entry)
+                continue
+            if deadline > now:
+                items.append(item._replace(delay_ms=int((deadline - now).total_seconds() * 1000)))
+            else:
+                overdue.append((item, deadline))
+        deliver, missed = self.catch_up.split(overdue, now.timestamp(), lambda pair: pair[1].timestamp())
+        items += [
+            item._replace(message=f"{item.message}\n\n（{deadline:%m/%d %H:%M} の通知を停止中に見逃しました）")
+            for item, deadline in deliver
+        ]
+        for result in self.scheduler.add_many(items):
+            if result.ok:
+                self._batch_ids.add(result.reminder_id)  # type: ignore[arg-type]
+            else:
+                logging.warning("一括登録の通知を復元できないため破棄します: %s", result.error)
+        if missed:
+            logging.info("停止中に期限を過ぎた一括登録の通知を %d 件破棄しました", len(missed))
+        self._persist_batch()
+        metrics.QUEUE_DEPTH.set(len(self.scheduler))
+
+    @property
+    def scheduled_job_id(self) -> object | None:
+        """発火待ちのジョブの timer.after() が返した ID。未スケジュール時・通知中は None。"""
+        reminder = self.scheduler.get(self._reminder_id) if self._reminder_id is not None else None
+        return reminder.job_id if reminder is not None else None
+
+    def _add_job(self, message: str, delay_ms: int, snooze_minutes: int, snooze_count: int = 0) -> None:
+        """Scheduler に通知ジョブを登録し、発火予定時刻と待ち行列の深さを記録する。
+
+        Raises:
+            Exception: timer.after() が失敗した場合はそのまま再送出する（Scheduler は何も保持しない）。
+        """
+        self._reminder_id = self.scheduler.add(
+            message, delay_ms=delay_ms, snooze_minutes=snooze_minutes, snooze_count=snooze_count,
+        )
+        self._deadline = self.scheduler.get(self._reminder_id).deadline  # type: ignore[union-attr]
+        metrics.QUEUE_DEPTH.set(1)
 
     def _cancel_job(self) -> None:
         """スケジュール済みジョブをキャンセルする（UI 状態は変更しない）。"""
-        if self.scheduled_job_id is not None:
-            self.root.after_cancel(self.scheduled_job_id)
-            self.scheduled_job_id = None
+        if self._reminder_id is not None:
+            self.scheduler.cancel(self._reminder_id)
+            self._reminder_id = None
+        self._deadline = None
+        metrics.QUEUE_DEPTH.set(0)
+
+    def _on_fire(self, reminder: Reminder) -> bool:
+        """Scheduler からの発火コールバック。スヌーズは show_reminder() 側で登録し直すため常に False を返す。
+
+        UI を破棄していれば作り直してから通知し、スヌーズで再び発火待ちになれば破棄し直す。
+        """
+        if self.background:
+            self.reopen()
+        if reminder.reminder_id in self._batch_ids:
+            self._show_batch_reminder(reminder)
+        else:
+            self.show_reminder(reminder.message, reminder.snooze_minutes, reminder.snooze_count)
+        self._enter_background()
+        return False
 
     def _reset_to_idle(self) -> None:
         """ジョブをキャンセルし、UI をアイドル状態に戻す。
 
         例外ハンドラや中断パスから呼び出すことで、
-        ボタン状態と scheduled_job_id を常に整合させる。
+        ボタン状態と発火待ちのジョブを常に整合させる。
         """
         self._cancel_job()
         self.schedule_button.configure(state=tk.NORMAL)
@@ -310,6 +685,7 @@ class ReminderApp:
         if self.scheduled_job_id is None:
             return
         self._reset_to_idle()
+        self._persist_deadline(None)
         self.status_var.set("リマインダー設定を解除しました。")
         logging.info("リマインダーの設定を解除しました。")
 
@@ -317,8 +693,12 @@ class ReminderApp:
 
     def _show_notification(self, message: str) -> None:
         """通知音を再生し、メッセージダイアログを表示する。"""
+        started = time.perf_counter()
         play_notification_sound(self.root)
+        sound_done = time.perf_counter()
         messagebox.showinfo("リマインダー", message)
+        metrics.STAGE_SOUND_MS.observe((sound_done - started) * 1000)
+        metrics.STAGE_DIALOG_MS.observe((time.perf_counter() - sound_done) * 1000)
 
     def show_reminder(self, message: str, snooze_minutes: int | None = None, snooze_count: int = 0) -> None:
         """通知ダイアログを表示し、スヌーズ有無を確認する。
@@ -328,37 +708,97 @@ class ReminderApp:
             snooze_minutes: スヌーズ間隔（分）。None の場合は snooze_var から正規化して取得する。
             snooze_count: 現在のスヌーズ回数。MAX_SNOOZE_COUNT に達した場合はダイアログを省略する。
         """
+        started = time.perf_counter()
+        fired_at = self.clock.now().timestamp()
+        lateness_ms = 0.0
+        if self._deadline is not None:
+            lateness_ms = max(0.0, self.clock.monotonic() - self._deadline) * 1000
+            metrics.FIRE_LATENESS_MS.observe(lateness_ms)
         if snooze_minutes is None:
             snooze_minutes = self._normalize_snooze_input()
 
-        # 通知ダイアログ表示前に UI をアイドル状態に戻す（キャンセルボタンを無効化）
-        self._reset_to_idle()
-        logging.info("リマインダーを通知: スヌーズ回数 %d", snooze_count)
-        self._show_notification(message)
-
-        # スヌーズ上限未満の場合のみ継続スヌーズを提案する
-        if snooze_count < MAX_SNOOZE_COUNT and messagebox.askyesno("スヌーズ", f"{snooze_minutes}分後に再通知しますか？"):
-            self._schedule_snooze(message, snooze_minutes, snooze_count + 1)
-            return
-
-        self.status_var.set(STATUS_NOTIFIED)
+        try:
+            # 通知ダイアログ表示前に UI をアイドル状態に戻す（キャンセルボタンを無効化）
+            self._reset_to_idle()
+            # 表示した時点で配信済みとし、終了しても再通知しないよう期限を消去する
+            self._persist_deadline(None)
+            logging.info("リマインダーを通知: スヌーズ回数 %d", snooze_count)
+            self._show_notification(message)
+
+            # スヌーズ上限未満の場合のみ継続スヌーズを提案する
+            if snooze_count >= MAX_SNOOZE_COUNT:
+                outcome = OUTCOME_LIMIT
+            elif messagebox.askyesno("スヌーズ", f"{snooze_minutes}分後に再通知しますか？"):
+                outcome = OUTCOME_SNOOZED
+            else:
+                outcome = OUTCOME_DISMISSED
+            if self.history is not None:
+                self.history.record(message, lateness_ms=lateness_ms, snooze_count=snooze_count,
+                                    outcome=outcome, fired_at=fired_at)
+
+            if outcome == OUTCOME_SNOOZED:
+                rearm_started = time.perf_counter()
+                self._schedule_snooze(message, snooze_minutes, snooze_count + 1)
+                metrics.STAGE_SNOOZE_MS.observe((time.perf_counter() - rearm_started) * 1000)
+                return
+
+            self.status_var.set(STATUS_NOTIFIED)
+        finally:
+            metrics.STAGE_DISPATCH_MS.observe((time.perf_counter() - started) * 1000)
+            metrics.flush()
+
+    def _show_batch_reminder(self, reminder: Reminder) -> None:
+        """schedule_many() で登録した通知を表示し、スヌーズ有無を確認する。
+
+        画面の発火待ち（schedule() の 1 件）とボタン状態には触れない。スヌーズは新しい ID で登録し直す。
+        """
+        started = time.perf_counter()
+        fired_at = self.clock.now().timestamp()
+        lateness_ms = max(0.0, self.clock.monotonic() - reminder.deadline) * 1000
+        metrics.FIRE_LATENESS_MS.observe(lateness_ms)
+        self._batch_ids.discard(reminder.reminder_id)
+        try:
+            # 表示した時点で配信済みとし、終了しても再通知しないよう保存済みの一覧から外す
+            self._persist_batch()
+            logging.info("一括登録の通知を表示: スヌーズ回数 %d", reminder.snooze_count)
+            self._show_notification(reminder.message)
+
+            if reminder.snooze_count >= MAX_SNOOZE_COUNT:
+                outcome = OUTCOME_LIMIT
+            elif messagebox.askyesno("スヌーズ", f"{reminder.snooze_minutes}分後に再通知しますか？"):
+                outcome = OUTCOME_SNOOZED
+            else:
+                outcome = OUTCOME_DISMISSED
+            if self.history is not None:
+                self.history.record(reminder.message, lateness_ms=lateness_ms, snooze_count=reminder.snooze_count,
+                                    outcome=outcome, fired_at=fired_at)
+
+            if outcome == OUTCOME_SNOOZED:
+                self._batch_ids.add(self.scheduler.add(
+                    reminder.message, delay_ms=snooze_delay_ms(reminder.snooze_minutes),
+                    snooze_minutes=reminder.snooze_minutes, snooze_count=reminder.snooze_count + 1,
+                ))
+                self._persist_batch()
+        finally:
+            metrics.STAGE_DISPATCH_MS.observe((time.perf_counter() - started) * 1000)
+            metrics.flush()
 
     def _schedule_snooze(self, message: str, snooze_minutes: int, snooze_count: int) -> None:
-        """指定間隔後に show_reminder を再呼び出しするスヌーズジョブを登録する。
+        """指定間隔後に show_reminder を再呼び出しするスヌーズジョブを Scheduler に登録する。
 
         Args:
             message: 再通知するメッセージ。
             snooze_minutes: 次の通知までの待機時間（分）。
             snooze_count: 累積スヌーズ回数。show_reminder に引き継ぎ上限チェックに使用する。
         """
-        delay_ms = int(datetime.timedelta(minutes=snooze_minutes).total_seconds() * 1000)
+        delay_ms = snooze_delay_ms(snooze_minutes)
+        self._cancel_job()
         try:
-            self.scheduled_job_id = self.root.after(
-                delay_ms, lambda: self.show_reminder(message, snooze_minutes, snooze_count)
-            )
+            self._add_job(message, delay_ms, snooze_minutes, snooze_count)
         except Exception:
             # after() が失敗した場合は UI をアイドル状態にリセットして例外を再送出する
             self._reset_to_idle()
             raise
+        self._persist_deadline(self.clock.now() + datetime.timedelta(milliseconds=delay_ms), snooze_count)
         self._set_active_state(f"スヌーズ中です。{snooze_minutes}分後に再通知します。")
         logging.info("スヌーズを設定: %d 分後に再通知（回数: %d）", snooze_minutes, snooze_count)
@@ -0,0 +1,107 @@
+"""実行環境の機能の検出結果をプロセス内でキャッシュする。
+
+通知のたびに platform.system() を呼んだり、コマンドを起動して例外で初めて存在しないと
+知ったりしないよう、OS・PATH 上のコマンド・D-Bus セッションバス・音声出力デバイス・
+任意の依存モジュールの有無を最初の問い合わせで 1 回だけ調べて覚えておく。
+検出結果はプロセスの間は変わらないものとして扱う（clear() で捨てられる）。
+"""
+from __future__ import annotations
+
+import glob
+import importlib
+import logging
+import os
+import platform
+import shutil
+import threading
+from types import ModuleType
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+_cache: dict[str, object] = {}
+# 検出処理の中で別の検出結果を参照することがあるため再入可能にする
+_lock = threading.RLock()
+
+
+def probe(key: str, check: Callable[[], T]) -> T:
+    """key の検出結果を返す。初回だけ check() を呼び、以後はキャッシュを返す。"""
+    try:
+        return _cache[key]  # type: ignore[return-value]
+    except KeyError:
+        pass
+    with _lock:
+        if key not in _cache:
+            _cache[key] = check()
+        return _cache[key]  # type: ignore[return-value]
+
+
+def clear() -> None:
+    """検出結果をすべて捨てる。次の問い合わせで調べ直す。"""
+    with _lock:
+        _cache.clear()
+
+
+def snapshot() -> dict[str, object]:
+    """これまでに検出した結果の写し（診断用）。"""
+    with _lock:
+        return {key: value for key, value in _cache.items() if not isinstance(value, ModuleType)}
+
+
+def system() -> str:
+    """platform.system() の値（"Linux" / "Darwin" / "Windows" など）。"""
+    return probe("system", platform.system)
+
+
+def binary(name: str) -> str | None:
+    """PATH 上のコマンドのフルパス。見つからなければ None。"""
+    return probe(f"binary:{name}", lambda: shutil.which(name))
+
+
+def optional_module(name: str) -> ModuleType | None:
+    """任意の依存モジュールを読み込んで返す。読み込めなければ None（失敗も覚えておく）。"""
+    def load() -> ModuleType | None:
+        try:
+            return importlib.import_module(name)
+        except Exception as e:
+            # cairosvg のように、モジュールはあっても共有ライブラリがなく OSError になることがある
+            logging.debug("%s を読み込めません: %s", name, e)
+            return None
+
+    return probe(f"module:{name}", load)
+
+
+def dbus_session() -> bool:
+    """D-Bus のセッションバスに接続できそうか（アドレスのソケットが存在するか）。"""
+    def check() -> bool:
+        address = os.environ.get("DBUS_SESSION_BUS_ADDRESS")
+        if address is None:
+            runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+            return runtime_dir is not None and os.path.exists(os.path.join(runtime_dir, "bus"))
+        for part in address.split(";"):
+            transport, _, params = part.partition(":")
+            options = dict(option.partition("=")[::2] for option in params.split(",") if option)
+            if transport == "unix" and "path" in options:
+                if os.path.exists(options["path"]):
+                    return True
+            elif transport:
+                # 抽象ソケットや TCP は接続してみないと分からないため、使えるものとして扱う
+                return True
+        return False
+
+    return probe("dbus_session", check)
+
+
+def audio_device() -> bool:
+    """音声出力デバイスがありそうか。Linux では ALSA の再生デバイスかサウンドサーバーのソケットを探す。"""
+    def check() -> bool:
+        if system() != "Linux":
+            return True
+        if os.environ.get("PULSE_SERVER") or glob.glob("/dev/snd/pcmC*D*p"):
+            return True
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        return runtime_dir is not None and any(
+            os.path.exists(os.path.join(runtime_dir, name)) for name in ("pulse/native", "pipewire-0")
+        )
+
+    return probe("audio_device", check)
@@ -0,0 +1,78 @@
+"""停止中に期限を過ぎたリマインダーの起動時キャッチアップ。
+
+アプリやサーバーが止まっている間に期限を迎えたリマインダーを、起動時にどう扱うかを決める。
+
+ポリシー:
+    all             期限切れをすべて通知する
+    latest          最も新しい 1 件だけ通知し、残りは見逃しとして破棄する
+    drop-older:秒   指定秒数より古いものを破棄し、残りを通知する
+
+通知する分は 1 件ずつ発火させず、1 回の通知（ダイアログ 1 つ、イベント 1 つ）にまとめて届ける。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Sequence, TypeVar
+
+POLICY_ALL = "all"
+POLICY_LATEST = "latest"
+POLICY_DROP_OLDER = "drop-older"
+POLICIES = (POLICY_ALL, POLICY_LATEST, POLICY_DROP_OLDER)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CatchUpPolicy:
+    """期限切れリマインダーの扱い方。
+
+    Attributes:
+        mode: "all" / "latest" / "drop-older" のいずれか。
+        max_age_s: drop-older で通知する期限切れの最大経過時間（秒）。
+    """
+
+    mode: str = POLICY_ALL
+    max_age_s: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.mode not in POLICIES:
+            raise ValueError(f"不明なキャッチアップ方針です: {self.mode}（{', '.join(POLICIES)} のいずれか）")
+        if self.mode == POLICY_DROP_OLDER and (self.max_age_s is None or self.max_age_s < 0):
+            raise ValueError("drop-older には 0 以上の秒数を指定してください（例: drop-older:3600）")
+
+    @classmethod
+    def parse(cls, spec: str) -> CatchUpPolicy:
+        """"all" / "latest" / "drop-older:秒" 形式の文字列から作る。
+
+        Raises:
+            ValueError: 形式が不正な場合。
+        """
+        mode, _, argument = spec.strip().partition(":")
+        if mode == POLICY_DROP_OLDER:
+            try:
+                return cls(mode, float(argument))
+            except ValueError:
+                raise ValueError("drop-older には 0 以上の秒数を指定してください（例: drop-older:3600）") from None
+        if argument:
+            raise ValueError(f"{mode} には引数を指定できません")
+        return cls(mode)
+
+    def cutoff(self, now: float) -> float | None:
+        """これより前の期限は破棄する、という境界（UNIX 時刻）。drop-older 以外は None。"""
+        return now - self.max_age_s if self.mode == POLICY_DROP_OLDER else None  # type: ignore[operator]
+
+    def split(self, overdue: Sequence[T], now: float, deadline: Callable[[T], float]) -> tuple[list[T], list[T]]:
+        """期限切れの並びを (通知するもの, 破棄するもの) に分ける。どちらも期限の古い順。
+
+        Args:
+            overdue: 期限切れの要素。
+            now: 現在の UNIX 時刻。
+            deadline: 要素から期限（UNIX 時刻）を取り出す関数。
+        """
+        ordered = sorted(overdue, key=deadline)
+        if self.mode == POLICY_LATEST:
+            return ordered[-1:], ordered[:-1]
+        cutoff = self.cutoff(now)
+        if cutoff is None:
+            return ordered, []
+        return [item for item in ordered if deadline(item) >= cutoff], [item for item in ordered if deadline(item) < cutoff]
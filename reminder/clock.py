@@ -0,0 +1,231 @@
+"""時計とタイマーの抽象化。
+
+ReminderApp は現在時刻の取得とジョブ登録をこのモジュールの Clock / Timer 経由で行う。
+本番では SystemClock と TkTimer（root.after のラッパー）を使い、テストや負荷試験では
+VirtualClock に差し替えることで、数日分のスケジュールを実時間を待たずに決定的に再生できる。
+Tk なしで実時間に動かす場合は RealtimeLoop を使う。
+"""
+from __future__ import annotations
+
+import datetime
+import heapq
+import itertools
+import time
+import tkinter as tk
+from typing import Callable, Hashable, Protocol
+
+
+class Clock(Protocol):
+    """現在時刻を提供するインターフェース。"""
+
+    def now(self) -> datetime.datetime:
+        """現在の壁時計時刻を返す。"""
+        ...
+
+    def monotonic(self) -> float:
+        """単調増加する経過時間（秒）を返す。"""
+        ...
+
+
+class Timer(Protocol):
+    """遅延実行ジョブを登録するインターフェース（root.after と同じシグネチャ）。"""
+
+    def after(self, delay_ms: int, callback: Callable[[], object]) -> Hashable:
+        """delay_ms ミリ秒後に callback を実行するジョブを登録し、ジョブ ID を返す。"""
+        ...
+
+    def after_cancel(self, job_id: Hashable) -> None:
+        """登録済みジョブを取り消す。"""
+        ...
+
+
+class SystemClock:
+    """OS の時計をそのまま返す Clock 実装。"""
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class TkTimer:
+    """Tk の root.after / after_cancel に委譲する Timer 実装。"""
+
+    def __init__(self, root: tk.Misc) -> None:
+        self.root = root
+
+    def after(self, delay_ms: int, callback: Callable[[], object]) -> Hashable:
+        return self.root.after(delay_ms, callback)
+
+    def after_cancel(self, job_id: Hashable) -> None:
+        self.root.after_cancel(job_id)
+
+
+class _JobQueue:
+    """期限順にジョブを保持するヒープ。取り消しは印を付けて取り出し時に捨てる。
+
+    期限の単位はサブクラスが決める（VirtualClock はミリ秒、RealtimeLoop は秒）。
+    """
+
+    def __init__(self) -> None:
+        self._queue: list[tuple[float, int, Callable[[], object]]] = []
+        # 未実行かつ未取り消しのジョブ ID と、ヒープに残っている取り消し済みのジョブ ID
+        self._live: set[int] = set()
+        self._cancelled: set[int] = set()
+        self._seq = itertools.count(1)
+
+    def _push(self, due: float, callback: Callable[[], object]) -> int:
+        seq = next(self._seq)
+        heapq.heappush(self._queue, (due, seq, callback))
+        self._live.add(seq)
+        return seq
+
+    def after_cancel(self, job_id: Hashable) -> None:
+        # ヒープからの削除は O(n) のため、取り消し済みとして印を付け取り出し時に捨てる。
+        # 実行済み・取り消し済みの ID は印を付けない（印が溜まり続けないように）
+        if job_id in self._live:
+            self._live.discard(job_id)  # type: ignore[arg-type]
+            self._cancelled.add(job_id)  # type: ignore[arg-type]
+
+    @property
+    def pending(self) -> int:
+        """未実行かつ未取り消しのジョブ数。"""
+        return len(self._live)
+
+    def _peek_due(self) -> float | None:
+        """次に実行されるジョブの期限。ジョブがなければ None。"""
+        while self._queue and self._queue[0][1] in self._cancelled:
+            _due, seq, _cb = heapq.heappop(self._queue)
+            self._cancelled.discard(seq)
+        return self._queue[0][0] if self._queue else None
+
+    def _pop(self) -> tuple[float, Callable[[], object]]:
+        due, seq, callback = heapq.heappop(self._queue)
+        self._live.discard(seq)
+        return due, callback
+
+
+class VirtualClock(_JobQueue):
+    """仮想時間で動作する Clock 兼 Timer。
+
+    advance() / run_until_idle() を呼ぶまで時間は進まない。期限を迎えたジョブは
+    期限順（同時刻なら登録順）に実行され、実行中は now() がそのジョブの期限を返す。
+    コールバック内で登録したジョブも同じ advance() の範囲内なら続けて実行される。
+
+    Attributes:
+        start: 仮想時間 0 に対応する壁時計時刻。
+        elapsed_ms: 開始からの仮想経過時間（ミリ秒）。
+        fired: これまでに実行したジョブ数。
+    """
+
+    def __init__(self, start: datetime.datetime | None = None) -> None:
+        super().__init__()
+        self.start = start or datetime.datetime(2026, 1, 1, 0, 0, 0)
+        self.elapsed_ms = 0
+        self.fired = 0
+
+    # ------------------------------------------------------------ Clock
+
+    def now(self) -> datetime.datetime:
+        return self.start + datetime.timedelta(milliseconds=self.elapsed_ms)
+
+    def monotonic(self) -> float:
+        return self.elapsed_ms / 1000
+
+    # ------------------------------------------------------------ Timer
+
+    def after(self, delay_ms: int, callback: Callable[[], object]) -> Hashable:
+        return self._push(self.elapsed_ms + max(0, int(delay_ms)), callback)
+
+    # ------------------------------------------------------------ 時間操作
+
+    def next_deadline_ms(self) -> int | None:
+        """次に実行されるジョブの期限（仮想経過ミリ秒）。ジョブがなければ None。"""
+        due = self._peek_due()
+        return None if due is None else int(due)
+
+    def advance(self, ms: int) -> int:
+        """仮想時間を ms ミリ秒進め、その間に期限を迎えたジョブを実行する。
+
+        Returns:
+            実行したジョブ数。
+        """
+        target = self.elapsed_ms + ms
+        fired = 0
+        while True:
+            due = self.next_deadline_ms()
+            if due is None or due > target:
+                break
+            _due, callback = self._pop()
+            self.elapsed_ms = max(self.elapsed_ms, due)
+            fired += 1
+            self.fired += 1
+            callback()
+        self.elapsed_ms = target
+        return fired
+
+    def run_until_idle(self, limit_ms: int | None = None) -> int:
+        """ジョブがなくなるまで（または limit_ms 経過まで）仮想時間を進める。
+
+        Returns:
+            実行したジョブ数。
+        """
+        deadline = None if limit_ms is None else self.elapsed_ms + limit_ms
+        fired = 0
+        while True:
+            due = self.next_deadline_ms()
+            if due is None or (deadline is not None and due > deadline):
+                break
+            fired += self.advance(due - self.elapsed_ms)
+        if deadline is not None and self.elapsed_ms < deadline:
+            self.elapsed_ms = deadline
+        return fired
+
+
+class RealtimeLoop(_JobQueue):
+    """実時間で動作する Clock 兼 Timer。Tk を使わないヘッドレス実行用。
+
+    VirtualClock と同じく run_until_idle() を呼んだスレッドでジョブを実行する。
+    次の期限まではスリープするため、待機中に CPU を消費しない。
+
+    Attributes:
+        fired: これまでに実行したジョブ数。
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fired = 0
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def after(self, delay_ms: int, callback: Callable[[], object]) -> Hashable:
+        return self._push(time.monotonic() + max(0, int(delay_ms)) / 1000, callback)
+
+    def run_until_idle(self, limit_ms: int | None = None) -> int:
+        """ジョブがなくなるまで（または limit_ms 経過まで）実時間で待ちながら実行する。
+
+        Returns:
+            実行したジョブ数。
+        """
+        deadline = None if limit_ms is None else time.monotonic() + limit_ms / 1000
+        fired = 0
+        while True:
+            due = self._peek_due()
+            if due is None or (deadline is not None and due > deadline):
+                break
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            _due, callback = self._pop()
+            fired += 1
+            self.fired += 1
+            callback()
+        return fired
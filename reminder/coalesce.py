@@ -0,0 +1,113 @@
+"""起床回数を抑える合体タイマー。
+
+多数のリマインダーがそれぞれ Timer にジョブを登録すると、期限が数秒ずつずれているだけでも
+そのたびにプロセスが起床する。CoalescingTimer は下位の Timer（TkTimer・RealtimeLoop・
+AsyncioTimer・VirtualClock のいずれか）に常に 1 件だけジョブを登録し、次の起床時刻を自分で決める。
+
+各ジョブは期限 due と許容遅延 slack を持ち、[due, due + slack] のどこで実行してもよい。
+起床時刻は未実行ジョブの due + slack の最小値とし、起床したらその時点で due を過ぎている
+ジョブをまとめて実行する。区間を点で刺す貪欲法と同じで、与えられた slack の範囲では起床回数が最小になる。
+slack が 0 のジョブだけなら下位の Timer に直接登録した場合と同じ時刻に実行する。
+
+起床回数は wakeups と wakeups_per_hour()、および reminder_timer_wakeups_total メトリクスで確認できる。
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+from typing import Callable, Hashable
+
+from . import metrics
+from .clock import Clock, Timer
+
+WAKEUPS_TOTAL = metrics.REGISTRY.counter("reminder_timer_wakeups_total", "合体タイマーが起床した回数")
+
+
+class CoalescingTimer:
+    """下位の Timer に 1 件だけジョブを登録し、期限の近いジョブを 1 回の起床にまとめる Timer。
+
+    Attributes:
+        clock: 期限の基準にする時計（下位の Timer と同じ monotonic を返すもの）。
+        timer: 起床用のジョブを登録する下位の Timer。
+        wakeups: 下位の Timer から起こされた回数。
+        fired: 実行したジョブ数。
+    """
+
+    def __init__(self, clock: Clock, timer: Timer) -> None:
+        self.clock = clock
+        self.timer = timer
+        self.wakeups = 0
+        self.fired = 0
+        self._started = clock.monotonic()
+        # seq -> (期限, 許容される最も遅い実行時刻, コールバック)。期限・時刻は monotonic の秒
+        self._jobs: dict[int, tuple[float, float, Callable[[], object]]] = {}
+        # 取り消したジョブはヒープに残し、取り出し時に _jobs にないものとして捨てる
+        self._by_due: list[tuple[float, int]] = []
+        self._by_latest: list[tuple[float, int]] = []
+        self._seq = itertools.count(1)
+        # 下位の Timer に登録中の (起床時刻, ジョブ ID)
+        self._armed: tuple[float, Hashable] | None = None
+
+    @property
+    def pending(self) -> int:
+        """未実行かつ未取り消しのジョブ数。"""
+        return len(self._jobs)
+
+    def after(self, delay_ms: int, callback: Callable[[], object], slack_ms: int = 0) -> Hashable:
+        """delay_ms ミリ秒後から、さらに slack_ms ミリ秒以内のどこかで callback を実行する。"""
+        due = self.clock.monotonic() + max(0, delay_ms) / 1000
+        latest = due + max(0, slack_ms) / 1000
+        seq = next(self._seq)
+        self._jobs[seq] = (due, latest, callback)
+        heapq.heappush(self._by_due, (due, seq))
+        heapq.heappush(self._by_latest, (latest, seq))
+        self._rearm()
+        return seq
+
+    def after_cancel(self, job_id: Hashable) -> None:
+        if self._jobs.pop(job_id, None) is not None:  # type: ignore[arg-type]
+            self._rearm()
+
+    def next_wakeup(self) -> float | None:
+        """次の起床時刻（monotonic の秒）。ジョブがなければ None。"""
+        while self._by_latest and self._by_latest[0][1] not in self._jobs:
+            heapq.heappop(self._by_latest)
+        return self._by_latest[0][0] if self._by_latest else None
+
+    def wakeups_per_hour(self) -> float:
+        """生成してからの 1 時間あたりの起床回数。"""
+        elapsed = self.clock.monotonic() - self._started
+        return self.wakeups * 3600 / elapsed if elapsed > 0 else 0.0
+
+    # ------------------------------------------------------------ 内部処理
+
+    def _rearm(self) -> None:
+        """下位の Timer のジョブを次の起床時刻に合わせる。変わらなければ何もしない。"""
+        wakeup = self.next_wakeup()
+        if self._armed is not None:
+            if self._armed[0] == wakeup:
+                return
+            self.timer.after_cancel(self._armed[1])
+            self._armed = None
+        if wakeup is not None:
+            # 早すぎる起床で空振りしないよう切り上げる（秒とミリ秒の変換誤差では切り上げない）
+            delay_ms = max(0, math.ceil(round((wakeup - self.clock.monotonic()) * 1000, 6)))
+            self._armed = (wakeup, self.timer.after(delay_ms, self._wake))
+
+    def _wake(self) -> None:
+        """起床処理。期限を過ぎたジョブを期限順にまとめて実行する。"""
+        self._armed = None
+        self.wakeups += 1
+        WAKEUPS_TOTAL.inc()
+        now = self.clock.monotonic()
+        try:
+            while self._by_due and self._by_due[0][0] <= now:
+                _due, seq = heapq.heappop(self._by_due)
+                # 同じ起床で先に実行したジョブが取り消した場合は実行しない
+                job = self._jobs.pop(seq, None)
+                if job is not None:
+                    self.fired += 1
+                    job[2]()
+        finally:
+            self._rearm()
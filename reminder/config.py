@@ -9,6 +9,8 @@ from .time_utils import DEFAULT_SNOOZE_MINUTES
 
 _CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "reminder")
 _CONFIG_PATH = os.path.join(_CONFIG_DIR, "settings.json")
+# 検索欄から再利用できるよう保存する、最近設定したメッセージの件数
+MAX_RECENT_MESSAGES = 100
 
 
 @dataclass
@@ -19,6 +21,14 @@ class Settings:
     hour: str = "00"
     minute: str = "00"
     snooze_minutes: str = field(default_factory=lambda: str(DEFAULT_SNOOZE_MINUTES))
+    # 発火待ちの通知の絶対期限（ISO 8601）。空文字は発火待ちなし。再起動時の復元とキャッチアップに使う
+    deadline: str = ""
+    # deadline の通知までに重ねたスヌーズ回数
+    snooze_count: str = "0"
+    # 最近設定したメッセージ（新しい順、重複なし、MAX_RECENT_MESSAGES 件まで）
+    recent_messages: list[str] = field(default_factory=list)
+    # schedule_many() で登録した発火待ち。message / deadline（ISO 8601）/ snooze_minutes / snooze_count の辞書
+    batch: list[dict] = field(default_factory=list)
 
 
 def load_settings() -> Settings:
@@ -0,0 +1,99 @@
+"""共有ストアのリースによるスケジューラ間のリーダー選出。
+
+可用性のためにサーバーを複数台動かすと、各インスタンスが独立したタイマーを持つため
+全リマインダーが台数分だけ発火してしまう。LeaderElector は ReminderStore の leases 表の
+1 行をリースとして奪い合い、保持しているインスタンスだけが発火を担当する。
+
+- リーダーは heartbeat_s（ttl_s の 1/3）ごとにリースを延長する
+- リーダーが止まると、待機系は遅くとも takeover_bound_s 後にリースを取得する
+- リーダー自身はリース期限より heartbeat_s だけ早く自分の権限を失効させ、
+  延長が遅れた旧リーダーと新リーダーが同時に発火する時間を作らない
+
+それでも二重に発火しかけた場合に備え、発火は ReminderStore.record_fire() で
+(reminder_id, deadline) ごとに 1 回だけ記録し、記録できたインスタンスだけが通知する。
+時刻は全インスタンスで同じ壁時計を使う前提（同一ホスト、または時刻同期済みのホスト）。
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Callable
+
+from .store import ReminderStore
+
+DEFAULT_LEASE_TTL_S = 10.0
+LEASE_NAME = "scheduler"
+
+
+class LeaderElector:
+    """ReminderStore のリースでリーダーを選ぶ。
+
+    Attributes:
+        holder: このインスタンスの識別子。
+        ttl_s: リースの有効期間（秒）。
+    """
+
+    def __init__(
+        self,
+        store: ReminderStore,
+        holder: str | None = None,
+        *,
+        ttl_s: float = DEFAULT_LEASE_TTL_S,
+        name: str = LEASE_NAME,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            store: リース表を持つ共有ストア。
+            holder: インスタンスの識別子。省略時はホスト名・PID・乱数から作る。
+            ttl_s: リースの有効期間（秒）。
+            name: リース名。同じ名前を使うインスタンス同士で 1 台だけがリーダーになる。
+            clock: 壁時計。テストでは固定値を返す関数を渡す。
+        """
+        if ttl_s <= 0:
+            raise ValueError("ttl_s は正の値で指定してください")
+        self.store = store
+        self.holder = holder or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.ttl_s = ttl_s
+        self.name = name
+        self._clock = clock
+        self._valid_until = 0.0
+
+    @property
+    def heartbeat_s(self) -> float:
+        """リースを延長・取得を試みる間隔（秒）。"""
+        return self.ttl_s / 3
+
+    @property
+    def takeover_bound_s(self) -> float:
+        """リーダー停止から待機系が引き継ぐまでの最大時間（秒）。"""
+        return self.ttl_s + self.heartbeat_s
+
+    @property
+    def is_leader(self) -> bool:
+        """現時点でリーダーとして発火してよいか。"""
+        return self._clock() < self._valid_until
+
+    def heartbeat(self) -> bool:
+        """リースの取得または延長を試み、リーダーかどうかを返す。"""
+        started = self._clock()
+        try:
+            acquired = self.store.acquire_lease(self.name, self.holder, self.ttl_s, started)
+        except sqlite3.Error as e:
+            logging.warning("リースの更新に失敗しました: %s", e)
+            acquired = False
+        # 延長が遅れても旧リーダーの権限が新リーダーの取得より先に切れるよう、安全側に短く見積もる
+        self._valid_until = started + self.ttl_s - self.heartbeat_s if acquired else 0.0
+        return acquired
+
+    def release(self) -> None:
+        """リースを手放し、待機系が直ちに引き継げるようにする。"""
+        self._valid_until = 0.0
+        try:
+            self.store.release_lease(self.name, self.holder)
+        except sqlite3.Error as e:
+            logging.warning("リースの解放に失敗しました: %s", e)
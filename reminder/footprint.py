@@ -0,0 +1,153 @@
+"""発火待ちの間の常駐メモリ量と起床回数を、通常モードとバックグラウンドモードで比べる。
+
+使い方:
+    python -m reminder.footprint --seconds 60
+    python -m reminder.footprint --seconds 60 --mode background --json
+
+各モードは別プロセスで実際の Tk ウィンドウを作り、翌日の同時刻（約 24 時間後）に
+リマインダーを 1 件設定した状態で --seconds 秒待機する。待機中に Tk のイベントループが
+処理したイベントの数を起床回数とし、待機後の RSS を記録する。バックグラウンドモードでは
+最後に UI を作り直す時間も計測する。設定ファイルは一時ディレクトリに置き、利用者の設定には触れない。
+ディスプレイのない環境では Tk を起動できないため計測できない。
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+from dataclasses import asdict, dataclass
+
+from .loadgen import rss_bytes
+
+MODES = ("full", "background")
+
+
+@dataclass
+class FootprintReport:
+    """1 モード分の計測結果。"""
+
+    mode: str
+    seconds: float
+    rss_bytes: int = 0
+    wakeups: int = 0
+    rebuild_ms: float = 0.0
+
+    @property
+    def wakeups_per_minute(self) -> float:
+        return self.wakeups * 60 / self.seconds if self.seconds else 0.0
+
+    def format(self) -> str:
+        line = (f"{self.mode:<10} RSS {self.rss_bytes / 1024:>9.0f} KiB  "
+                f"起床 {self.wakeups:>5} 回（{self.wakeups_per_minute:.1f} 回/分）")
+        if self.rebuild_ms:
+            line += f"  UI 再構築 {self.rebuild_ms:.1f} ms"
+        return line
+
+
+def count_wakeups(root: tk.Misc, seconds: float) -> int:
+    """seconds 秒の間に Tk のイベントループが処理したイベントの数を返す。
+
+    終了用のタイマー自体は数えない。
+    """
+    done = False
+
+    def stop() -> None:
+        nonlocal done
+        done = True
+
+    root.after(int(seconds * 1000), stop)
+    wakeups = 0
+    while not done:
+        # 処理できるイベントが来るまでブロックし、1 件処理して戻る
+        root.tk.dooneevent(0)
+        wakeups += 1
+    return wakeups - 1
+
+
+def measure(mode: str, seconds: float) -> FootprintReport:
+    """このプロセスで ReminderApp を起動し、発火待ちの状態を mode で計測する。"""
+    from .app import ReminderApp
+
+    report = FootprintReport(mode=mode, seconds=seconds)
+    root = tk.Tk()
+    try:
+        app = ReminderApp(root, background=mode == "background")
+        # 1 分前の時刻を指定すると翌日に繰り越され、計測中には発火しない
+        target = datetime.datetime.now() - datetime.timedelta(minutes=1)
+        app.hour_var.set(f"{target.hour:02d}")
+        app.minute_var.set(f"{target.minute:02d}")
+        app.message_text.insert("1.0", "footprint")
+        app.schedule()
+        root.update()
+        gc.collect()
+        report.wakeups = count_wakeups(root, seconds)
+        report.rss_bytes = rss_bytes()
+        if app.background:
+            started = time.perf_counter()
+            app.reopen()
+            root.update_idletasks()
+            report.rebuild_ms = (time.perf_counter() - started) * 1000
+        app.cancel_schedule()
+    finally:
+        root.destroy()
+    return report
+
+
+def _measure_in_child(mode: str, seconds: float) -> FootprintReport:
+    """mode の計測を別プロセスで実行する（RSS が他のモードの影響を受けないようにする）。"""
+    output = subprocess.run(
+        [sys.executable, "-m", "reminder.footprint", "--mode", mode, "--seconds", str(seconds), "--json"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return FootprintReport(**json.loads(output.splitlines()[-1])[0])
+
+
+def compare(reports: list[FootprintReport]) -> str:
+    """計測結果を並べ、通常モードに対するバックグラウンドモードの比率を添える。"""
+    lines = [report.format() for report in reports]
+    by_mode = {report.mode: report for report in reports}
+    full, background = by_mode.get("full"), by_mode.get("background")
+    if full is not None and background is not None and full.rss_bytes:
+        lines.append(f"background / full: RSS {background.rss_bytes / full.rss_bytes:.0%}  "
+                     f"起床 {background.wakeups} / {full.wakeups} 回")
+    return "\n".join(lines)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m reminder.footprint",
+                                     description="発火待ちの間の RSS と起床回数の計測")
+    parser.add_argument("--seconds", type=float, default=60.0, help="待機して計測する時間（秒）")
+    parser.add_argument("--mode", choices=MODES, default=None, help="計測するモード（省略時は両方を別プロセスで比べる）")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if args.mode is None:
+        reports = [_measure_in_child(mode, args.seconds) for mode in MODES]
+    else:
+        from . import config
+
+        # 計測用のリマインダーを利用者の設定ファイルに残さない
+        saved_paths = config._CONFIG_DIR, config._CONFIG_PATH
+        with tempfile.TemporaryDirectory() as config_dir:
+            config._CONFIG_DIR = config_dir
+            config._CONFIG_PATH = os.path.join(config_dir, "settings.json")
+            try:
+                reports = [measure(args.mode, args.seconds)]
+            finally:
+                config._CONFIG_DIR, config._CONFIG_PATH = saved_paths
+    print(json.dumps([asdict(report) for report in reports], ensure_ascii=False) if args.json else compare(reports))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,367 @@
+"""発火したリマインダーの履歴と集計。
+
+show_reminder() が通知を表示すると、その発火の記録（時刻・遅延・スヌーズ回数・応答）を残す。
+履歴は 3 層で持つ。
+
+- 直近の記録: メモリ上の固定長リングバッファ（collections.deque）。古いものから押し出される
+- 全記録: 追記専用の gzip 圧縮セグメント（1 行 1 件の JSON）。一定件数で次のセグメントに移り、
+  max_segments を超えた古いセグメントは削除する
+- 集計: 1 時間ごとのロールアップ（件数・スヌーズ提示数・受け入れ数・遅延の合計と最大）。
+  記録のたびに該当する時間枠だけを加算し、集計クエリは生の記録を読み直さず時間枠を足し合わせる
+
+ロールアップはセグメントを閉じるたびに rollups.json に保存し、起動時はそれと
+閉じていないセグメント（前回異常終了した場合の書きかけ）だけから復元する。
+書きかけのセグメントに追記すると gzip の末尾が壊れたまま残るため、起動のたびに新しいセグメントを始める。
+"""
+from __future__ import annotations
+
+import collections
+import datetime
+import gzip
+import json
+import logging
+import os
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator
+
+from .config import _CONFIG_DIR
+
+HISTORY_DIR = os.path.join(_CONFIG_DIR, "history")
+
+# メモリに保持する直近の記録数
+DEFAULT_CAPACITY = 500
+# 1 セグメントあたりの記録数
+DEFAULT_SEGMENT_RECORDS = 1_000
+# ディスクに残すセグメント数（DEFAULT_SEGMENT_RECORDS × この数が保存される記録の上限）
+DEFAULT_MAX_SEGMENTS = 50
+# ロールアップを残す期間（時間）
+ROLLUP_RETENTION_HOURS = 24 * 90
+
+OUTCOME_SNOOZED = "snoozed"
+OUTCOME_DISMISSED = "dismissed"
+# スヌーズ上限に達しており、スヌーズを提示しなかった
+OUTCOME_LIMIT = "limit"
+OUTCOMES = (OUTCOME_SNOOZED, OUTCOME_DISMISSED, OUTCOME_LIMIT)
+
+_SEGMENT_SUFFIX = ".jsonl.gz"
+_ROLLUPS_FILE = "rollups.json"
+
+
+@dataclass(slots=True, frozen=True)
+class FireRecord:
+    """発火 1 回分の記録。
+
+    Attributes:
+        fired_at: 通知を表示した時刻（UNIX 時刻、秒）。
+        message: 通知メッセージ。
+        lateness_ms: 予定時刻に対する遅延（ミリ秒）。
+        snooze_count: この通知までに重ねたスヌーズ回数。
+        outcome: "snoozed" / "dismissed" / "limit" のいずれか。
+    """
+
+    fired_at: float
+    message: str
+    lateness_ms: float
+    snooze_count: int
+    outcome: str
+
+
+@dataclass(slots=True)
+class HourlyRollup:
+    """1 時間分の集計。"""
+
+    fires: int = 0
+    offered: int = 0
+    accepted: int = 0
+    lateness_sum_ms: float = 0.0
+    lateness_max_ms: float = 0.0
+
+    def add(self, record: FireRecord) -> None:
+        self.fires += 1
+        if record.outcome != OUTCOME_LIMIT:
+            self.offered += 1
+            self.accepted += record.outcome == OUTCOME_SNOOZED
+        self.lateness_sum_ms += record.lateness_ms
+        self.lateness_max_ms = max(self.lateness_max_ms, record.lateness_ms)
+
+    def merge(self, other: HourlyRollup) -> None:
+        self.fires += other.fires
+        self.offered += other.offered
+        self.accepted += other.accepted
+        self.lateness_sum_ms += other.lateness_sum_ms
+        self.lateness_max_ms = max(self.lateness_max_ms, other.lateness_max_ms)
+
+
+def _hour_of(timestamp: float) -> int:
+    return int(timestamp // 3600 * 3600)
+
+
+class FireHistory:
+    """発火履歴のリングバッファ・セグメントログ・時間別ロールアップ。
+
+    Attributes:
+        directory: セグメントとロールアップの保存先。None ならメモリ上だけで保持する。
+        readonly: True なら既存の履歴を読むだけで、書き込みもファイルの作成もしない。
+    """
+
+    def __init__(
+        self,
+        directory: str | None = HISTORY_DIR,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        segment_records: int = DEFAULT_SEGMENT_RECORDS,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        readonly: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            directory: 保存先ディレクトリ。None ならファイルに書かない。
+            capacity: メモリに保持する直近の記録数。
+            segment_records: 1 セグメントあたりの記録数。
+            max_segments: ディスクに残すセグメント数。
+            readonly: 他のプロセスが書き込み中の履歴を集計だけする場合に True（`reminder history`）。
+            clock: 記録時刻の取得元。
+        """
+        if capacity <= 0 or segment_records <= 0 or max_segments <= 0:
+            raise ValueError("capacity / segment_records / max_segments は正の値で指定してください")
+        self.directory = directory
+        self.readonly = readonly
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self._clock = clock
+        self._recent: collections.deque[FireRecord] = collections.deque(maxlen=capacity)
+        self._rollups: dict[int, HourlyRollup] = {}
+        # ロールアップに反映済みで閉じた最後のセグメント番号
+        self._sealed_through = 0
+        self._segment: gzip.GzipFile | None = None
+        self._segment_seq = 0
+        self._segment_count = 0
+        if directory is not None:
+            self._load()
+
+    # ------------------------------------------------------------ 記録
+
+    def record(
+        self,
+        message: str,
+        *,
+        lateness_ms: float,
+        snooze_count: int,
+        outcome: str,
+        fired_at: float | None = None,
+    ) -> FireRecord:
+        """発火を 1 件記録して返す。ファイルへの書き込みに失敗しても記録はメモリに残す。
+
+        Raises:
+            ValueError: outcome が不正な場合、または readonly の場合。
+        """
+        if outcome not in OUTCOMES:
+            raise ValueError(f"不明な応答です: {outcome}（{', '.join(OUTCOMES)} のいずれか）")
+        if self.readonly:
+            raise ValueError("読み取り専用の履歴には記録できません")
+        record = FireRecord(self._clock() if fired_at is None else fired_at, message,
+                            max(0.0, lateness_ms), snooze_count, outcome)
+        self._apply(record)
+        if self.directory is not None:
+            try:
+                self._append(record)
+            except OSError as e:
+                logging.warning("発火履歴の書き込みに失敗しました: %s", e)
+        return record
+
+    def close(self) -> None:
+        """書き込み中のセグメントを閉じ、ロールアップを保存する。"""
+        if self._segment is not None:
+            try:
+                self._seal()
+            except OSError as e:
+                logging.warning("発火履歴を閉じられませんでした: %s", e)
+
+    # ------------------------------------------------------------ 参照・集計
+
+    def __len__(self) -> int:
+        """集計済みの発火回数（ディスクから削除したセグメントの分を含む）。"""
+        return sum(rollup.fires for rollup in self._rollups.values())
+
+    def recent(self, limit: int | None = None) -> list[FireRecord]:
+        """直近の記録を新しい順に返す（最大でリングバッファの容量まで）。"""
+        records = list(reversed(self._recent))
+        return records if limit is None else records[:limit]
+
+    def fires_per_hour(self, since: float | None = None, until: float | None = None) -> list[tuple[int, int]]:
+        """[since, until) に含まれる時間枠ごとの (時間枠の開始 UNIX 時刻, 発火回数) を時刻順に返す。"""
+        return [(hour, rollup.fires) for hour, rollup in self._window(since, until)]
+
+    def snooze_acceptance_rate(self, since: float | None = None, until: float | None = None) -> float | None:
+        """スヌーズを提示した通知のうち受け入れた割合。提示がなければ None。"""
+        total = self.rollup(since, until)
+        return total.accepted / total.offered if total.offered else None
+
+    def mean_lateness_ms(self, since: float | None = None, until: float | None = None) -> float | None:
+        """平均の発火遅延（ミリ秒）。発火がなければ None。"""
+        total = self.rollup(since, until)
+        return total.lateness_sum_ms / total.fires if total.fires else None
+
+    def rollup(self, since: float | None = None, until: float | None = None) -> HourlyRollup:
+        """[since, until) に含まれる時間枠の集計を合算して返す。"""
+        total = HourlyRollup()
+        for _hour, rollup in self._window(since, until):
+            total.merge(rollup)
+        return total
+
+    def iter_records(self) -> Iterator[FireRecord]:
+        """ディスクに残っているすべての記録を古い順に返す。集計には使わない（書き出し・調査用）。"""
+        for _seq, path in self._segments():
+            yield from _read_segment(path)
+
+    # ------------------------------------------------------------ 内部処理
+
+    def _window(self, since: float | None, until: float | None) -> Iterator[tuple[int, HourlyRollup]]:
+        start = float("-inf") if since is None else _hour_of(since)
+        for hour in sorted(self._rollups):
+            if hour >= start and (until is None or hour < until):
+                yield hour, self._rollups[hour]
+
+    def _apply(self, record: FireRecord) -> None:
+        self._recent.append(record)
+        hour = _hour_of(record.fired_at)
+        rollup = self._rollups.get(hour)
+        if rollup is None:
+            rollup = self._rollups[hour] = HourlyRollup()
+        rollup.add(record)
+
+    def _append(self, record: FireRecord) -> None:
+        if self._segment is None:
+            self._segment_seq = max(self._segment_seq, self._sealed_through) + 1
+            os.makedirs(self.directory, exist_ok=True)  # type: ignore[arg-type]
+            self._segment = gzip.open(self._segment_path(self._segment_seq), "ab")  # type: ignore[assignment]
+            self._segment_count = 0
+        line = json.dumps(asdict(record), ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._segment.write(line.encode("utf-8"))  # type: ignore[union-attr]
+        # 圧縮済みの分をファイルへ出しておき、異常終了しても直前の記録までは読めるようにする
+        self._segment.flush(zlib.Z_SYNC_FLUSH)  # type: ignore[union-attr]
+        self._segment_count += 1
+        if self._segment_count >= self.segment_records:
+            self._seal()
+
+    def _seal(self) -> None:
+        """書き込み中のセグメントを閉じ、ロールアップを保存して古いセグメントを削除する。"""
+        assert self._segment is not None
+        self._segment.close()
+        self._segment = None
+        self._sealed_through = self._segment_seq
+        self._save_rollups()
+        for _seq, path in self._segments()[:-self.max_segments]:
+            os.remove(path)
+
+    def _load(self) -> None:
+        """保存済みのロールアップと、閉じていないセグメントから状態を復元する。"""
+        try:
+            with open(os.path.join(self.directory, _ROLLUPS_FILE), encoding="utf-8") as f:  # type: ignore[arg-type]
+                saved = json.load(f)
+            self._sealed_through = int(saved["sealed_through"])
+            self._rollups = {int(hour): HourlyRollup(*values) for hour, values in saved["hours"].items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # 壊れている場合は残っているセグメントから集計し直す
+            logging.warning("発火履歴の集計を読み込めないため再集計します: %s", e)
+            self._sealed_through = 0
+            self._rollups = {}
+        segments = self._segments()
+        unsealed = [(seq, path) for seq, path in segments if seq > self._sealed_through]
+        for _seq, path in unsealed:
+            for record in _read_segment(path):
+                hour = _hour_of(record.fired_at)
+                self._rollups.setdefault(hour, HourlyRollup()).add(record)
+        # 直近の記録は新しいセグメントから容量分だけ読み戻す
+        tail: list[FireRecord] = []
+        for _seq, path in reversed(segments):
+            tail[:0] = _read_segment(path)
+            if len(tail) >= self._recent.maxlen:  # type: ignore[operator]
+                break
+        self._recent.extend(tail)
+        if segments:
+            self._segment_seq = segments[-1][0]
+        if unsealed and not self.readonly:
+            self._sealed_through = self._segment_seq
+            try:
+                self._save_rollups()
+            except OSError as e:
+                logging.warning("発火履歴の集計を保存できませんでした: %s", e)
+
+    def _save_rollups(self) -> None:
+        if self._rollups:
+            oldest = max(self._rollups) - ROLLUP_RETENTION_HOURS * 3600
+            self._rollups = {hour: rollup for hour, rollup in self._rollups.items() if hour >= oldest}
+        path = os.path.join(self.directory, _ROLLUPS_FILE)  # type: ignore[arg-type]
+        data = {
+            "sealed_through": self._sealed_through,
+            "hours": {str(hour): list(asdict(rollup).values()) for hour, rollup in self._rollups.items()},
+        }
+        # 書きかけのファイルを残さないよう一時ファイルから置き換える
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    def _segments(self) -> list[tuple[int, str]]:
+        """ディスク上のセグメントを (番号, パス) で古い順に返す。"""
+        try:
+            names = os.listdir(self.directory)  # type: ignore[arg-type]
+        except FileNotFoundError:
+            return []
+        segments = []
+        for name in names:
+            stem = name[: -len(_SEGMENT_SUFFIX)]
+            if name.endswith(_SEGMENT_SUFFIX) and stem.isdigit():
+                segments.append((int(stem), os.path.join(self.directory, name)))  # type: ignore[arg-type]
+        return sorted(segments)
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{seq:08d}{_SEGMENT_SUFFIX}")  # type: ignore[arg-type]
+
+
+def _read_segment(path: str) -> list[FireRecord]:
+    """セグメントの記録を読む。異常終了で末尾が欠けていれば読めたところまでを返す。"""
+    records = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(FireRecord(**json.loads(line)))
+                except (ValueError, TypeError):
+                    # 書きかけの最終行
+                    continue
+    except (EOFError, OSError, zlib.error):
+        pass
+    return records
+
+
+def print_history(directory: str = HISTORY_DIR, hours: int = 24, recent: int = 10) -> int:
+    """`reminder history` の本体。直近 hours 時間の集計と最近の発火を表示する。
+
+    Returns:
+        終了コード。
+    """
+    history = FireHistory(directory, readonly=True)
+    since = time.time() - hours * 3600
+    total = history.rollup(since)
+    rate = history.snooze_acceptance_rate(since)
+    mean = history.mean_lateness_ms(since)
+    print(f"直近 {hours} 時間: 発火 {total.fires} 回")
+    print(f"  スヌーズ受け入れ率: {'-' if rate is None else f'{rate:.0%}'}"
+          f"（提示 {total.offered} 回・受け入れ {total.accepted} 回）")
+    print(f"  平均遅延: {'-' if mean is None else f'{mean:.1f} ms'}（最大 {total.lateness_max_ms:.1f} ms）")
+    for hour, fires in history.fires_per_hour(since):
+        print(f"  {datetime.datetime.fromtimestamp(hour):%m/%d %H:00}  {fires:5d} 回")
+    records = history.recent(recent)
+    if records:
+        print("最近の発火:")
+    for record in records:
+        first_line = record.message.splitlines()[0] if record.message else ""
+        print(f"  {datetime.datetime.fromtimestamp(record.fired_at):%m/%d %H:%M:%S}  {record.outcome:9s}"
+              f"  遅延 {record.lateness_ms:.0f} ms  スヌーズ {record.snooze_count} 回  {first_line}")
+    return 0
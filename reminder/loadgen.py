@@ -0,0 +1,251 @@
+"""スケジューラ向けの合成負荷ジェネレーターとソークテストハーネス。
+
+使い方:
+    python -m reminder.loadgen --count 10000 --pattern bursty --span 86400 \\
+        --snooze-rate 0.3 --cancel-rate 0.1
+
+既定では VirtualClock 上で実行するため、1 日分のワークロードも数秒で終わる。
+`--realtime` を付けると RealtimeLoop で実時間に実行し、発火遅延を実測する。
+`--slack MS` を付けると CoalescingTimer で期限の近い発火をまとめ、起床回数の減り方を確かめられる。
+ワークロードは ReminderApp.schedule() / _schedule_snooze() が通知ジョブを委ねているのと同じ
+Scheduler に投入する（ダイアログと設定ファイルの保存だけを除いた経路）。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+from .clock import RealtimeLoop, VirtualClock
+from .coalesce import CoalescingTimer
+from .scheduler import Reminder, Scheduler
+from .time_utils import DEFAULT_SNOOZE_MINUTES, MAX_SNOOZE_COUNT
+
+PATTERNS = ("uniform", "bursty")
+
+
+@dataclass
+class LoadConfig:
+    """負荷ワークロードの設定。
+
+    Attributes:
+        count: 投入するリマインダー数。
+        pattern: 発火時刻の分布。"uniform"（一様）または "bursty"（集中）。
+        span_s: 発火時刻を分布させる期間（秒）。
+        bursts: bursty 時の集中点の数。
+        burst_jitter_s: bursty 時に集中点の前後へ散らす幅（秒）。
+        snooze_rate: 発火時にスヌーズを受け入れる確率。
+        cancel_rate: 発火前に取り消して別時刻で再登録する（チャーン）割合。
+        snooze_minutes: 各リマインダーのスヌーズ間隔（分）。
+        sample_interval_s: RSS を記録する間隔（秒、スケジューラの時計基準）。
+        seed: 乱数シード。同じ値なら同じワークロードを再現する。
+        realtime: True の場合は実時間で実行する。
+        slack_ms: 各リマインダーの許容遅延（ミリ秒）。0 より大きければ CoalescingTimer で起床をまとめる。
+    """
+
+    count: int = 1_000
+    pattern: str = "uniform"
+    span_s: float = 3_600.0
+    bursts: int = 10
+    burst_jitter_s: float = 1.0
+    snooze_rate: float = 0.0
+    cancel_rate: float = 0.0
+    snooze_minutes: int = DEFAULT_SNOOZE_MINUTES
+    sample_interval_s: float = 60.0
+    seed: int = 0
+    realtime: bool = False
+    slack_ms: int = 0
+
+
+@dataclass
+class LoadReport:
+    """負荷試験の結果。"""
+
+    added: int = 0
+    fired: int = 0
+    snoozed: int = 0
+    cancelled: int = 0
+    wall_seconds: float = 0.0
+    simulated_seconds: float = 0.0
+    fires_per_second: float = 0.0
+    wakeups: int = 0
+    wakeups_per_hour: float = 0.0
+    lateness_ms: dict[str, float] = field(default_factory=dict)
+    rss_samples: list[tuple[float, int]] = field(default_factory=list)
+    leaked_timers: int = 0
+    leaked_reminders: int = 0
+
+    def format(self) -> str:
+        """人が読むためのテキスト形式に整形する。"""
+        lines = [
+            f"added={self.added} fired={self.fired} snoozed={self.snoozed} cancelled={self.cancelled}",
+            f"wall={self.wall_seconds:.3f}s simulated={self.simulated_seconds:.0f}s "
+            f"throughput={self.fires_per_second:.0f} fires/s",
+            f"wakeups={self.wakeups} ({self.wakeups_per_hour:.1f}/h)",
+            "lateness_ms " + " ".join(f"{k}={v:.2f}" for k, v in self.lateness_ms.items()),
+        ]
+        if self.rss_samples:
+            first, last = self.rss_samples[0][1], self.rss_samples[-1][1]
+            peak = max(rss for _t, rss in self.rss_samples)
+            lines.append(
+                f"rss start={first / 1024:.0f}KiB end={last / 1024:.0f}KiB peak={peak / 1024:.0f}KiB "
+                f"samples={len(self.rss_samples)}"
+            )
+        lines.append(f"leaked_timers={self.leaked_timers} leaked_reminders={self.leaked_reminders}")
+        return "\n".join(lines)
+
+
+def rss_bytes() -> int:
+    """現在の常駐メモリ量（バイト）を返す。
+
+    Linux では /proc/self/statm の現在値を使い、取得できない環境では
+    getrusage のピーク値（macOS はバイト、Linux は KiB 単位）で代用する。
+    どちらも使えない環境（Windows）では 0 を返す。
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentiles(values: list[float], qs: tuple[float, ...] = (0.5, 0.95, 0.99)) -> dict[str, float]:
+    """値の分位点（最近傍順位法）と最大値を返す。値がなければ空の辞書。"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {}
+    for q in qs:
+        index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+        result[f"p{round(q * 100):d}"] = ordered[index]
+    result["max"] = ordered[-1]
+    return result
+
+
+def _fire_offsets(config: LoadConfig, rng: random.Random) -> list[float]:
+    """パターンに従って各リマインダーの発火時刻（開始からの秒）を生成する。"""
+    if config.pattern == "uniform":
+        return [rng.uniform(0, config.span_s) for _ in range(config.count)]
+    if config.pattern == "bursty":
+        centers = [rng.uniform(0, config.span_s) for _ in range(max(1, config.bursts))]
+        return [
+            max(0.0, rng.choice(centers) + rng.uniform(-config.burst_jitter_s, config.burst_jitter_s))
+            for _ in range(config.count)
+        ]
+    raise ValueError(f"不明なパターンです: {config.pattern}（{', '.join(PATTERNS)} のいずれか）")
+
+
+def run_load(config: LoadConfig) -> LoadReport:
+    """ワークロードを生成してスケジューラに投入し、完了まで実行して結果を返す。"""
+    rng = random.Random(config.seed)
+    loop = RealtimeLoop() if config.realtime else VirtualClock()
+    # 計測・チャーン用のジョブも同じ Timer に載せ、起床回数に含める
+    timer = CoalescingTimer(loop, loop) if config.slack_ms > 0 else loop
+    report = LoadReport()
+    lateness: list[float] = []
+
+    def on_fire(reminder: Reminder) -> bool:
+        report.fired += 1
+        lateness.append(max(0.0, loop.monotonic() - reminder.deadline) * 1000)
+        if rng.random() < config.snooze_rate:
+            # 上限到達後の受け入れは Scheduler 側で無視されるため数えない
+            if reminder.snooze_count < MAX_SNOOZE_COUNT:
+                report.snoozed += 1
+            return True
+        return False
+
+    scheduler = Scheduler(loop, timer, on_fire=on_fire)
+    started_mono = loop.monotonic()
+
+    def sample_rss() -> None:
+        report.rss_samples.append((loop.monotonic() - started_mono, rss_bytes()))
+        # 発火待ちがなくなったら計測ジョブ自身も止め、run_until_idle() を終わらせる
+        if len(scheduler):
+            timer.after(int(config.sample_interval_s * 1000), sample_rss)
+
+    def churn(reminder_id: int, replacement_delay_ms: int) -> None:
+        if scheduler.cancel(reminder_id):
+            report.cancelled += 1
+            scheduler.add(f"replacement-{reminder_id}", delay_ms=replacement_delay_ms,
+                          snooze_minutes=config.snooze_minutes, slack_ms=config.slack_ms)
+            report.added += 1
+
+    wall_started = time.perf_counter()
+    for index, offset in enumerate(_fire_offsets(config, rng)):
+        delay_ms = int(offset * 1000)
+        reminder_id = scheduler.add(f"load-{index}", delay_ms=delay_ms, snooze_minutes=config.snooze_minutes,
+                                    slack_ms=config.slack_ms)
+        report.added += 1
+        if rng.random() < config.cancel_rate:
+            cancel_at = int(rng.uniform(0, delay_ms))
+            timer.after(cancel_at, lambda rid=reminder_id: churn(rid, int(rng.uniform(0, config.span_s) * 1000)))
+    sample_rss()
+    loop.run_until_idle()
+    report.rss_samples.append((loop.monotonic() - started_mono, rss_bytes()))
+
+    report.wall_seconds = time.perf_counter() - wall_started
+    report.simulated_seconds = loop.monotonic() - started_mono
+    report.fires_per_second = report.fired / report.wall_seconds if report.wall_seconds else 0.0
+    # 下位の Timer が実行したジョブ 1 件がプロセスの起床 1 回にあたる
+    report.wakeups = loop.fired
+    report.wakeups_per_hour = report.wakeups * 3600 / report.simulated_seconds if report.simulated_seconds else 0.0
+    report.lateness_ms = percentiles(lateness)
+    report.leaked_timers = loop.pending + (timer.pending if timer is not loop else 0)
+    report.leaked_reminders = len(scheduler)
+    return report
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    defaults = LoadConfig()
+    parser = argparse.ArgumentParser(prog="python -m reminder.loadgen", description="スケジューラの負荷試験")
+    parser.add_argument("--count", type=int, default=defaults.count, help="投入するリマインダー数")
+    parser.add_argument("--pattern", choices=PATTERNS, default=defaults.pattern, help="発火時刻の分布")
+    parser.add_argument("--span", type=float, default=defaults.span_s, help="発火時刻を分布させる期間（秒）")
+    parser.add_argument("--bursts", type=int, default=defaults.bursts, help="bursty 時の集中点の数")
+    parser.add_argument("--burst-jitter", type=float, default=defaults.burst_jitter_s, help="集中点の前後の幅（秒）")
+    parser.add_argument("--snooze-rate", type=float, default=defaults.snooze_rate, help="スヌーズを受け入れる確率")
+    parser.add_argument("--cancel-rate", type=float, default=defaults.cancel_rate, help="取り消して再登録する割合")
+    parser.add_argument("--snooze-minutes", type=int, default=defaults.snooze_minutes, help="スヌーズ間隔（分）")
+    parser.add_argument("--sample-interval", type=float, default=defaults.sample_interval_s, help="RSS 記録間隔（秒）")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="乱数シード")
+    parser.add_argument("--realtime", action="store_true", help="仮想時間ではなく実時間で実行する")
+    parser.add_argument("--slack", type=int, default=defaults.slack_ms,
+                        help="各リマインダーの許容遅延（ミリ秒）。指定すると起床をまとめる")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    config = LoadConfig(
+        count=args.count,
+        pattern=args.pattern,
+        span_s=args.span,
+        bursts=args.bursts,
+        burst_jitter_s=args.burst_jitter,
+        snooze_rate=args.snooze_rate,
+        cancel_rate=args.cancel_rate,
+        snooze_minutes=args.snooze_minutes,
+        sample_interval_s=args.sample_interval,
+        seed=args.seed,
+        realtime=args.realtime,
+        slack_ms=args.slack,
+    )
+    report = run_load(config)
+    print(json.dumps(asdict(report), ensure_ascii=False) if args.json else report.format())
+    # タイマーやリマインダーが残った場合はリークとして非ゼロで終了する
+    return 1 if report.leaked_timers or report.leaked_reminders else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+"""ノンブロッキングなログ出力パイプライン。
+
+ルートロガーには QueueHandler だけを取り付け、端末やファイルへの書き込みは
+QueueListener のバックグラウンドスレッドで行う。schedule() や show_reminder() などの
+ホットパスが払うコストはレコードをキューに積むことだけになり、遅い端末や
+journald の背圧で UI が止まらない。
+
+出力先:
+    - 標準エラー（テキストまたは JSON Lines）
+    - ローテーションするファイル（JSON Lines、任意）
+
+大量に発生する定型ログはテンプレートごとにサンプリングして間引ける。
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+# LogRecord の標準属性。これ以外の属性は extra= で渡された構造化フィールドとして出力する
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """1 レコードを 1 行の JSON に整形するフォーマッター。
+
+    extra= で渡した値は同じオブジェクトのトップレベルに含める。
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack_info"] = record.stack_info
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """WARNING 未満の定型ログをテンプレート単位で間引くフィルター。
+
+    同じメッセージテンプレート（record.msg）について、window_s 秒の区間ごとに
+    最初の burst 件は通し、それ以降は every 件に 1 件だけ通す。
+    WARNING 以上は常に通す。
+
+    Attributes:
+        dropped: 間引いたレコード数の累計。
+    """
+
+    def __init__(self, burst: int = 20, every: int = 10, window_s: float = 60.0) -> None:
+        super().__init__()
+        self.burst = burst
+        self.every = max(1, every)
+        self.window_s = window_s
+        self.dropped = 0
+        self._counts: dict[object, int] = {}
+        self._window_started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_started >= self.window_s:
+                self._counts.clear()
+                self._window_started = now
+            count = self._counts.get(record.msg, 0) + 1
+            self._counts[record.msg] = count
+            if count <= self.burst or (count - self.burst) % self.every == 0:
+                return True
+            self.dropped += 1
+            return False
+
+
+class _EnqueueOnlyHandler(logging.handlers.QueueHandler):
+    """レコードを整形せずにキューへ積む QueueHandler。
+
+    標準の QueueHandler.prepare() は呼び出し側スレッドでメッセージを整形するが、
+    同一プロセス内のキューであれば整形はリスナー側に任せられる。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    *,
+    json_lines: bool = False,
+    log_file: str | None = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    sampling: SamplingFilter | None = None,
+) -> logging.handlers.QueueListener:
+    """ルートロガーをキュー経由の非同期出力に切り替え、起動済みのリスナーを返す。
+
+    既存のルートハンドラーは取り外す。終了時は shutdown_logging() でリスナーを止め、
+    キューに残ったレコードを書き出すこと。
+
+    Args:
+        level: ルートロガーのレベル。
+        json_lines: True の場合、標準エラーにも JSON Lines で出力する。
+        log_file: 指定時はこのパスに JSON Lines でローテーション出力する。
+        max_bytes: ローテーションするファイルサイズ（バイト）。
+        backup_count: 保持する過去ファイル数。
+        sampling: 定型ログの間引きフィルター。None の場合は間引かない。
+    """
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(logging.BASIC_FORMAT))
+    handlers: list[logging.Handler] = [console]
+    if log_file:
+        rotating = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        rotating.setFormatter(JsonLinesFormatter())
+        handlers.append(rotating)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    enqueue = _EnqueueOnlyHandler(log_queue)
+    if sampling is not None:
+        # 間引きはキューに積む前に行い、捨てるレコードの転送コストも省く
+        enqueue.addFilter(sampling)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(enqueue)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def shutdown_logging(listener: logging.handlers.QueueListener) -> None:
+    """リスナーを停止し、残ったレコードを書き出してハンドラーを閉じる。"""
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
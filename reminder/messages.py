@@ -0,0 +1,100 @@
+"""通知メッセージの重複排除とテンプレート。
+
+実際のリマインダーは「朝会」「服薬」や、チケット名だけが違う定型文など、少数のメッセージの
+繰り返しが大半を占める。ReminderStore はメッセージ本文を messages 表に内容ハッシュで
+1 回だけ保存し、各リマインダーはその ID と小さなパラメーターだけを持つ。
+
+パラメーター付きで登録したメッセージは "{ticket} のレビュー" のようなテンプレートとして扱い、
+通知する時点で埋め込む。テンプレートの解析結果は compile_template() がキャッシュするため、
+同じ本文を何度描画しても解析は 1 回で済む。パラメーターなしで登録したメッセージは
+波括弧を含んでいてもそのまま表示する。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import string
+from functools import lru_cache
+from typing import Mapping
+
+# 1 件のリマインダーに持たせるパラメーターの上限
+MAX_PARAMS = 16
+MAX_PARAM_LENGTH = 256
+TEMPLATE_CACHE_SIZE = 1024
+
+_FORMATTER = string.Formatter()
+
+
+def message_digest(body: str) -> bytes:
+    """メッセージ本文の内容ハッシュ（16 バイト）。messages 表の一意キーに使う。"""
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=16).digest()
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(body: str) -> tuple[tuple[str, str | None], ...]:
+    """テンプレートを (直前の文字列, フィールド名) の並びに解析する。
+
+    使えるのは {name} 形式の名前付きフィールドだけで、"{{" "}}" は波括弧そのものを表す。
+    書式指定・変換・属性参照は受け付けない。
+
+    Raises:
+        ValueError: 構文が不正な場合、または使えないフィールドを含む場合。
+    """
+    parts = []
+    for literal, field, spec, conversion in _FORMATTER.parse(body):
+        if field is not None and (not field.isidentifier() or spec or conversion):
+            raise ValueError(f"テンプレートには {{名前}} 形式のフィールドだけを使えます: {{{field}}}")
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def template_fields(body: str) -> frozenset[str]:
+    """テンプレートが参照するフィールド名の集合。"""
+    return frozenset(field for _literal, field in compile_template(body) if field is not None)
+
+
+def render(body: str, params: Mapping[str, str] | None) -> str:
+    """メッセージを通知用の文字列にする。params が None なら本文をそのまま返す。"""
+    if params is None:
+        return body
+    return "".join(literal + params[field] if field is not None else literal
+                   for literal, field in compile_template(body))
+
+
+def validate_params(body: str, params: Mapping[str, object]) -> dict[str, str]:
+    """テンプレートとパラメーターを検証し、値を文字列にそろえて返す。
+
+    Raises:
+        ValueError: テンプレートが不正な場合、フィールドに対応する値がない場合、
+            または値が文字列・数値でない・大きすぎる場合。
+    """
+    fields = template_fields(body)
+    if len(params) > MAX_PARAMS:
+        raise ValueError(f"params は {MAX_PARAMS} 個までです")
+    missing = fields - params.keys()
+    if missing:
+        raise ValueError(f"params に値がありません: {', '.join(sorted(missing))}")
+    unused = params.keys() - fields
+    if unused:
+        raise ValueError(f"テンプレートで使われていない params です: {', '.join(sorted(unused))}")
+    normalized = {}
+    for key, value in params.items():
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f"params の値は文字列か数値で指定してください: {key}")
+        text = str(value)
+        if len(text) > MAX_PARAM_LENGTH:
+            raise ValueError(f"params の値は {MAX_PARAM_LENGTH} 文字までです: {key}")
+        normalized[key] = text
+    return normalized
+
+
+def dump_params(params: Mapping[str, str] | None) -> str | None:
+    """params をストアの params 列に保存する形式（空白なしの JSON）にする。"""
+    if params is None:
+        return None
+    return json.dumps(params, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def load_params(text: str | None) -> dict[str, str] | None:
+    """ストアの params 列から復元する。"""
+    return None if text is None else json.loads(text)
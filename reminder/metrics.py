@@ -0,0 +1,359 @@
+"""発火遅延・処理時間の計測と Prometheus テキスト形式でのエクスポート。
+
+外部ライブラリに依存しない軽量なヒストグラム・ゲージ・カウンターを提供する。
+記録値は固定バケットへのカウントのみで保持するため、観測 1 回あたりのコストは
+二分探索と整数加算だけで済む。
+
+エクスポート方法:
+    - write_textfile(): node_exporter の textfile collector 互換のファイルを書き出す
+    - serve_metrics(): localhost で /metrics を返す HTTP エンドポイントを起動する
+    - `reminder stats`: 書き出し済みファイルを読み込み要約を表示する
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import _CONFIG_DIR
+
+METRICS_PATH = os.path.join(_CONFIG_DIR, "metrics.prom")
+
+# ミリ秒単位のバケット境界。ダイアログ操作（数秒〜数分）まで収まるよう上限を広めに取る
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 30_000, 60_000, 300_000)
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...], extra: tuple[str, str] | None = None) -> str:
+    """ラベルのタプルを Prometheus の `{k="v",...}` 表記に変換する。"""
+    pairs = list(labels)
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """数値を Prometheus 表記にする。整数値は小数点なしで出力する。"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """固定バケットの累積ヒストグラム。
+
+    Attributes:
+        name: メトリクス名。
+        labels: (キー, 値) のタプル列。
+        buckets: バケット上限値（昇順）。
+        counts: 各バケットの（非累積）観測数。末尾は +Inf バケット。
+        sum: 観測値の合計。
+        count: 観測回数。
+    """
+
+    __slots__ = ("name", "labels", "buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, name: str, labels: tuple[tuple[str, str], ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS) -> None:
+        self.name = name
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """値を 1 件記録する。"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def render(self) -> list[str]:
+        """Prometheus テキスト形式のサンプル行を返す。"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            le = _format_labels(self.labels, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        suffix = _format_labels(self.labels)
+        lines.append(f"{self.name}_sum{suffix} {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count{suffix} {self.count}")
+        return lines
+
+
+class Gauge:
+    """現在値を保持するゲージ。"""
+
+    __slots__ = ("name", "labels", "value")
+
+    def __init__(self, name: str, labels: tuple[tuple[str, str], ...] = ()) -> None:
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """値を上書きする。"""
+        self.value = value
+
+    def render(self) -> list[str]:
+        """Prometheus テキスト形式のサンプル行を返す。"""
+        return [f"{self.name}{_format_labels(self.labels)} {_format_value(self.value)}"]
+
+
+class Counter:
+    """単調増加するカウンター。"""
+
+    __slots__ = ("name", "labels", "value", "_lock")
+
+    def __init__(self, name: str, labels: tuple[tuple[str, str], ...] = ()) -> None:
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        """値を amount だけ増やす。"""
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> list[str]:
+        """Prometheus テキスト形式のサンプル行を返す。"""
+        return [f"{self.name}{_format_labels(self.labels)} {_format_value(self.value)}"]
+
+
+class MetricsRegistry:
+    """メトリクスの登録と一括レンダリングを行うレジストリ。
+
+    同じ名前・ラベルで登録した場合は既存のインスタンスを返す。
+    """
+
+    def __init__(self) -> None:
+        # name -> (type, help, {labels: metric})
+        self._families: dict[str, tuple[str, str, dict[tuple[tuple[str, str], ...], Histogram | Gauge | Counter]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, name: str, help_text: str, labels: dict[str, str] | None, factory):
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, {}))
+            if family[0] != kind:
+                raise ValueError(f"メトリクス {name} は {family[0]} として登録済みです")
+            metrics = family[2]
+            if key not in metrics:
+                metrics[key] = factory(key)
+            return metrics[key]
+
+    def histogram(self, name: str, help_text: str, labels: dict[str, str] | None = None,
+                  buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS) -> Histogram:
+        """ヒストグラムを取得（未登録なら作成）する。"""
+        return self._get("histogram", name, help_text, labels, lambda key: Histogram(name, key, buckets))
+
+    def gauge(self, name: str, help_text: str, labels: dict[str, str] | None = None) -> Gauge:
+        """ゲージを取得（未登録なら作成）する。"""
+        return self._get("gauge", name, help_text, labels, lambda key: Gauge(name, key))
+
+    def counter(self, name: str, help_text: str, labels: dict[str, str] | None = None) -> Counter:
+        """カウンターを取得（未登録なら作成）する。"""
+        return self._get("counter", name, help_text, labels, lambda key: Counter(name, key))
+
+    def render(self) -> str:
+        """登録済みの全メトリクスを Prometheus テキスト形式で返す。"""
+        lines = []
+        with self._lock:
+            families = sorted(self._families.items())
+        for name, (kind, help_text, metrics) in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for _key, metric in sorted(metrics.items()):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str = METRICS_PATH) -> None:
+        """メトリクスをファイルに書き出す。失敗時はログのみ残す。
+
+        読み取り側が書きかけのファイルを見ないよう、一時ファイルに書いてから置き換える。
+        """
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning("メトリクスファイルの書き出しに失敗しました: %s", e)
+
+
+REGISTRY = MetricsRegistry()
+
+# flush() の書き出し先。None の間は何もしない（テストやライブラリ利用時にファイルを作らない）
+_textfile_path: str | None = None
+
+
+def enable_textfile(path: str = METRICS_PATH) -> None:
+    """flush() でメトリクスファイルを書き出すよう設定する。エントリーポイントから呼ぶ。"""
+    global _textfile_path
+    _textfile_path = path
+
+
+def flush() -> None:
+    """enable_textfile() で有効化されていればメトリクスファイルを更新する。"""
+    if _textfile_path is not None:
+        REGISTRY.write_textfile(_textfile_path)
+
+
+FIRE_LATENESS_MS = REGISTRY.histogram(
+    "reminder_fire_lateness_ms", "予定時刻に対する実際の発火遅延（ミリ秒）")
+QUEUE_DEPTH = REGISTRY.gauge("reminder_queue_depth", "発火待ちのリマインダー数")
+
+_STAGE_HELP = "show_reminder 内の各処理段階の所要時間（ミリ秒）"
+STAGE_DISPATCH_MS = REGISTRY.histogram("reminder_stage_duration_ms", _STAGE_HELP, {"stage": "dispatch"})
+STAGE_SOUND_MS = REGISTRY.histogram("reminder_stage_duration_ms", _STAGE_HELP, {"stage": "sound"})
+STAGE_DIALOG_MS = REGISTRY.histogram("reminder_stage_duration_ms", _STAGE_HELP, {"stage": "dialog"})
+STAGE_SNOOZE_MS = REGISTRY.histogram("reminder_stage_duration_ms", _STAGE_HELP, {"stage": "snooze"})
+UI_REBUILD_MS = REGISTRY.histogram(
+    "reminder_ui_rebuild_ms", "バックグラウンドモードで破棄した UI の再構築にかかった時間（ミリ秒）")
+
+
+# ------------------------------------------------------------ HTTP エンドポイント
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics にレジストリの内容を返すハンドラ。"""
+
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self) -> None:  # noqa: N802 (BaseHTTPRequestHandler の規約)
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        # アクセスログで通常ログを埋めないよう debug レベルに落とす
+        logging.debug("metrics: " + format, *args)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """localhost に /metrics エンドポイントをデーモンスレッドで起動する。
+
+    Args:
+        port: 待ち受けポート。0 の場合は空きポートを自動で割り当てる。
+        host: 待ち受けアドレス。既定では外部公開しないよう loopback に限定する。
+        registry: 公開するレジストリ。
+
+    Returns:
+        起動したサーバー。停止時は shutdown() を呼ぶ。
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="reminder-metrics", daemon=True).start()
+    logging.info("メトリクスエンドポイントを起動: http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+# ------------------------------------------------------------ stats コマンド
+
+
+def parse_textfile(text: str) -> dict[str, float]:
+    """Prometheus テキスト形式を `{サンプル名+ラベル: 値}` の辞書に変換する。"""
+    samples = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, _, raw = line.rpartition(" ")
+        try:
+            samples[key] = float(raw)
+        except ValueError:
+            continue
+    return samples
+
+
+def _estimate_quantile(buckets: list[tuple[float, float]], q: float) -> float:
+    """累積バケットから分位点を線形補間で推定する（histogram_quantile と同じ考え方）。"""
+    total = buckets[-1][1] if buckets else 0
+    if total == 0:
+        return math.nan
+    rank = q * total
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def summarize(samples: dict[str, float]) -> list[str]:
+    """ヒストグラムごとに件数・平均・p50/p95/p99 を要約した行を返す。"""
+    series: dict[str, list[tuple[float, float]]] = {}
+    for key, value in samples.items():
+        name, _, labels = key.partition("{")
+        if not name.endswith("_bucket"):
+            continue
+        label_pairs = [p for p in labels.rstrip("}").split(",") if p]
+        le = next((p for p in label_pairs if p.startswith("le=")), None)
+        if le is None:
+            # le ラベルのないバケット行は集計できないため読み飛ばす
+            continue
+        bound = le.split("=", 1)[1].strip('"')
+        try:
+            upper = math.inf if bound == "+Inf" else float(bound)
+        except ValueError:
+            continue
+        rest = ",".join(p for p in label_pairs if not p.startswith("le="))
+        series_key = name[: -len("_bucket")] + (f"{{{rest}}}" if rest else "")
+        series.setdefault(series_key, []).append((upper, value))
+
+    lines = []
+    for series_key in sorted(series):
+        buckets = sorted(series[series_key])
+        name, _, labels = series_key.partition("{")
+        suffix = f"{{{labels}" if labels else ""
+        count = samples.get(f"{name}_count{suffix}", 0.0)
+        total = samples.get(f"{name}_sum{suffix}", 0.0)
+        mean = total / count if count else math.nan
+        p50, p95, p99 = (_estimate_quantile(buckets, q) for q in (0.5, 0.95, 0.99))
+        lines.append(
+            f"{series_key}: count={int(count)} mean={mean:.1f} p50={p50:.1f} p95={p95:.1f} p99={p99:.1f}"
+        )
+    for key in sorted(samples):
+        name = key.partition("{")[0]
+        if not name.endswith(("_bucket", "_sum", "_count")):
+            lines.append(f"{key}: {_format_value(samples[key])}")
+    return lines
+
+
+def print_stats(path: str = METRICS_PATH) -> int:
+    """`reminder stats` の本体。メトリクスファイルの要約を標準出力に表示する。
+
+    Returns:
+        終了コード。ファイルが読めない場合は 1。
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            samples = parse_textfile(f.read())
+    except OSError as e:
+        print(f"メトリクスファイルを読み込めません: {e}")
+        return 1
+    for line in summarize(samples):
+        print(line)
+    return 0
@@ -1,26 +1,78 @@
+"""通知音・デスクトップ通知・ウィンドウアイコン。
+
+通知の送り先（バックエンド）は BackendRegistry に登録し、種類（音・デスクトップ通知）ごとに
+使えるもののうち最も優先度の高い 1 つを選ぶ。使えるかどうかは capabilities の検出結果
+（OS・PATH 上のコマンド・D-Bus・音声デバイス）だけで判断し、選んだ結果はプロセス内で覚えておく。
+送信に失敗したバックエンドは RETRY_AFTER_S 秒の間は使わず、次の候補に切り替える。その時間が
+過ぎたら選び直し、優先度の高いものから再び試す。音を鳴らせるものがなければ tkinter の bell() を鳴らす。
+
+外部パッケージは entry point（グループ "reminder.notification_backends"）で NotificationBackend を
+公開すると組み込みより優先して使われる。entry point は必要になった時点で 1 つずつ読み込み、
+使えるものが見つかればそれ以降は読み込まない。
+"""
 from __future__ import annotations
 
 import base64
 import logging
 import os
-import platform
 import subprocess
 import threading
+import time
 import tkinter as tk
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from . import capabilities, config
+
+ENTRY_POINT_GROUP = "reminder.notification_backends"
+KIND_SOUND = "sound"
+KIND_DESKTOP = "desktop"
+# 送信に失敗したバックエンドを再び試すまでの秒数
+RETRY_AFTER_S = 300.0
+
+_ICON_SIZE = 64
+# パッケージの親ディレクトリ（プロジェクトルート）の assets/ を参照する
+_ICON_SVG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "reminder_icon.svg")
+_AFPLAY = "/usr/bin/afplay"
+_MACOS_SOUND = "/System/Library/Sounds/Glass.aiff"
+_NOTIFY_SEND_ARGS = ["notify-send", "--urgency=normal", "リマインダー"]
+_CANBERRA_ARGS = ["canberra-gtk-play", "--id=message-new-instant"]
+
+
+def _icon_png() -> bytes | None:
+    """アイコンの PNG を返す。cairosvg が使えなければ None。
+
+    変換結果は設定ディレクトリに保存し、SVG より新しければ次回以降の起動では cairosvg を読み込まずに使う。
+    """
+    cache_path = os.path.join(config._CONFIG_DIR, f"icon-{_ICON_SIZE}.png")
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(_ICON_SVG):
+            with open(cache_path, "rb") as f:
+                return f.read()
+    except OSError:
+        pass
+    cairosvg = capabilities.optional_module("cairosvg")
+    if cairosvg is None:
+        return None
+    png_data = cairosvg.svg2png(url=_ICON_SVG, output_width=_ICON_SIZE, output_height=_ICON_SIZE)
+    try:
+        os.makedirs(config._CONFIG_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png_data)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logging.debug("アイコンのキャッシュを保存できませんでした: %s", e)
+    return png_data
 
 
 def _set_window_icon(root: tk.Tk) -> None:
     """SVG アイコンをウィンドウに設定する。変換ライブラリが無い場合は無視する。"""
     try:
-        import cairosvg  # type: ignore[import]
-
-        # パッケージの親ディレクトリ（プロジェクトルート）の assets/ を参照する
-        svg_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "assets",
-            "reminder_icon.svg",
-        )
-        png_data = cairosvg.svg2png(url=svg_path, output_width=64, output_height=64)
+        png_data = _icon_png()
+        if png_data is None:
+            logging.debug("cairosvg が使えないためウィンドウアイコンを設定しません")
+            return
         icon = tk.PhotoImage(data=base64.b64encode(png_data))
         # Tk 側で画像が解放されないように参照を保持する。
         root._icon_image = icon  # type: ignore[attr-defined]
@@ -29,11 +81,41 @@ def _set_window_icon(root: tk.Tk) -> None:
         logging.debug("ウィンドウアイコンの設定をスキップしました: %s", e)
 
 
+def _release_window_icon(root: tk.Tk) -> None:
+    """_set_window_icon() が保持した画像を手放す。
+
+    iconphoto() は画像をその時点で複製するため、手放してもウィンドウのアイコンは残る。
+    """
+    try:
+        del root._icon_image  # type: ignore[attr-defined]
+    except AttributeError:
+        pass
+
+
+def _spawn(args: list[str]) -> None:
+    """コマンドを出力を捨てて起動する（終了は待たない）。"""
+    subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _start_afplay() -> None:
+    """macOS: afplay で Glass.aiff を再生する（afplay バックエンドの送信処理）。
+
+    起動はこのスレッドで行い、失敗を呼び出し側（BackendRegistry）に伝える。
+    終了待ちだけを別スレッドに任せ、UI スレッドをブロックしない。
+    """
+    proc = subprocess.Popen(
+        [capabilities.binary("afplay") or _AFPLAY, _MACOS_SOUND],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    threading.Thread(target=proc.wait, daemon=True).start()
+
+
 def _play_macos_sound() -> None:
     """macOS: afplay で Glass.aiff を別スレッド再生する（UI スレッドをブロックしない）。"""
     def _play_and_wait() -> None:
         proc = subprocess.Popen(
-            ["/usr/bin/afplay", "/System/Library/Sounds/Glass.aiff"],
+            [capabilities.binary("afplay") or _AFPLAY, _MACOS_SOUND],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
@@ -52,11 +134,7 @@ def _play_windows_sound() -> None:
 def _send_linux_notification() -> None:
     """Linux: notify-send でデスクトップ通知を送信する。失敗時はログのみ残す。"""
     try:
-        subprocess.Popen(
-            ["notify-send", "--urgency=normal", "リマインダー"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        _spawn(_NOTIFY_SEND_ARGS)
     except Exception as e:
         # notify-send が利用できない場合はログのみ残し、呼び出し側の bell にフォールバックする
         logging.debug("notify-send の送信に失敗しました: %s", e)
@@ -71,28 +149,179 @@ def _ring_bell(root: tk.Tk) -> None:
         pass
 
 
+@dataclass(frozen=True)
+class NotificationBackend:
+    """通知の送り先。
+
+    Attributes:
+        name: 名前。同じ名前のバックエンドは 1 つとみなす。
+        kind: KIND_SOUND（音を鳴らす）か KIND_DESKTOP（デスクトップ通知を出す）。
+        available: 使えるかを返す。capabilities の検出結果で判断し、重いモジュールは読み込まないこと。
+        send: 通知する。失敗時は例外を送出する（次の候補に切り替える）。
+        priority: 組み込みの同じ種類の中での優先度（大きいほど先に試す）。
+    """
+
+    name: str
+    kind: str
+    available: Callable[[], bool]
+    send: Callable[[tk.Tk], object]
+    priority: int = 0
+
+
+class BackendRegistry:
+    """NotificationBackend を種類ごとに選んで通知する。
+
+    Args:
+        entry_point_group: 追加のバックエンドを探す entry point のグループ。None なら探さない。
+    """
+
+    def __init__(self, entry_point_group: str | None = ENTRY_POINT_GROUP) -> None:
+        self._group = entry_point_group
+        self._builtin: list[NotificationBackend] = []
+        # 未読み込みの entry point（最初の選択時に列挙する）と、読み込み済みのバックエンド
+        self._entry_points: list[Any] | None = None
+        self._plugins: list[NotificationBackend] = []
+        # 種類 -> 選んだバックエンド（使えるものがなければ None）
+        self._selected: dict[str, NotificationBackend | None] = {}
+        # 失敗したバックエンド名 -> 再び試してよくなる time.monotonic() の時刻
+        self._failed: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def register(self, backend: NotificationBackend) -> None:
+        """組み込みのバックエンドを追加する。"""
+        with self._lock:
+            self._builtin.append(backend)
+            self._builtin.sort(key=lambda b: -b.priority)
+            self._selected.clear()
+
+    def select(self, kind: str) -> NotificationBackend | None:
+        """種類ごとに使えるバックエンドを選んで返す。結果は覚えておき、以後は調べ直さない。"""
+        try:
+            return self._selected[kind]
+        except KeyError:
+            pass
+        with self._lock:
+            if kind not in self._selected:
+                self._selected[kind] = next(
+                    (b for b in self._candidates() if b.kind == kind and self._usable(b)), None
+                )
+            return self._selected[kind]
+
+    def notify(self, root: tk.Tk) -> None:
+        """デスクトップ通知と音を出す。音を鳴らせるバックエンドがなければ bell() を鳴らす。"""
+        self._send(KIND_DESKTOP, root)
+        if not self._send(KIND_SOUND, root):
+            _ring_bell(root)
+
+    def clear(self) -> None:
+        """選択結果・失敗の記録・読み込んだ entry point を捨てる（組み込みの登録は残す）。"""
+        with self._lock:
+            self._entry_points = None
+            self._plugins.clear()
+            self._selected.clear()
+            self._failed.clear()
+
+    # ------------------------------------------------------------ 内部処理
+
+    def _send(self, kind: str, root: tk.Tk) -> bool:
+        if self._failed:
+            self._expire_failures()
+        while (backend := self.select(kind)) is not None:
+            try:
+                backend.send(root)
+                return True
+            except Exception as e:
+                logging.debug("通知バックエンド %s が失敗したため %.0f 秒間は使いません: %s",
+                              backend.name, RETRY_AFTER_S, e)
+                with self._lock:
+                    self._failed[backend.name] = time.monotonic() + RETRY_AFTER_S
+                    self._selected.pop(kind, None)
+        return False
+
+    def _expire_failures(self) -> None:
+        """再試行の時刻を過ぎた失敗の記録を消し、選び直させる。"""
+        with self._lock:
+            now = time.monotonic()
+            expired = [name for name, retry_at in self._failed.items() if retry_at <= now]
+            if not expired:
+                return
+            for name in expired:
+                del self._failed[name]
+            self._selected.clear()
+
+    def _usable(self, backend: NotificationBackend) -> bool:
+        if backend.name in self._failed:
+            return False
+        try:
+            return bool(backend.available())
+        except Exception as e:
+            logging.debug("通知バックエンド %s の検出に失敗しました: %s", backend.name, e)
+            return False
+
+    def _candidates(self) -> Iterator[NotificationBackend]:
+        """entry point のバックエンド（名前順、必要になった分だけ読み込む）、組み込みの順に返す。ロック内で呼ぶ。"""
+        yield from self._plugins
+        if self._entry_points is None:
+            self._entry_points = self._discover()
+        while self._entry_points:
+            entry_point = self._entry_points.pop(0)
+            try:
+                backend = entry_point.load()
+            except Exception as e:
+                logging.warning("通知バックエンド %s を読み込めません: %s", entry_point.name, e)
+                continue
+            if not isinstance(backend, NotificationBackend):
+                logging.warning("通知バックエンド %s は NotificationBackend ではありません", entry_point.name)
+                continue
+            self._plugins.append(backend)
+            yield backend
+        yield from self._builtin
+
+    def _discover(self) -> list[Any]:
+        if self._group is None:
+            return []
+        try:
+            from importlib.metadata import entry_points
+
+            return sorted(entry_points(group=self._group), key=lambda ep: ep.name)
+        except Exception as e:
+            logging.debug("entry point を列挙できません: %s", e)
+            return []
+
+
+REGISTRY = BackendRegistry()
+REGISTRY.register(NotificationBackend(
+    "afplay", KIND_SOUND,
+    lambda: capabilities.system() == "Darwin" and capabilities.binary("afplay") is not None,
+    lambda _root: _start_afplay(),
+))
+REGISTRY.register(NotificationBackend(
+    "winsound", KIND_SOUND,
+    lambda: capabilities.system() == "Windows" and capabilities.optional_module("winsound") is not None,
+    lambda _root: _play_windows_sound(),
+))
+REGISTRY.register(NotificationBackend(
+    "canberra", KIND_SOUND,
+    lambda: (capabilities.system() == "Linux" and capabilities.binary("canberra-gtk-play") is not None
+             and capabilities.audio_device()),
+    lambda _root: _spawn(_CANBERRA_ARGS),
+))
+REGISTRY.register(NotificationBackend(
+    "notify-send", KIND_DESKTOP,
+    lambda: (capabilities.system() == "Linux" and capabilities.binary("notify-send") is not None
+             and capabilities.dbus_session()),
+    lambda _root: _spawn(_NOTIFY_SEND_ARGS),
+))
+
+
 def play_notification_sound(root: tk.Tk) -> None:
     """通知音を再生する。
 
-    プラットフォームごとに最適な方法を試み、失敗時は tkinter の bell() にフォールバックする。
+    REGISTRY が環境ごとに選んだバックエンドで通知し、音を鳴らせなければ tkinter の bell() にフォールバックする。
     - macOS: afplay コマンドで Glass.aiff を再生（別スレッド）
     - Windows: winsound.MessageBeep で警告音を再生
-    - Linux: notify-send でデスクトップ通知を送信し、加えて bell を鳴らす
+    - Linux: D-Bus のセッションがあれば notify-send でデスクトップ通知を送信し、
+      音声デバイスと canberra-gtk-play があればそれで、なければ bell を鳴らす
     - その他 / 上記失敗時: root.bell()
     """
-    system_name = platform.system()
-    try:
-        if system_name == "Darwin":
-            _play_macos_sound()
-            return
-        if system_name == "Windows":
-            _play_windows_sound()
-            return
-        if system_name == "Linux":
-            # notify-send は音を伴わないことがあるため、後段の bell も併せて鳴らす
-            _send_linux_notification()
-    except Exception:
-        # OS 固有の再生に失敗した場合は bell にフォールバック
-        pass
-
-    _ring_bell(root)
+    REGISTRY.notify(root)
@@ -0,0 +1,135 @@
+"""ホットパスのオプトイン・プロファイリング。
+
+環境変数 REMINDER_PROFILE_DIR または `--profile-dir` が指定された場合のみ、
+ReminderApp の主要メソッドと設定保存・アイコン設定を cProfile と tracemalloc で包む。
+指定がなければ何も差し替えないため、無効時のオーバーヘッドはない。
+
+出力（セッションごとにタイムスタンプ付きのサブディレクトリへ保存）:
+    session.pstats              : セッション全体の cProfile 統計（pstats で読み込み可能）
+    <関数名>-<連番>.snapshot    : 各呼び出し直後の tracemalloc スナップショット
+"""
+from __future__ import annotations
+
+import atexit
+import cProfile
+import datetime
+import functools
+import logging
+import os
+import threading
+import tracemalloc
+from typing import Callable
+
+from . import app
+
+PROFILE_DIR_ENV = "REMINDER_PROFILE_DIR"
+
+# tracemalloc が保持するスタックの深さ。深いほど正確だがメモリを食う
+_TRACEMALLOC_FRAMES = 10
+
+
+class ProfileSession:
+    """1 回の起動に対応するプロファイリングセッション。
+
+    cProfile はプロセス内で同時に 1 つしか有効にできないため、セッション全体で
+    1 つの Profile を共有し、最も外側のフック呼び出しの間だけ有効にする。
+
+    Attributes:
+        directory: 出力先ディレクトリ。
+        calls: フック名ごとの呼び出し回数。
+    """
+
+    def __init__(self, directory: str) -> None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.directory = os.path.join(directory, f"session-{stamp}-{os.getpid()}")
+        os.makedirs(self.directory, exist_ok=True)
+        self.calls: dict[str, int] = {}
+        self._profile = cProfile.Profile()
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._restore: list[Callable[[], None]] = []
+        self._dumped = False
+        # 既に他者が tracemalloc を開始している場合は停止の責任を持たない
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """func を計測付きの関数で包んで返す。"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self._lock:
+                outermost = self._depth == 0
+                self._depth += 1
+                if outermost:
+                    self._profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._depth -= 1
+                    if outermost:
+                        self._profile.disable()
+                if outermost:
+                    self._snapshot(name)
+
+        return wrapper
+
+    def patch(self, owner: object, attr: str, name: str | None = None) -> None:
+        """owner.attr を計測付きに差し替え、dump() 後に元に戻せるよう記録する。"""
+        original = getattr(owner, attr)
+        setattr(owner, attr, self.wrap(name or attr, original))
+        self._restore.append(lambda: setattr(owner, attr, original))
+
+    def _snapshot(self, name: str) -> None:
+        """tracemalloc のスナップショットを保存する。失敗しても本処理は継続する。"""
+        count = self.calls.get(name, 0) + 1
+        self.calls[name] = count
+        try:
+            tracemalloc.take_snapshot().dump(os.path.join(self.directory, f"{name}-{count:04d}.snapshot"))
+        except Exception as e:
+            logging.debug("tracemalloc スナップショットの保存に失敗しました: %s", e)
+
+    def dump(self) -> str:
+        """cProfile 統計を書き出し、差し替えた関数を元に戻す。2 回目以降は何もしない。
+
+        Returns:
+            pstats ファイルのパス。
+        """
+        path = os.path.join(self.directory, "session.pstats")
+        if self._dumped:
+            return path
+        self._dumped = True
+        self._profile.dump_stats(path)
+        for restore in reversed(self._restore):
+            restore()
+        self._restore.clear()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        logging.info("プロファイル結果を保存しました: %s", self.directory)
+        return path
+
+
+def install(directory: str) -> ProfileSession:
+    """ReminderApp のホットパスにプロファイリングフックを取り付ける。
+
+    対象: ReminderApp.schedule / show_reminder / _schedule_snooze、
+    および app モジュールが参照する save_settings / _set_window_icon。
+    プロセス終了時に自動で dump() する。
+    """
+    session = ProfileSession(directory)
+    for method in ("schedule", "show_reminder", "_schedule_snooze"):
+        session.patch(app.ReminderApp, method)
+    session.patch(app, "save_settings")
+    session.patch(app, "_set_window_icon")
+    atexit.register(session.dump)
+    logging.info("プロファイリングを有効化しました: %s", session.directory)
+    return session
+
+
+def install_from_env(directory: str | None = None) -> ProfileSession | None:
+    """引数または環境変数で出力先が指定されていればフックを取り付ける。"""
+    directory = directory or os.environ.get(PROFILE_DIR_ENV)
+    if not directory:
+        return None
+    return install(directory)
@@ -0,0 +1,380 @@
+"""GUI に依存しない複数リマインダー対応のスケジューラ。
+
+ReminderApp.schedule() / _schedule_snooze() と同じ手順（calculate_delay_ms による
+遅延計算 → timer.after による登録 → 発火時のスヌーズ再登録と MAX_SNOOZE_COUNT による打ち切り）
+を、任意個のリマインダーに対してヘッドレスで実行する。Clock / Timer を差し替えることで
+仮想時間・実時間・Tk のいずれでも動作する。
+
+timer に CoalescingTimer を渡すと、各リマインダーの slack_ms（許容遅延）の範囲で
+期限の近い発火を 1 回の起床にまとめる。それ以外の Timer では slack_ms を無視して期限ちょうどに発火する。
+
+多数を一度に登録する場合は add_many() を使う。全件を先に検証し、現在時刻の取得と遅延計算を
+1 回の走査で済ませたうえで、検証を通ったものをまとめて登録する（途中で Timer が失敗すれば全件を取り消す）。
+
+tags を付けたリマインダーは TagIndex に載り、cancel_tag() / snooze_tag() でタグ単位に
+取り消し・延期できる。手間はタグの付いた件数に比例し、発火待ち全体は走査しない。
+"""
+from __future__ import annotations
+
+import datetime
+import functools
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Callable, Hashable, Iterable, Iterator, NamedTuple, Sequence
+
+from .clock import Clock, Timer
+from .coalesce import CoalescingTimer
+from .search import SearchIndex
+from .tags import TagIndex, normalize_tags
+from .time_utils import (
+    DEFAULT_SNOOZE_MINUTES,
+    MAX_SNOOZE_COUNT,
+    SNOOZE_MAX_MINUTES,
+    SNOOZE_MIN_MINUTES,
+    calculate_delay_ms,
+    snooze_delay_ms,
+)
+
+
+@dataclass(slots=True)
+class Reminder:
+    """スケジューラが保持する 1 件のリマインダー。
+
+    多数を同時に保持するため __slots__ で属性辞書を持たない。
+
+    Attributes:
+        reminder_id: スケジューラ内で一意な ID。
+        message: 通知メッセージ。
+        deadline: 次の発火予定時刻（clock.monotonic() 基準の秒）。
+        snooze_minutes: スヌーズ間隔（分）。
+        snooze_count: 累積スヌーズ回数。
+        job_id: timer.after() が返したジョブ ID。発火処理中は None。
+        slack_ms: 期限から遅れて発火してよい時間（ミリ秒）。CoalescingTimer が起床をまとめるのに使う。
+        tags: タグ（reminder.tags 参照）。
+    """
+
+    reminder_id: int
+    message: str
+    deadline: float
+    snooze_minutes: int = DEFAULT_SNOOZE_MINUTES
+    snooze_count: int = 0
+    job_id: Hashable | None = None
+    slack_ms: int = 0
+    tags: tuple[str, ...] = ()
+
+
+class BatchItem(NamedTuple):
+    """add_many() に渡す 1 件分の登録内容。各項目の意味は Scheduler.add() の引数と同じ。"""
+
+    message: str
+    target: datetime.time | None = None
+    delay_ms: int | None = None
+    snooze_minutes: int = DEFAULT_SNOOZE_MINUTES
+    snooze_count: int = 0
+    reminder_id: int | None = None
+    slack_ms: int = 0
+    tags: Sequence[str] = ()
+
+
+class BatchResult(NamedTuple):
+    """add_many() の 1 件分の結果。登録できた場合は reminder_id、できなかった場合は error を持つ。"""
+
+    reminder_id: int | None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.reminder_id is not None
+
+
+class Scheduler:
+    """複数のリマインダーを Timer 上で管理するスケジューラ。
+
+    Attributes:
+        clock: 現在時刻の取得元。
+        timer: ジョブの登録先。
+        on_fire: 発火時に呼ばれるコールバック。True を返すとスヌーズを受け入れたとみなす。
+            None を返した場合は判断を保留し、後で resolve() を呼ぶまでリマインダーを保持する
+            （ダイアログの応答待ちや非同期ハンドラーの完了待ちに相当する）。
+    """
+
+    def __init__(
+        self,
+        clock: Clock,
+        timer: Timer,
+        on_fire: Callable[[Reminder], bool | None] | None = None,
+    ) -> None:
+        self.clock = clock
+        self.timer = timer
+        self.on_fire = on_fire
+        self._reminders: dict[int, Reminder] = {}
+        self._ids = itertools.count(1)
+        # 全文検索索引。最初の search() で作り、以後は登録・取り消し・破棄のたびに更新する
+        self._index: SearchIndex | None = None
+        self._tags = TagIndex()
+
+    def __len__(self) -> int:
+        return len(self._reminders)
+
+    def __iter__(self) -> Iterator[Reminder]:
+        return iter(list(self._reminders.values()))
+
+    def get(self, reminder_id: int) -> Reminder | None:
+        """ID に対応する発火待ちのリマインダーを返す。"""
+        return self._reminders.get(reminder_id)
+
+    def search(self, query: str, limit: int | None = None) -> list[Reminder]:
+        """メッセージが検索語の区切りをすべて含むリマインダーを ID 順に返す（reminder.search 参照）。"""
+        if self._index is None:
+            self._index = SearchIndex()
+            for reminder in self._reminders.values():
+                self._index.add(reminder.reminder_id, reminder.message)
+        return [self._reminders[reminder_id] for reminder_id in self._index.search(query, limit)]
+
+    def tagged(self, tag: str) -> list[Reminder]:
+        """タグが付いた発火待ちのリマインダーを ID 順に返す。"""
+        return [self._reminders[reminder_id] for reminder_id in self._tags.ids(tag)]
+
+    def cancel_tag(self, tag: str) -> list[int]:
+        """タグが付いたリマインダーをすべて取り消し、取り消した ID を返す。"""
+        return [reminder_id for reminder_id in self._tags.ids(tag) if self.cancel(reminder_id)]
+
+    def snooze_tag(self, tag: str, minutes: int | None = None) -> list[int]:
+        """タグが付いたリマインダーを現在から minutes 分後へ延期し、延期した ID を返す。
+
+        スヌーズ上限に達しているものは延期せずにそのまま残す（snooze() と同じ）。
+        """
+        return [reminder_id for reminder_id in self._tags.ids(tag) if self.snooze(reminder_id, minutes)]
+
+    def add(
+        self,
+        message: str,
+        *,
+        target: datetime.time | None = None,
+        delay_ms: int | None = None,
+        snooze_minutes: int = DEFAULT_SNOOZE_MINUTES,
+        snooze_count: int = 0,
+        reminder_id: int | None = None,
+        slack_ms: int = 0,
+        tags: Sequence[str] = (),
+    ) -> int:
+        """リマインダーを登録し、ID を返す。
+
+        Args:
+            message: 通知メッセージ。空白のみは不可。
+            target: 通知時刻。schedule() と同じく過ぎていれば翌日扱いにする。
+            delay_ms: 現在からの待機時間（ミリ秒）。target と排他。
+            snooze_minutes: スヌーズ間隔（分）。
+            snooze_count: 既存のスヌーズ回数（永続化から復元する場合に指定）。
+            reminder_id: 外部で採番した ID（ストアの主キーなど）。省略時は内部で採番する。
+                同じスケジューラで両方の採番方式を混在させないこと。
+            slack_ms: 期限から遅れて発火してよい時間（ミリ秒）。スヌーズ後の再発火にも使う。
+            tags: タグ。cancel_tag() / snooze_tag() の対象になる。
+
+        Raises:
+            ValueError: 入力が不正な場合。
+        """
+        reminder, delay_ms = self._prepare(
+            BatchItem(message, target, delay_ms, snooze_minutes, snooze_count, reminder_id, slack_ms, tags),
+            lambda target: calculate_delay_ms(self.clock.now(), target),
+        )
+        self._arm(reminder, delay_ms)
+        self._indexed(reminder)
+        return reminder.reminder_id
+
+    def add_many(self, items: Iterable[BatchItem], *, all_or_nothing: bool = False) -> list[BatchResult]:
+        """複数のリマインダーをまとめて登録し、入力と同じ順で結果を返す。
+
+        全件を先に検証し、入力が不正なもの（型の誤りを含む）は例外にせず BatchResult.error に理由を入れる。
+        target の遅延は同じ現在時刻から計算する。検証を通ったものは全件を登録するか、
+        Timer が例外を送出した場合は同じ呼び出しで登録した分をすべて取り消してから例外を再送出する。
+
+        Args:
+            items: 登録内容。
+            all_or_nothing: True なら 1 件でも不正な入力があれば何も登録しない
+                （不正でなかった項目は reminder_id も error も None になる）。
+        """
+        now: datetime.datetime | None = None
+        # 通知時刻は分単位のため、一括登録内の異なる target は高々 1440 種類。同じ時刻の遅延は 1 回だけ計算する
+        delays: dict[datetime.time, int] = {}
+
+        def delay_for(target: datetime.time) -> int:
+            nonlocal now
+            delay_ms = delays.get(target)
+            if delay_ms is None:
+                if now is None:
+                    now = self.clock.now()
+                delay_ms = delays[target] = calculate_delay_ms(now, target)
+            return delay_ms
+
+        results: list[BatchResult] = []
+        prepared: list[tuple[Reminder, int]] = []
+        batch_ids: set[int] = set()
+        for item in items:
+            try:
+                if item.reminder_id is not None and item.reminder_id in batch_ids:
+                    raise ValueError(f"リマインダー {item.reminder_id} が同じ一括登録内で重複しています")
+                reminder, delay_ms = self._prepare(item, delay_for)
+            except (ValueError, TypeError) as e:
+                # 型の誤り（数値の代わりに None や文字列など）も、その項目だけの失敗として返す
+                results.append(BatchResult(None, str(e)))
+                continue
+            batch_ids.add(reminder.reminder_id)
+            prepared.append((reminder, delay_ms))
+            results.append(BatchResult(reminder.reminder_id))
+        if all_or_nothing and len(prepared) < len(results):
+            return [result if result.error is not None else BatchResult(None) for result in results]
+
+        armed: list[Reminder] = []
+        try:
+            for reminder, delay_ms in prepared:
+                self._arm(reminder, delay_ms)
+                armed.append(reminder)
+        except Exception:
+            for reminder in armed:
+                if reminder.job_id is not None:
+                    self.timer.after_cancel(reminder.job_id)
+                self._drop(reminder.reminder_id)
+            raise
+        for reminder in armed:
+            self._indexed(reminder)
+        return results
+
+    def _prepare(self, item: BatchItem, delay_for: Callable[[datetime.time], int]) -> tuple[Reminder, int]:
+        """登録内容を検証し、登録前のリマインダーと待機時間（ミリ秒）を返す。ID はここで採番する。
+
+        delay_for は target から待機時間を求める関数で、target がある場合だけ呼ぶ。
+
+        Raises:
+            ValueError: 入力が不正な場合。
+            TypeError: 項目の型が誤っている場合（数値の代わりに文字列・bool・float など）。
+        """
+        if not isinstance(item.message, str) or not item.message.strip():
+            raise ValueError("メッセージが空です")
+        if (item.target is None) == (item.delay_ms is None):
+            raise ValueError("target と delay_ms のどちらか一方を指定してください")
+        if item.target is not None and not isinstance(item.target, datetime.time):
+            raise TypeError("target は datetime.time で指定してください")
+        # 登録前に型をそろえて検証し、_arm() や calculate_delay_ms() で一括登録全体が失敗しないようにする
+        for name in ("delay_ms", "snooze_minutes", "snooze_count", "slack_ms"):
+            value = getattr(item, name)
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+                raise TypeError(f"{name} は整数で指定してください")
+        if item.delay_ms is not None and item.delay_ms < 0:
+            raise ValueError("delay_ms は 0 以上で指定してください")
+        if not SNOOZE_MIN_MINUTES <= item.snooze_minutes <= SNOOZE_MAX_MINUTES:
+            raise ValueError(f"スヌーズ間隔は {SNOOZE_MIN_MINUTES}〜{SNOOZE_MAX_MINUTES} 分で指定してください")
+        if item.snooze_count < 0:
+            raise ValueError("snooze_count は 0 以上で指定してください")
+        if item.slack_ms < 0:
+            raise ValueError("slack_ms は 0 以上で指定してください")
+        tags = normalize_tags(item.tags) if item.tags else ()
+        reminder_id = item.reminder_id
+        if reminder_id is None:
+            reminder_id = next(self._ids)
+        elif reminder_id in self._reminders:
+            raise ValueError(f"リマインダー {reminder_id} は登録済みです")
+        delay_ms = item.delay_ms if item.target is None else delay_for(item.target)
+        reminder = Reminder(reminder_id, item.message, 0.0, item.snooze_minutes, item.snooze_count,
+                            slack_ms=item.slack_ms, tags=tags)
+        return reminder, delay_ms  # type: ignore[return-value]
+
+    def cancel(self, reminder_id: int) -> bool:
+        """リマインダーを取り消す。存在しなければ False を返す。"""
+        reminder = self._drop(reminder_id)
+        if reminder is None:
+            return False
+        if reminder.job_id is not None:
+            self.timer.after_cancel(reminder.job_id)
+        return True
+
+    def snooze(self, reminder_id: int, minutes: int | None = None) -> bool:
+        """発火待ちのリマインダーを現在から minutes 分後へ延期する。
+
+        Args:
+            reminder_id: 対象の ID。
+            minutes: 延期する分数。None の場合はリマインダー自身のスヌーズ間隔。
+
+        Returns:
+            延期できた場合は True。存在しないかスヌーズ上限に達している場合は False。
+        """
+        reminder = self._reminders.get(reminder_id)
+        if reminder is None or reminder.snooze_count >= MAX_SNOOZE_COUNT:
+            return False
+        if reminder.job_id is not None:
+            self.timer.after_cancel(reminder.job_id)
+            reminder.job_id = None
+        reminder.snooze_count += 1
+        self._arm(reminder, snooze_delay_ms(minutes if minutes is not None else reminder.snooze_minutes))
+        return True
+
+    def _arm(self, reminder: Reminder, delay_ms: int) -> None:
+        """タイマーにジョブを登録する。登録に失敗した場合はリマインダーを保持しない。"""
+        reminder_id = reminder.reminder_id
+        try:
+            # クロージャより小さい partial で発火先を束縛する
+            callback = functools.partial(self._fire, reminder_id)
+            if reminder.slack_ms and isinstance(self.timer, CoalescingTimer):
+                reminder.job_id = self.timer.after(delay_ms, callback, reminder.slack_ms)
+            else:
+                reminder.job_id = self.timer.after(delay_ms, callback)
+        except Exception:
+            self._drop(reminder_id)
+            raise
+        reminder.deadline = self.clock.monotonic() + delay_ms / 1000
+        self._reminders[reminder_id] = reminder
+
+    def _fire(self, reminder_id: int) -> None:
+        """発火処理。on_fire の結果に応じてスヌーズを再登録するか破棄する。"""
+        reminder = self._reminders.get(reminder_id)
+        if reminder is None:
+            return
+        reminder.job_id = None
+        accepted: bool | None = False
+        try:
+            if self.on_fire is not None:
+                accepted = self.on_fire(reminder)
+        except Exception:
+            logging.exception("リマインダー %d の通知処理で例外が発生しました", reminder_id)
+            accepted = False
+        if accepted is None:
+            # 判断保留。resolve() が呼ばれるまで保持する
+            return
+        self.resolve(reminder_id, bool(accepted))
+
+    def resolve(self, reminder_id: int, accept_snooze: bool) -> bool:
+        """発火済みリマインダーのスヌーズ可否を確定する。
+
+        on_fire が None を返して保留したリマインダーに対して呼ぶ。受け入れた場合は
+        スヌーズ間隔後に再登録し、拒否またはスヌーズ上限の場合は破棄する。
+
+        Returns:
+            スヌーズとして再登録した場合は True。
+        """
+        reminder = self._reminders.get(reminder_id)
+        if reminder is None or reminder.job_id is not None:
+            # 取り消し済み、または発火前のリマインダー
+            return False
+        if accept_snooze and reminder.snooze_count < MAX_SNOOZE_COUNT:
+            reminder.snooze_count += 1
+            self._arm(reminder, snooze_delay_ms(reminder.snooze_minutes))
+            return True
+        self._drop(reminder_id)
+        return False
+
+    def _indexed(self, reminder: Reminder) -> None:
+        """登録したリマインダーを検索索引・タグ索引に加える。"""
+        if self._index is not None:
+            self._index.add(reminder.reminder_id, reminder.message)
+        if reminder.tags:
+            self._tags.add(reminder.reminder_id, reminder.tags)
+
+    def _drop(self, reminder_id: int) -> Reminder | None:
+        """リマインダーを保持対象と検索索引・タグ索引から外す。"""
+        if self._index is not None:
+            self._index.remove(reminder_id)
+        reminder = self._reminders.pop(reminder_id, None)
+        if reminder is not None and reminder.tags:
+            self._tags.remove(reminder_id, reminder.tags)
+        return reminder
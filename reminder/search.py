@@ -0,0 +1,120 @@
+"""リマインダーのメッセージ全文検索。
+
+日本語は単語の区切りが空白に現れないため、単語ではなく文字の n-gram で索引を作る。
+正規化（NFKC・大文字小文字の同一視）した本文を英数字・かな漢字の連なりごとに区切り、
+連なりの中の隣り合う 2 文字（bigram）と末尾の 1 文字を索引語にする。
+
+検索語も同じ規則で区切り、各区切りの bigram をすべて含む文書を索引から絞り込んだ後、
+区切りが本文に部分文字列として現れるかを確かめて誤検出を除く。1 文字の区切りは
+その文字で始まる索引語のいずれかを含む文書を候補にする（末尾の 1 文字を索引語に
+含めているため、どの位置に現れても拾える）。
+
+SearchIndex はこの索引をプロセス内の辞書で持つ純 Python 実装で、Scheduler と ReminderApp が使う。
+ReminderStore は同じ索引語を SQLite の FTS5（使えない場合は通常の表）に保存する。
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable
+
+# 英数字・かな漢字など（記号・空白・下線以外）の連なり
+_RUN = re.compile(r"[^\W_]+")
+
+
+def normalize(text: str) -> str:
+    """検索用に正規化する（全角英数字・半角カナを NFKC でそろえ、大文字小文字を同一視する）。"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def query_terms(query: str) -> list[str]:
+    """検索語を正規化して区切り、重複を除いて返す。区切りはすべて含むもの（AND）として扱う。"""
+    return list(dict.fromkeys(_RUN.findall(normalize(query))))
+
+
+def index_tokens(text: str) -> set[str]:
+    """本文の索引語（連なりごとの bigram と末尾の 1 文字）を返す。"""
+    return _tokens(normalize(text))
+
+
+def term_tokens(term: str) -> set[str]:
+    """2 文字以上の検索語の区切りが含むべき索引語。"""
+    return {term[i:i + 2] for i in range(len(term) - 1)}
+
+
+def matches(terms: Iterable[str], normalized: str) -> bool:
+    """正規化済みの本文が区切りをすべて部分文字列として含むか。"""
+    return all(term in normalized for term in terms)
+
+
+def _tokens(normalized: str) -> set[str]:
+    tokens = set()
+    for run in _RUN.findall(normalized):
+        tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+        tokens.add(run[-1])
+    return tokens
+
+
+class SearchIndex:
+    """文書 ID から本文を引く n-gram 転置索引。追加・削除は文書 1 件分の索引語だけを更新する。"""
+
+    def __init__(self) -> None:
+        self._postings: dict[str, set[int]] = {}
+        # 候補の確認と削除時の索引語の再計算に使う正規化済み本文
+        self._texts: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._texts
+
+    def add(self, doc_id: int, text: str) -> None:
+        """文書を索引に加える。同じ ID があれば置き換える。"""
+        if doc_id in self._texts:
+            self.remove(doc_id)
+        normalized = normalize(text)
+        self._texts[doc_id] = normalized
+        for token in _tokens(normalized):
+            self._postings.setdefault(token, set()).add(doc_id)
+
+    def remove(self, doc_id: int) -> bool:
+        """文書を索引から除く。存在しなければ False。"""
+        normalized = self._texts.pop(doc_id, None)
+        if normalized is None:
+            return False
+        for token in _tokens(normalized):
+            posting = self._postings[token]
+            posting.discard(doc_id)
+            if not posting:
+                del self._postings[token]
+        return True
+
+    def search(self, query: str, limit: int | None = None) -> list[int]:
+        """検索語の区切りをすべて含む文書の ID を昇順で返す。区切りがない検索語は何にも一致しない。"""
+        terms = query_terms(query)
+        if not terms:
+            return []
+        candidates: set[int] | None = None
+        # 小さい候補集合から順に絞り込む
+        for posting in sorted(self._candidate_sets(terms), key=len):
+            candidates = posting.copy() if candidates is None else candidates & posting
+            if not candidates:
+                return []
+        found = []
+        for doc_id in sorted(candidates or ()):
+            if matches(terms, self._texts[doc_id]):
+                found.append(doc_id)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def _candidate_sets(self, terms: list[str]) -> list[set[int]]:
+        empty: set[int] = set()
+        sets = []
+        for term in terms:
+            if len(term) == 1:
+                sets.append(set().union(*(ids for token, ids in self._postings.items() if token[0] == term)))
+            else:
+                sets.extend(self._postings.get(token, empty) for token in term_tokens(term))
+        return sets
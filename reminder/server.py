@@ -0,0 +1,819 @@
+"""複数利用者のリマインダーを扱う asyncio HTTP サーバー。
+
+`python -m reminder serve` で起動する。リマインダーは ReminderStore に利用者ごとの
+名前空間で保存し、発火待ちのものは AsyncScheduler のタイマーに載せる。
+HTTP/1.1 は標準ライブラリの asyncio.start_server の上に最小限だけ実装しており、
+keep-alive とチャンク転送に対応する。
+
+API（{user} は利用者名、本文はすべて UTF-8 の JSON）:
+    POST   /v1/users/{user}/reminders              作成。{"message", "delay_ms" | "at" | "time", "snooze_minutes", "params", "tags"}
+    GET    /v1/users/{user}/reminders[?state=...&q=...&tag=...]
+                                                    一覧。q を指定するとメッセージの全文検索（reminder.search 参照）、
+                                                    tag を指定するとそのタグが付いたものだけ
+    GET    /v1/users/{user}/reminders/{id}         1 件取得
+    DELETE /v1/users/{user}/reminders/{id}         取り消し
+    POST   /v1/users/{user}/reminders/{id}/snooze  延期。{"minutes"}（省略時はスヌーズ間隔）
+    POST   /v1/users/{user}/reminders/bulk         NDJSON 一括登録。結果も 1 行ずつ NDJSON で返す
+    POST   /v1/users/{user}/tags/{tag}/cancel      タグが付いた発火待ちをすべて取り消す。{"cancelled": [id, ...]}
+    POST   /v1/users/{user}/tags/{tag}/snooze      タグが付いた発火待ちをすべて延期する。{"minutes"}（省略時は各スヌーズ間隔）。
+                                                    スヌーズ上限に達したものは延期しない
+    GET    /v1/users/{user}/events?since=N&timeout=S
+                                                    発火イベントのロングポーリング。
+                                                    Accept: text/event-stream なら SSE で配信し続ける
+    GET    /healthz                                 死活確認。{"status", "role": "leader" | "standby"}
+
+"at" は UNIX 時刻（秒）、"time" は "HH:MM"（過ぎていれば翌日）で期限を指定する。
+"params" を渡すと "message" を "{ticket} のレビュー" のようなテンプレートとして保存し、
+発火時に埋め込む（reminder.messages 参照）。"tags" は文字列の配列で、タグ単位の一括操作に使う
+（reminder.tags 参照）。
+
+起動時（およびリーダー引き継ぎ時）に停止中に期限を過ぎたものは CatchUpPolicy に従って
+選別し、利用者ごとに 1 つの "catchup" イベントにまとめて配信する。通常の発火は "fire" イベントになる。
+
+LeaderElector を渡すと同じストアを共有する複数インスタンスで動かせる。API はどのインスタンスでも
+受け付けるが、タイマーを持って発火させるのはリースを保持するリーダーだけで、リーダーは
+ハートビートごとにストアの発火待ちと自分のタイマーを突き合わせて他インスタンスでの変更を取り込む。
+発火イベントはリーダーのチャネルにだけ届く。
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import datetime
+import http
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .aio import AsyncScheduler
+from .catchup import CatchUpPolicy
+from .failover import LeaderElector
+from .messages import validate_params
+from .scheduler import BatchItem, Reminder
+from .store import STATE_CANCELLED, STATE_FIRED, STATE_PENDING, STATES, NewReminder, ReminderStore, StoredReminder
+from .tags import normalize_tags
+from .time_utils import (
+    DEFAULT_SNOOZE_MINUTES,
+    MAX_SNOOZE_COUNT,
+    SNOOZE_MAX_MINUTES,
+    SNOOZE_MIN_MINUTES,
+    calculate_delay_ms,
+    snooze_delay_ms,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+# 利用者ごとに保持する直近の発火イベント数。ロングポーリングの取りこぼしはこの範囲で補う
+DEFAULT_EVENT_BUFFER = 1_000
+# 一括登録でストアへ 1 トランザクションにまとめる行数
+BULK_BATCH_SIZE = 500
+# 登録できる期限の上限（現在からの秒数）。ストアの整数列・タイマーに載らない値を弾く
+MAX_SCHEDULE_AHEAD_S = 10 * 366 * 86_400
+# ロングポーリングの待機時間の上限（秒）
+MAX_POLL_TIMEOUT_S = 60.0
+# SSE で無通信が続いたときに送るコメント行の間隔（秒）
+SSE_KEEPALIVE_S = 15.0
+
+_MAX_HEADER_BYTES = 16 * 1024
+_MAX_BODY_BYTES = 1024 * 1024
+_MAX_USER_LENGTH = 128
+
+
+class HttpError(Exception):
+    """HTTP のエラー応答に変換される例外。"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+# ------------------------------------------------------------ 発火イベント
+
+
+class _EventChannel:
+    """1 利用者分の発火イベントを連番付きで保持し、待機者に通知する。"""
+
+    def __init__(self, maxlen: int) -> None:
+        self.events: collections.deque[dict[str, object]] = collections.deque(maxlen=maxlen)
+        self.last_seq = 0
+        self._waiters: set[asyncio.Future] = set()
+
+    def publish(self, event: dict[str, object]) -> None:
+        self.last_seq += 1
+        event["seq"] = self.last_seq
+        self.events.append(event)
+        self.wake()
+
+    def wake(self) -> None:
+        """待機中の wait() をすべて戻す。"""
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    def since(self, seq: int) -> list[dict[str, object]]:
+        """連番が seq より大きいイベントを古い順に返す。"""
+        if seq >= self.last_seq:
+            return []
+        return [event for event in self.events if event["seq"] > seq]  # type: ignore[operator]
+
+    async def wait(self, seq: int, timeout: float) -> list[dict[str, object]]:
+        """seq より新しいイベントが届くまで最大 timeout 秒待って返す。"""
+        events = self.since(seq)
+        if events or timeout <= 0:
+            return events
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters.discard(waiter)
+        return self.since(seq)
+
+
+# ------------------------------------------------------------ HTTP 入出力
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    reader: asyncio.StreamReader
+    body_consumed: bool = False
+    keep_alive: bool = True
+    parts: list[str] = field(default_factory=list)
+
+    async def read_body(self) -> bytes:
+        """本文をすべて読み込む。"""
+        chunks = []
+        size = 0
+        async for chunk in self._iter_body():
+            size += len(chunk)
+            if size > _MAX_BODY_BYTES:
+                raise HttpError(413, "本文が大きすぎます")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def read_json(self) -> dict[str, object]:
+        body = await self.read_body()
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "本文が JSON として読めません") from None
+        if not isinstance(payload, dict):
+            raise HttpError(400, "本文は JSON オブジェクトで指定してください")
+        return payload
+
+    async def iter_lines(self) -> AsyncIterator[bytes]:
+        """本文を 1 行ずつ読む。全体を溜め込まないため一括登録の本文サイズに上限はない。"""
+        pending = b""
+        async for chunk in self._iter_body():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            if len(pending) > _MAX_BODY_BYTES:
+                raise HttpError(413, "1 行が大きすぎます")
+            for line in lines:
+                yield line
+        if pending:
+            yield pending
+
+    async def _iter_body(self) -> AsyncIterator[bytes]:
+        if self.body_consumed:
+            return
+        self.body_consumed = True
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await self.reader.readline()
+                try:
+                    size = int(size_line.split(b";")[0].strip(), 16)
+                except ValueError:
+                    raise HttpError(400, "チャンクサイズが不正です") from None
+                if size == 0:
+                    # トレーラーを読み飛ばす
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                yield await self.reader.readexactly(size)
+                await self.reader.readline()
+        else:
+            try:
+                remaining = int(self.headers.get("content-length", "0"))
+            except ValueError:
+                raise HttpError(400, "Content-Length が不正です") from None
+            while remaining > 0:
+                chunk = await self.reader.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    raise HttpError(400, "本文が途中で切れています")
+                remaining -= len(chunk)
+                yield chunk
+
+
+async def _read_request(reader: asyncio.StreamReader) -> _Request | None:
+    """リクエスト行とヘッダーを読む。接続が閉じられていれば None。"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise HttpError(400, "リクエストが途中で切れています") from None
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "ヘッダーが大きすぎます") from None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "リクエスト行が不正です") from None
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    url = urlsplit(target)
+    connection = headers.get("connection", "").lower()
+    return _Request(
+        method=method.upper(),
+        path=url.path,
+        query={k: v[-1] for k, v in parse_qs(url.query).items()},
+        headers=headers,
+        reader=reader,
+        keep_alive=connection != "close" if version == "HTTP/1.1" else connection == "keep-alive",
+        parts=[unquote(part) for part in url.path.strip("/").split("/")],
+    )
+
+
+def _head(status: int, headers: dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _json_bytes(payload: object) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: object, keep_alive: bool) -> None:
+    body = _json_bytes(payload)
+    writer.write(_head(status, {
+        "Content-Type": "application/json; charset=utf-8",
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+    }) + body)
+    await writer.drain()
+
+
+def _chunk(data: bytes) -> bytes:
+    return f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n"
+
+
+# ------------------------------------------------------------ サーバー本体
+
+
+class ReminderServer:
+    """ReminderStore と AsyncScheduler を HTTP で公開するサーバー。
+
+    Attributes:
+        store: リマインダーの保存先。
+        scheduler: 発火待ちリマインダーのタイマー。ID はストアの reminder_id と同じ。
+        elector: 複数インスタンス構成でのリーダー選出。None なら単独で常に発火を担当する。
+        catch_up: 停止中に期限を過ぎたリマインダーの扱い方。
+    """
+
+    def __init__(self, store: ReminderStore, *, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 event_buffer: int = DEFAULT_EVENT_BUFFER, elector: LeaderElector | None = None,
+                 catch_up: CatchUpPolicy | None = None) -> None:
+        """
+        Args:
+            store: リマインダーの保存先。
+            host: 待ち受けるアドレス。
+            port: 待ち受けるポート。0 の場合は空いているポートを選ぶ。
+            event_buffer: 利用者ごとに保持する直近の発火イベント数。
+            elector: 同じストアを共有するインスタンス間のリーダー選出。
+            catch_up: 停止中に期限を過ぎたリマインダーの扱い方。既定はすべて通知する。
+        """
+        self.store = store
+        self.host = host
+        self.port = port
+        self.elector = elector
+        self.catch_up = catch_up or CatchUpPolicy()
+        self._leading = elector is None
+        self._lease_task: asyncio.Task | None = None
+        self._event_buffer = event_buffer
+        self._channels: dict[str, _EventChannel] = {}
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self.scheduler: AsyncScheduler | None = None
+
+    async def start(self) -> None:
+        """ストアの発火待ちリマインダーをタイマーに載せ、待ち受けを開始する。
+
+        elector がある場合はリースを取得できた時点でタイマーに載せる。
+        """
+        self.scheduler = AsyncScheduler(on_fire=self._on_fire)
+        if self.elector is None:
+            self._catch_up_overdue()
+            await self._sync_timers()
+        else:
+            self._lease_task = asyncio.ensure_future(self._lease_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=_MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info("リマインダーサーバーを http://%s:%d で起動しました", self.host, self.port)
+
+    async def close(self) -> None:
+        """待ち受けと接続を閉じ、全タイマーを外す。ストアの状態は発火待ちのまま残る。
+
+        リースを保持していれば手放し、待機系が直ちに引き継げるようにする。
+        """
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+            await asyncio.gather(self._lease_task, return_exceptions=True)
+            self._lease_task = None
+            self._leading = False
+            self.elector.release()  # type: ignore[union-attr]
+        if self._server is not None:
+            self._server.close()
+            # keep-alive や SSE の接続を閉じ、各接続の処理が終わるのを待つ
+            handlers = list(self._connections.values())
+            for writer in list(self._connections):
+                writer.close()
+            for channel in self._channels.values():
+                channel.wake()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        self._disarm_all()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.close()
+
+    def channel(self, user: str) -> _EventChannel:
+        """利用者の発火イベントチャネルを返す。"""
+        channel = self._channels.get(user)
+        if channel is None:
+            channel = self._channels[user] = _EventChannel(self._event_buffer)
+        return channel
+
+    @property
+    def role(self) -> str:
+        """発火を担当していれば "leader"、待機中なら "standby"。"""
+        return "leader" if self._leading else "standby"
+
+    # ------------------------------------------------------------ スケジューリング
+
+    async def _lease_loop(self) -> None:
+        """ハートビートごとにリースを更新し、役割の変化に合わせてタイマーを載せ外しする。"""
+        assert self.elector is not None
+        while True:
+            leader = self.elector.heartbeat()
+            if leader:
+                if not self._leading:
+                    logging.info("リーダーになりました（%s）。発火待ちを引き継ぎます", self.elector.holder)
+                    self._leading = True
+                    self._catch_up_overdue()
+                # 引き継ぎ時は停止中の取りこぼしを、以降は他インスタンスでの登録・変更を取り込む
+                await self._sync_timers()
+            elif self._leading:
+                logging.warning("リースを失ったため待機系に戻ります（%s）", self.elector.holder)
+                self._leading = False
+                self._disarm_all()
+            await asyncio.sleep(self.elector.heartbeat_s)
+
+    async def _sync_timers(self) -> None:
+        """ストアの発火待ちとタイマーを突き合わせ、差分だけ載せ外しする。
+
+        期限を過ぎているものは直ちに発火させる（停止中・引き継ぎ前の取りこぼしの再送）。
+        """
+        assert self.scheduler is not None
+        armed = {reminder.reminder_id: reminder.snooze_count for reminder in self.scheduler.scheduler}
+        now = time.time()
+        changed = []
+        # 発火待ち全体は列指向の写しで比べ、差分の行だけを読み直す
+        for record in self.store.pending_columns():
+            count = armed.pop(record.reminder_id, None)
+            if count == record.snooze_count:
+                continue
+            if count is not None:
+                # 他インスタンスでスヌーズされ、期限が変わった
+                await self.scheduler.cancel(record.reminder_id)
+            changed.append(record.reminder_id)
+        await self._arm_many([
+            self._timer_item(stored, now) for stored in self.store.get_many(changed) if stored.state == STATE_PENDING
+        ])
+        for reminder_id in armed:
+            # 他インスタンスで取り消された
+            await self.scheduler.cancel(reminder_id)
+
+    def _catch_up_overdue(self) -> None:
+        """停止中に期限を過ぎた発火待ちを方針に従って選別し、利用者ごとに 1 イベントで配信する。"""
+        now = time.time()
+        cutoff = self.catch_up.cutoff(now)
+        # 方針で破棄が確定している古いものは行を読まずに 1 文で更新する
+        missed_counts = self.store.mark_missed_before(cutoff) if cutoff is not None else {}
+        overdue: dict[str, list[StoredReminder]] = {}
+        for stored in self.store.due_between(cutoff, now):
+            overdue.setdefault(stored.user, []).append(stored)
+        holder = self.elector.holder if self.elector is not None else ""
+        for user in set(overdue) | set(missed_counts):
+            deliver, missed = self.catch_up.split(overdue.get(user, []), now, lambda r: r.deadline)
+            missed_count = missed_counts.get(user, 0) + self.store.mark_missed(r.reminder_id for r in missed)
+            recorded = set(self.store.record_fires(((r.reminder_id, r.deadline) for r in deliver), now, holder))
+            delivered = [r for r in deliver if r.reminder_id in recorded]
+            if not delivered and not missed_count:
+                continue
+            for stored in delivered:
+                stored.state = STATE_FIRED
+            self.channel(user).publish({
+                "kind": "catchup",
+                "reminders": [stored.to_dict() for stored in delivered],
+                "missed": missed_count,
+                "fired_at": now,
+            })
+            logging.info("停止中の期限切れを配信しました: %s（通知 %d 件・破棄 %d 件）", user, len(delivered), missed_count)
+
+    def _disarm_all(self) -> None:
+        if self.scheduler is not None:
+            for reminder in list(self.scheduler.scheduler):
+                self.scheduler.scheduler.cancel(reminder.reminder_id)
+
+    async def _arm(self, stored: StoredReminder, now: float) -> None:
+        """リマインダーをタイマーに載せる。待機系では何もしない（リーダーが同期で拾う）。"""
+        assert self.scheduler is not None
+        if not self._leading:
+            return
+        await self.scheduler.add(**self._timer_item(stored, now)._asdict())
+
+    async def _arm_many(self, items: list[BatchItem]) -> None:
+        """複数のリマインダーを 1 回の add_many() でタイマーに載せる。待機系では何もしない。
+
+        載せられなかった項目はストアには発火待ちのまま残るため、理由を記録しておく
+        （elector がある場合はリース更新ごとの _sync_timers() で載せ直される）。
+        """
+        assert self.scheduler is not None
+        if not items or not self._leading:
+            return
+        results = await self.scheduler.add_many(items)
+        for item, result in zip(items, results):
+            if result.error is not None:
+                logging.warning("リマインダー %s をタイマーに載せられません: %s", item.reminder_id, result.error)
+
+    @staticmethod
+    def _timer_item(stored: StoredReminder, now: float) -> BatchItem:
+        """ストアの行からタイマーへの登録内容を作る。"""
+        return BatchItem(
+            stored.message,
+            delay_ms=max(0, round((stored.deadline - now) * 1000)),
+            snooze_minutes=stored.snooze_minutes,
+            snooze_count=stored.snooze_count,
+            reminder_id=stored.reminder_id,
+            tags=stored.tags,
+        )
+
+    def _on_fire(self, reminder: Reminder) -> bool:
+        """期限到来時の処理。発火を記録できた場合だけ所有者のチャネルへ配信する。"""
+        if self.elector is not None and not self.elector.is_leader:
+            # リースが切れかけている。ストアには発火待ちのまま残し、次のリーダーに任せる
+            return False
+        stored = self.store.get_any(reminder.reminder_id)
+        now = time.time()
+        if stored is not None and stored.state == STATE_PENDING and stored.deadline > now:
+            # 載せた後に他インスタンスで延期され（snooze_count と期限が変わった）、新しい期限がまだ来ていない。
+            # 古い期限で発火を記録せず、Scheduler がこのリマインダーを破棄した後でストアの期限に載せ直す
+            logging.debug("リマインダー %d は延期済み（スヌーズ %d→%d 回）のため載せ直します",
+                          stored.reminder_id, reminder.snooze_count, stored.snooze_count)
+            self.scheduler.timer.loop.call_soon(self._rearm_pending, stored.reminder_id)  # type: ignore[union-attr]
+            return False
+        holder = self.elector.holder if self.elector is not None else ""
+        if stored is None or not self.store.record_fire(stored.reminder_id, stored.deadline, now, holder):
+            # 取り消し済み、または他のインスタンスが同じ期限で発火済み
+            return False
+        self.channel(stored.user).publish({
+            "kind": "fire",
+            "reminder_id": stored.reminder_id,
+            "message": stored.render(),
+            "deadline": stored.deadline,
+            "fired_at": now,
+            "lateness_ms": max(0.0, now - stored.deadline) * 1000,
+            "snooze_count": stored.snooze_count,
+        })
+        return False
+
+    def _rearm_pending(self, reminder_id: int) -> None:
+        """ストアで発火待ちのリマインダーを、まだ載っていなければストアの期限でタイマーに載せる。"""
+        stored = self.store.get_any(reminder_id)
+        if (stored is None or stored.state != STATE_PENDING or not self._leading
+                or self.scheduler is None or self.scheduler.scheduler.get(reminder_id) is not None):
+            # 取り消し・発火済み、待機系への降格、または _sync_timers() が先に載せ直した
+            return
+        self.scheduler.scheduler.add(**self._timer_item(stored, time.time())._asdict())
+
+    def _parse_new(self, payload: dict[str, object], now: float) -> NewReminder:
+        """作成要求を検証して返す。
+
+        Raises:
+            ValueError: 入力が不正な場合。
+        """
+        message = payload.get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise ValueError("message を空でない文字列で指定してください")
+        snooze_minutes = payload.get("snooze_minutes", DEFAULT_SNOOZE_MINUTES)
+        if (not isinstance(snooze_minutes, int) or isinstance(snooze_minutes, bool)
+                or not SNOOZE_MIN_MINUTES <= snooze_minutes <= SNOOZE_MAX_MINUTES):
+            raise ValueError(f"snooze_minutes は {SNOOZE_MIN_MINUTES}〜{SNOOZE_MAX_MINUTES} の整数で指定してください")
+        params = payload.get("params")
+        if params is not None:
+            if not isinstance(params, dict):
+                raise ValueError("params はオブジェクトで指定してください")
+            params = validate_params(message, params)
+        tags = payload.get("tags")
+        tags = normalize_tags(tags) if tags is not None else ()
+        given = [key for key in ("delay_ms", "at", "time") if payload.get(key) is not None]
+        if len(given) != 1:
+            raise ValueError("delay_ms / at / time のいずれか 1 つを指定してください")
+        value = payload[given[0]]
+        # JSON の true / false は int として読まれ、Infinity / NaN / 1e300 も float として読まれる
+        if given[0] == "delay_ms":
+            if (not isinstance(value, int) or isinstance(value, bool)
+                    or not 0 <= value <= MAX_SCHEDULE_AHEAD_S * 1000):
+                raise ValueError(f"delay_ms は 0〜{MAX_SCHEDULE_AHEAD_S * 1000} の整数で指定してください")
+            deadline = now + value / 1000
+        elif given[0] == "at":
+            if (not isinstance(value, (int, float)) or isinstance(value, bool) or not math.isfinite(value)
+                    or not 0 <= value <= now + MAX_SCHEDULE_AHEAD_S):
+                raise ValueError(f"at は現在から {MAX_SCHEDULE_AHEAD_S // 86_400} 日以内の UNIX 時刻（秒）で指定してください")
+            deadline = float(value)
+        else:
+            try:
+                target = datetime.datetime.strptime(str(value), "%H:%M").time()
+            except ValueError:
+                raise ValueError("time は HH:MM 形式で指定してください") from None
+            deadline = now + calculate_delay_ms(datetime.datetime.fromtimestamp(now), target) / 1000
+        return NewReminder(message, deadline, snooze_minutes, params, tags)
+
+    async def _create_many(self, user: str, items: list[NewReminder], now: float) -> list[StoredReminder]:
+        created = self.store.create_many(user, items)
+        # 1 回のコミットで作った行は、タイマーにも 1 回の add_many() で載せる
+        await self._arm_many([self._timer_item(stored, now) for stored in created])
+        return created
+
+    async def _snooze(self, stored: StoredReminder, minutes: int | None) -> StoredReminder:
+        """発火待ちなら延期し、発火済みなら minutes 分後に再登録する。"""
+        assert self.scheduler is not None
+        if stored.state == STATE_CANCELLED:
+            raise HttpError(409, "取り消し済みのリマインダーです")
+        if stored.snooze_count >= MAX_SNOOZE_COUNT:
+            raise HttpError(409, f"スヌーズは {MAX_SNOOZE_COUNT} 回までです")
+        minutes = stored.snooze_minutes if minutes is None else minutes
+        now = time.time()
+        stored.deadline = now + snooze_delay_ms(minutes) / 1000
+        stored.snooze_count += 1
+        stored.state = STATE_PENDING
+        if not self.store.reschedule(stored.reminder_id, stored.deadline, stored.snooze_count):
+            raise HttpError(409, "取り消し済みのリマインダーです")
+        await self.scheduler.cancel(stored.reminder_id)
+        await self._arm(stored, now)
+        return stored
+
+    async def _cancel_tag(self, user: str, tag: str) -> list[int]:
+        """タグが付いた発火待ちをストアとタイマーの両方で取り消し、取り消した ID を返す。"""
+        assert self.scheduler is not None
+        cancelled = self.store.cancel_tag(user, tag)
+        for reminder_id in cancelled:
+            await self.scheduler.cancel(reminder_id)
+        return cancelled
+
+    async def _snooze_tag(self, user: str, tag: str, minutes: int | None) -> list[StoredReminder]:
+        """タグが付いた発火待ちを延期し、延期したものを返す。タイマーは 1 回の add_many() で載せ直す。"""
+        assert self.scheduler is not None
+        now = time.time()
+        snoozed = self.store.snooze_tag(user, tag, now, minutes, MAX_SNOOZE_COUNT)
+        for stored in snoozed:
+            await self.scheduler.cancel(stored.reminder_id)
+        await self._arm_many([self._timer_item(stored, now) for stored in snoozed])
+        return snoozed
+
+    @staticmethod
+    def _parse_minutes(payload: dict[str, object]) -> int | None:
+        """延期要求の minutes を検証して返す。省略時は None。"""
+        minutes = payload.get("minutes")
+        if minutes is not None and (
+            not isinstance(minutes, int) or isinstance(minutes, bool)
+            or not SNOOZE_MIN_MINUTES <= minutes <= SNOOZE_MAX_MINUTES
+        ):
+            raise HttpError(400, f"minutes は {SNOOZE_MIN_MINUTES}〜{SNOOZE_MAX_MINUTES} の整数で指定してください")
+        return minutes
+
+    # ------------------------------------------------------------ HTTP 処理
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections[writer] = asyncio.current_task()  # type: ignore[assignment]
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = await self._dispatch(request, writer)
+                except HttpError as e:
+                    await _send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            logging.exception("HTTP リクエストの処理で例外が発生しました")
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def _dispatch(self, request: _Request, writer: asyncio.StreamWriter) -> bool:
+        """リクエストを処理して応答を書き、接続を維持するかを返す。"""
+        parts = request.parts
+        if parts == ["healthz"]:
+            return await self._reply(request, writer, 200, {"status": "ok", "role": self.role})
+        if len(parts) < 3 or parts[:2] != ["v1", "users"]:
+            raise HttpError(404, "見つかりません")
+        user = parts[2]
+        if not user or len(user) > _MAX_USER_LENGTH:
+            raise HttpError(400, f"利用者名は 1〜{_MAX_USER_LENGTH} 文字で指定してください")
+        rest = parts[3:]
+        method = request.method
+
+        if rest == ["events"] and method == "GET":
+            return await self._events(request, writer, user)
+        if rest == ["reminders", "bulk"] and method == "POST":
+            return await self._bulk(request, writer, user)
+        if rest == ["reminders"]:
+            if method == "POST":
+                try:
+                    item = self._parse_new(await request.read_json(), time.time())
+                except ValueError as e:
+                    raise HttpError(400, str(e)) from None
+                created = await self._create_many(user, [item], time.time())
+                return await self._reply(request, writer, 201, created[0].to_dict())
+            if method == "GET":
+                state = request.query.get("state")
+                if state is not None and state not in STATES:
+                    raise HttpError(400, f"state は {' / '.join(STATES)} のいずれかで指定してください")
+                query = request.query.get("q")
+                tag = request.query.get("tag")
+                if query is not None:
+                    reminders = self.store.search(user, query, state)
+                    if tag is not None:
+                        reminders = [r for r in reminders if tag in r.tags]
+                elif tag is not None:
+                    reminders = self.store.tagged(user, tag, state)
+                else:
+                    reminders = self.store.list_reminders(user, state)
+                return await self._reply(request, writer, 200, {"reminders": [r.to_dict() for r in reminders]})
+            raise HttpError(405, "許可されていないメソッドです")
+        if len(rest) in (2, 3) and rest[0] == "reminders":
+            try:
+                reminder_id = int(rest[1])
+            except ValueError:
+                raise HttpError(404, "見つかりません") from None
+            stored = self.store.get(user, reminder_id)
+            if stored is None:
+                raise HttpError(404, f"リマインダー {reminder_id} は存在しません")
+            if len(rest) == 2 and method == "GET":
+                return await self._reply(request, writer, 200, stored.to_dict())
+            if len(rest) == 2 and method == "DELETE":
+                if not self.store.cancel(user, reminder_id):
+                    raise HttpError(409, "発火待ちではないため取り消せません")
+                assert self.scheduler is not None
+                await self.scheduler.cancel(reminder_id)
+                stored.state = STATE_CANCELLED
+                return await self._reply(request, writer, 200, stored.to_dict())
+            if rest[2:] == ["snooze"] and method == "POST":
+                minutes = self._parse_minutes(await request.read_json())
+                return await self._reply(request, writer, 200, (await self._snooze(stored, minutes)).to_dict())
+            raise HttpError(405, "許可されていないメソッドです")
+        if len(rest) == 3 and rest[0] == "tags" and rest[1]:
+            if method != "POST":
+                raise HttpError(405, "許可されていないメソッドです")
+            tag = rest[1]
+            if rest[2] == "cancel":
+                return await self._reply(request, writer, 200, {"cancelled": await self._cancel_tag(user, tag)})
+            if rest[2] == "snooze":
+                minutes = self._parse_minutes(await request.read_json())
+                snoozed = await self._snooze_tag(user, tag, minutes)
+                return await self._reply(request, writer, 200, {"reminders": [r.to_dict() for r in snoozed]})
+        raise HttpError(404, "見つかりません")
+
+    async def _reply(self, request: _Request, writer: asyncio.StreamWriter, status: int, payload: object) -> bool:
+        # 読み残した本文があると次のリクエストの境界が分からないため接続を閉じる
+        keep_alive = request.keep_alive and (
+            request.body_consumed
+            or (request.headers.get("content-length", "0") == "0" and "transfer-encoding" not in request.headers)
+        )
+        await _send_json(writer, status, payload, keep_alive)
+        return keep_alive
+
+    async def _bulk(self, request: _Request, writer: asyncio.StreamWriter, user: str) -> bool:
+        """NDJSON の一括登録。BULK_BATCH_SIZE 行ごとにストアへ書き、結果を行単位で返す。"""
+        writer.write(_head(200, {
+            "Content-Type": "application/x-ndjson; charset=utf-8",
+            "Transfer-Encoding": "chunked",
+            "Connection": "keep-alive" if request.keep_alive else "close",
+        }))
+        line_no = 0
+        batch: list[tuple[int, tuple[str, float, int]]] = []
+        results: list[dict[str, object]] = []
+
+        async def flush() -> None:
+            if batch:
+                created = await self._create_many(user, [item for _n, item in batch], time.time())
+                results.extend({"line": n, "ok": True, "reminder": stored.to_dict()}
+                               for (n, _item), stored in zip(batch, created))
+                batch.clear()
+            if results:
+                results.sort(key=lambda r: r["line"])  # type: ignore[arg-type, return-value]
+                writer.write(_chunk(b"".join(_json_bytes(r) + b"\n" for r in results)))
+                results.clear()
+                await writer.drain()
+
+        keep_alive = request.keep_alive
+        try:
+            async for raw in request.iter_lines():
+                if not raw.strip():
+                    continue
+                line_no += 1
+                try:
+                    payload = json.loads(raw)
+                    if not isinstance(payload, dict):
+                        raise ValueError("各行は JSON オブジェクトで指定してください")
+                    batch.append((line_no, self._parse_new(payload, time.time())))
+                except ValueError as e:
+                    results.append({"line": line_no, "ok": False, "error": str(e)})
+                if len(batch) + len(results) >= BULK_BATCH_SIZE:
+                    await flush()
+        except HttpError as e:
+            # 応答ヘッダーは送信済みのため、本文の最終行でエラーを伝えて接続を閉じる
+            results.append({"line": line_no + 1, "ok": False, "error": str(e)})
+            keep_alive = False
+        await flush()
+        writer.write(_chunk(b""))
+        await writer.drain()
+        return keep_alive
+
+    async def _events(self, request: _Request, writer: asyncio.StreamWriter, user: str) -> bool:
+        """発火イベントをロングポーリングまたは SSE で返す。"""
+        channel = self.channel(user)
+        try:
+            since = int(request.headers.get("last-event-id") or request.query.get("since", channel.last_seq))
+            timeout = min(MAX_POLL_TIMEOUT_S, float(request.query.get("timeout", "30")))
+        except ValueError:
+            raise HttpError(400, "since / timeout が不正です") from None
+
+        if "text/event-stream" not in request.headers.get("accept", ""):
+            events = await channel.wait(since, timeout)
+            next_seq = events[-1]["seq"] if events else since
+            return await self._reply(request, writer, 200, {"events": events, "next": next_seq})
+
+        writer.write(_head(200, {
+            "Content-Type": "text/event-stream; charset=utf-8",
+            "Cache-Control": "no-cache",
+            "Connection": "close",
+        }))
+        await writer.drain()
+        while not writer.is_closing():
+            events = await channel.wait(since, SSE_KEEPALIVE_S)
+            if not events:
+                writer.write(b": keepalive\n\n")
+            for event in events:
+                writer.write(f"id: {event['seq']}\nevent: {event['kind']}\ndata: ".encode("ascii")
+                             + _json_bytes(event) + b"\n\n")
+                since = event["seq"]  # type: ignore[assignment]
+            await writer.drain()
+        return False
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, db_path: str = ":memory:",
+          lease_ttl_s: float | None = None, instance_id: str | None = None,
+          catch_up: CatchUpPolicy | None = None) -> int:
+    """サーバーを起動し、Ctrl+C で止まるまで処理する。
+
+    lease_ttl_s を指定すると、同じ db_path を共有するインスタンス間でリーダー選出を行う。
+    """
+    store = ReminderStore(db_path)
+    elector = LeaderElector(store, instance_id, ttl_s=lease_ttl_s) if lease_ttl_s else None
+    try:
+        asyncio.run(ReminderServer(store, host=host, port=port, elector=elector, catch_up=catch_up).serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+    return 0
@@ -0,0 +1,316 @@
+"""ワーカープロセスに分割して動かすシャード化スケジューラ。
+
+1 プロセスの Scheduler は発火コールバック・メッセージ整形・通知送出を 1 コアで処理するため、
+多数のユーザーのリマインダーを扱うと頭打ちになる。ShardedScheduler はリマインダーを
+所有者（owner）または ID のハッシュでワーカープロセスに振り分け、各ワーカーが
+自前の AsyncScheduler を動かす。コーディネーターは add / cancel / snooze を担当ワーカーへ転送し、
+発火イベントを 1 本のキューに集約する。
+
+リマインダー ID は (シャード番号, シャード内 ID) を 1 つの整数にまとめたもので、
+ID だけから担当シャードを求められる。
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any
+
+from .time_utils import DEFAULT_SNOOZE_MINUTES, MAX_SNOOZE_COUNT
+
+# グローバル ID = シャード内 ID * _ID_STRIDE + シャード番号
+_ID_STRIDE = 1 << 16
+# 応答待ちの既定タイムアウト（秒）
+DEFAULT_TIMEOUT_S = 10.0
+
+
+@dataclass(frozen=True)
+class FireEvent:
+    """ワーカーから集約される発火イベント。
+
+    Attributes:
+        reminder_id: グローバルなリマインダー ID。
+        owner: 所有者。指定がなければ空文字。
+        message: 通知メッセージ。
+        snooze_count: 発火時点の累積スヌーズ回数。
+        lateness_ms: 予定時刻からの遅延（ミリ秒）。
+        shard: 発火したシャード番号。
+    """
+
+    reminder_id: int
+    owner: str
+    message: str
+    snooze_count: int
+    lateness_ms: float
+    shard: int
+
+
+def shard_for(key: str, shards: int) -> int:
+    """キーを担当するシャード番号を返す。プロセス間で結果が変わらない CRC32 を使う。"""
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+def _global_id(shard: int, local_id: int) -> int:
+    return local_id * _ID_STRIDE + shard
+
+
+def _split_id(reminder_id: int) -> tuple[int, int]:
+    return reminder_id % _ID_STRIDE, reminder_id // _ID_STRIDE
+
+
+def _worker_main(shard: int, commands: Any, replies: Any, events: Any, snooze_on_fire: bool) -> None:
+    """ワーカープロセスの本体。コマンドキューを読みながら AsyncScheduler を動かす。"""
+    from .aio import AsyncScheduler
+    from .scheduler import BatchItem
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        owners: dict[int, str] = {}
+
+        def on_fire(reminder) -> bool:
+            events.put(FireEvent(
+                reminder_id=_global_id(shard, reminder.reminder_id),
+                owner=owners.get(reminder.reminder_id, ""),
+                message=reminder.message,
+                snooze_count=reminder.snooze_count,
+                lateness_ms=max(0.0, loop.time() - reminder.deadline) * 1000,
+                shard=shard,
+            ))
+            if not snooze_on_fire or reminder.snooze_count >= MAX_SNOOZE_COUNT:
+                # この発火で破棄されるため所有者情報も捨てる
+                owners.pop(reminder.reminder_id, None)
+            return snooze_on_fire
+
+        scheduler = AsyncScheduler(on_fire=on_fire)
+        while True:
+            # multiprocessing のキューはブロッキングなので別スレッドで待つ
+            command = await loop.run_in_executor(None, commands.get)
+            if command is None:
+                break
+            request_id, op, args = command
+            try:
+                if op == "add_many":
+                    # 1 件でも不正ならこのシャードには何も登録しない（途中まで登録されたまま残さない）
+                    results = await scheduler.add_many(
+                        [BatchItem(**kwargs) for _owner, kwargs in args], all_or_nothing=True,
+                    )
+                    error = next((r.error for r in results if r.error is not None), None)
+                    if error is not None:
+                        raise ValueError(error)
+                    ids = []
+                    for (owner, _kwargs), batch_result in zip(args, results):
+                        owners[batch_result.reminder_id] = owner
+                        ids.append(_global_id(shard, batch_result.reminder_id))
+                    result: object = ids
+                elif op == "cancel":
+                    result = await scheduler.cancel(args)
+                    if result:
+                        owners.pop(args, None)
+                elif op == "snooze":
+                    result = await scheduler.snooze(*args)
+                elif op == "count":
+                    result = len(scheduler)
+                else:
+                    raise ValueError(f"不明な操作です: {op}")
+                replies.put((request_id, True, result))
+            except Exception as e:
+                replies.put((request_id, False, f"{type(e).__name__}: {e}"))
+
+    asyncio.run(run())
+
+
+class ShardedScheduler:
+    """リマインダーを複数のワーカープロセスに分散するコーディネーター。
+
+    Attributes:
+        shards: ワーカープロセス数。
+        events: 全シャードの FireEvent が届くキュー。
+    """
+
+    def __init__(self, shards: int | None = None, *, snooze_on_fire: bool = False,
+                 timeout_s: float = DEFAULT_TIMEOUT_S) -> None:
+        """
+        Args:
+            shards: ワーカー数。None の場合は CPU コア数。
+            snooze_on_fire: True の場合、発火時に常にスヌーズを受け入れる。
+            timeout_s: ワーカーの応答待ちタイムアウト（秒）。
+        """
+        self.shards = shards or multiprocessing.cpu_count()
+        if self.shards >= _ID_STRIDE:
+            raise ValueError(f"シャード数は {_ID_STRIDE} 未満にしてください")
+        self._timeout_s = timeout_s
+        # fork は Tk やスレッドと相性が悪いため、どの OS でも spawn で起動する
+        context = multiprocessing.get_context("spawn")
+        self.events = context.Queue()
+        self._replies = context.Queue()
+        self._commands = [context.Queue() for _ in range(self.shards)]
+        self._workers = [
+            context.Process(
+                target=_worker_main,
+                args=(shard, self._commands[shard], self._replies, self.events, snooze_on_fire),
+                name=f"reminder-shard-{shard}",
+                daemon=True,
+            )
+            for shard in range(self.shards)
+        ]
+        self._request_ids = itertools.count(1)
+        self._add_seq = itertools.count(1)
+        self._pending: dict[int, queue.Queue] = {}
+        self._lock = threading.Lock()
+        self._reader: threading.Thread | None = None
+        self._closed = False
+        for worker in self._workers:
+            worker.start()
+        self._reader = threading.Thread(target=self._read_replies, name="reminder-shard-replies", daemon=True)
+        self._reader.start()
+
+    def __enter__(self) -> ShardedScheduler:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------ 公開 API
+
+    def add(
+        self,
+        message: str,
+        *,
+        owner: str | None = None,
+        delay_ms: int | None = None,
+        snooze_minutes: int = DEFAULT_SNOOZE_MINUTES,
+    ) -> int:
+        """リマインダーを担当シャードに登録し、グローバル ID を返す。
+
+        owner を指定した場合は owner のハッシュで、省略した場合は登録順の連番の
+        ハッシュでシャードを決める。
+
+        Raises:
+            ValueError: ワーカー側で入力が拒否された場合。
+        """
+        return self.add_many([{
+            "message": message, "owner": owner, "delay_ms": delay_ms, "snooze_minutes": snooze_minutes,
+        }])[0]
+
+    def add_many(self, items: list[dict[str, Any]]) -> list[int]:
+        """複数のリマインダーをシャードごとにまとめて登録し、入力順の ID リストを返す。
+
+        各要素は add() のキーワード引数（message / owner / delay_ms / snooze_minutes）を持つ辞書。
+        全シャードへ同時に送ってから応答を待つため、シャードあたり 1 往復で済む。
+        いずれかのシャードで入力が拒否された（または応答しなかった）場合は、全シャードの応答を
+        待ってから他のシャードに登録された分を取り消し、最初の例外を送出する。
+
+        Raises:
+            ValueError: ワーカー側で入力が拒否された場合。
+            TimeoutError: シャードが応答しなかった場合。
+        """
+        batches: dict[int, list[tuple[int, tuple[str, dict[str, Any]]]]] = {}
+        for index, item in enumerate(items):
+            owner = item.get("owner")
+            key = owner if owner is not None else f"#{next(self._add_seq)}"
+            kwargs = {
+                "message": item["message"],
+                "delay_ms": item.get("delay_ms"),
+                "snooze_minutes": item.get("snooze_minutes", DEFAULT_SNOOZE_MINUTES),
+            }
+            batches.setdefault(shard_for(key, self.shards), []).append((index, (owner or "", kwargs)))
+
+        requests = {
+            shard: self._send(shard, "add_many", [payload for _index, payload in batch])
+            for shard, batch in batches.items()
+        }
+        ids: list[int] = [0] * len(items)
+        registered: list[int] = []
+        error: Exception | None = None
+        for shard, batch in batches.items():
+            try:
+                shard_ids = self._wait(shard, *requests[shard])
+            except (ValueError, TimeoutError) as e:
+                # 残りのシャードの応答も受け取り、登録された分を取り消してから送出する
+                error = error or e
+                continue
+            registered += shard_ids
+            for (index, _payload), reminder_id in zip(batch, shard_ids):
+                ids[index] = reminder_id
+        if error is not None:
+            for reminder_id in registered:
+                self.cancel(reminder_id)
+            raise error
+        return ids
+
+    def cancel(self, reminder_id: int) -> bool:
+        """リマインダーを取り消す。"""
+        shard, local_id = _split_id(reminder_id)
+        return shard < self.shards and self._call(shard, "cancel", local_id)
+
+    def snooze(self, reminder_id: int, minutes: int | None = None) -> bool:
+        """発火待ちのリマインダーを延期する。"""
+        shard, local_id = _split_id(reminder_id)
+        return shard < self.shards and self._call(shard, "snooze", (local_id, minutes))
+
+    def pending_counts(self) -> list[int]:
+        """シャードごとの発火待ち件数を返す。"""
+        return [self._call(shard, "count", None) for shard in range(self.shards)]
+
+    def close(self) -> None:
+        """全ワーカーを停止する。"""
+        if self._closed:
+            return
+        self._closed = True
+        for commands in self._commands:
+            commands.put(None)
+        for worker in self._workers:
+            worker.join(timeout=self._timeout_s)
+            if worker.is_alive():
+                logging.warning("シャードワーカー %s が停止しないため終了させます", worker.name)
+                worker.terminate()
+        self._replies.put(None)
+        if self._reader is not None:
+            self._reader.join(timeout=self._timeout_s)
+
+    # ------------------------------------------------------------ 内部処理
+
+    def _call(self, shard: int, op: str, args: object) -> Any:
+        """シャードにコマンドを送り、応答を待って返す。"""
+        return self._wait(shard, *self._send(shard, op, args))
+
+    def _send(self, shard: int, op: str, args: object) -> tuple[int, queue.Queue]:
+        """シャードにコマンドを送り、応答の受け取り口を返す。"""
+        if self._closed:
+            raise RuntimeError("ShardedScheduler は停止済みです")
+        request_id = next(self._request_ids)
+        slot: queue.Queue = queue.Queue(maxsize=1)
+        with self._lock:
+            self._pending[request_id] = slot
+        self._commands[shard].put((request_id, op, args))
+        return request_id, slot
+
+    def _wait(self, shard: int, request_id: int, slot: queue.Queue) -> Any:
+        """_send() した要求の応答を待って返す。"""
+        try:
+            ok, result = slot.get(timeout=self._timeout_s)
+        except queue.Empty:
+            raise TimeoutError(f"シャード {shard} が {self._timeout_s} 秒以内に応答しませんでした") from None
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+        if not ok:
+            raise ValueError(result)
+        return result
+
+    def _read_replies(self) -> None:
+        """応答キューを読み、待っている呼び出し元に結果を渡す。"""
+        while True:
+            reply = self._replies.get()
+            if reply is None:
+                return
+            request_id, ok, result = reply
+            with self._lock:
+                slot = self._pending.get(request_id)
+            if slot is not None:
+                slot.put((ok, result))
@@ -0,0 +1,658 @@
+"""利用者ごとの名前空間を持つ SQLite のリマインダーストア。
+
+デスクトップ版の settings.json は 1 人分の 1 件しか保持できないため、サーバーモードでは
+リマインダーを 1 行 1 件で SQLite に保存する。期限はプロセスを越えて意味を持つよう
+UNIX 時刻（秒）で保持する。利用者向けの操作はすべて user 列で絞り込み、
+他の利用者のリマインダーは存在しないものとして扱う。
+
+標準ライブラリの sqlite3 だけを使い、ファイルの場合は WAL モードで開く。
+1 つの接続をロックで保護して共有するため、asyncio のループからも別スレッドからも使える。
+
+同じファイルを複数のサーバーインスタンスで共有する場合に備え、リーダー選出用の
+リース表（leases）と、(reminder_id, deadline) ごとに 1 回だけ記録できる発火記録表（fires）も持つ。
+
+メッセージ本文は messages 表に内容ハッシュで 1 回だけ保存し、reminders 表は
+その ID とテンプレート用のパラメーター（reminder.messages 参照）だけを持つ。
+messages 表の行は削除しないため、ID はインスタンスをまたいでキャッシュしてよい。
+
+メッセージの全文検索用に、埋め込み後の本文の n-gram（reminder.search 参照）を
+SQLite の FTS5 仮想表に保存する。FTS5 を組み込んでいない SQLite では通常の表
+（索引語, reminder_id）で代用する。本文は作成後に変わらず、状態は検索時に reminders 表で
+絞り込むため、索引は作成時に追加するだけで、取り消し・発火で更新する必要はない。
+
+タグ（reminder.tags 参照）は表示用に reminders 表の tags 列へ JSON で持ち、一括操作用に
+(user, tag, reminder_id) を主キーとする reminder_tags 表にも保存する。reminder_tags には発火待ちの
+行だけを置き、発火・取り消し・見逃しで削除する（スヌーズで発火待ちに戻ったら入れ直す）。
+発火待ちのタグでの絞り込み・取り消し・延期はこの主キーの範囲検索から始めるため、手間は
+そのタグが付いた発火待ちの件数に比例し、履歴の件数には依存しない。
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Mapping, NamedTuple, Sequence
+
+from .config import _CONFIG_DIR
+from .messages import dump_params, load_params, message_digest, render, validate_params
+from .records import ReminderColumns, ReminderRecord
+from .search import index_tokens, matches, normalize, query_terms, term_tokens
+from .tags import dump_tags, load_tags, normalize_tags
+from .time_utils import DEFAULT_SNOOZE_MINUTES, snooze_delay_ms
+
+STORE_PATH = os.path.join(_CONFIG_DIR, "reminders.db")
+
+STATE_PENDING = "pending"
+STATE_FIRED = "fired"
+STATE_CANCELLED = "cancelled"
+# 停止中に期限を過ぎ、キャッチアップ方針により通知せずに破棄した
+STATE_MISSED = "missed"
+STATES = (STATE_PENDING, STATE_FIRED, STATE_CANCELLED, STATE_MISSED)
+
+# 全文検索索引の実装
+SEARCH_FTS5 = "fts5"
+SEARCH_NGRAM = "ngram"
+
+# 本文・ID の共有キャッシュの上限（超えたら空にして作り直す）
+MESSAGE_CACHE_SIZE = 4096
+# get_many() が 1 文で IN に渡す ID の数（SQLite のパラメーター数の上限より十分小さくする）
+_IDS_PER_QUERY = 500
+# pending_columns() に載せる期限の上限（9999-12-31 の UNIX 時刻）。これを超える行は整数列に収まらない
+_MAX_COLUMN_DEADLINE = 253_402_300_799
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    message_id INTEGER PRIMARY KEY,
+    digest     BLOB    NOT NULL UNIQUE,
+    body       TEXT    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reminders (
+    reminder_id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    user           TEXT    NOT NULL,
+    message_id     INTEGER NOT NULL REFERENCES messages (message_id),
+    params         TEXT,
+    tags           TEXT,
+    deadline       REAL    NOT NULL,
+    snooze_minutes INTEGER NOT NULL,
+    snooze_count   INTEGER NOT NULL DEFAULT 0,
+    state          TEXT    NOT NULL DEFAULT 'pending'
+);
+CREATE INDEX IF NOT EXISTS reminders_user_state ON reminders (user, state, reminder_id);
+CREATE INDEX IF NOT EXISTS reminders_state_deadline ON reminders (state, deadline);
+CREATE TABLE IF NOT EXISTS reminder_tags (
+    user        TEXT    NOT NULL,
+    tag         TEXT    NOT NULL,
+    reminder_id INTEGER NOT NULL,
+    PRIMARY KEY (user, tag, reminder_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS reminder_tags_reminder ON reminder_tags (reminder_id);
+CREATE TABLE IF NOT EXISTS leases (
+    name    TEXT PRIMARY KEY,
+    holder  TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fires (
+    reminder_id INTEGER NOT NULL,
+    deadline    REAL    NOT NULL,
+    fired_at    REAL    NOT NULL,
+    holder      TEXT    NOT NULL,
+    PRIMARY KEY (reminder_id, deadline)
+);
+"""
+
+_FTS5_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reminder_search"
+    " USING fts5(tokens, content='', tokenize='unicode61 remove_diacritics 0')"
+)
+_TERMS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminder_terms (
+    token       TEXT    NOT NULL,
+    reminder_id INTEGER NOT NULL,
+    PRIMARY KEY (token, reminder_id)
+) WITHOUT ROWID
+"""
+
+_COLUMNS = (
+    "reminders.reminder_id, reminders.user, body, deadline, snooze_minutes, snooze_count, state,"
+    " message_id, params, tags"
+)
+_SELECT = f"SELECT {_COLUMNS} FROM reminders JOIN messages USING (message_id)"
+# reminder_tags の主キー (user, tag, reminder_id) の範囲から引かせるため CROSS JOIN で結合順を固定する
+_SELECT_TAGGED = (
+    f"SELECT {_COLUMNS} FROM reminder_tags"
+    " CROSS JOIN reminders ON reminders.reminder_id = reminder_tags.reminder_id"
+    " JOIN messages USING (message_id)"
+    " WHERE reminder_tags.user = ? AND reminder_tags.tag = ? AND state = ?"
+    " ORDER BY reminder_tags.reminder_id"
+)
+_UNTAG = "DELETE FROM reminder_tags WHERE reminder_id = ?"
+
+
+@dataclass(slots=True)
+class StoredReminder:
+    """ストアに保存されたリマインダー 1 件。
+
+    Attributes:
+        reminder_id: 全利用者で一意な ID。
+        user: 所有者。
+        message: 通知メッセージ。params がある場合は埋め込み前のテンプレート。
+            同じ本文のリマインダー同士で同じ文字列オブジェクトを共有する。
+        deadline: 次の通知期限（UNIX 時刻、秒）。
+        snooze_minutes: スヌーズ間隔（分）。
+        snooze_count: 累積スヌーズ回数。
+        state: "pending" / "fired" / "cancelled" / "missed" のいずれか。
+        message_id: messages 表での本文の ID。
+        params: テンプレートに埋め込む値。テンプレートでなければ None。
+        tags: タグ。
+    """
+
+    reminder_id: int
+    user: str
+    message: str
+    deadline: float
+    snooze_minutes: int
+    snooze_count: int
+    state: str
+    message_id: int = 0
+    params: dict[str, str] | None = None
+    tags: tuple[str, ...] = ()
+
+    def render(self) -> str:
+        """通知に表示する文字列。テンプレートなら params を埋め込む。"""
+        return render(self.message, self.params)
+
+    def to_dict(self) -> dict[str, object]:
+        """JSON 化できる辞書に変換する。message は埋め込み済みの文字列、template は埋め込み前の本文。"""
+        # asdict() は値を deepcopy するため、一覧や一括登録の応答で目立って遅くなる
+        data: dict[str, object] = {
+            "reminder_id": self.reminder_id,
+            "user": self.user,
+            "message": self.render(),
+            "deadline": self.deadline,
+            "snooze_minutes": self.snooze_minutes,
+            "snooze_count": self.snooze_count,
+            "state": self.state,
+            "message_id": self.message_id,
+            "params": None if self.params is None else dict(self.params),
+            "tags": list(self.tags),
+        }
+        if self.params is not None:
+            data["template"] = self.message
+        return data
+
+
+class NewReminder(NamedTuple):
+    """create_many() に渡す 1 件分の内容。(message, deadline, snooze_minutes) のタプルも受け付ける。"""
+
+    message: str
+    deadline: float
+    snooze_minutes: int = DEFAULT_SNOOZE_MINUTES
+    params: Mapping[str, object] | None = None
+    tags: Sequence[str] = ()
+
+
+class ReminderStore:
+    """SQLite に保存するリマインダーストア。"""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """
+        Args:
+            path: データベースファイルのパス。":memory:" の場合はプロセス内だけで保持する。
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        # 他プロセスが書き込み中の場合はロック解放を待つ
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._lock = threading.Lock()
+        # 本文 → message_id（登録用）と message_id → 本文（読み出した本文の共有用）
+        self._message_ids: dict[str, int] = {}
+        self._bodies: dict[int, str] = {}
+        with self._lock, self._conn:
+            if path != ":memory:":
+                # 書き込み中も読み取りを止めず、コミットごとの fsync を減らす
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self.search_backend = self._open_search_index()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------ 登録
+
+    def create(self, user: str, message: str, deadline: float,
+               snooze_minutes: int = DEFAULT_SNOOZE_MINUTES,
+               params: Mapping[str, object] | None = None,
+               tags: Sequence[str] = ()) -> StoredReminder:
+        """リマインダーを 1 件保存して返す。params を渡すと message をテンプレートとして扱う。
+
+        Raises:
+            ValueError: テンプレートと params が合わない場合、またはタグが不正な場合。
+        """
+        return self.create_many(user, [NewReminder(message, deadline, snooze_minutes, params, tags)])[0]
+
+    def create_many(self, user: str, items: Iterable[NewReminder | tuple]) -> list[StoredReminder]:
+        """NewReminder（または同じ並びのタプル）を 1 トランザクションで保存する。
+
+        Raises:
+            ValueError: テンプレートと params が合わない要素、またはタグが不正な要素がある場合。1 件も保存しない。
+        """
+        created = []
+        # ロールバックされた message_id をキャッシュに残さないよう、コミット後に反映する
+        new_ids: dict[str, int] = {}
+        with self._lock, self._conn:
+            for item in items:
+                message, deadline, snooze_minutes, params, tags = NewReminder(*item)
+                if params is not None:
+                    params = validate_params(message, params)
+                tags = normalize_tags(tags) if tags else ()
+                message_id = self._message_ids.get(message) or new_ids.get(message)
+                if message_id is None:
+                    message_id = new_ids[message] = self._insert_message(message)
+                cursor = self._conn.execute(
+                    "INSERT INTO reminders (user, message_id, params, tags, deadline, snooze_minutes)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (user, message_id, dump_params(params), dump_tags(tags), deadline, snooze_minutes),
+                )
+                stored = StoredReminder(
+                    cursor.lastrowid, user, message, deadline, snooze_minutes, 0, STATE_PENDING,
+                    message_id, params, tags,
+                )
+                if tags:
+                    self._conn.executemany(
+                        "INSERT INTO reminder_tags (user, tag, reminder_id) VALUES (?, ?, ?)",
+                        ((user, tag, stored.reminder_id) for tag in tags),
+                    )
+                self._index(stored.reminder_id, stored.render())
+                created.append(stored)
+        if len(self._message_ids) + len(new_ids) > MESSAGE_CACHE_SIZE:
+            self._message_ids.clear()
+        self._message_ids.update(new_ids)
+        return created
+
+    def message_count(self) -> int:
+        """messages 表に保存している本文の種類数。"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    # ------------------------------------------------------------ 参照
+
+    def get(self, user: str, reminder_id: int) -> StoredReminder | None:
+        """利用者のリマインダーを 1 件返す。他の利用者のものなら None。"""
+        return self._fetch_one(
+            f"{_SELECT} WHERE reminder_id = ? AND user = ?", (reminder_id, user)
+        )
+
+    def get_any(self, reminder_id: int) -> StoredReminder | None:
+        """利用者を問わず ID でリマインダーを返す。スケジューラ内部用。"""
+        return self._fetch_one(f"{_SELECT} WHERE reminder_id = ?", (reminder_id,))
+
+    def list_reminders(self, user: str, state: str | None = None, limit: int | None = None) -> list[StoredReminder]:
+        """利用者のリマインダーを ID 順に返す。state を指定するとその状態だけに絞る。"""
+        sql = f"{_SELECT} WHERE user = ?"
+        params: list[object] = [user]
+        if state is not None:
+            sql += " AND state = ?"
+            params.append(state)
+        sql += " ORDER BY reminder_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._stored(row) for row in rows]
+
+    def search(self, user: str, query: str, state: str | None = None,
+               limit: int | None = None) -> list[StoredReminder]:
+        """本文（テンプレートは埋め込み後）が検索語の区切りをすべて含むリマインダーを ID 順に返す。
+
+        検索語は空白や記号で区切り、区切りごとに部分文字列として一致するかを見る（大文字小文字・
+        全角半角は区別しない）。区切りを含まない検索語は何にも一致しない。
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        # 単項 + で user・state の索引を使わせず、索引語の一致（reminder_id 順）から引かせる。
+        # 利用者の全件を走査せずに済み、ORDER BY のための並べ替えも要らない
+        sql = f"{_SELECT} WHERE +user = ?"
+        params: list[object] = [user]
+        if state is not None:
+            sql += " AND +state = ?"
+            params.append(state)
+        if self.search_backend == SEARCH_FTS5:
+            sql += " AND reminder_id IN (SELECT rowid FROM reminder_search WHERE reminder_search MATCH ?)"
+            params.append(" AND ".join(
+                f'"{term}"*' if len(term) == 1 else " AND ".join(f'"{token}"' for token in sorted(term_tokens(term)))
+                for term in terms
+            ))
+        else:
+            for term in terms:
+                if len(term) == 1:
+                    # その文字で始まる索引語の範囲
+                    sql += " AND reminder_id IN (SELECT reminder_id FROM reminder_terms WHERE token >= ? AND token < ?)"
+                    params.extend((term, chr(ord(term) + 1)))
+                else:
+                    tokens = sorted(term_tokens(term))
+                    sql += (
+                        " AND reminder_id IN (SELECT reminder_id FROM reminder_terms"
+                        f" WHERE token IN ({', '.join('?' * len(tokens))}) GROUP BY reminder_id HAVING COUNT(*) = ?)"
+                    )
+                    params.extend((*tokens, len(tokens)))
+        sql += " ORDER BY reminder_id"
+        found = []
+        with self._lock:
+            # n-gram の一致は候補の絞り込みなので、本文に区切りが現れるかを確かめる
+            for row in self._conn.execute(sql, params):
+                stored = self._stored(row)
+                if matches(terms, normalize(stored.render())):
+                    found.append(stored)
+                    if limit is not None and len(found) >= limit:
+                        break
+        return found
+
+    def tagged(self, user: str, tag: str, state: str | None = None) -> list[StoredReminder]:
+        """利用者のタグが付いたリマインダーを ID 順に返す。state を指定するとその状態だけに絞る。
+
+        発火待ちは reminder_tags から引く。それ以外の状態を含む場合は利用者のタグ付きの行を走査する。
+        """
+        with self._lock:
+            rows = self._tagged_rows(user, tag, state)
+        return [self._stored(row) for row in rows]
+
+    def pending(self) -> list[StoredReminder]:
+        """全利用者の発火待ちリマインダーを期限順に返す。起動時の再登録に使う。"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"{_SELECT} WHERE state = ? ORDER BY deadline", (STATE_PENDING,)
+            ).fetchall()
+        return [self._stored(row) for row in rows]
+
+    def pending_columns(self) -> ReminderColumns:
+        """全利用者の発火待ちリマインダーを ID 順の ReminderColumns で返す。期限は整数秒に丸める。
+
+        StoredReminder を件数分作らず 1 件数十バイトで持つため、タイマーとの突き合わせのように
+        発火待ち全体を繰り返し見る処理に使う。期限が 0〜9999 年末の範囲外の行（Infinity など）は
+        整数列にもタイマーにも載らないため含めない。
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT reminder_id, message_id, body, deadline, snooze_minutes, snooze_count"
+                " FROM reminders JOIN messages USING (message_id)"
+                " WHERE state = ? AND deadline BETWEEN 0 AND ? ORDER BY reminder_id",
+                (STATE_PENDING, _MAX_COLUMN_DEADLINE),
+            )
+            return ReminderColumns(
+                ReminderRecord(reminder_id, self._body(message_id, body), round(deadline), snooze_minutes, count)
+                for reminder_id, message_id, body, deadline, snooze_minutes, count in cursor
+            )
+
+    def get_many(self, reminder_ids: Iterable[int]) -> list[StoredReminder]:
+        """利用者を問わず ID の並びのリマインダーを ID 順に返す。存在しない ID は飛ばす。スケジューラ内部用。"""
+        ids = list(reminder_ids)
+        rows: list[tuple] = []
+        with self._lock:
+            for start in range(0, len(ids), _IDS_PER_QUERY):
+                chunk = ids[start:start + _IDS_PER_QUERY]
+                rows += self._conn.execute(
+                    f"{_SELECT} WHERE reminder_id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+        rows.sort(key=lambda row: row[0])
+        return [self._stored(row) for row in rows]
+
+    def due_between(self, start: float | None, end: float) -> list[StoredReminder]:
+        """期限が [start, end) に入る発火待ちを期限順に返す。start が None なら下限なし。
+
+        (state, deadline) の索引による範囲検索なので、発火待ち全体の件数には依存しない。
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"{_SELECT} WHERE state = ? AND deadline >= ? AND deadline < ?"
+                " ORDER BY deadline",
+                (STATE_PENDING, float("-inf") if start is None else start, end),
+            ).fetchall()
+        return [self._stored(row) for row in rows]
+
+    # ------------------------------------------------------------ 状態遷移
+
+    def cancel(self, user: str, reminder_id: int) -> bool:
+        """利用者の発火待ちリマインダーを取り消し済みにする。該当がなければ False。"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE reminders SET state = ? WHERE reminder_id = ? AND user = ? AND state = ?",
+                (STATE_CANCELLED, reminder_id, user, STATE_PENDING),
+            )
+            if cursor.rowcount:
+                self._conn.execute(_UNTAG, (reminder_id,))
+        return cursor.rowcount > 0
+
+    def cancel_tag(self, user: str, tag: str) -> list[int]:
+        """利用者のタグが付いた発火待ちをすべて取り消し済みにし、取り消した ID を返す。"""
+        with self._lock, self._conn:
+            ids = [row[0] for row in self._tagged_rows(user, tag, STATE_PENDING)]
+            self._conn.executemany(
+                "UPDATE reminders SET state = ? WHERE reminder_id = ?",
+                ((STATE_CANCELLED, reminder_id) for reminder_id in ids),
+            )
+            self._conn.executemany(_UNTAG, ((reminder_id,) for reminder_id in ids))
+        return ids
+
+    def snooze_tag(self, user: str, tag: str, now: float, minutes: int | None,
+                   max_snooze_count: int) -> list[StoredReminder]:
+        """利用者のタグが付いた発火待ちを now から minutes 分後へ延期し、延期したものを返す。
+
+        minutes が None なら各リマインダーのスヌーズ間隔を使う。スヌーズ回数が
+        max_snooze_count に達しているものは延期しない。
+        """
+        with self._lock, self._conn:
+            snoozed = [
+                self._stored(row) for row in self._tagged_rows(user, tag, STATE_PENDING)
+                if row[5] < max_snooze_count
+            ]
+            for stored in snoozed:
+                stored.deadline = now + snooze_delay_ms(minutes if minutes is not None else stored.snooze_minutes) / 1000
+                stored.snooze_count += 1
+            self._conn.executemany(
+                "UPDATE reminders SET deadline = ?, snooze_count = ? WHERE reminder_id = ?",
+                ((stored.deadline, stored.snooze_count, stored.reminder_id) for stored in snoozed),
+            )
+        return snoozed
+
+    def mark_fired(self, reminder_id: int) -> bool:
+        """発火待ちのリマインダーを発火済みにする。"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE reminders SET state = ? WHERE reminder_id = ? AND state = ?",
+                (STATE_FIRED, reminder_id, STATE_PENDING),
+            )
+            if cursor.rowcount:
+                self._conn.execute(_UNTAG, (reminder_id,))
+        return cursor.rowcount > 0
+
+    def record_fire(self, reminder_id: int, deadline: float, fired_at: float, holder: str = "") -> bool:
+        """期限 deadline での発火を記録し、発火済みにする。
+
+        同じ (reminder_id, deadline) はインスタンスをまたいで 1 回しか記録できないため、
+        True を返した呼び出し元だけが通知すればよい。取り消し済みや記録済みなら False。
+        """
+        return bool(self.record_fires([(reminder_id, deadline)], fired_at, holder))
+
+    def record_fires(self, fires: Iterable[tuple[int, float]], fired_at: float, holder: str = "") -> list[int]:
+        """(reminder_id, deadline) の並びの発火を 1 トランザクションで記録し、記録できた ID を返す。"""
+        recorded = []
+        with self._lock, self._conn:
+            for reminder_id, deadline in fires:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO fires (reminder_id, deadline, fired_at, holder)"
+                    " SELECT reminder_id, deadline, ?, ? FROM reminders"
+                    " WHERE reminder_id = ? AND deadline = ? AND state = ?",
+                    (fired_at, holder, reminder_id, deadline, STATE_PENDING),
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "UPDATE reminders SET state = ? WHERE reminder_id = ?", (STATE_FIRED, reminder_id)
+                    )
+                    self._conn.execute(_UNTAG, (reminder_id,))
+                    recorded.append(reminder_id)
+        return recorded
+
+    def mark_missed(self, reminder_ids: Iterable[int]) -> int:
+        """発火待ちのリマインダーを見逃し（破棄）にし、更新した件数を返す。"""
+        missed = 0
+        with self._lock, self._conn:
+            for reminder_id in reminder_ids:
+                cursor = self._conn.execute(
+                    "UPDATE reminders SET state = ? WHERE reminder_id = ? AND state = ?",
+                    (STATE_MISSED, reminder_id, STATE_PENDING),
+                )
+                if cursor.rowcount:
+                    self._conn.execute(_UNTAG, (reminder_id,))
+                    missed += 1
+        return missed
+
+    def mark_missed_before(self, cutoff: float) -> dict[str, int]:
+        """期限が cutoff より前の発火待ちをまとめて見逃しにし、利用者ごとの件数を返す。"""
+        with self._lock, self._conn:
+            counts = dict(self._conn.execute(
+                "SELECT user, COUNT(*) FROM reminders WHERE state = ? AND deadline < ? GROUP BY user",
+                (STATE_PENDING, cutoff),
+            ).fetchall())
+            self._conn.execute(
+                "DELETE FROM reminder_tags WHERE reminder_id IN"
+                " (SELECT reminder_id FROM reminders WHERE state = ? AND deadline < ?)",
+                (STATE_PENDING, cutoff),
+            )
+            self._conn.execute(
+                "UPDATE reminders SET state = ? WHERE state = ? AND deadline < ?",
+                (STATE_MISSED, STATE_PENDING, cutoff),
+            )
+        return counts
+
+    def reschedule(self, reminder_id: int, deadline: float, snooze_count: int) -> bool:
+        """期限とスヌーズ回数を更新し、発火待ちに戻す。取り消し済みなら False。"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE reminders SET deadline = ?, snooze_count = ?, state = ?"
+                " WHERE reminder_id = ? AND state != ?",
+                (deadline, snooze_count, STATE_PENDING, reminder_id, STATE_CANCELLED),
+            )
+            if cursor.rowcount:
+                # 発火済みから戻した場合は reminder_tags から消えているため入れ直す
+                user, tags = self._conn.execute(
+                    "SELECT user, tags FROM reminders WHERE reminder_id = ?", (reminder_id,)
+                ).fetchone()
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO reminder_tags (user, tag, reminder_id) VALUES (?, ?, ?)",
+                    ((user, tag, reminder_id) for tag in load_tags(tags)),
+                )
+        return cursor.rowcount > 0
+
+    # ------------------------------------------------------------ リース
+
+    def acquire_lease(self, name: str, holder: str, ttl_s: float, now: float) -> bool:
+        """リース name を holder として取得または延長する。
+
+        未取得・期限切れ・holder 自身が保持中のいずれかなら期限を now + ttl_s に更新して True を返す。
+        他のインスタンスが有効なリースを持っていれば False。
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO leases (name, holder, expires) VALUES (?, ?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires = excluded.expires"
+                " WHERE leases.holder = excluded.holder OR leases.expires <= ?",
+                (name, holder, now + ttl_s, now),
+            )
+        return cursor.rowcount > 0
+
+    def release_lease(self, name: str, holder: str) -> None:
+        """holder が保持しているリースを手放す。他のインスタンスは直ちに取得できる。"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
+
+    def lease_holder(self, name: str, now: float) -> str | None:
+        """有効なリースの保持者を返す。誰も保持していなければ None。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT holder FROM leases WHERE name = ? AND expires > ?", (name, now)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _open_search_index(self) -> str:
+        """全文検索索引を用意し、使う実装を返す。ロック・トランザクション内で呼ぶ。
+
+        一度通常の表で代用したデータベースは、以後 FTS5 が使える環境で開いても通常の表を使い続ける。
+        索引を新しく作った場合は既存のリマインダーを索引に加える。
+        """
+        tables = {name for (name,) in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "reminder_terms" in tables:
+            return SEARCH_NGRAM
+        try:
+            self._conn.execute(_FTS5_SCHEMA)
+            # FTS5 のない SQLite で、FTS5 のある環境で作ったファイルを開いた場合はここで失敗する
+            self._conn.execute("SELECT rowid FROM reminder_search LIMIT 0")
+            self.search_backend = SEARCH_FTS5
+        except sqlite3.OperationalError:
+            self._conn.execute(_TERMS_SCHEMA)
+            self.search_backend = SEARCH_NGRAM
+        if self.search_backend == SEARCH_NGRAM or "reminder_search" not in tables:
+            rows = self._conn.execute(
+                "SELECT reminder_id, body, params FROM reminders JOIN messages USING (message_id)"
+            ).fetchall()
+            for reminder_id, body, params in rows:
+                self._index(reminder_id, render(body, load_params(params)))
+        return self.search_backend
+
+    def _index(self, reminder_id: int, text: str) -> None:
+        """全文検索索引にリマインダーを加える。ロック・トランザクション内で呼ぶ。"""
+        tokens = index_tokens(text)
+        if self.search_backend == SEARCH_FTS5:
+            self._conn.execute(
+                "INSERT INTO reminder_search (rowid, tokens) VALUES (?, ?)", (reminder_id, " ".join(tokens))
+            )
+        else:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO reminder_terms (token, reminder_id) VALUES (?, ?)",
+                ((token, reminder_id) for token in tokens),
+            )
+
+    def _insert_message(self, body: str) -> int:
+        """本文を messages 表に登録して ID を返す。登録済みなら既存の ID。ロック・トランザクション内で呼ぶ。"""
+        digest = message_digest(body)
+        cursor = self._conn.execute("INSERT OR IGNORE INTO messages (digest, body) VALUES (?, ?)", (digest, body))
+        if cursor.rowcount:
+            return cursor.lastrowid  # type: ignore[return-value]
+        return self._conn.execute("SELECT message_id FROM messages WHERE digest = ?", (digest,)).fetchone()[0]
+
+    def _tagged_rows(self, user: str, tag: str, state: str | None) -> list[tuple]:
+        """タグが付いた行を ID 順に返す。ロック内で呼ぶ。"""
+        if state == STATE_PENDING:
+            return self._conn.execute(_SELECT_TAGGED, (user, tag, STATE_PENDING)).fetchall()
+        # 発火待ち以外は reminder_tags に残さないため、利用者のタグ付きの行から探す
+        sql = f"{_SELECT} WHERE reminders.user = ? AND tags IS NOT NULL"
+        params: list[object] = [user]
+        if state is not None:
+            sql += " AND state = ?"
+            params.append(state)
+        rows = self._conn.execute(sql + " ORDER BY reminders.reminder_id", params).fetchall()
+        return [row for row in rows if tag in load_tags(row[-1])]
+
+    def _body(self, message_id: int, body: str) -> str:
+        """同じ本文の行が別々の文字列を持たないよう、message_id ごとに 1 つを共有する。"""
+        shared = self._bodies.get(message_id)
+        if shared is None:
+            if len(self._bodies) >= MESSAGE_CACHE_SIZE:
+                self._bodies.clear()
+            shared = self._bodies[message_id] = body
+        return shared
+
+    def _stored(self, row: tuple) -> StoredReminder:
+        *columns, message_id, params, tags = row
+        columns[2] = self._body(message_id, columns[2])
+        return StoredReminder(*columns, message_id, load_params(params), load_tags(tags))
+
+    def _fetch_one(self, sql: str, params: tuple) -> StoredReminder | None:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return self._stored(row) if row else None
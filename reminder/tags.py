@@ -0,0 +1,79 @@
+"""リマインダーのタグ（プロジェクト・相手・当番などのまとまり）。
+
+1 件のリマインダーは複数のタグを持てる。「タグ X をすべて取り消す」「グループ Y を 30 分延期する」
+といった一括操作のため、タグから ID を引く二次索引を持つ。Scheduler は TagIndex を、
+ReminderStore は reminder_tags 表を登録・破棄に合わせて更新し、一括操作は該当する件数に比例する
+手間で済む（発火待ち全体を走査しない）。
+"""
+from __future__ import annotations
+
+import json
+from typing import Iterable, Sequence
+
+# 1 件のリマインダーに付けられるタグの上限
+MAX_TAGS = 16
+MAX_TAG_LENGTH = 64
+
+
+def normalize_tags(tags: Sequence[object]) -> tuple[str, ...]:
+    """タグを検証し、前後の空白を除いて重複のない並び（指定順）にして返す。
+
+    Raises:
+        ValueError: tags が list / tuple でない場合、文字列でない・空・長すぎるタグがある場合、
+            または数が多すぎる場合。
+    """
+    # JSON の数値やオブジェクト（キーがタグになってしまう）も 400 で返せるよう ValueError にする
+    if not isinstance(tags, (list, tuple)):
+        raise ValueError("tags は文字列の配列で指定してください")
+    normalized: dict[str, None] = {}
+    for tag in tags:
+        if not isinstance(tag, str) or not tag.strip():
+            raise ValueError("タグは空でない文字列で指定してください")
+        tag = tag.strip()
+        if len(tag) > MAX_TAG_LENGTH:
+            raise ValueError(f"タグは {MAX_TAG_LENGTH} 文字までです: {tag[:MAX_TAG_LENGTH]}…")
+        normalized[tag] = None
+    if len(normalized) > MAX_TAGS:
+        raise ValueError(f"タグは {MAX_TAGS} 個までです")
+    return tuple(normalized)
+
+
+class TagIndex:
+    """タグから ID の集合を引く索引。"""
+
+    def __init__(self) -> None:
+        self._ids: dict[str, set[int]] = {}
+
+    def __contains__(self, tag: object) -> bool:
+        return tag in self._ids
+
+    def add(self, reminder_id: int, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._ids.setdefault(tag, set()).add(reminder_id)
+
+    def remove(self, reminder_id: int, tags: Iterable[str]) -> None:
+        """ID を tags の各タグから外す。空になったタグは索引から消す。"""
+        for tag in tags:
+            ids = self._ids.get(tag)
+            if ids is not None:
+                ids.discard(reminder_id)
+                if not ids:
+                    del self._ids[tag]
+
+    def ids(self, tag: str) -> list[int]:
+        """タグが付いた ID を昇順で返す。"""
+        return sorted(self._ids.get(tag, ()))
+
+    def tags(self) -> list[str]:
+        """使われているタグを名前順で返す。"""
+        return sorted(self._ids)
+
+
+def dump_tags(tags: tuple[str, ...]) -> str | None:
+    """タグをストアの tags 列に保存する形式（空白なしの JSON 配列）にする。タグがなければ None。"""
+    return json.dumps(tags, ensure_ascii=False, separators=(",", ":")) if tags else None
+
+
+def load_tags(text: str | None) -> tuple[str, ...]:
+    """ストアの tags 列から復元する。"""
+    return () if text is None else tuple(json.loads(text))
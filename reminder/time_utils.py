@@ -35,3 +35,8 @@ def calculate_delay_ms(now: datetime.datetime, target: datetime.time) -> int:
         target_dt += datetime.timedelta(days=1)
 
     return int((target_dt - now).total_seconds() * 1000)
+
+
+def snooze_delay_ms(snooze_minutes: int) -> int:
+    """スヌーズ間隔（分）を待機時間（ミリ秒）に変換する。"""
+    return int(datetime.timedelta(minutes=snooze_minutes).total_seconds() * 1000)
@@ -0,0 +1,124 @@
+"""Tk イベントループの停止（ストール）検出。
+
+Tk 側では一定間隔の after() コールバックでハートビート時刻を更新し、
+別スレッドの監視ループがその鮮度を確認する。しきい値を超えて更新が途絶えた場合、
+メインスレッドがその時点で実行しているスタックをログに出し、回数と継続時間を
+メトリクスに記録する。
+
+モーダルダイアログ表示中も Tk はネストしたイベントループで after() を処理するため、
+検出されるのは同期ディスク書き込みなどで実際にループが止まっているケースに限られる。
+"""
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+import tkinter as tk
+import traceback
+from typing import Callable
+
+from . import metrics
+
+# ハートビート間隔（ミリ秒）と、ストールとみなす既定のしきい値（秒）
+DEFAULT_HEARTBEAT_MS = 250
+DEFAULT_STALL_THRESHOLD_S = 1.0
+
+STALLS_TOTAL = metrics.REGISTRY.counter("reminder_loop_stalls_total", "しきい値を超えたイベントループ停止の回数")
+STALL_DURATION_MS = metrics.REGISTRY.histogram(
+    "reminder_loop_stall_duration_ms", "検出したイベントループ停止の継続時間（ミリ秒）")
+
+
+class StallWatchdog:
+    """ハートビートと監視スレッドでイベントループの停止を検出する。
+
+    Attributes:
+        root: ハートビートを登録する Tk ルート。
+        threshold_s: ストールとみなすハートビート途絶時間（秒）。
+        stall_count: 検出したストールの累計回数。
+    """
+
+    def __init__(
+        self,
+        root: tk.Misc,
+        threshold_s: float = DEFAULT_STALL_THRESHOLD_S,
+        heartbeat_ms: int = DEFAULT_HEARTBEAT_MS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.root = root
+        self.threshold_s = threshold_s
+        self.stall_count = 0
+        self._heartbeat_ms = heartbeat_ms
+        self._clock = clock
+        self._last_beat = clock()
+        self._stalled = False
+        self._main_thread_id = threading.get_ident()
+        self._job_id: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """ハートビートと監視スレッドを開始する。Tk のメインスレッドから呼ぶこと。"""
+        self._main_thread_id = threading.get_ident()
+        self._last_beat = self._clock()
+        self._stop.clear()
+        self._job_id = self.root.after(self._heartbeat_ms, self._heartbeat)
+        self._thread = threading.Thread(target=self._monitor, name="reminder-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """監視を停止する。"""
+        self._stop.set()
+        if self._job_id is not None:
+            try:
+                self.root.after_cancel(self._job_id)
+            except tk.TclError:
+                # ルートが既に破棄されている場合は無視する
+                pass
+            self._job_id = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _heartbeat(self) -> None:
+        """Tk 側のハートビート。ストール明けであれば継続時間を記録する。"""
+        now = self._clock()
+        if self._stalled:
+            self._stalled = False
+            duration_ms = max(0.0, now - self._last_beat - self._heartbeat_ms / 1000) * 1000
+            STALL_DURATION_MS.observe(duration_ms)
+            logging.warning("イベントループが再開しました（停止時間: %.0f ms）", duration_ms)
+        self._last_beat = now
+        if not self._stop.is_set():
+            self._job_id = self.root.after(self._heartbeat_ms, self._heartbeat)
+
+    def _monitor(self) -> None:
+        """監視スレッド本体。ハートビート間隔ごとに check() を呼ぶ。"""
+        while not self._stop.wait(self._heartbeat_ms / 1000):
+            self.check()
+
+    def check(self) -> bool:
+        """ハートビートの鮮度を確認し、新たなストールを検出したら True を返す。
+
+        1 回のストールにつきスタックの記録とカウントは 1 度だけ行う。
+        """
+        if self._stalled:
+            return False
+        elapsed = self._clock() - self._last_beat
+        if elapsed < self.threshold_s:
+            return False
+        self._stalled = True
+        self.stall_count += 1
+        STALLS_TOTAL.inc()
+        logging.warning(
+            "イベントループが %.1f 秒応答していません。実行中のスタック:\n%s",
+            elapsed, self.format_main_stack(),
+        )
+        return True
+
+    def format_main_stack(self) -> str:
+        """メインスレッドの現在のスタックを文字列で返す。"""
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is None:
+            return "(メインスレッドのスタックを取得できません)"
+        return "".join(traceback.format_stack(frame))
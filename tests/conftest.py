@@ -1,7 +1,9 @@
-"""tkinter が利用できない環境でテストを実行できるようにするモック設定。"""
+"""tkinter が利用できない環境でテストを実行できるようにするモック設定と共通フィクスチャ。"""
 import sys
 from unittest.mock import MagicMock
 
+import pytest
+
 try:
     import tkinter  # noqa: F401
 except ModuleNotFoundError:
@@ -14,3 +16,10 @@ except ModuleNotFoundError:
     sys.modules["tkinter"] = mock_tk
     sys.modules["tkinter.ttk"] = MagicMock()
     sys.modules["tkinter.messagebox"] = MagicMock()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_config_dir(tmp_path, monkeypatch):
+    """設定ファイルの保存先を一時ディレクトリに差し替え、ホームディレクトリに書き込まないようにする。"""
+    monkeypatch.setattr("reminder.config._CONFIG_DIR", str(tmp_path))
+    monkeypatch.setattr("reminder.config._CONFIG_PATH", str(tmp_path / "settings.json"))
@@ -0,0 +1,139 @@
+"""tests/test_aio.py — reminder.aio のユニットテスト
+
+テストクラス一覧:
+    AsyncioTimerTests     : loop.call_at による絶対期限での登録と取り消し
+    AsyncSchedulerTests   : 非同期 add / cancel / snooze と同期・非同期ハンドラー
+    TkIntegrationTests    : pump_asyncio_in_tk() / run_tk_in_asyncio()
+"""
+import asyncio
+import tkinter as tk
+import unittest
+from unittest.mock import Mock
+
+from reminder import MAX_SNOOZE_COUNT
+from reminder.aio import AsyncioTimer, AsyncScheduler, pump_asyncio_in_tk, run_tk_in_asyncio
+
+
+class AsyncioTimerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_after_uses_absolute_loop_deadline(self):
+        loop = asyncio.get_running_loop()
+        timer = AsyncioTimer(loop)
+        fired = asyncio.Event()
+        handle = timer.after(10, fired.set)
+        self.assertAlmostEqual(handle.when(), loop.time() + 0.01, delta=0.01)
+        await asyncio.wait_for(fired.wait(), 1)
+
+    async def test_after_cancel(self):
+        timer = AsyncioTimer(asyncio.get_running_loop())
+        callback = Mock()
+        timer.after_cancel(timer.after(0, callback))
+        await asyncio.sleep(0.01)
+        callback.assert_not_called()
+
+
+class AsyncSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_thousands_of_concurrent_reminders_fire(self):
+        fired = []
+        scheduler = AsyncScheduler(on_fire=lambda r: fired.append(r.reminder_id) or False)
+        for i in range(3_000):
+            await scheduler.add(f"r{i}", delay_ms=i % 50)
+        self.assertEqual(len(scheduler), 3_000)
+        await asyncio.wait_for(scheduler.wait_idle(), 5)
+        self.assertEqual(len(fired), 3_000)
+        self.assertEqual(len(scheduler), 0)
+
+    async def test_add_at_absolute_deadline(self):
+        loop = asyncio.get_running_loop()
+        seen = []
+        scheduler = AsyncScheduler(on_fire=lambda r: seen.append(loop.time()) or False)
+        deadline = loop.time() + 0.02
+        await scheduler.add("a", at=deadline)
+        await asyncio.wait_for(scheduler.wait_idle(), 1)
+        self.assertGreaterEqual(seen[0], deadline - 0.002)
+
+    async def test_add_rejects_both_delay_and_at(self):
+        scheduler = AsyncScheduler()
+        with self.assertRaises(ValueError):
+            await scheduler.add("a", delay_ms=0, at=0.0)
+
+    async def test_async_handler_keeps_reminder_until_resolved(self):
+        release = asyncio.Event()
+        calls = []
+
+        async def handler(reminder):
+            calls.append(reminder.snooze_count)
+            await release.wait()
+            return False
+
+        scheduler = AsyncScheduler(on_fire=handler)
+        await scheduler.add("a", delay_ms=0)
+        await asyncio.sleep(0.01)
+        self.assertEqual(calls, [0])
+        self.assertEqual(len(scheduler), 1)
+        release.set()
+        await asyncio.wait_for(scheduler.wait_idle(), 1)
+        self.assertEqual(len(scheduler), 0)
+
+    async def test_async_handler_snooze_rearms(self):
+        counts = []
+
+        async def handler(reminder):
+            counts.append(reminder.snooze_count)
+            return True
+
+        scheduler = AsyncScheduler(on_fire=handler)
+        rid = await scheduler.add("a", delay_ms=0, snooze_minutes=1)
+        await asyncio.sleep(0.01)
+        self.assertEqual(counts, [0])
+        self.assertEqual(scheduler.scheduler.get(rid).snooze_count, 1)
+        self.assertTrue(await scheduler.cancel(rid))
+        await asyncio.wait_for(scheduler.wait_idle(), 1)
+
+    async def test_async_handler_exception_drops_reminder(self):
+        async def handler(_reminder):
+            raise RuntimeError("boom")
+
+        scheduler = AsyncScheduler(on_fire=handler)
+        await scheduler.add("a", delay_ms=0)
+        with self.assertLogs(level="ERROR"):
+            await asyncio.wait_for(scheduler.wait_idle(), 1)
+        self.assertEqual(len(scheduler), 0)
+
+    async def test_snooze_postpones(self):
+        fired = []
+        scheduler = AsyncScheduler(on_fire=lambda r: fired.append(r) or False)
+        rid = await scheduler.add("a", delay_ms=20)
+        self.assertTrue(await scheduler.snooze(rid, minutes=1))
+        await asyncio.sleep(0.05)
+        self.assertEqual(fired, [])
+        self.assertEqual(scheduler.scheduler.get(rid).snooze_count, 1)
+        self.assertLessEqual(scheduler.scheduler.get(rid).snooze_count, MAX_SNOOZE_COUNT)
+        await scheduler.cancel(rid)
+
+
+class TkIntegrationTests(unittest.TestCase):
+    def test_pump_runs_asyncio_callbacks_from_tk_after(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        root = Mock()
+        jobs = []
+        ids = iter(range(1, 100))
+        root.after.side_effect = lambda _ms, cb: jobs.append(cb) or f"job-{next(ids)}"
+        callback = Mock()
+        loop.call_soon(callback)
+        stop = pump_asyncio_in_tk(root, loop, interval_ms=5)
+        jobs.pop(0)()
+        callback.assert_called_once()
+        root.after.assert_called_with(5, jobs[0])
+        stop()
+        root.after_cancel.assert_called_once_with("job-2")
+
+    def test_run_tk_in_asyncio_returns_when_window_destroyed(self):
+        root = Mock()
+        root.update.side_effect = [None, None, tk.TclError("destroyed")]
+        asyncio.run(run_tk_in_asyncio(root, interval_ms=1))
+        self.assertEqual(root.update.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""tests/test_capabilities.py — reminder.capabilities と通知バックエンドの選択のユニットテスト
+
+テストクラス一覧:
+    CapabilityProbeTests : 機能検出を 1 回だけ行いキャッシュする
+    BackendRegistryTests : 種類ごとのバックエンド選択・失敗時の切り替えと再試行・entry point の遅延読み込み
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from reminder import capabilities
+from reminder.notifications import KIND_DESKTOP, KIND_SOUND, RETRY_AFTER_S, BackendRegistry, NotificationBackend
+
+
+class CapabilityProbeTests(unittest.TestCase):
+    def setUp(self):
+        capabilities.clear()
+        self.addCleanup(capabilities.clear)
+
+    def test_probe_runs_check_once(self):
+        check = Mock(return_value="/usr/bin/x")
+        self.assertEqual(capabilities.probe("x", check), "/usr/bin/x")
+        self.assertEqual(capabilities.probe("x", check), "/usr/bin/x")
+        check.assert_called_once_with()
+        self.assertEqual(capabilities.snapshot(), {"x": "/usr/bin/x"})
+        capabilities.clear()
+        capabilities.probe("x", check)
+        self.assertEqual(check.call_count, 2)
+
+    @patch("reminder.capabilities.shutil.which", return_value=None)
+    def test_missing_binary_is_cached(self, mock_which):
+        self.assertIsNone(capabilities.binary("notify-send"))
+        self.assertIsNone(capabilities.binary("notify-send"))
+        mock_which.assert_called_once_with("notify-send")
+
+    def test_failed_import_is_cached(self):
+        with patch("reminder.capabilities.importlib.import_module", side_effect=OSError("no libcairo")) as mock_import:
+            self.assertIsNone(capabilities.optional_module("cairosvg"))
+            self.assertIsNone(capabilities.optional_module("cairosvg"))
+        mock_import.assert_called_once_with("cairosvg")
+        # モジュールは診断用の写しに含めない
+        self.assertIsNone(capabilities.snapshot()["module:cairosvg"])
+        self.assertIs(capabilities.optional_module("os"), os)
+        self.assertNotIn("module:os", capabilities.snapshot())
+
+    def test_dbus_session_address(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            socket_path = os.path.join(tmp, "bus")
+            cases = [
+                ({"DBUS_SESSION_BUS_ADDRESS": f"unix:path={socket_path}"}, False),
+                ({"DBUS_SESSION_BUS_ADDRESS": "unix:abstract=/tmp/dbus-x,guid=1"}, True),
+                ({"XDG_RUNTIME_DIR": tmp}, False),
+            ]
+            for env, expected in cases:
+                capabilities.clear()
+                with patch.dict(os.environ, env, clear=True):
+                    self.assertIs(capabilities.dbus_session(), expected, env)
+            open(socket_path, "w").close()
+            for env in ({"DBUS_SESSION_BUS_ADDRESS": f"unix:path={socket_path}"}, {"XDG_RUNTIME_DIR": tmp}):
+                capabilities.clear()
+                with patch.dict(os.environ, env, clear=True):
+                    self.assertTrue(capabilities.dbus_session(), env)
+
+    @patch("reminder.capabilities.glob.glob", return_value=[])
+    @patch("reminder.capabilities.platform.system", return_value="Linux")
+    def test_audio_device(self, _mock_system, _mock_glob):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertFalse(capabilities.audio_device())
+        capabilities.clear()
+        with patch.dict(os.environ, {"PULSE_SERVER": "tcp:localhost"}, clear=True):
+            self.assertTrue(capabilities.audio_device())
+        capabilities.clear()
+        with patch("reminder.capabilities.platform.system", return_value="Darwin"):
+            self.assertTrue(capabilities.audio_device())
+
+
+def _backend(name, kind=KIND_SOUND, available=True, send=None):
+    return NotificationBackend(name, kind, Mock(return_value=available), send or Mock())
+
+
+def _entry_point(name, backend):
+    entry_point = Mock()
+    entry_point.name = name
+    entry_point.load = Mock(return_value=backend) if not isinstance(backend, Exception) else Mock(side_effect=backend)
+    return entry_point
+
+
+class BackendRegistryTests(unittest.TestCase):
+    def test_selects_best_available_backend_per_kind_once(self):
+        registry = BackendRegistry(None)
+        low = _backend("low")
+        unavailable = _backend("unused", available=False)
+        desktop = _backend("desktop", KIND_DESKTOP)
+        registry.register(low)
+        registry.register(NotificationBackend("high", KIND_SOUND, unavailable.available, unavailable.send, priority=5))
+        registry.register(desktop)
+        root = Mock()
+        registry.notify(root)
+        registry.notify(root)
+        self.assertEqual(low.send.call_count, 2)
+        self.assertEqual(desktop.send.call_count, 2)
+        unavailable.available.assert_called_once_with()
+        low.available.assert_called_once_with()
+        root.bell.assert_not_called()
+
+    def test_failed_backend_falls_through_to_next_then_bell(self):
+        registry = BackendRegistry(None)
+        broken = NotificationBackend("broken", KIND_SOUND, lambda: True, Mock(side_effect=OSError), priority=1)
+        spare = _backend("spare", send=Mock(side_effect=[None, OSError]))
+        registry.register(broken)
+        registry.register(spare)
+        root = Mock()
+        registry.notify(root)
+        self.assertIs(registry.select(KIND_SOUND), spare)
+        root.bell.assert_not_called()
+        registry.notify(root)
+        self.assertIsNone(registry.select(KIND_SOUND))
+        root.bell.assert_called_once_with()
+        broken.send.assert_called_once()
+
+    def test_failed_backend_is_retried_after_cooldown(self):
+        registry = BackendRegistry(None)
+        flaky = NotificationBackend("flaky", KIND_SOUND, lambda: True, Mock(side_effect=[OSError, None]), priority=1)
+        spare = _backend("spare")
+        registry.register(flaky)
+        registry.register(spare)
+        root = Mock()
+        with patch("reminder.notifications.time.monotonic", return_value=1000.0):
+            registry.notify(root)
+            registry.notify(root)
+        self.assertEqual(flaky.send.call_count, 1)
+        self.assertEqual(spare.send.call_count, 2)
+        with patch("reminder.notifications.time.monotonic", return_value=1000.0 + RETRY_AFTER_S):
+            registry.notify(root)
+        # 再試行の時刻を過ぎたら優先度の高い flaky を選び直す
+        self.assertEqual(flaky.send.call_count, 2)
+        self.assertIs(registry.select(KIND_SOUND), flaky)
+        self.assertEqual(spare.send.call_count, 2)
+
+    def test_entry_points_take_precedence_and_load_lazily(self):
+        registry = BackendRegistry("test.group")
+        builtin = _backend("builtin")
+        registry.register(builtin)
+        plugin = _backend("plugin")
+        later = _entry_point("z-later", _backend("later"))
+        entry_points = [later, _entry_point("b-plugin", plugin), _entry_point("a-broken", ImportError("x"))]
+        with patch("importlib.metadata.entry_points", return_value=entry_points) as mock_entry_points, \
+             self.assertLogs(level="WARNING"):
+            self.assertIs(registry.select(KIND_SOUND), plugin)
+            self.assertIs(registry.select(KIND_SOUND), plugin)
+        mock_entry_points.assert_called_once_with(group="test.group")
+        # 使えるものが見つかった後の entry point は読み込まない
+        later.load.assert_not_called()
+        builtin.available.assert_not_called()
+
+    def test_rejects_entry_point_of_wrong_type(self):
+        registry = BackendRegistry("test.group")
+        builtin = _backend("builtin")
+        registry.register(builtin)
+        with patch("importlib.metadata.entry_points", return_value=[_entry_point("bad", object())]), \
+             self.assertLogs(level="WARNING"):
+            self.assertIs(registry.select(KIND_SOUND), builtin)
+
+
+if __name__ == "__main__":
+    unittest.main()
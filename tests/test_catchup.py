@@ -0,0 +1,229 @@
+"""tests/test_catchup.py — reminder.catchup と起動時キャッチアップのユニットテスト
+
+テストクラス一覧:
+    CatchUpPolicyTests : 方針の解析と (通知, 破棄) への振り分け
+    AppRestoreTests    : ReminderApp が保存済みの絶対期限から復元・キャッチアップする（schedule_many() の分を含む）
+    ServerCatchUpTests : サーバー起動時に期限切れを利用者ごと 1 イベントにまとめて配信する
+"""
+import datetime
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from reminder import ReminderApp
+from reminder.catchup import CatchUpPolicy
+from reminder.clock import VirtualClock
+from reminder.config import Settings, load_settings, save_settings
+from reminder.scheduler import BatchItem
+from reminder.server import ReminderServer
+from reminder.store import STATE_FIRED, STATE_MISSED, STATE_PENDING, ReminderStore
+
+from .test_reminder import _DummyVar
+
+
+class CatchUpPolicyTests(unittest.TestCase):
+    DEADLINES = [50.0, 10.0, 90.0, 30.0]
+
+    def test_parse(self):
+        self.assertEqual(CatchUpPolicy.parse("all"), CatchUpPolicy())
+        self.assertEqual(CatchUpPolicy.parse("latest"), CatchUpPolicy("latest"))
+        self.assertEqual(CatchUpPolicy.parse("drop-older:3600"), CatchUpPolicy("drop-older", 3600.0))
+        for spec in ("sometimes", "drop-older", "drop-older:x", "latest:5", "drop-older:-1"):
+            with self.assertRaises(ValueError, msg=spec):
+                CatchUpPolicy.parse(spec)
+
+    def test_all_delivers_everything_oldest_first(self):
+        self.assertEqual(CatchUpPolicy().split(self.DEADLINES, 100.0, float), ([10.0, 30.0, 50.0, 90.0], []))
+
+    def test_latest_delivers_only_newest(self):
+        self.assertEqual(CatchUpPolicy("latest").split(self.DEADLINES, 100.0, float), ([90.0], [10.0, 30.0, 50.0]))
+        self.assertEqual(CatchUpPolicy("latest").split([], 100.0, float), ([], []))
+
+    def test_drop_older_uses_age_cutoff(self):
+        policy = CatchUpPolicy("drop-older", 60.0)
+        self.assertEqual(policy.cutoff(100.0), 40.0)
+        self.assertEqual(policy.split(self.DEADLINES, 100.0, float), ([50.0, 90.0], [10.0, 30.0]))
+
+
+def _create_restored_app(clock, saved, catch_up=None):
+    """保存済み設定 saved から起動した ReminderApp を返す。UI は Mock で代替する。"""
+    def fake_ui(app):
+        app.schedule_button = Mock()
+        app.cancel_button = Mock()
+        app.status_var = Mock()
+        app.message_text = Mock()
+        app.search_results = Mock()
+
+    save_settings(saved)
+    with patch.object(ReminderApp, "_build_ui", autospec=True, side_effect=fake_ui), \
+         patch("reminder.app.tk.StringVar", side_effect=lambda value="": _DummyVar(value)):
+        return ReminderApp(Mock(), clock=clock, timer=clock, catch_up=catch_up)
+
+
+@patch("reminder.app.play_notification_sound")
+@patch("reminder.app.messagebox.askyesno", return_value=False)
+@patch("reminder.app.messagebox.showinfo")
+class AppRestoreTests(unittest.TestCase):
+    START = datetime.datetime(2026, 1, 1, 10, 0)
+
+    def _saved(self, deadline, snooze_count=0):
+        return Settings(message="薬を飲む", hour="10", minute="30", snooze_minutes="5",
+                        deadline=deadline.isoformat(), snooze_count=str(snooze_count))
+
+    def test_future_deadline_is_rearmed_at_absolute_time(self, showinfo, _ask, _sound):
+        clock = VirtualClock(self.START)
+        app = _create_restored_app(clock, self._saved(self.START + datetime.timedelta(minutes=7), snooze_count=2))
+        self.assertIsNotNone(app.scheduled_job_id)
+        self.assertEqual(clock.next_deadline_ms(), 7 * 60_000)
+        clock.run_until_idle()
+        showinfo.assert_called_once_with("リマインダー", "薬を飲む")
+        self.assertEqual(load_settings().deadline, "")
+
+    def test_overdue_is_delivered_once_with_note(self, showinfo, _ask, _sound):
+        clock = VirtualClock(self.START)
+        _create_restored_app(clock, self._saved(self.START - datetime.timedelta(hours=3)))
+        clock.run_until_idle()
+        showinfo.assert_called_once()
+        self.assertIn("01/01 07:00 の通知を停止中に見逃しました", showinfo.call_args.args[1])
+        self.assertEqual(load_settings().deadline, "")
+
+    def test_overdue_older_than_cutoff_is_dropped(self, showinfo, _ask, _sound):
+        clock = VirtualClock(self.START)
+        app = _create_restored_app(clock, self._saved(self.START - datetime.timedelta(hours=3)),
+                                   catch_up=CatchUpPolicy("drop-older", 3600))
+        clock.run_until_idle()
+        showinfo.assert_not_called()
+        self.assertIsNone(app.scheduled_job_id)
+        self.assertIn("破棄しました", app.status_var.set.call_args.args[0])
+        self.assertEqual(load_settings().deadline, "")
+
+    def test_schedule_and_snooze_persist_absolute_deadline(self, _showinfo, ask, _sound):
+        clock = VirtualClock(self.START)
+        app = _create_restored_app(clock, Settings())
+        app.hour_var.set("10")
+        app.minute_var.set("30")
+        app.message_text.get.return_value = "会議"
+        app.schedule()
+        self.assertEqual(load_settings().deadline, "2026-01-01T10:30:00")
+
+        ask.return_value = True
+        clock.advance(30 * 60_000)
+        saved = load_settings()
+        self.assertEqual((saved.deadline, saved.snooze_count), ("2026-01-01T10:35:00", "1"))
+        # 再起動すると残りのスヌーズを引き継いで復元される
+        restarted = _create_restored_app(VirtualClock(self.START + datetime.timedelta(minutes=31)), saved)
+        self.assertIsNotNone(restarted.scheduled_job_id)
+
+    def test_cancel_clears_persisted_deadline(self, _showinfo, _ask, _sound):
+        clock = VirtualClock(self.START)
+        app = _create_restored_app(clock, self._saved(self.START + datetime.timedelta(minutes=7)))
+        app.cancel_schedule()
+        self.assertEqual(load_settings().deadline, "")
+        self.assertEqual(clock.pending, 0)
+
+    def test_unreadable_deadline_is_discarded(self, showinfo, _ask, _sound):
+        clock = VirtualClock(self.START)
+        saved = Settings(message="x", deadline="not-a-date")
+        app = _create_restored_app(clock, saved)
+        self.assertIsNone(app.scheduled_job_id)
+        self.assertEqual(load_settings().deadline, "")
+
+    def test_wrongly_typed_deadline_is_discarded(self, showinfo, _ask, _sound):
+        clock = VirtualClock(self.START)
+        for saved in (Settings(message="x", deadline=5),
+                      Settings(message="x", deadline=self.START.isoformat(), snooze_count=None)):
+            with self.subTest(saved=saved):
+                app = _create_restored_app(clock, saved)
+                self.assertIsNone(app.scheduled_job_id)
+                self.assertEqual(load_settings().deadline, "")
+        showinfo.assert_not_called()
+
+    def test_schedule_many_persists_once_and_survives_restart(self, showinfo, _ask, _sound):
+        clock = VirtualClock(self.START)
+        app = _create_restored_app(clock, Settings())
+        with patch("reminder.app.save_settings", wraps=save_settings) as save:
+            results = app.schedule_many([
+                BatchItem("朝会", target=datetime.time(10, 30)),
+                BatchItem("", delay_ms=0),
+                BatchItem("休憩", delay_ms=5 * 60_000, snooze_minutes=10),
+            ])
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        save.assert_called_once()
+        saved = load_settings()
+        self.assertEqual([(e["message"], e["deadline"], e["snooze_minutes"]) for e in saved.batch],
+                         [("朝会", "2026-01-01T10:30:00", 5), ("休憩", "2026-01-01T10:05:00", 10)])
+        # 画面の発火待ちには触れない
+        self.assertIsNone(app.scheduled_job_id)
+
+        restarted_clock = VirtualClock(self.START + datetime.timedelta(minutes=20))
+        _create_restored_app(restarted_clock, saved)
+        restarted_clock.run_until_idle()
+        self.assertEqual([c.args[1].split("\n")[0] for c in showinfo.call_args_list], ["休憩", "朝会"])
+        self.assertIn("01/01 10:05 の通知を停止中に見逃しました", showinfo.call_args_list[0].args[1])
+        self.assertEqual(load_settings().batch, [])
+
+    def test_batch_fire_snoozes_without_touching_main_reminder(self, showinfo, ask, _sound):
+        clock = VirtualClock(self.START)
+        app = _create_restored_app(clock, self._saved(self.START + datetime.timedelta(hours=2)))
+        main_job = app.scheduled_job_id
+        app.schedule_many([BatchItem("水を飲む", delay_ms=60_000)])
+        ask.return_value = True
+        clock.advance(60_000)
+        showinfo.assert_called_once_with("リマインダー", "水を飲む")
+        self.assertEqual(app.scheduled_job_id, main_job)
+        saved = load_settings()
+        self.assertEqual(saved.deadline, "2026-01-01T12:00:00")
+        self.assertEqual([(e["deadline"], e["snooze_count"]) for e in saved.batch], [("2026-01-01T10:06:00", 1)])
+
+    def test_unreadable_batch_entries_are_discarded(self, showinfo, _ask, _sound):
+        clock = VirtualClock(self.START)
+        future = (self.START + datetime.timedelta(minutes=1)).isoformat()
+        saved = Settings(batch=[
+            {"message": "ok", "deadline": future, "snooze_minutes": 5, "snooze_count": 0},
+            {"message": "x", "deadline": "not-a-date", "snooze_minutes": 5, "snooze_count": 0},
+            {"message": 5, "deadline": future, "snooze_minutes": 5, "snooze_count": 0},
+            {"message": "y", "deadline": future, "snooze_minutes": "5", "snooze_count": 0},
+            "broken",
+        ])
+        _create_restored_app(clock, saved)
+        self.assertEqual([e["message"] for e in load_settings().batch], ["ok"])
+        clock.run_until_idle()
+        showinfo.assert_called_once_with("リマインダー", "ok")
+
+
+class ServerCatchUpTests(unittest.IsolatedAsyncioTestCase):
+    async def _start(self, policy):
+        store = ReminderStore()
+        now = time.time()
+        ids = [store.create("alice", f"a{i}", now - 60 * (i + 1)).reminder_id for i in range(3)]
+        ids.append(store.create("bob", "b0", now - 7_200).reminder_id)
+        future = store.create("alice", "later", now + 3_600)
+        server = ReminderServer(store, port=0, catch_up=policy)
+        await server.start()
+        self.addAsyncCleanup(server.close)
+        self.addCleanup(store.close)
+        return store, server, ids, future
+
+    async def test_all_delivers_one_batch_per_user(self):
+        store, server, ids, future = await self._start(CatchUpPolicy())
+        [alice] = server.channel("alice").events
+        self.assertEqual((alice["kind"], alice["missed"]), ("catchup", 0))
+        self.assertEqual([r["message"] for r in alice["reminders"]], ["a2", "a1", "a0"])
+        self.assertEqual(len(server.channel("bob").events), 1)
+        self.assertEqual({store.get_any(i).state for i in ids}, {STATE_FIRED})
+        self.assertEqual([r.reminder_id for r in server.scheduler.scheduler], [future.reminder_id])
+
+    async def test_latest_and_drop_older(self):
+        store, server, ids, _future = await self._start(CatchUpPolicy("latest"))
+        [alice] = server.channel("alice").events
+        self.assertEqual(([r["message"] for r in alice["reminders"]], alice["missed"]), (["a0"], 2))
+        self.assertEqual([store.get_any(i).state for i in ids[:3]], [STATE_FIRED, STATE_MISSED, STATE_MISSED])
+
+        store, server, ids, _future = await self._start(CatchUpPolicy("drop-older", 150))
+        [alice] = server.channel("alice").events
+        self.assertEqual(([r["message"] for r in alice["reminders"]], alice["missed"]), (["a1", "a0"], 1))
+        [bob] = server.channel("bob").events
+        self.assertEqual((bob["reminders"], bob["missed"]), ([], 1))
+        self.assertEqual(store.get_any(ids[3]).state, STATE_MISSED)
+        self.assertEqual(len(store.due_between(None, time.time())), 0)
+        self.assertEqual(len(store.list_reminders("alice", STATE_PENDING)), 1)
@@ -0,0 +1,169 @@
+"""tests/test_clock.py — reminder.clock のユニットテスト
+
+テストクラス一覧:
+    VirtualClockTests    : VirtualClock の時刻・ジョブ実行順・取り消し
+    TkTimerTests         : TkTimer の root.after への委譲
+    SimulatedScheduleTests : ReminderApp を仮想時間で動かすシナリオテスト
+"""
+import datetime
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from reminder import MAX_SNOOZE_COUNT, SNOOZE_MAX_MINUTES, ReminderApp
+from reminder.clock import TkTimer, VirtualClock
+from reminder.config import Settings
+from reminder.time_utils import snooze_delay_ms
+
+from .test_reminder import _DummyVar
+
+
+class VirtualClockTests(unittest.TestCase):
+    def test_now_advances_with_virtual_time(self):
+        clock = VirtualClock(datetime.datetime(2026, 1, 1, 10, 0))
+        clock.advance(90_000)
+        self.assertEqual(clock.now(), datetime.datetime(2026, 1, 1, 10, 1, 30))
+        self.assertEqual(clock.monotonic(), 90.0)
+
+    def test_jobs_run_in_deadline_order_with_now_at_deadline(self):
+        clock = VirtualClock()
+        seen = []
+        clock.after(200, lambda: seen.append(("b", clock.monotonic())))
+        clock.after(100, lambda: seen.append(("a", clock.monotonic())))
+        clock.after(100, lambda: seen.append(("a2", clock.monotonic())))
+        self.assertEqual(clock.advance(1_000), 3)
+        self.assertEqual(seen, [("a", 0.1), ("a2", 0.1), ("b", 0.2)])
+        self.assertEqual(clock.elapsed_ms, 1_000)
+
+    def test_jobs_beyond_window_stay_pending(self):
+        clock = VirtualClock()
+        clock.after(500, Mock())
+        self.assertEqual(clock.advance(499), 0)
+        self.assertEqual(clock.pending, 1)
+        self.assertEqual(clock.advance(1), 1)
+        self.assertEqual(clock.pending, 0)
+
+    def test_cancelled_job_is_skipped(self):
+        clock = VirtualClock()
+        callback = Mock()
+        job = clock.after(10, callback)
+        clock.after_cancel(job)
+        self.assertEqual(clock.pending, 0)
+        clock.advance(100)
+        callback.assert_not_called()
+
+    def test_cancelling_fired_or_unknown_jobs_leaves_no_marks(self):
+        clock = VirtualClock()
+        for _ in range(100):
+            job = clock.after(10, Mock())
+            clock.advance(10)
+            # ReminderApp は発火のたびに発火済みのジョブを取り消す
+            clock.after_cancel(job)
+        clock.after_cancel("unknown")
+        cancelled = clock.after(10, Mock())
+        clock.after_cancel(cancelled)
+        clock.after_cancel(cancelled)
+        clock.advance(10)
+        self.assertEqual(clock._cancelled, set())
+        self.assertEqual(clock.pending, 0)
+
+    def test_callbacks_can_schedule_follow_up_jobs(self):
+        clock = VirtualClock()
+        ticks = []
+
+        def tick():
+            ticks.append(clock.elapsed_ms)
+            if len(ticks) < 5:
+                clock.after(1_000, tick)
+
+        clock.after(1_000, tick)
+        self.assertEqual(clock.run_until_idle(), 5)
+        self.assertEqual(ticks, [1_000, 2_000, 3_000, 4_000, 5_000])
+
+    def test_run_until_idle_respects_limit(self):
+        clock = VirtualClock()
+        clock.after(1_000, Mock())
+        clock.after(5_000, Mock())
+        self.assertEqual(clock.run_until_idle(limit_ms=2_000), 1)
+        self.assertEqual(clock.elapsed_ms, 2_000)
+        self.assertEqual(clock.pending, 1)
+
+
+class TkTimerTests(unittest.TestCase):
+    def test_delegates_to_root(self):
+        root = Mock()
+        root.after.return_value = "after#1"
+        timer = TkTimer(root)
+        callback = Mock()
+        self.assertEqual(timer.after(10, callback), "after#1")
+        root.after.assert_called_once_with(10, callback)
+        timer.after_cancel("after#1")
+        root.after_cancel.assert_called_once_with("after#1")
+
+
+def _create_virtual_app(clock, hour="10", minute="30", snooze="5"):
+    with patch.object(ReminderApp, "_build_ui"), \
+         patch("reminder.app.load_settings", return_value=Settings()), \
+         patch("reminder.app.tk.StringVar", side_effect=lambda value="": _DummyVar(value)):
+        app = ReminderApp(Mock(), clock=clock, timer=clock)
+    app.hour_var.set(hour)
+    app.minute_var.set(minute)
+    app.snooze_var.set(snooze)
+    app.schedule_button = Mock()
+    app.cancel_button = Mock()
+    app.status_var = Mock()
+    app.message_text = Mock()
+    app.message_text.get.return_value = "仮想時間テスト"
+    app.search_results = Mock()
+    return app
+
+
+@patch("reminder.app.save_settings")
+@patch("reminder.app.play_notification_sound")
+@patch("reminder.app.messagebox.showinfo")
+class SimulatedScheduleTests(unittest.TestCase):
+    def test_full_day_of_max_snoozes_runs_in_virtual_time(self, _showinfo, _sound, _save):
+        clock = VirtualClock(datetime.datetime(2026, 1, 1, 10, 0))
+        app = _create_virtual_app(clock, snooze=str(SNOOZE_MAX_MINUTES))
+        fired_at = []
+        original = app.show_reminder
+
+        def record(*args, **kwargs):
+            fired_at.append(clock.now())
+            original(*args, **kwargs)
+
+        app.show_reminder = record
+        started = time.perf_counter()
+        with patch("reminder.app.messagebox.askyesno", return_value=True):
+            app.schedule()
+            clock.run_until_idle()
+        self.assertLess(time.perf_counter() - started, 5)
+
+        self.assertEqual(len(fired_at), MAX_SNOOZE_COUNT + 1)
+        self.assertEqual(fired_at[0], datetime.datetime(2026, 1, 1, 10, 30))
+        expected_last = fired_at[0] + datetime.timedelta(milliseconds=snooze_delay_ms(SNOOZE_MAX_MINUTES)) * MAX_SNOOZE_COUNT
+        self.assertEqual(fired_at[-1], expected_last)
+        self.assertIsNone(app.scheduled_job_id)
+        self.assertEqual(len(app.scheduler), 0)
+        self.assertEqual(clock.pending, 0)
+
+    def test_past_target_rolls_over_to_next_day(self, _showinfo, _sound, _save):
+        clock = VirtualClock(datetime.datetime(2026, 1, 1, 11, 0))
+        app = _create_virtual_app(clock, hour="10", minute="30")
+        with patch("reminder.app.messagebox.askyesno", return_value=False):
+            app.schedule()
+            clock.run_until_idle()
+        _showinfo.assert_called_once_with("リマインダー", "仮想時間テスト")
+        self.assertEqual(clock.now(), datetime.datetime(2026, 1, 2, 10, 30))
+
+    def test_cancel_prevents_virtual_fire(self, _showinfo, _sound, _save):
+        clock = VirtualClock(datetime.datetime(2026, 1, 1, 10, 0))
+        app = _create_virtual_app(clock)
+        app.schedule()
+        app.cancel_schedule()
+        clock.advance(snooze_delay_ms(24 * 60))
+        _showinfo.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""tests/test_coalesce.py — reminder.coalesce のユニットテスト
+
+テストクラス一覧:
+    CoalescingTimerTests : 下位の Timer に 1 件だけ登録し、許容遅延の範囲で起床をまとめる
+    SchedulerSlackTests  : Scheduler のリマインダーごとの slack_ms
+"""
+import unittest
+from unittest.mock import Mock
+
+from reminder.clock import VirtualClock
+from reminder.coalesce import CoalescingTimer
+from reminder.scheduler import Scheduler
+
+
+def _timer():
+    clock = VirtualClock()
+    return clock, CoalescingTimer(clock, clock)
+
+
+class CoalescingTimerTests(unittest.TestCase):
+    def test_zero_slack_fires_at_exact_deadlines(self):
+        clock, timer = _timer()
+        fired = []
+        for delay in (300, 100, 200):
+            timer.after(delay, lambda d=delay: fired.append((d, clock.elapsed_ms)))
+        clock.run_until_idle()
+        self.assertEqual(fired, [(100, 100), (200, 200), (300, 300)])
+        self.assertEqual(timer.wakeups, 3)
+
+    def test_keeps_one_underlying_job(self):
+        clock, timer = _timer()
+        for delay in range(1_000, 6_000):
+            timer.after(delay * 1000, Mock(), slack_ms=0)
+        self.assertEqual(clock.pending, 1)
+        self.assertEqual(timer.pending, 5_000)
+        self.assertEqual(clock.next_deadline_ms(), 1_000_000)
+
+    def test_merges_deadlines_within_slack(self):
+        clock, timer = _timer()
+        fired = []
+        for delay in (0, 1_000, 2_000, 10_000):
+            timer.after(delay, lambda d=delay: fired.append((d, clock.elapsed_ms)), slack_ms=5_000)
+        clock.run_until_idle()
+        # 最初の起床は最も早い期限 + 許容遅延。その時点で期限を過ぎたものをまとめて実行する
+        self.assertEqual(fired, [(0, 5_000), (1_000, 5_000), (2_000, 5_000), (10_000, 15_000)])
+        self.assertEqual(timer.wakeups, 2)
+        self.assertEqual(timer.fired, 4)
+
+    def test_never_fires_before_deadline_or_after_slack(self):
+        clock, timer = _timer()
+        fired = []
+        timer.after(10_000, lambda: fired.append(("loose", clock.elapsed_ms)), slack_ms=60_000)
+        timer.after(20_000, lambda: fired.append(("tight", clock.elapsed_ms)))
+        clock.run_until_idle()
+        self.assertEqual(fired, [("loose", 20_000), ("tight", 20_000)])
+        self.assertEqual(timer.wakeups, 1)
+
+    def test_cancel_moves_wakeup_later(self):
+        clock, timer = _timer()
+        first = timer.after(1_000, Mock())
+        timer.after(5_000, Mock())
+        timer.after_cancel(first)
+        self.assertEqual(clock.next_deadline_ms(), 5_000)
+        self.assertEqual(clock.pending, 1)
+        timer.after_cancel(first)
+        clock.run_until_idle()
+        self.assertEqual((timer.wakeups, timer.fired, timer.pending), (1, 1, 0))
+
+    def test_callback_can_cancel_job_in_same_wakeup(self):
+        clock, timer = _timer()
+        second = Mock()
+        jobs = {}
+        jobs["second"] = None
+        timer.after(0, lambda: timer.after_cancel(jobs["second"]), slack_ms=1_000)
+        jobs["second"] = timer.after(500, second, slack_ms=1_000)
+        clock.run_until_idle()
+        second.assert_not_called()
+
+    def test_callback_error_does_not_lose_remaining_jobs(self):
+        clock, timer = _timer()
+        after = Mock()
+        timer.after(0, Mock(side_effect=RuntimeError("boom")), slack_ms=1_000)
+        timer.after(100, after, slack_ms=1_000)
+        with self.assertRaises(RuntimeError):
+            clock.run_until_idle()
+        clock.run_until_idle()
+        after.assert_called_once()
+        self.assertEqual(timer.pending, 0)
+
+    def test_wakeups_per_hour(self):
+        clock, timer = _timer()
+        for minute in range(60):
+            timer.after(minute * 60_000, Mock(), slack_ms=15 * 60_000)
+        clock.run_until_idle()
+        clock.advance(3_600_000 - clock.elapsed_ms)
+        self.assertEqual(timer.wakeups, 4)
+        self.assertEqual(timer.wakeups_per_hour(), 4.0)
+
+
+class SchedulerSlackTests(unittest.TestCase):
+    def test_slack_applies_to_first_fire_and_snoozes(self):
+        clock, timer = _timer()
+        fired = []
+
+        def on_fire(reminder):
+            fired.append((reminder.message, clock.elapsed_ms))
+            return reminder.snooze_count == 0
+
+        scheduler = Scheduler(clock, timer, on_fire=on_fire)
+        scheduler.add("a", delay_ms=1_000, snooze_minutes=1, slack_ms=30_000)
+        scheduler.add("b", delay_ms=20_000, snooze_minutes=1, slack_ms=30_000)
+        clock.run_until_idle()
+        self.assertEqual(fired, [("a", 31_000), ("b", 31_000), ("a", 121_000), ("b", 121_000)])
+        self.assertEqual(timer.wakeups, 2)
+
+    def test_slack_is_ignored_by_plain_timer(self):
+        clock = VirtualClock()
+        fired = []
+        scheduler = Scheduler(clock, clock, on_fire=lambda r: fired.append(clock.elapsed_ms))
+        scheduler.add("a", delay_ms=1_000, slack_ms=30_000)
+        clock.run_until_idle()
+        self.assertEqual(fired, [1_000])
+
+    def test_rejects_negative_slack(self):
+        clock, timer = _timer()
+        with self.assertRaises(ValueError):
+            Scheduler(clock, timer).add("a", delay_ms=0, slack_ms=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
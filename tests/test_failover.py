@@ -0,0 +1,164 @@
+"""tests/test_failover.py — reminder.failover のユニットテスト
+
+テストクラス一覧:
+    LeaderElectorTests  : リースの取得・延長・期限切れでの引き継ぎ・解放
+    FireRecordTests     : (reminder_id, deadline) ごとに 1 回だけ記録される発火記録
+    FailoverServerTests : ストアを共有する 2 台のサーバーでの発火担当と引き継ぎ
+"""
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from reminder.failover import LeaderElector
+from reminder.scheduler import Reminder
+from reminder.server import ReminderServer
+from reminder.store import STATE_FIRED, ReminderStore
+
+
+class _FakeClock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class LeaderElectorTests(unittest.TestCase):
+    def setUp(self):
+        self.store = ReminderStore()
+        self.addCleanup(self.store.close)
+        self.clock = _FakeClock()
+        self.a = LeaderElector(self.store, "a", ttl_s=9, clock=self.clock)
+        self.b = LeaderElector(self.store, "b", ttl_s=9, clock=self.clock)
+
+    def test_only_one_holder(self):
+        self.assertTrue(self.a.heartbeat())
+        self.assertFalse(self.b.heartbeat())
+        self.assertTrue(self.a.is_leader)
+        self.assertFalse(self.b.is_leader)
+        self.assertEqual(self.store.lease_holder("scheduler", self.clock()), "a")
+
+    def test_renewal_keeps_leadership(self):
+        self.a.heartbeat()
+        for _ in range(10):
+            self.clock.now += self.a.heartbeat_s
+            self.assertTrue(self.a.heartbeat())
+            self.assertFalse(self.b.heartbeat())
+
+    def test_standby_takes_over_after_expiry(self):
+        self.a.heartbeat()
+        # リーダーは DB 上の期限より heartbeat_s 早く自分の権限を失効させる
+        self.clock.now += self.a.ttl_s - self.a.heartbeat_s
+        self.assertFalse(self.a.is_leader)
+        self.assertFalse(self.b.heartbeat())
+        self.clock.now += self.a.heartbeat_s
+        self.assertTrue(self.b.heartbeat())
+        self.assertFalse(self.a.heartbeat())
+        self.assertLessEqual(self.b.takeover_bound_s, 12)
+
+    def test_release_allows_immediate_takeover(self):
+        self.a.heartbeat()
+        self.a.release()
+        self.assertFalse(self.a.is_leader)
+        self.assertTrue(self.b.heartbeat())
+
+    def test_rejects_non_positive_ttl(self):
+        with self.assertRaises(ValueError):
+            LeaderElector(self.store, ttl_s=0)
+
+
+class FireRecordTests(unittest.TestCase):
+    def setUp(self):
+        self.store = ReminderStore()
+        self.addCleanup(self.store.close)
+
+    def test_fire_is_recorded_once_per_deadline(self):
+        stored = self.store.create("alice", "会議", 100.0)
+        self.assertTrue(self.store.record_fire(stored.reminder_id, 100.0, 101.0, "a"))
+        self.assertFalse(self.store.record_fire(stored.reminder_id, 100.0, 101.5, "b"))
+        self.assertEqual(self.store.get("alice", stored.reminder_id).state, STATE_FIRED)
+        # スヌーズ後の新しい期限は別の発火として記録できる
+        self.store.reschedule(stored.reminder_id, 400.0, 1)
+        self.assertFalse(self.store.record_fire(stored.reminder_id, 100.0, 401.0, "a"))
+        self.assertTrue(self.store.record_fire(stored.reminder_id, 400.0, 401.0, "b"))
+
+    def test_cancelled_reminder_is_not_recorded(self):
+        stored = self.store.create("alice", "会議", 100.0)
+        self.store.cancel("alice", stored.reminder_id)
+        self.assertFalse(self.store.record_fire(stored.reminder_id, 100.0, 101.0, "a"))
+
+
+class FailoverServerTests(unittest.IsolatedAsyncioTestCase):
+    TTL_S = 0.3
+
+    async def asyncSetUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "reminders.db")
+        self.stores = [ReminderStore(path), ReminderStore(path)]
+        self.servers = [
+            ReminderServer(store, port=0, elector=LeaderElector(store, name, ttl_s=self.TTL_S))
+            for store, name in zip(self.stores, "ab")
+        ]
+        await self.servers[0].start()
+        await self._wait_for(lambda: self.servers[0].role == "leader")
+        await self.servers[1].start()
+        await asyncio.sleep(self.TTL_S)
+
+    async def asyncTearDown(self):
+        for server in self.servers:
+            await server.close()
+        for store in self.stores:
+            store.close()
+
+    async def _wait_for(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("条件が満たされませんでした")
+            await asyncio.sleep(0.01)
+
+    def _fire_count(self):
+        return self.stores[0]._conn.execute("SELECT COUNT(*) FROM fires").fetchone()[0]
+
+    async def test_only_leader_fires_reminders_created_anywhere(self):
+        leader, standby = self.servers
+        self.assertEqual((leader.role, standby.role), ("leader", "standby"))
+        self.assertEqual(len(standby.scheduler), 0)
+        # 待機系で登録したものもリーダーが次のハートビートで拾って発火させる
+        for server in self.servers:
+            await server._create_many("alice", [("会議", time.time() + 0.05, 5)], time.time())
+        await self._wait_for(lambda: leader.channel("alice").last_seq == 2)
+        self.assertEqual(standby.channel("alice").last_seq, 0)
+        self.assertEqual(self._fire_count(), 2)
+
+    async def test_standby_takes_over_and_replays_missed(self):
+        leader, standby = self.servers
+        # リースを解放せずに止まった（クラッシュした）リーダー
+        with patch.object(leader.elector, "release"):
+            await leader.close()
+        crashed_at = time.monotonic()
+        missed = self.stores[0].create("alice", "停止中に期限", time.time() - 1)
+        await self._wait_for(lambda: standby.role == "leader")
+        self.assertLessEqual(time.monotonic() - crashed_at, standby.elector.takeover_bound_s + 0.2)
+        await self._wait_for(lambda: standby.channel("alice").last_seq == 1)
+        self.assertEqual(standby.channel("alice").events[0]["reminders"][0]["reminder_id"], missed.reminder_id)
+        self.assertEqual(self._fire_count(), 1)
+
+    async def test_fire_already_recorded_elsewhere_is_not_notified_again(self):
+        leader, standby = self.servers
+        created = await leader._create_many("alice", [("会議", time.time(), 5)], time.time())
+        await self._wait_for(lambda: leader.channel("alice").last_seq == 1)
+        # 旧リーダーのタイマーが遅れて発火した場合を模擬する
+        with patch.object(type(standby.elector), "is_leader", new=True):
+            standby._on_fire(Reminder(created[0].reminder_id, "会議", 0.0))
+        self.assertEqual(standby.channel("alice").last_seq, 0)
+        self.assertEqual(self._fire_count(), 1)
+
+    async def test_graceful_close_hands_over_immediately(self):
+        leader, standby = self.servers
+        await leader.close()
+        await self._wait_for(lambda: standby.role == "leader", timeout=standby.elector.heartbeat_s + 0.5)
@@ -0,0 +1,91 @@
+"""tests/test_footprint.py — reminder.footprint のユニットテスト
+
+テストクラス一覧:
+    CountWakeupsTests : count_wakeups() の起床回数の数え方
+    ReportTests       : FootprintReport と compare() の出力
+    MainTests         : コマンドライン実行
+"""
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from reminder import config
+from reminder.footprint import FootprintReport, compare, count_wakeups, main
+
+
+class _FakeRoot:
+    """after() で登録したジョブを、dooneevent() 1 回につき期限順に 1 件ずつ実行する Tk の代替。"""
+
+    def __init__(self):
+        self.jobs = []
+        self.tk = self
+
+    def after(self, ms, callback):
+        self.jobs.append((ms, len(self.jobs), callback))
+
+    def dooneevent(self, _flags):
+        self.jobs.sort()
+        _ms, _seq, callback = self.jobs.pop(0)
+        callback()
+
+
+class CountWakeupsTests(unittest.TestCase):
+    def test_counts_events_before_end_timer(self):
+        root = _FakeRoot()
+        ticks = []
+        for ms in (100, 200, 300):
+            root.after(ms, lambda: ticks.append(1))
+        root.after(5_000, lambda: ticks.append(1))
+        self.assertEqual(count_wakeups(root, 1.0), 3)
+        self.assertEqual(len(ticks), 3)
+
+    def test_idle_loop_counts_zero(self):
+        self.assertEqual(count_wakeups(_FakeRoot(), 1.0), 0)
+
+
+class ReportTests(unittest.TestCase):
+    def test_wakeups_per_minute(self):
+        report = FootprintReport(mode="full", seconds=30, wakeups=6)
+        self.assertEqual(report.wakeups_per_minute, 12.0)
+        self.assertEqual(FootprintReport(mode="full", seconds=0).wakeups_per_minute, 0.0)
+
+    def test_compare_shows_background_ratio(self):
+        text = compare([
+            FootprintReport(mode="full", seconds=60, rss_bytes=40 * 1024 * 1024, wakeups=4),
+            FootprintReport(mode="background", seconds=60, rss_bytes=10 * 1024 * 1024, wakeups=0, rebuild_ms=12.5),
+        ])
+        self.assertIn("UI 再構築 12.5 ms", text)
+        self.assertIn("background / full: RSS 25%  起床 0 / 4 回", text)
+
+
+class MainTests(unittest.TestCase):
+    def test_single_mode_runs_with_isolated_settings(self):
+        original = config._CONFIG_PATH
+        seen = []
+
+        def fake_measure(mode, seconds):
+            seen.append(config._CONFIG_PATH)
+            return FootprintReport(mode=mode, seconds=seconds, rss_bytes=1024)
+
+        out = io.StringIO()
+        with patch("reminder.footprint.measure", side_effect=fake_measure), redirect_stdout(out):
+            self.assertEqual(main(["--mode", "background", "--seconds", "5", "--json"]), 0)
+        self.assertNotEqual(seen, [original])
+        self.assertEqual(config._CONFIG_PATH, original)
+        self.assertEqual(json.loads(out.getvalue()),
+                         [{"mode": "background", "seconds": 5.0, "rss_bytes": 1024, "wakeups": 0, "rebuild_ms": 0.0}])
+
+    def test_compares_both_modes_in_child_processes(self):
+        out = io.StringIO()
+        with patch("reminder.footprint._measure_in_child",
+                   side_effect=lambda mode, seconds: FootprintReport(mode=mode, seconds=seconds, rss_bytes=1024)) as child, \
+             redirect_stdout(out):
+            main(["--seconds", "1"])
+        self.assertEqual([c.args for c in child.call_args_list], [("full", 1.0), ("background", 1.0)])
+        self.assertIn("background / full", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+"""tests/test_history.py — reminder.history のユニットテスト
+
+テストクラス一覧:
+    FireHistoryTests : リングバッファと時間別ロールアップによる集計
+    SegmentLogTests  : 圧縮セグメントへの追記・切り替え・削除と、再起動時の復元
+    AppHistoryTests  : ReminderApp.show_reminder() が発火を記録する
+"""
+import datetime
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import Mock, patch
+
+from reminder import ReminderApp
+from reminder.clock import VirtualClock
+from reminder.config import Settings, save_settings
+from reminder.history import (
+    OUTCOME_DISMISSED,
+    OUTCOME_LIMIT,
+    OUTCOME_SNOOZED,
+    FireHistory,
+    FireRecord,
+    print_history,
+)
+from reminder.time_utils import MAX_SNOOZE_COUNT
+
+from .test_reminder import _DummyVar
+
+_HOUR = 1_800_000_000 // 3600 * 3600
+
+
+class FireHistoryTests(unittest.TestCase):
+    def test_ring_buffer_keeps_newest(self):
+        history = FireHistory(None, capacity=3)
+        for i in range(5):
+            history.record(f"m{i}", lateness_ms=0, snooze_count=0, outcome=OUTCOME_DISMISSED, fired_at=_HOUR + i)
+        self.assertEqual([r.message for r in history.recent()], ["m4", "m3", "m2"])
+        self.assertEqual([r.message for r in history.recent(1)], ["m4"])
+        # 集計はリングバッファから押し出された分も含む
+        self.assertEqual(len(history), 5)
+
+    def test_aggregates(self):
+        history = FireHistory(None)
+        fires = [
+            (_HOUR + 10, 100, OUTCOME_SNOOZED),
+            (_HOUR + 20, 300, OUTCOME_DISMISSED),
+            (_HOUR + 3600, 50, OUTCOME_SNOOZED),
+            (_HOUR + 3700, 150, OUTCOME_LIMIT),
+        ]
+        for fired_at, lateness, outcome in fires:
+            history.record("会議", lateness_ms=lateness, snooze_count=0, outcome=outcome, fired_at=fired_at)
+        self.assertEqual(history.fires_per_hour(), [(_HOUR, 2), (_HOUR + 3600, 2)])
+        self.assertEqual(history.fires_per_hour(since=_HOUR + 3600), [(_HOUR + 3600, 2)])
+        self.assertEqual(history.fires_per_hour(until=_HOUR + 3600), [(_HOUR, 2)])
+        # 上限到達（提示なし）は受け入れ率の分母に入れない
+        self.assertAlmostEqual(history.snooze_acceptance_rate(), 2 / 3)
+        self.assertEqual(history.snooze_acceptance_rate(until=_HOUR + 3600), 0.5)
+        self.assertEqual(history.mean_lateness_ms(), 150.0)
+        self.assertEqual(history.rollup(since=_HOUR + 3600).lateness_max_ms, 150.0)
+
+    def test_empty_aggregates(self):
+        history = FireHistory(None)
+        self.assertEqual(history.fires_per_hour(), [])
+        self.assertIsNone(history.snooze_acceptance_rate())
+        self.assertIsNone(history.mean_lateness_ms())
+
+    def test_rejects_unknown_outcome(self):
+        with self.assertRaises(ValueError):
+            FireHistory(None).record("会議", lateness_ms=0, snooze_count=0, outcome="ignored")
+        with self.assertRaises(ValueError):
+            FireHistory(None, capacity=0)
+
+
+class SegmentLogTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = self._tmp.name
+
+    def _fill(self, history, count, start=0):
+        for i in range(start, start + count):
+            history.record(f"m{i}", lateness_ms=i, snooze_count=i % 3,
+                           outcome=OUTCOME_SNOOZED if i % 2 else OUTCOME_DISMISSED, fired_at=_HOUR + i * 60)
+
+    def _segments(self):
+        return sorted(name for name in os.listdir(self.dir) if name.endswith(".jsonl.gz"))
+
+    def test_rotates_and_drops_old_segments_but_keeps_rollups(self):
+        history = FireHistory(self.dir, capacity=5, segment_records=10, max_segments=3)
+        self._fill(history, 55)
+        history.close()
+        self.assertEqual(len(self._segments()), 3)
+        # ディスクに残るのは直近 3 セグメント分、集計はすべての発火を含む
+        self.assertEqual([r.message for r in history.iter_records()][0], "m30")
+        self.assertEqual(len(list(history.iter_records())), 25)
+        reopened = FireHistory(self.dir, capacity=5, segment_records=10, max_segments=3)
+        self.assertEqual(len(reopened), 55)
+        self.assertEqual(reopened.fires_per_hour(), history.fires_per_hour())
+        self.assertEqual(reopened.mean_lateness_ms(), 27.0)
+        self.assertEqual([r.message for r in reopened.recent()], ["m54", "m53", "m52", "m51", "m50"])
+
+    def test_recovers_unsealed_segment_after_crash(self):
+        history = FireHistory(self.dir, segment_records=100)
+        self._fill(history, 7)
+        # close() せずに終了した状態（gzip の末尾なし）
+        reopened = FireHistory(self.dir, segment_records=100)
+        self.assertEqual(len(reopened), 7)
+        self.assertEqual(reopened.recent(1)[0], FireRecord(_HOUR + 360, "m6", 6, 0, OUTCOME_DISMISSED))
+        # 書きかけのセグメントには追記せず、新しいセグメントを始める
+        self._fill(reopened, 1, start=7)
+        reopened.close()
+        self.assertEqual(len(self._segments()), 2)
+        self.assertEqual(len(FireHistory(self.dir)), 8)
+
+    def test_tolerates_truncated_tail(self):
+        history = FireHistory(self.dir, segment_records=100)
+        self._fill(history, 5)
+        history.close()
+        path = os.path.join(self.dir, self._segments()[0])
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[: len(data) // 2])
+        os.remove(os.path.join(self.dir, "rollups.json"))
+        reopened = FireHistory(self.dir)
+        self.assertLess(len(reopened), 5)
+        self.assertEqual([r.message for r in reopened.recent()][-1], "m0")
+
+    def test_corrupt_rollups_are_rebuilt_from_segments(self):
+        history = FireHistory(self.dir, segment_records=100)
+        self._fill(history, 4)
+        history.close()
+        with open(os.path.join(self.dir, "rollups.json"), "w") as f:
+            f.write("{")
+        with self.assertLogs(level="WARNING"):
+            reopened = FireHistory(self.dir)
+        self.assertEqual(len(reopened), 4)
+
+    def test_segments_are_gzip_json_lines(self):
+        history = FireHistory(self.dir)
+        history.record("会議", lateness_ms=1.5, snooze_count=2, outcome=OUTCOME_SNOOZED, fired_at=_HOUR)
+        history.close()
+        with gzip.open(os.path.join(self.dir, self._segments()[0]), "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), '{"fired_at":%d,"message":"会議","lateness_ms":1.5,'
+                                       '"snooze_count":2,"outcome":"snoozed"}\n' % _HOUR)
+
+    def test_readonly_does_not_write(self):
+        history = FireHistory(self.dir, segment_records=100)
+        self._fill(history, 3)
+        before = sorted(os.listdir(self.dir))
+        reader = FireHistory(self.dir, readonly=True)
+        self.assertEqual(len(reader), 3)
+        self.assertEqual(sorted(os.listdir(self.dir)), before)
+        with self.assertRaises(ValueError):
+            self._fill(reader, 1)
+        # 書き込み中のプロセスが続けて記録しても、次の起動で失われない
+        self._fill(history, 2, start=3)
+        history.close()
+        self.assertEqual(len(FireHistory(self.dir)), 5)
+
+    def test_print_history(self):
+        history = FireHistory(self.dir)
+        history.record("会議\n詳細", lateness_ms=12, snooze_count=1, outcome=OUTCOME_SNOOZED)
+        history.close()
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(print_history(self.dir, hours=1, recent=5), 0)
+        self.assertIn("発火 1 回", out.getvalue())
+        self.assertIn("スヌーズ受け入れ率: 100%", out.getvalue())
+        self.assertIn("snoozed", out.getvalue())
+        self.assertNotIn("詳細", out.getvalue())
+
+
+def _create_app(clock, history):
+    """期限を 7 分後に保存した状態から起動した ReminderApp を返す。UI は Mock で代替する。"""
+    def fake_ui(app):
+        app.schedule_button = Mock()
+        app.cancel_button = Mock()
+        app.status_var = Mock()
+        app.message_text = Mock()
+        app.search_results = Mock()
+
+    deadline = clock.now() + datetime.timedelta(minutes=7)
+    save_settings(Settings(message="薬を飲む", snooze_minutes="5", deadline=deadline.isoformat()))
+    with patch.object(ReminderApp, "_build_ui", autospec=True, side_effect=fake_ui), \
+         patch("reminder.app.tk.StringVar", side_effect=lambda value="": _DummyVar(value)):
+        return ReminderApp(Mock(), clock=clock, timer=clock, history=history)
+
+
+@patch("reminder.app.play_notification_sound")
+@patch("reminder.app.messagebox.showinfo")
+class AppHistoryTests(unittest.TestCase):
+    START = datetime.datetime(2026, 1, 1, 10, 0)
+
+    def test_records_dismissed_fire(self, _showinfo, _sound):
+        clock = VirtualClock(self.START)
+        history = FireHistory(None)
+        _create_app(clock, history)
+        with patch("reminder.app.messagebox.askyesno", return_value=False):
+            clock.run_until_idle()
+        (record,) = history.recent()
+        self.assertEqual(record.message, "薬を飲む")
+        self.assertEqual(record.outcome, OUTCOME_DISMISSED)
+        self.assertEqual(record.snooze_count, 0)
+        self.assertEqual(record.lateness_ms, 0.0)
+        self.assertEqual(record.fired_at, (self.START + datetime.timedelta(minutes=7)).timestamp())
+
+    def test_records_each_snooze_until_limit(self, _showinfo, _sound):
+        clock = VirtualClock(self.START)
+        history = FireHistory(None)
+        _create_app(clock, history)
+        with patch("reminder.app.messagebox.askyesno", return_value=True):
+            clock.run_until_idle()
+        records = list(reversed(history.recent()))
+        self.assertEqual(len(records), MAX_SNOOZE_COUNT + 1)
+        self.assertEqual([r.snooze_count for r in records], list(range(MAX_SNOOZE_COUNT + 1)))
+        self.assertEqual({r.outcome for r in records[:-1]}, {OUTCOME_SNOOZED})
+        self.assertEqual(records[-1].outcome, OUTCOME_LIMIT)
+        self.assertEqual(history.snooze_acceptance_rate(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
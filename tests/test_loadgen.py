@@ -0,0 +1,82 @@
+"""tests/test_loadgen.py — reminder.loadgen のユニットテスト
+
+テストクラス一覧:
+    PercentilesTests : percentiles() の分位点計算
+    RunLoadTests     : run_load() の仮想時間・実時間での実行結果
+    MainTests        : コマンドライン実行
+"""
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+
+from reminder.loadgen import LoadConfig, main, percentiles, rss_bytes, run_load
+
+
+class PercentilesTests(unittest.TestCase):
+    def test_empty_values(self):
+        self.assertEqual(percentiles([]), {})
+
+    def test_nearest_rank(self):
+        result = percentiles([float(v) for v in range(1, 101)])
+        self.assertEqual(result, {"p50": 50.0, "p95": 95.0, "p99": 99.0, "max": 100.0})
+
+
+class RunLoadTests(unittest.TestCase):
+    def test_uniform_workload_fires_everything_without_leaks(self):
+        report = run_load(LoadConfig(count=500, span_s=86_400, seed=1))
+        self.assertEqual(report.added, 500)
+        self.assertEqual(report.fired, 500)
+        self.assertEqual(report.leaked_timers, 0)
+        self.assertEqual(report.leaked_reminders, 0)
+        self.assertGreater(len(report.rss_samples), 2)
+
+    def test_snooze_and_cancel_churn_are_accounted(self):
+        report = run_load(LoadConfig(count=1_000, pattern="bursty", snooze_rate=0.5, cancel_rate=0.2, seed=2))
+        self.assertGreater(report.snoozed, 0)
+        self.assertGreater(report.cancelled, 0)
+        self.assertEqual(report.added, 1_000 + report.cancelled)
+        # 取り消された分を除き、各リマインダーは初回 + スヌーズ回数だけ発火する
+        self.assertEqual(report.fired, report.added - report.cancelled + report.snoozed)
+        self.assertEqual(report.leaked_timers, 0)
+
+    def test_slack_coalesces_wakeups(self):
+        config = LoadConfig(count=2_000, span_s=86_400, sample_interval_s=86_400, seed=3)
+        exact = run_load(config)
+        config.slack_ms = 300_000
+        coalesced = run_load(config)
+        self.assertEqual(coalesced.fired, exact.fired)
+        self.assertEqual(coalesced.leaked_timers, 0)
+        self.assertLess(coalesced.wakeups, exact.wakeups / 5)
+        self.assertLess(coalesced.lateness_ms["max"], 300_001)
+
+    def test_same_seed_is_deterministic(self):
+        config = LoadConfig(count=300, pattern="bursty", snooze_rate=0.3, cancel_rate=0.1, seed=7)
+        a, b = run_load(config), run_load(config)
+        self.assertEqual((a.fired, a.snoozed, a.cancelled, a.simulated_seconds),
+                         (b.fired, b.snoozed, b.cancelled, b.simulated_seconds))
+
+    def test_unknown_pattern_raises(self):
+        with self.assertRaises(ValueError):
+            run_load(LoadConfig(pattern="spiky"))
+
+    def test_realtime_run_measures_lateness(self):
+        report = run_load(LoadConfig(count=20, span_s=0.05, realtime=True, sample_interval_s=0.01))
+        self.assertEqual(report.fired, 20)
+        self.assertIn("p99", report.lateness_ms)
+
+    def test_rss_bytes_is_non_negative(self):
+        self.assertGreaterEqual(rss_bytes(), 0)
+
+
+class MainTests(unittest.TestCase):
+    def test_json_output(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            rc = main(["--count", "50", "--json"])
+        self.assertEqual(rc, 0)
+        self.assertEqual(json.loads(out.getvalue())["fired"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""tests/test_log_pipeline.py — reminder.log_pipeline のユニットテスト
+
+テストクラス一覧:
+    JsonLinesFormatterTests : JSON Lines 形式の整形と構造化フィールド
+    SamplingFilterTests     : テンプレート単位の間引き
+    ConfigureLoggingTests   : キュー経由の出力・ファイルローテーション・終了処理
+"""
+import io
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from reminder.log_pipeline import JsonLinesFormatter, SamplingFilter, configure_logging, shutdown_logging
+
+
+def _record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord("reminder", level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class JsonLinesFormatterTests(unittest.TestCase):
+    def test_formats_message_and_extra_fields(self):
+        line = JsonLinesFormatter().format(_record("スヌーズ %d 分", 5, reminder_id=42))
+        payload = json.loads(line)
+        self.assertEqual(payload["message"], "スヌーズ 5 分")
+        self.assertEqual(payload["level"], "INFO")
+        self.assertEqual(payload["reminder_id"], 42)
+        self.assertNotIn("args", payload)
+        self.assertNotIn("\n", line)
+
+    def test_includes_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            import sys
+            record = logging.LogRecord("reminder", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+        payload = json.loads(JsonLinesFormatter().format(record))
+        self.assertIn("ValueError: boom", payload["exc_info"])
+
+
+class SamplingFilterTests(unittest.TestCase):
+    def test_passes_burst_then_one_in_every(self):
+        sampler = SamplingFilter(burst=3, every=5)
+        passed = [sampler.filter(_record("tick")) for _ in range(13)]
+        self.assertEqual(passed, [True] * 3 + [False] * 4 + [True] + [False] * 4 + [True])
+        self.assertEqual(sampler.dropped, 8)
+
+    def test_counts_templates_independently(self):
+        sampler = SamplingFilter(burst=1, every=100)
+        self.assertTrue(sampler.filter(_record("a %d", 1)))
+        self.assertTrue(sampler.filter(_record("b %d", 1)))
+        self.assertFalse(sampler.filter(_record("a %d", 2)))
+
+    def test_never_drops_warnings(self):
+        sampler = SamplingFilter(burst=0, every=1000)
+        self.assertTrue(all(sampler.filter(_record("w", level=logging.WARNING)) for _ in range(10)))
+
+    def test_window_resets_counts(self):
+        sampler = SamplingFilter(burst=1, every=1000, window_s=60)
+        with patch("reminder.log_pipeline.time.monotonic", side_effect=[0.0, 1.0, 100.0]):
+            sampler._window_started = 0.0
+            self.assertTrue(sampler.filter(_record("x")))
+            self.assertFalse(sampler.filter(_record("x")))
+            self.assertTrue(sampler.filter(_record("x")))
+
+
+class ConfigureLoggingTests(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self._saved = (root.handlers[:], root.level)
+
+        def restore():
+            handlers, level = self._saved
+            for handler in root.handlers[:]:
+                root.removeHandler(handler)
+            for handler in handlers:
+                root.addHandler(handler)
+            root.setLevel(level)
+
+        self.addCleanup(restore)
+
+    def test_records_are_written_by_listener_thread(self):
+        stream = io.StringIO()
+        with patch("reminder.log_pipeline.sys.stderr", stream):
+            listener = configure_logging(json_lines=True)
+        logging.info("リマインダーを設定: %02d:%02d", 9, 5)
+        shutdown_logging(listener)
+        payload = json.loads(stream.getvalue().strip().splitlines()[-1])
+        self.assertEqual(payload["message"], "リマインダーを設定: 09:05")
+
+    def test_root_has_only_queue_handler(self):
+        with patch("reminder.log_pipeline.sys.stderr", io.StringIO()):
+            listener = configure_logging()
+        try:
+            handlers = logging.getLogger().handlers
+            self.assertEqual(len(handlers), 1)
+            self.assertIsInstance(handlers[0], logging.handlers.QueueHandler)
+        finally:
+            shutdown_logging(listener)
+
+    def test_rotating_file_sink_and_sampling(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "reminder.log")
+            sampler = SamplingFilter(burst=2, every=1000)
+            with patch("reminder.log_pipeline.sys.stderr", io.StringIO()):
+                listener = configure_logging(log_file=path, max_bytes=400, backup_count=2, sampling=sampler)
+            for i in range(10):
+                logging.info("tick %d", i)
+            for i in range(10):
+                logging.warning("warn %d", i)
+            shutdown_logging(listener)
+            lines = []
+            for name in sorted(os.listdir(tmpdir)):
+                with open(os.path.join(tmpdir, name), encoding="utf-8") as f:
+                    lines.extend(json.loads(line)["message"] for line in f)
+            self.assertTrue(os.path.exists(path + ".1"))
+            self.assertNotIn("tick 2", lines)
+            self.assertEqual(sampler.dropped, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
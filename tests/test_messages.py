@@ -0,0 +1,79 @@
+"""tests/test_messages.py — reminder.messages とストアのメッセージ重複排除のテスト
+
+テストクラス一覧:
+    TemplateTests          : テンプレートの解析・キャッシュ・埋め込み・検証
+    MessageStorageTests    : messages 表による重複排除
+"""
+import unittest
+
+from reminder.messages import compile_template, message_digest, render, template_fields, validate_params
+from reminder.store import NewReminder, ReminderStore
+
+
+class TemplateTests(unittest.TestCase):
+    def test_render_fills_named_fields(self):
+        self.assertEqual(render("{ticket} のレビュー（{{期限}} {due}）", {"ticket": "OPS-12", "due": "17:00"}),
+                         "OPS-12 のレビュー（{期限} 17:00）")
+        self.assertEqual(template_fields("{a}-{b}-{a}"), frozenset({"a", "b"}))
+
+    def test_without_params_message_is_literal(self):
+        self.assertEqual(render("{括弧} はそのまま", None), "{括弧} はそのまま")
+
+    def test_compiled_templates_are_cached(self):
+        body = "キャッシュ確認 {name}"
+        compile_template(body)
+        hits = compile_template.cache_info().hits
+        for i in range(10):
+            render(body, {"name": str(i)})
+        self.assertEqual(compile_template.cache_info().hits, hits + 10)
+
+    def test_rejects_unsafe_or_mismatched_templates(self):
+        for body in ("{0}", "{}", "{a.__class__}", "{a[0]}", "{a!r}", "{a:>10}", "{a"):
+            with self.assertRaises(ValueError, msg=body):
+                validate_params(body, {"a": "x"})
+        with self.assertRaises(ValueError):
+            validate_params("{a} {b}", {"a": "x"})
+        with self.assertRaises(ValueError):
+            validate_params("{a}", {"a": "x", "b": "y"})
+        with self.assertRaises(ValueError):
+            validate_params("{a}", {"a": ["x"]})
+        self.assertEqual(validate_params("{n} 回目", {"n": 3}), {"n": "3"})
+
+    def test_digest_is_stable_and_content_based(self):
+        self.assertEqual(message_digest("会議"), message_digest("会議"))
+        self.assertNotEqual(message_digest("会議"), message_digest("会議 "))
+        self.assertEqual(len(message_digest("会議")), 16)
+
+
+class MessageStorageTests(unittest.TestCase):
+    def setUp(self):
+        self.store = ReminderStore()
+        self.addCleanup(self.store.close)
+
+    def test_repeated_messages_are_stored_once(self):
+        self.store.create_many("alice", [("朝会", float(i), 5) for i in range(1_000)])
+        self.store.create_many("bob", [NewReminder("朝会", 1.0), NewReminder("服薬", 2.0)])
+        self.assertEqual(self.store.message_count(), 2)
+        loaded = self.store.list_reminders("alice")
+        self.assertEqual(len({r.message_id for r in loaded}), 1)
+        # 読み出した本文は同じ文字列オブジェクトを共有する
+        self.assertEqual(len({id(r.message) for r in loaded}), 1)
+
+    def test_templates_share_one_body_and_render_per_reminder(self):
+        template = "{ticket} のレビュー"
+        first = self.store.create("alice", template, 100.0, params={"ticket": "OPS-1"})
+        second = self.store.create("alice", template, 200.0, params={"ticket": "OPS-2"})
+        self.assertEqual(self.store.message_count(), 1)
+        loaded = self.store.get("alice", second.reminder_id)
+        self.assertEqual((loaded.message, loaded.params), (template, {"ticket": "OPS-2"}))
+        self.assertEqual(loaded.render(), "OPS-2 のレビュー")
+        self.assertEqual(self.store.get_any(first.reminder_id).to_dict()["message"], "OPS-1 のレビュー")
+        self.assertEqual(loaded.to_dict()["template"], template)
+
+    def test_invalid_item_rolls_back_batch_and_message_cache(self):
+        with self.assertRaises(ValueError):
+            self.store.create_many("alice", [("新規 {x}", 1.0, 5, {"x": "1"}), ("壊れた {y}", 2.0, 5, {})])
+        self.assertEqual((self.store.message_count(), self.store.list_reminders("alice")), (0, []))
+        # ロールバックされた message_id を使い回さない
+        stored = self.store.create("alice", "新規 {x}", 1.0, params={"x": "2"})
+        self.assertEqual(self.store.get("alice", stored.reminder_id).render(), "新規 2")
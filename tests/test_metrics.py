@@ -0,0 +1,177 @@
+"""tests/test_metrics.py — reminder.metrics のユニットテスト
+
+テストクラス一覧:
+    HistogramTests       : Histogram の記録と Prometheus 形式の出力
+    RegistryTests        : MetricsRegistry の登録・レンダリング・ファイル書き出し
+    StatsTests           : parse_textfile() / summarize() / print_stats() の要約
+    ServeMetricsTests    : serve_metrics() の HTTP エンドポイント
+    AppInstrumentationTests : ReminderApp からの計測値の記録
+"""
+import io
+import os
+import tempfile
+import unittest
+import urllib.request
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from reminder import metrics
+from reminder.metrics import Histogram, MetricsRegistry, parse_textfile, print_stats, serve_metrics, summarize
+
+from .test_reminder import _create_app
+
+
+class HistogramTests(unittest.TestCase):
+    def test_observe_places_value_in_first_matching_bucket(self):
+        h = Histogram("latency_ms", buckets=(10, 100))
+        h.observe(5)
+        h.observe(10)
+        h.observe(50)
+        h.observe(1_000)
+        self.assertEqual(h.counts, [2, 1, 1])
+        self.assertEqual(h.count, 4)
+        self.assertEqual(h.sum, 1_065)
+
+    def test_render_emits_cumulative_buckets_with_labels(self):
+        h = Histogram("latency_ms", (("stage", "sound"),), buckets=(10, 100))
+        h.observe(5)
+        h.observe(50)
+        self.assertEqual(h.render(), [
+            'latency_ms_bucket{stage="sound",le="10"} 1',
+            'latency_ms_bucket{stage="sound",le="100"} 2',
+            'latency_ms_bucket{stage="sound",le="+Inf"} 2',
+            'latency_ms_sum{stage="sound"} 55',
+            'latency_ms_count{stage="sound"} 2',
+        ])
+
+
+class RegistryTests(unittest.TestCase):
+    def test_same_name_and_labels_returns_same_instance(self):
+        registry = MetricsRegistry()
+        a = registry.histogram("x_ms", "help", {"stage": "a"})
+        self.assertIs(registry.histogram("x_ms", "help", {"stage": "a"}), a)
+        self.assertIsNot(registry.histogram("x_ms", "help", {"stage": "b"}), a)
+
+    def test_kind_mismatch_raises(self):
+        registry = MetricsRegistry()
+        registry.gauge("depth", "help")
+        with self.assertRaises(ValueError):
+            registry.histogram("depth", "help")
+
+    def test_render_includes_help_and_type(self):
+        registry = MetricsRegistry()
+        registry.gauge("depth", "待ち行列").set(3)
+        text = registry.render()
+        self.assertIn("# HELP depth 待ち行列", text)
+        self.assertIn("# TYPE depth gauge", text)
+        self.assertIn("depth 3", text)
+
+    def test_counter_renders_as_counter_type(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("stalls_total", "help")
+        counter.inc()
+        counter.inc(2)
+        text = registry.render()
+        self.assertIn("# TYPE stalls_total counter", text)
+        self.assertIn("stalls_total 3", text)
+
+    def test_write_textfile_creates_file(self):
+        registry = MetricsRegistry()
+        registry.gauge("depth", "help").set(1)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "sub", "metrics.prom")
+            registry.write_textfile(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertIn("depth 1", f.read())
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+    def test_flush_is_noop_until_enabled(self):
+        with patch.object(metrics, "_textfile_path", None), \
+             patch.object(metrics.REGISTRY, "write_textfile") as mock_write:
+            metrics.flush()
+            mock_write.assert_not_called()
+            metrics.enable_textfile("/tmp/x.prom")
+            metrics.flush()
+            mock_write.assert_called_once_with("/tmp/x.prom")
+
+
+class StatsTests(unittest.TestCase):
+    def _sample_text(self):
+        registry = MetricsRegistry()
+        h = registry.histogram("lat_ms", "help", buckets=(10, 100, 1000))
+        for value in (5, 5, 50, 500):
+            h.observe(value)
+        registry.gauge("depth", "help").set(2)
+        return registry.render()
+
+    def test_parse_textfile_skips_comments(self):
+        samples = parse_textfile(self._sample_text())
+        self.assertEqual(samples['lat_ms_bucket{le="+Inf"}'], 4)
+        self.assertEqual(samples["depth"], 2)
+        self.assertFalse(any(k.startswith("#") for k in samples))
+
+    def test_summarize_reports_count_mean_and_quantiles(self):
+        lines = summarize(parse_textfile(self._sample_text()))
+        self.assertIn("lat_ms: count=4 mean=140.0 p50=10.0 p95=820.0 p99=964.0", lines)
+        self.assertIn("depth: 2", lines)
+
+    def test_summarize_skips_bucket_lines_without_le(self):
+        samples = parse_textfile(self._sample_text())
+        samples['lat_ms_bucket{path="x"}'] = 3
+        samples['lat_ms_bucket{le="abc"}'] = 3
+        lines = summarize(samples)
+        self.assertIn("lat_ms: count=4 mean=140.0 p50=10.0 p95=820.0 p99=964.0", lines)
+
+    def test_print_stats_returns_error_for_missing_file(self):
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(print_stats("/nonexistent/metrics.prom"), 1)
+
+
+class ServeMetricsTests(unittest.TestCase):
+    def test_serves_metrics_on_localhost(self):
+        registry = MetricsRegistry()
+        registry.gauge("depth", "help").set(7)
+        server = serve_metrics(0, registry=registry)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            self.assertIn("depth 7", resp.read().decode("utf-8"))
+
+
+class AppInstrumentationTests(unittest.TestCase):
+    @patch("reminder.app.save_settings")
+    @patch("reminder.app.calculate_delay_ms", return_value=60_000)
+    def test_schedule_sets_queue_depth_and_deadline(self, _mock_delay, _mock_save):
+        app, _root = _create_app()
+        app.message_text.get.return_value = "テスト"
+        app.schedule()
+        self.assertEqual(metrics.QUEUE_DEPTH.value, 1)
+        self.assertIsNotNone(app._deadline)
+        app.cancel_schedule()
+        self.assertEqual(metrics.QUEUE_DEPTH.value, 0)
+        self.assertIsNone(app._deadline)
+
+    @patch("reminder.app.play_notification_sound")
+    @patch("reminder.app.messagebox.askyesno", return_value=True)
+    @patch("reminder.app.messagebox.showinfo")
+    def test_show_reminder_records_lateness_and_stages(self, _showinfo, _askyesno, _sound):
+        app, _root = _create_app()
+        app._deadline = 0.0
+        before = {
+            name: h.count for name, h in (
+                ("late", metrics.FIRE_LATENESS_MS), ("dispatch", metrics.STAGE_DISPATCH_MS),
+                ("sound", metrics.STAGE_SOUND_MS), ("dialog", metrics.STAGE_DIALOG_MS),
+                ("snooze", metrics.STAGE_SNOOZE_MS),
+            )
+        }
+        app.show_reminder("テスト", snooze_minutes=5)
+        self.assertEqual(metrics.FIRE_LATENESS_MS.count, before["late"] + 1)
+        self.assertEqual(metrics.STAGE_DISPATCH_MS.count, before["dispatch"] + 1)
+        self.assertEqual(metrics.STAGE_SOUND_MS.count, before["sound"] + 1)
+        self.assertEqual(metrics.STAGE_DIALOG_MS.count, before["dialog"] + 1)
+        self.assertEqual(metrics.STAGE_SNOOZE_MS.count, before["snooze"] + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""tests/test_profiling.py — reminder.profiling のユニットテスト
+
+テストクラス一覧:
+    ProfileSessionTests : ProfileSession の計測・出力・復元
+    InstallTests        : install() / install_from_env() の有効化条件と差し替え対象
+"""
+import os
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from reminder import app, profiling
+from reminder.profiling import ProfileSession, install, install_from_env
+
+
+class ProfileSessionTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.session = ProfileSession(self._tmp.name)
+        self.addCleanup(self.session.dump)
+
+    def test_wrap_preserves_return_value_and_name(self):
+        def target(x):
+            return x * 2
+
+        wrapped = self.session.wrap("target", target)
+        self.assertEqual(wrapped(21), 42)
+        self.assertEqual(wrapped.__name__, "target")
+
+    def test_nested_calls_snapshot_only_outermost(self):
+        inner = self.session.wrap("inner", lambda: None)
+        outer = self.session.wrap("outer", lambda: inner())
+        outer()
+        self.assertEqual(self.session.calls, {"outer": 1})
+        self.assertTrue(os.path.exists(os.path.join(self.session.directory, "outer-0001.snapshot")))
+
+    def test_snapshot_taken_even_when_function_raises(self):
+        def boom():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.session.wrap("boom", boom)()
+        self.assertEqual(self.session.calls, {"boom": 1})
+
+    def test_dump_writes_loadable_pstats_and_restores_patches(self):
+        holder = type("Holder", (), {"func": staticmethod(lambda: sum(range(100)))})
+        original = holder.func
+        self.session.patch(holder, "func")
+        self.assertIsNot(holder.func, original)
+        holder.func()
+        path = self.session.dump()
+        self.assertIs(holder.func, original)
+        self.assertGreater(pstats.Stats(path).total_calls, 0)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_dump_is_idempotent(self):
+        first = self.session.dump()
+        self.assertEqual(self.session.dump(), first)
+
+
+class InstallTests(unittest.TestCase):
+    def test_install_from_env_returns_none_when_disabled(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(install_from_env())
+        self.assertFalse(hasattr(app.ReminderApp.schedule, "__wrapped__"))
+
+    def test_install_from_env_uses_environment_variable(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+             patch.dict(os.environ, {profiling.PROFILE_DIR_ENV: tmpdir}), \
+             patch("reminder.profiling.atexit.register"):
+            session = install_from_env()
+            try:
+                self.assertTrue(session.directory.startswith(tmpdir))
+            finally:
+                session.dump()
+
+    def test_install_wraps_hot_paths_and_dump_restores_them(self):
+        originals = {
+            "schedule": app.ReminderApp.schedule,
+            "show_reminder": app.ReminderApp.show_reminder,
+            "_schedule_snooze": app.ReminderApp._schedule_snooze,
+        }
+        save_settings = app.save_settings
+        set_icon = app._set_window_icon
+        with tempfile.TemporaryDirectory() as tmpdir, patch("reminder.profiling.atexit.register"):
+            session = install(tmpdir)
+            try:
+                for name, original in originals.items():
+                    self.assertIs(getattr(app.ReminderApp, name).__wrapped__, original)
+                self.assertIs(app.save_settings.__wrapped__, save_settings)
+                self.assertIs(app._set_window_icon.__wrapped__, set_icon)
+            finally:
+                session.dump()
+        for name, original in originals.items():
+            self.assertIs(getattr(app.ReminderApp, name), original)
+        self.assertIs(app.save_settings, save_settings)
+        self.assertIs(app._set_window_icon, set_icon)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""tests/test_records.py — reminder.records のユニットテスト
+
+テストクラス一覧:
+    ReminderRecordTests  : __slots__ レコードと状態 enum
+    ReminderColumnsTests : 列指向コンテナの追加・参照・更新・詰め直し
+    MemoryFootprintTests : 100k 件あたりのメモリ量
+"""
+import tracemalloc
+import unittest
+from dataclasses import dataclass
+
+from reminder.records import ReminderColumns, ReminderRecord, ReminderState
+from reminder.scheduler import Reminder
+from reminder.store import StoredReminder
+
+_EPOCH = 1_800_000_000
+_COUNT = 100_000
+
+
+class ReminderRecordTests(unittest.TestCase):
+    def test_has_no_instance_dict(self):
+        record = ReminderRecord(1, "会議", _EPOCH)
+        self.assertFalse(hasattr(record, "__dict__"))
+        with self.assertRaises(AttributeError):
+            record.extra = 1
+        self.assertFalse(hasattr(Reminder(1, "会議", 0.0), "__dict__"))
+
+    def test_state_labels_match_store(self):
+        self.assertEqual(ReminderState.parse("missed"), ReminderState.MISSED)
+        self.assertEqual(ReminderState.CANCELLED.label, "cancelled")
+        with self.assertRaises(ValueError):
+            ReminderState.parse("unknown")
+
+    def test_from_stored(self):
+        stored = StoredReminder(7, "alice", "会議", _EPOCH + 0.6, 10, 2, "fired")
+        self.assertEqual(ReminderRecord.from_stored(stored),
+                         ReminderRecord(7, "会議", _EPOCH + 1, 10, 2, ReminderState.FIRED))
+
+
+class ReminderColumnsTests(unittest.TestCase):
+    def setUp(self):
+        self.columns = ReminderColumns(ReminderRecord(i, f"r{i}", _EPOCH + i * 60) for i in range(1, 11))
+
+    def test_get_round_trips_records(self):
+        self.assertEqual(len(self.columns), 10)
+        self.assertEqual(self.columns.get(3), ReminderRecord(3, "r3", _EPOCH + 180))
+        self.assertIn(10, self.columns)
+        self.assertNotIn(11, self.columns)
+        with self.assertRaises(KeyError):
+            self.columns.get(0)
+        self.assertEqual([r.reminder_id for r in self.columns], list(range(1, 11)))
+
+    def test_requires_ascending_ids_and_rejects_overflow_atomically(self):
+        with self.assertRaises(ValueError):
+            self.columns.append(ReminderRecord(5, "x", _EPOCH))
+        with self.assertRaises(OverflowError):
+            self.columns.append(ReminderRecord(11, "x", _EPOCH, snooze_count=300))
+        self.assertEqual(len(self.columns), 10)
+        self.assertEqual(self.columns.nbytes(), 10 * 28)
+
+    def test_state_updates_and_due(self):
+        self.columns.set_state(2, ReminderState.CANCELLED)
+        self.assertEqual(self.columns.due(_EPOCH + 180), [1, 3])
+        self.columns.set_state(1, ReminderState.FIRED)
+        self.columns.snooze(1, _EPOCH + 3_600)
+        self.assertEqual((self.columns.get(1).snooze_count, self.columns.get(1).state), (1, ReminderState.PENDING))
+        self.assertEqual(self.columns.count(ReminderState.PENDING), 9)
+        self.assertEqual(self.columns.count(ReminderState.CANCELLED), 1)
+
+    def test_compact_drops_finished_rows(self):
+        self.columns.set_state(2, ReminderState.CANCELLED)
+        self.columns.set_state(5, ReminderState.FIRED)
+        self.assertEqual(self.columns.compact(), 2)
+        self.assertEqual([r.reminder_id for r in self.columns], [1, 3, 4, 6, 7, 8, 9, 10])
+        self.assertEqual(self.columns.get(6).message, "r6")
+
+
+@dataclass
+class _DictReminder:
+    """比較用の __dict__ を持つ素朴な表現。"""
+
+    reminder_id: int
+    message: str
+    deadline: int
+    snooze_minutes: int = 5
+    snooze_count: int = 0
+    state: int = 0
+
+
+def _traced_bytes(build):
+    tracemalloc.start()
+    try:
+        built = build()
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del built
+    return current
+
+
+class MemoryFootprintTests(unittest.TestCase):
+    """100k 件あたりのメモリ量を実測し、表現どうしを比べる。値は reminder/records.py の表と対応する。
+
+    tracemalloc の絶対値は Python のバージョンやビルドで変わるため、同じ条件で作った表現の比で確かめる。
+    """
+
+    MESSAGE = "定例会議"
+
+    def _records(self):
+        return [ReminderRecord(i, self.MESSAGE, _EPOCH + i) for i in range(_COUNT)]
+
+    def _columns(self):
+        columns = ReminderColumns()
+        for i in range(_COUNT):
+            columns.append(ReminderRecord(i, self.MESSAGE, _EPOCH + i))
+        return columns
+
+    def test_slotted_records_per_100k(self):
+        used = _traced_bytes(self._records)
+        baseline = _traced_bytes(lambda: [_DictReminder(i, self.MESSAGE, _EPOCH + i) for i in range(_COUNT)])
+        self.assertLess(used, baseline * 0.9)
+
+    def test_columns_per_100k(self):
+        used = _traced_bytes(self._columns)
+        # 1 件ごとのオブジェクトを作らないため、array の伸長の余裕分を見込んでも __slots__ レコードの 1/3 未満
+        self.assertLess(used, _traced_bytes(self._records) / 3)
+        self.assertEqual(self._columns().nbytes(), 28 * _COUNT)
@@ -15,13 +15,17 @@
     NormalizeTimeInputsTests: _normalize_time_inputs() の単体テスト
     ScheduleTests           : schedule() の動作テスト
     CancelScheduleTests     : cancel_schedule() の動作テスト
+    ScheduleManyTests       : schedule_many() の項目ごとのエラーと 1 回の保存・表示更新
     ReminderAppSnoozeTests  : show_reminder() / _schedule_snooze() のテスト
+    BackgroundModeTests     : バックグラウンドモードの UI 破棄と再構築のテスト
     BuildSectionTests       : _build_*_section() の UI 構築テスト
     FocusNavigationTests    : _focus_next() / _focus_prev() のテスト
     MainTests               : main() のテスト
     SettingsTests           : Settings / load_settings / save_settings のテスト
 """
+import base64
 import datetime
+import io
 import json
 import os
 import subprocess
@@ -44,7 +48,10 @@ from reminder import (
     calculate_delay_ms,
     play_notification_sound,
 )
+from reminder import capabilities, notifications
+from reminder.catchup import CatchUpPolicy
 from reminder.config import Settings, load_settings, save_settings
+from reminder.scheduler import BatchItem
 
 
 class CalculateDelayMsTests(unittest.TestCase):
@@ -82,18 +89,36 @@ class CalculateDelayMsTests(unittest.TestCase):
         self.assertEqual(calculate_delay_ms(now, target), 3_600_000)
 
 
+def _reset_notification_probes(test):
+    """機能検出とバックエンド選択のキャッシュをテストの前後で捨てる。"""
+    capabilities.clear()
+    notifications.REGISTRY.clear()
+    test.addCleanup(capabilities.clear)
+    test.addCleanup(notifications.REGISTRY.clear)
+
+
 class PlayNotificationSoundTests(unittest.TestCase):
     """play_notification_sound() のプラットフォーム別フォールバックを検証する。"""
 
+    def setUp(self):
+        _reset_notification_probes(self)
+        # notify-send と afplay だけが PATH 上にあり、D-Bus のセッションに接続できる環境とする
+        commands = {"notify-send": "/usr/bin/notify-send", "afplay": "/usr/bin/afplay"}
+        for target, kwargs in (("reminder.capabilities.shutil.which", {"side_effect": commands.get}),
+                               ("reminder.capabilities.dbus_session", {"return_value": True})):
+            patcher = patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     @patch("reminder.notifications.subprocess.Popen")
-    @patch("reminder.notifications.platform.system", return_value="Linux")
+    @patch("reminder.capabilities.platform.system", return_value="Linux")
     def test_calls_root_bell_on_linux(self, _mock_system, _mock_popen):
         root = Mock()
         play_notification_sound(root)
         root.bell.assert_called_once_with()
 
     @patch("reminder.notifications.subprocess.Popen")
-    @patch("reminder.notifications.platform.system", return_value="Linux")
+    @patch("reminder.capabilities.platform.system", return_value="Linux")
     def test_ignores_tcl_error(self, _mock_system, _mock_popen):
         root = Mock()
         root.bell.side_effect = tk.TclError("bell is not available")
@@ -101,7 +126,7 @@ class PlayNotificationSoundTests(unittest.TestCase):
         root.bell.assert_called_once_with()
 
     @patch("reminder.notifications.subprocess.Popen")
-    @patch("reminder.notifications.platform.system", return_value="Linux")
+    @patch("reminder.capabilities.platform.system", return_value="Linux")
     def test_sends_notify_send_on_linux(self, _mock_system, mock_popen):
         root = Mock()
         play_notification_sound(root)
@@ -112,27 +137,56 @@ class PlayNotificationSoundTests(unittest.TestCase):
         )
 
     @patch("reminder.notifications.subprocess.Popen", side_effect=FileNotFoundError)
-    @patch("reminder.notifications.platform.system", return_value="Linux")
+    @patch("reminder.capabilities.platform.system", return_value="Linux")
     def test_notify_send_not_found_still_rings_bell(self, _mock_system, _mock_popen):
         root = Mock()
         play_notification_sound(root)
         root.bell.assert_called_once_with()
 
+    @patch("reminder.notifications.subprocess.Popen")
     @patch("reminder.notifications.threading.Thread")
-    @patch("reminder.notifications.platform.system", return_value="Darwin")
-    def test_plays_afplay_on_darwin(self, _mock_system, mock_thread_cls):
+    @patch("reminder.capabilities.platform.system", return_value="Darwin")
+    def test_plays_afplay_on_darwin(self, _mock_system, mock_thread_cls, mock_popen):
         root = Mock()
         play_notification_sound(root)
+        self.assertEqual(mock_popen.call_args.args[0][0], "/usr/bin/afplay")
         mock_thread_cls.assert_called_once()
         mock_thread_cls.return_value.start.assert_called_once()
         root.bell.assert_not_called()
 
-    @patch("reminder.notifications.platform.system", return_value="Windows")
+    @patch("reminder.notifications.subprocess.Popen", side_effect=OSError)
+    @patch("reminder.capabilities.platform.system", return_value="Darwin")
+    def test_afplay_failure_falls_back_to_bell(self, _mock_system, _mock_popen):
+        root = Mock()
+        play_notification_sound(root)
+        root.bell.assert_called_once_with()
+
+    @patch("reminder.capabilities.platform.system", return_value="Windows")
     def test_falls_back_to_bell_when_winsound_unavailable(self, _mock_system):
         root = Mock()
         play_notification_sound(root)
         root.bell.assert_called_once_with()
 
+    @patch("reminder.notifications.subprocess.Popen", side_effect=FileNotFoundError)
+    @patch("reminder.capabilities.platform.system", return_value="Linux")
+    def test_probes_once_and_skips_failed_backend(self, mock_system, mock_popen):
+        root = Mock()
+        for _ in range(3):
+            play_notification_sound(root)
+        mock_system.assert_called_once_with()
+        # 起動に失敗した notify-send は 2 回目以降試さない
+        mock_popen.assert_called_once()
+        self.assertEqual(root.bell.call_count, 3)
+
+    @patch("reminder.notifications.subprocess.Popen")
+    @patch("reminder.capabilities.platform.system", return_value="Linux")
+    def test_skips_notify_send_without_dbus_session(self, _mock_system, mock_popen):
+        root = Mock()
+        with patch("reminder.capabilities.dbus_session", return_value=False):
+            play_notification_sound(root)
+        mock_popen.assert_not_called()
+        root.bell.assert_called_once_with()
+
 
 class PlatformHelperTests(unittest.TestCase):
     """プラットフォーム別ヘルパーの単体テスト。"""
@@ -158,6 +212,14 @@ class PlatformHelperTests(unittest.TestCase):
     def test_send_linux_notification_swallows_missing_command(self, _mock_popen):
         _send_linux_notification()
 
+    @patch("reminder.notifications.threading.Thread")
+    @patch("reminder.notifications.subprocess.Popen", side_effect=FileNotFoundError)
+    def test_start_afplay_raises_when_afplay_missing(self, _mock_popen, mock_thread_cls):
+        # afplay バックエンドは起動の失敗を BackendRegistry に伝え、次の候補に切り替えさせる
+        with self.assertRaises(FileNotFoundError):
+            notifications._start_afplay()
+        mock_thread_cls.assert_not_called()
+
     def test_ring_bell_invokes_root_bell(self):
         root = Mock()
         _ring_bell(root)
@@ -172,6 +234,9 @@ class PlatformHelperTests(unittest.TestCase):
 class SetWindowIconTests(unittest.TestCase):
     """_set_window_icon() の挙動を検証する。"""
 
+    def setUp(self):
+        _reset_notification_probes(self)
+
     def test_does_not_raise_when_cairosvg_unavailable(self):
         root = Mock()
         _set_window_icon(root)
@@ -186,6 +251,19 @@ class SetWindowIconTests(unittest.TestCase):
         self.assertIs(root._icon_image, icon)
         root.iconphoto.assert_called_once_with(True, icon)
 
+    @patch("reminder.notifications.tk.PhotoImage")
+    def test_reuses_converted_icon_without_cairosvg(self, mock_photo_image):
+        svg2png = Mock(return_value=b"png-data")
+        with patch.dict("sys.modules", {"cairosvg": types.SimpleNamespace(svg2png=svg2png)}):
+            _set_window_icon(Mock())
+        # 次の起動では変換結果を読むだけで、cairosvg は読み込まない
+        capabilities.clear()
+        with patch("reminder.capabilities.importlib.import_module") as mock_import:
+            _set_window_icon(Mock())
+        mock_import.assert_not_called()
+        svg2png.assert_called_once()
+        self.assertEqual(mock_photo_image.call_args_list[-1].kwargs["data"], base64.b64encode(b"png-data"))
+
 
 class CoerceIntTests(unittest.TestCase):
     """_coerce_int() の変換・クランプ動作を検証する。"""
@@ -242,6 +320,7 @@ def _create_app(snooze_value="5", hour_value="10", minute_value="30"):
     app.cancel_button = Mock()
     app.status_var = Mock()
     app.message_text = Mock()
+    app.search_results = Mock()
     return app, root
 
 
@@ -306,22 +385,52 @@ class ScheduleTests(unittest.TestCase):
 class CancelScheduleTests(unittest.TestCase):
     def test_cancel_when_no_job_does_nothing(self):
         app, root = _create_app()
-        app.scheduled_job_id = None
+        self.assertIsNone(app.scheduled_job_id)
         app.cancel_schedule()
         root.after_cancel.assert_not_called()
         app.schedule_button.configure.assert_not_called()
 
     def test_cancel_active_job(self):
         app, root = _create_app()
-        app.scheduled_job_id = "job-1"
+        app._schedule_snooze("テスト", 5, 0)
+        self.assertEqual(app.scheduled_job_id, "job-1")
+        self.assertEqual(len(app.scheduler), 1)
         app.cancel_schedule()
         root.after_cancel.assert_called_once_with("job-1")
         self.assertIsNone(app.scheduled_job_id)
+        self.assertEqual(len(app.scheduler), 0)
         app.schedule_button.configure.assert_called_with(state=tk.NORMAL)
         app.cancel_button.configure.assert_called_with(state=tk.DISABLED)
         app.status_var.set.assert_called_with("リマインダー設定を解除しました。")
 
 
+@patch("reminder.app.save_settings")
+@patch("reminder.app.messagebox.showwarning")
+class ScheduleManyTests(unittest.TestCase):
+    def test_reports_errors_per_item_with_one_save_and_status(self, mock_warning, mock_save):
+        app, root = _create_app()
+        results = app.schedule_many([
+            BatchItem("a", delay_ms=1_000), BatchItem("", delay_ms=0), BatchItem("b", delay_ms="x"),
+        ])
+        self.assertEqual([r.ok for r in results], [True, False, False])
+        self.assertTrue(all(r.error for r in results[1:]))
+        mock_warning.assert_not_called()
+        mock_save.assert_called_once()
+        app.status_var.set.assert_called_once_with("1 件の通知を予定しました。2 件は登録できませんでした。")
+        app.schedule_button.configure.assert_not_called()
+        self.assertEqual(app.recent_messages(), ["a"])
+        self.assertEqual(root.after.call_count, 1)
+
+    def test_all_or_nothing_registers_and_saves_nothing(self, _mock_warning, mock_save):
+        app, root = _create_app()
+        results = app.schedule_many([BatchItem("a", delay_ms=1_000), BatchItem("", delay_ms=0)],
+                                    all_or_nothing=True)
+        self.assertEqual([r.reminder_id for r in results], [None, None])
+        mock_save.assert_not_called()
+        root.after.assert_not_called()
+        self.assertEqual(len(app.scheduler), 0)
+
+
 class ReminderAppSnoozeTests(unittest.TestCase):
     @patch("reminder.app.play_notification_sound")
     @patch("reminder.app.messagebox.askyesno", return_value=True)
@@ -389,6 +498,128 @@ class ReminderAppSnoozeTests(unittest.TestCase):
         app.cancel_button.configure.assert_called_with(state=tk.DISABLED)
 
 
+def _create_background_app(test):
+    """background=True の ReminderApp を返す。_build_ui はテスト中ずっと Mock のウィジェットを組み立てる。"""
+    root = Mock()
+    root.after.return_value = "job-1"
+    builds = []
+
+    def fake_ui(app):
+        app._frame = Mock()
+        app.schedule_button = Mock()
+        app.cancel_button = Mock()
+        app.status_var = _DummyVar(app._status)
+        app.message_text = Mock()
+        app.message_text.get.return_value = "テスト"
+        app.search_results = Mock()
+        builds.append(app._frame)
+
+    for patcher in (
+        patch.object(ReminderApp, "_build_ui", autospec=True, side_effect=fake_ui),
+        patch("reminder.app.load_settings", return_value=Settings()),
+        patch("reminder.app.save_settings"),
+        patch("reminder.app.tk.StringVar", side_effect=lambda value="": _DummyVar(value)),
+    ):
+        patcher.start()
+        test.addCleanup(patcher.stop)
+    app = ReminderApp(root, background=True)
+    return app, root, builds
+
+
+@patch("reminder.app.calculate_delay_ms", return_value=60_000)
+class BackgroundModeTests(unittest.TestCase):
+    def test_schedule_drops_widgets_and_iconifies(self, _mock_delay):
+        app, root, builds = _create_background_app(self)
+        root._icon_image = Mock()
+        app.schedule()
+        builds[0].destroy.assert_called_once()
+        self.assertIsNone(app._frame)
+        self.assertIsNone(app.message_text)
+        self.assertIsNone(app.status_var)
+        self.assertFalse(hasattr(root, "_icon_image"))
+        root.iconify.assert_called_once()
+        # 破棄したウィジェットに触れる Enter キーの schedule() を呼ばせない
+        root.unbind.assert_called_once_with("<Return>")
+        # Scheduler の発火待ちは残る
+        self.assertEqual(app.scheduled_job_id, "job-1")
+
+    def test_reopen_rebuilds_from_saved_state(self, _mock_delay):
+        app, root, builds = _create_background_app(self)
+        app.schedule()
+        status = app._status
+        app.reopen()
+        self.assertEqual(len(builds), 2)
+        app.message_text.insert.assert_called_once_with("1.0", "テスト")
+        app.schedule_button.configure.assert_called_with(state=tk.DISABLED)
+        app.cancel_button.configure.assert_called_with(state=tk.NORMAL)
+        self.assertEqual(app.status_var.get(), status)
+        root.deiconify.assert_called_once()
+        # 表示中に開き直しても作り直さない
+        app.reopen()
+        self.assertEqual(len(builds), 2)
+
+    def test_map_event_of_root_reopens(self, _mock_delay):
+        app, root, builds = _create_background_app(self)
+        root.bind.assert_any_call("<Map>", app._on_map)
+        app.schedule()
+        app._on_map(Mock(widget=Mock()))
+        self.assertIsNone(app._frame)
+        app._on_map(Mock(widget=root))
+        self.assertEqual(len(builds), 2)
+
+    def test_minimizing_after_reopen_drops_ui_again(self, _mock_delay):
+        app, root, builds = _create_background_app(self)
+        root.bind.assert_any_call("<Unmap>", app._on_unmap)
+        app.schedule()
+        app.reopen()
+        app._on_unmap(Mock(widget=Mock()))
+        self.assertIs(app._frame, builds[1])
+        app._on_unmap(Mock(widget=root))
+        builds[1].destroy.assert_called_once()
+        self.assertIsNone(app._frame)
+        self.assertEqual(root.iconify.call_count, 2)
+
+    def test_minimizing_without_pending_reminder_keeps_ui(self, _mock_delay):
+        app, root, builds = _create_background_app(self)
+        app._on_unmap(Mock(widget=root))
+        self.assertIs(app._frame, builds[0])
+        root.iconify.assert_not_called()
+
+    def test_schedule_many_drops_widgets_and_keeps_status(self, _mock_delay):
+        app, root, builds = _create_background_app(self)
+        app.schedule_many([BatchItem("a", delay_ms=1_000)])
+        self.assertIsNone(app._frame)
+        root.iconify.assert_called_once()
+        app.schedule_many([BatchItem("b", delay_ms=1_000)])
+        app.reopen()
+        self.assertEqual(app.status_var.get(), "1 件の通知を予定しました。")
+
+    @patch("reminder.app.play_notification_sound")
+    @patch("reminder.app.messagebox.showinfo")
+    def test_fire_rebuilds_ui_and_drops_it_again_after_snooze(self, mock_showinfo, _mock_sound, _mock_delay):
+        app, root, builds = _create_background_app(self)
+        app.schedule()
+        fire = root.after.call_args.args[1]
+        with patch("reminder.app.messagebox.askyesno", return_value=True):
+            fire()
+        mock_showinfo.assert_called_once_with("リマインダー", "テスト")
+        self.assertEqual(len(builds), 2)
+        builds[1].destroy.assert_called_once()
+        self.assertIsNone(app._frame)
+        self.assertEqual(root.after.call_count, 2)
+
+    @patch("reminder.app.play_notification_sound")
+    @patch("reminder.app.messagebox.askyesno", return_value=False)
+    @patch("reminder.app.messagebox.showinfo")
+    def test_dismissed_fire_leaves_ui_open(self, _mock_showinfo, _mock_askyesno, _mock_sound, _mock_delay):
+        app, root, builds = _create_background_app(self)
+        app.schedule()
+        root.after.call_args.args[1]()
+        self.assertIs(app._frame, builds[1])
+        self.assertEqual(app.status_var.get(), STATUS_NOTIFIED)
+        root.deiconify.assert_called_once()
+
+
 class BuildSectionTests(unittest.TestCase):
     def setUp(self):
         root = Mock()
@@ -479,11 +710,38 @@ class MainTests(unittest.TestCase):
         mock_root = Mock()
         mock_tk_cls.return_value = mock_root
         from reminder.__main__ import main
-        main()
+        with patch("reminder.__main__.metrics.enable_textfile"), \
+             patch("reminder.__main__.configure_logging"), \
+             patch("reminder.__main__.shutdown_logging"), \
+             patch("reminder.__main__.history.FireHistory") as mock_history_cls:
+            main([])
         mock_tk_cls.assert_called_once()
-        mock_app_cls.assert_called_once_with(mock_root)
+        mock_app_cls.assert_called_once_with(mock_root, catch_up=CatchUpPolicy(),
+                                             history=mock_history_cls.return_value, background=False)
+        mock_history_cls.return_value.close.assert_called_once()
         mock_root.mainloop.assert_called_once()
 
+    def test_stats_ignores_invalid_metrics_port_env(self):
+        from reminder.__main__ import main
+        with patch.dict(os.environ, {"REMINDER_METRICS_PORT": "abc"}), \
+             patch("reminder.__main__.metrics.print_stats", return_value=0) as mock_stats, \
+             patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            self.assertEqual(main(["stats"]), 0)
+        mock_stats.assert_called_once()
+        self.assertIn("REMINDER_METRICS_PORT", stderr.getvalue())
+
+    def test_invalid_catch_up_env_is_ignored(self):
+        from reminder.__main__ import _build_parser, main
+        with patch.dict(os.environ, {"REMINDER_CATCH_UP": "bogus"}), \
+             patch("reminder.__main__.metrics.print_stats", return_value=0) as mock_stats, \
+             patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            self.assertEqual(main(["stats"]), 0)
+            self.assertEqual(_build_parser().parse_args([]).catch_up, CatchUpPolicy())
+        mock_stats.assert_called_once()
+        self.assertIn("REMINDER_CATCH_UP", stderr.getvalue())
+        with patch.dict(os.environ, {"REMINDER_CATCH_UP": "latest"}):
+            self.assertEqual(_build_parser().parse_args([]).catch_up, CatchUpPolicy("latest"))
+
 
 class SettingsTests(unittest.TestCase):
     def test_default_settings(self):
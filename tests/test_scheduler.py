@@ -0,0 +1,215 @@
+"""tests/test_scheduler.py — reminder.scheduler のユニットテスト
+
+テストクラス一覧:
+    SchedulerAddTests    : add() の入力検証と遅延計算
+    SchedulerFireTests   : 発火・スヌーズ再登録・上限による打ち切り・判断保留と resolve()
+    SchedulerCancelTests : cancel() / snooze() による取り消しと延期
+    SchedulerBatchTests  : add_many() の一括検証・項目ごとの結果・失敗時の取り消し
+"""
+import datetime
+import unittest
+from unittest.mock import Mock, patch
+
+from reminder import MAX_SNOOZE_COUNT, calculate_delay_ms
+from reminder.clock import VirtualClock
+from reminder.scheduler import BatchItem, BatchResult, Scheduler
+
+
+class SchedulerAddTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(datetime.datetime(2026, 1, 1, 10, 0))
+        self.scheduler = Scheduler(self.clock, self.clock)
+
+    def test_target_uses_calculate_delay_ms(self):
+        rid = self.scheduler.add("朝会", target=datetime.time(10, 30))
+        self.assertEqual(self.scheduler.get(rid).deadline, 30 * 60)
+
+    def test_past_target_rolls_over_to_next_day(self):
+        rid = self.scheduler.add("朝会", target=datetime.time(9, 0))
+        self.assertEqual(self.scheduler.get(rid).deadline, 23 * 3600)
+
+    def test_rejects_invalid_input(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.add("   ", delay_ms=0)
+        with self.assertRaises(ValueError):
+            self.scheduler.add("x")
+        with self.assertRaises(ValueError):
+            self.scheduler.add("x", delay_ms=0, target=datetime.time(1, 0))
+        with self.assertRaises(ValueError):
+            self.scheduler.add("x", delay_ms=0, snooze_minutes=0)
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_timer_failure_does_not_keep_reminder(self):
+        timer = Mock()
+        timer.after.side_effect = RuntimeError("after failed")
+        scheduler = Scheduler(self.clock, timer)
+        with self.assertRaises(RuntimeError):
+            scheduler.add("x", delay_ms=10)
+        self.assertEqual(len(scheduler), 0)
+
+
+class SchedulerFireTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.fired = []
+
+    def test_fire_without_snooze_removes_reminder(self):
+        scheduler = Scheduler(self.clock, self.clock, on_fire=lambda r: self.fired.append(r.message) or False)
+        scheduler.add("a", delay_ms=1_000)
+        self.clock.run_until_idle()
+        self.assertEqual(self.fired, ["a"])
+        self.assertEqual(len(scheduler), 0)
+
+    def test_accepted_snooze_rearms_until_max_count(self):
+        scheduler = Scheduler(self.clock, self.clock, on_fire=lambda r: self.fired.append(r.snooze_count) or True)
+        scheduler.add("a", delay_ms=0, snooze_minutes=5)
+        self.clock.run_until_idle()
+        self.assertEqual(self.fired, list(range(MAX_SNOOZE_COUNT + 1)))
+        self.assertEqual(self.clock.elapsed_ms, MAX_SNOOZE_COUNT * 5 * 60_000)
+        self.assertEqual(self.clock.pending, 0)
+
+    def test_exception_in_on_fire_is_logged_and_reminder_dropped(self):
+        def boom(_reminder):
+            raise RuntimeError("boom")
+
+        scheduler = Scheduler(self.clock, self.clock, on_fire=boom)
+        scheduler.add("a", delay_ms=0)
+        with self.assertLogs(level="ERROR"):
+            self.clock.run_until_idle()
+        self.assertEqual(len(scheduler), 0)
+
+    def test_none_from_on_fire_defers_until_resolve(self):
+        scheduler = Scheduler(self.clock, self.clock, on_fire=lambda r: None)
+        rid = scheduler.add("a", delay_ms=0)
+        self.clock.run_until_idle()
+        self.assertIsNotNone(scheduler.get(rid))
+        self.assertTrue(scheduler.resolve(rid, accept_snooze=True))
+        self.assertEqual(scheduler.get(rid).snooze_count, 1)
+        self.assertFalse(scheduler.resolve(rid, accept_snooze=True))
+        self.clock.run_until_idle()
+        self.assertFalse(scheduler.resolve(rid, accept_snooze=False))
+        self.assertIsNone(scheduler.get(rid))
+
+    def test_cancel_inside_on_fire_is_respected(self):
+        scheduler = Scheduler(self.clock, self.clock, on_fire=lambda r: scheduler.cancel(r.reminder_id) or True)
+        scheduler.add("a", delay_ms=0)
+        self.clock.run_until_idle()
+        self.assertEqual(len(scheduler), 0)
+        self.assertEqual(self.clock.pending, 0)
+
+
+class SchedulerCancelTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.on_fire = Mock(return_value=False)
+        self.scheduler = Scheduler(self.clock, self.clock, on_fire=self.on_fire)
+
+    def test_cancel_removes_timer(self):
+        rid = self.scheduler.add("a", delay_ms=1_000)
+        self.assertTrue(self.scheduler.cancel(rid))
+        self.assertFalse(self.scheduler.cancel(rid))
+        self.clock.run_until_idle()
+        self.on_fire.assert_not_called()
+        self.assertEqual(self.clock.pending, 0)
+
+    def test_snooze_postpones_pending_reminder(self):
+        rid = self.scheduler.add("a", delay_ms=1_000)
+        self.assertTrue(self.scheduler.snooze(rid, minutes=10))
+        self.assertEqual(self.scheduler.get(rid).snooze_count, 1)
+        self.clock.advance(1_000)
+        self.on_fire.assert_not_called()
+        self.clock.run_until_idle()
+        self.on_fire.assert_called_once()
+        self.assertEqual(self.clock.elapsed_ms, 10 * 60_000)
+
+    def test_snooze_refused_at_max_count(self):
+        rid = self.scheduler.add("a", delay_ms=1_000)
+        self.scheduler.get(rid).snooze_count = MAX_SNOOZE_COUNT
+        self.assertFalse(self.scheduler.snooze(rid))
+        self.assertFalse(self.scheduler.snooze(999))
+
+
+class SchedulerBatchTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(datetime.datetime(2026, 1, 1, 10, 0))
+        self.scheduler = Scheduler(self.clock, self.clock)
+
+    def test_reports_errors_per_item_and_registers_the_rest(self):
+        results = self.scheduler.add_many([
+            BatchItem("朝会", target=datetime.time(10, 30)),
+            BatchItem("   ", delay_ms=0),
+            BatchItem("昼会", delay_ms=60_000, snooze_minutes=0),
+            BatchItem("夕会", target=datetime.time(9, 0)),
+        ])
+        self.assertEqual([r.ok for r in results], [True, False, False, True])
+        self.assertEqual(results[1].error, "メッセージが空です")
+        self.assertIn("スヌーズ間隔", results[2].error)
+        self.assertEqual(self.scheduler.get(results[0].reminder_id).deadline, 30 * 60)
+        self.assertEqual(self.scheduler.get(results[3].reminder_id).deadline, 23 * 3600)
+        self.assertEqual(self.clock.pending, 2)
+
+    def test_all_or_nothing_registers_nothing_on_invalid_item(self):
+        results = self.scheduler.add_many(
+            [BatchItem("朝会", delay_ms=0), BatchItem("x")], all_or_nothing=True,
+        )
+        self.assertEqual(results[0], BatchResult(None))
+        self.assertFalse(results[1].ok)
+        self.assertEqual(len(self.scheduler), 0)
+        self.assertEqual(self.clock.pending, 0)
+
+    def test_reports_wrong_types_per_item(self):
+        results = self.scheduler.add_many([
+            BatchItem(None, delay_ms=0),
+            BatchItem("a", delay_ms=0, snooze_minutes="5"),
+            BatchItem("b", delay_ms=0, slack_ms=None),
+            BatchItem("d", delay_ms="10"),
+            BatchItem("e", target="12:00"),
+            BatchItem("f", delay_ms=float("inf")),
+            BatchItem("g", delay_ms=True),
+            BatchItem("h", delay_ms=-5),
+            BatchItem("i", delay_ms=0, snooze_count="1"),
+            BatchItem("j", delay_ms=0, snooze_count=-1),
+            BatchItem("c", delay_ms=0),
+        ])
+        self.assertEqual([r.ok for r in results], [False] * 10 + [True])
+        self.assertTrue(all(r.error for r in results[:10]))
+        self.assertEqual(len(self.scheduler), 1)
+
+    def test_rejects_duplicate_ids(self):
+        self.scheduler.add("既存", delay_ms=0, reminder_id=1)
+        results = self.scheduler.add_many([
+            BatchItem("a", delay_ms=0, reminder_id=1),
+            BatchItem("b", delay_ms=0, reminder_id=2),
+            BatchItem("c", delay_ms=0, reminder_id=2),
+        ])
+        self.assertEqual([r.reminder_id for r in results], [None, 2, None])
+        self.assertEqual(self.scheduler.get(2).message, "b")
+
+    def test_timer_failure_rolls_back_whole_batch(self):
+        timer = Mock()
+        timer.after.side_effect = ["job-1", "job-2", RuntimeError("after failed")]
+        scheduler = Scheduler(self.clock, timer)
+        with self.assertRaises(RuntimeError):
+            scheduler.add_many([BatchItem(f"m{i}", delay_ms=i) for i in range(3)])
+        self.assertEqual(len(scheduler), 0)
+        self.assertEqual([c.args for c in timer.after_cancel.call_args_list], [("job-1",), ("job-2",)])
+
+    def test_computes_delay_once_per_target(self):
+        items = [BatchItem(f"m{i}", target=datetime.time(11, i % 2)) for i in range(100)]
+        with patch("reminder.scheduler.calculate_delay_ms", wraps=calculate_delay_ms) as calc:
+            results = self.scheduler.add_many(items)
+        self.assertEqual(calc.call_count, 2)
+        self.assertEqual({self.scheduler.get(r.reminder_id).deadline for r in results}, {3600, 3660})
+
+    def test_batch_is_searchable_and_fires(self):
+        fired = []
+        scheduler = Scheduler(self.clock, self.clock, on_fire=lambda r: fired.append(r.message))
+        scheduler.search("会議")
+        scheduler.add_many([BatchItem("週次会議", delay_ms=2_000), BatchItem("定例会議", delay_ms=1_000)])
+        self.assertEqual([r.message for r in scheduler.search("会議")], ["週次会議", "定例会議"])
+        self.clock.run_until_idle()
+        self.assertEqual(fired, ["定例会議", "週次会議"])
+
+
+if __name__ == "__main__":
+    unittest.main()
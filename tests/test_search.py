@@ -0,0 +1,197 @@
+"""tests/test_search.py — reminder.search と各所の全文検索のユニットテスト
+
+テストクラス一覧:
+    TokenizerTests      : 正規化と n-gram の索引語
+    SearchIndexTests    : 転置索引の追加・削除・検索と 100k 件での検索時間
+    StoreSearchTests    : ReminderStore.search（FTS5 と通常の表による代替）
+    SchedulerSearchTests: Scheduler.search の索引が登録・取り消し・発火に追従する
+    AppSearchTests      : ReminderApp の最近のメッセージ検索
+"""
+import contextlib
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import reminder.store as store_module
+from reminder import ReminderApp
+from reminder.clock import VirtualClock
+from reminder.config import MAX_RECENT_MESSAGES, Settings, load_settings
+from reminder.scheduler import Scheduler
+from reminder.search import SearchIndex, index_tokens, normalize, query_terms
+from reminder.store import SEARCH_FTS5, SEARCH_NGRAM, STATE_CANCELLED, STATE_PENDING, ReminderStore
+
+from .test_reminder import _DummyVar
+
+
+def _without_fts5():
+    """FTS5 を組み込んでいない SQLite を模す。"""
+    return patch.object(store_module, "_FTS5_SCHEMA",
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS reminder_search USING no_such_module(tokens)")
+
+
+class TokenizerTests(unittest.TestCase):
+    def test_normalizes_width_and_case(self):
+        self.assertEqual(normalize("ＯＰＳ－１２ ｶﾞｲﾄﾞ"), "ops-12 ガイド")
+
+    def test_bigrams_and_last_character_per_run(self):
+        self.assertEqual(index_tokens("会議室 Up!"), {"会議", "議室", "室", "up", "p"})
+
+    def test_query_terms_split_on_symbols_and_spaces(self):
+        self.assertEqual(query_terms(" 会議　OPS-12 会議 "), ["会議", "ops", "12"])
+        self.assertEqual(query_terms("!?"), [])
+
+
+class SearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        for doc_id, text in enumerate(["朝会の資料", "服薬", "会議の資料を提出", "Stand up", "ab ba"], start=1):
+            self.index.add(doc_id, text)
+
+    def test_substring_and_and_queries(self):
+        self.assertEqual(self.index.search("資料"), [1, 3])
+        self.assertEqual(self.index.search("資料 提出"), [3])
+        self.assertEqual(self.index.search("STAND"), [4])
+        self.assertEqual(self.index.search("存在しない"), [])
+        self.assertEqual(self.index.search(""), [])
+
+    def test_single_character_query_matches_any_position(self):
+        self.assertEqual(self.index.search("会"), [1, 3])
+        self.assertEqual(self.index.search("薬"), [2])
+
+    def test_candidates_are_verified_against_text(self):
+        # "ab ba" は abab の bigram（ab・ba）をすべて含むが、abab という部分文字列はない
+        self.assertEqual(self.index.search("abab"), [])
+        self.assertEqual(self.index.search("ab"), [5])
+
+    def test_remove_and_replace(self):
+        self.assertTrue(self.index.remove(1))
+        self.assertFalse(self.index.remove(1))
+        self.assertEqual(self.index.search("資料"), [3])
+        self.index.add(3, "散歩")
+        self.assertEqual((self.index.search("資料"), self.index.search("散歩")), ([], [3]))
+        self.assertEqual(len(self.index), 4)
+
+    def test_limit(self):
+        self.assertEqual(self.index.search("資料", limit=1), [1])
+
+    def test_selective_queries_stay_fast_with_100k_documents(self):
+        index = SearchIndex()
+        words = ["朝会", "服薬", "会議", "資料", "レビュー", "散歩", "請求書", "デプロイ"]
+        texts = [f"{words[doc_id % 8]} {words[doc_id // 8 % 8]} OPS-{doc_id}" for doc_id in range(100_000)]
+        for doc_id, text in enumerate(texts):
+            index.add(doc_id, text)
+        started = time.perf_counter()
+        found = index.search("請求書 ops-4242")
+        elapsed = time.perf_counter() - started
+        self.assertEqual(found, [doc_id for doc_id, text in enumerate(texts) if "請求書" in text and "4242" in text])
+        self.assertLess(elapsed, 0.05)
+
+
+class StoreSearchTests(unittest.TestCase):
+    def _check_search(self, store):
+        self.addCleanup(store.close)
+        meeting = store.create("alice", "会議の資料", 100.0)
+        store.create("alice", "ＯＰＳ－１２ のレビュー", 100.0)
+        template = store.create("alice", "{ticket} のデプロイ", 100.0, params={"ticket": "OPS-7"})
+        store.create("bob", "会議", 100.0)
+        self.assertEqual([r.reminder_id for r in store.search("alice", "会議")], [meeting.reminder_id])
+        self.assertEqual([r.render() for r in store.search("alice", "ops")],
+                         ["ＯＰＳ－１２ のレビュー", "OPS-7 のデプロイ"])
+        # テンプレートは埋め込み後の本文で検索できる
+        self.assertEqual([r.reminder_id for r in store.search("alice", "ops-7")], [template.reminder_id])
+        self.assertEqual(len(store.search("alice", "の", limit=2)), 2)
+        self.assertEqual(store.search("alice", "会議 提出"), [])
+        store.cancel("alice", meeting.reminder_id)
+        self.assertEqual(store.search("alice", "会議", state=STATE_PENDING), [])
+        self.assertEqual([r.state for r in store.search("alice", "会議")], [STATE_CANCELLED])
+
+    def test_fts5(self):
+        store = ReminderStore()
+        self.assertEqual(store.search_backend, SEARCH_FTS5)
+        self._check_search(store)
+
+    def test_ngram_table_without_fts5(self):
+        with _without_fts5():
+            store = ReminderStore()
+        self.assertEqual(store.search_backend, SEARCH_NGRAM)
+        self._check_search(store)
+
+    def test_existing_reminders_are_indexed_when_the_index_is_created(self):
+        for without_fts5, backend in ((False, SEARCH_FTS5), (True, SEARCH_NGRAM)):
+            with self.subTest(backend=backend), tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "reminders.db")
+                store = ReminderStore(path)
+                stored = store.create("alice", "会議の資料", 100.0)
+                # 全文検索索引を持たない以前のデータベースを模す
+                store._conn.execute("DROP TABLE reminder_search")
+                store.close()
+                with _without_fts5() if without_fts5 else contextlib.nullcontext():
+                    reopened = ReminderStore(path)
+                self.assertEqual(reopened.search_backend, backend)
+                self.assertEqual([r.reminder_id for r in reopened.search("alice", "資料")], [stored.reminder_id])
+                reopened.close()
+                # 一度通常の表で代用した後は、FTS5 が使えても通常の表を使い続ける
+                again = ReminderStore(path)
+                self.assertEqual(again.search_backend, backend)
+                again.close()
+
+
+class SchedulerSearchTests(unittest.TestCase):
+    def test_index_follows_add_cancel_and_fire(self):
+        clock = VirtualClock()
+        scheduler = Scheduler(clock, clock, on_fire=lambda _reminder: False)
+        meeting = scheduler.add("会議の資料", delay_ms=60_000)
+        scheduler.add("服薬", delay_ms=120_000)
+        self.assertEqual([r.reminder_id for r in scheduler.search("資料")], [meeting])
+        later = scheduler.add("資料の提出", delay_ms=180_000)
+        self.assertEqual([r.reminder_id for r in scheduler.search("資料")], [meeting, later])
+        scheduler.cancel(later)
+        self.assertEqual([r.reminder_id for r in scheduler.search("資料")], [meeting])
+        clock.advance(60_000)
+        self.assertEqual(scheduler.search("資料"), [])
+        self.assertEqual([r.message for r in scheduler.search("服薬")], ["服薬"])
+
+
+class AppSearchTests(unittest.TestCase):
+    def _create_app(self, saved=None):
+        with patch.object(ReminderApp, "_build_ui"), \
+             patch("reminder.app.load_settings", return_value=saved or Settings()), \
+             patch("reminder.app.tk.StringVar", side_effect=lambda value="": _DummyVar(value)):
+            app = ReminderApp(Mock())
+        app.schedule_button = Mock()
+        app.cancel_button = Mock()
+        app.status_var = Mock()
+        app.message_text = Mock()
+        app.search_results = Mock()
+        app.search_results.curselection.return_value = ()
+        return app
+
+    def test_scheduled_messages_are_remembered_newest_first(self):
+        app = self._create_app()
+        for message in ("朝会の資料", "服薬", "朝会の資料"):
+            app.message_text.get.return_value = message
+            app.schedule()
+        self.assertEqual(app.recent_messages(), ["朝会の資料", "服薬"])
+        self.assertEqual(load_settings().recent_messages, ["朝会の資料", "服薬"])
+        restarted = self._create_app(Settings(recent_messages=load_settings().recent_messages))
+        self.assertEqual(restarted.search_recent_messages("資料"), ["朝会の資料"])
+
+    def test_search_and_use_result(self):
+        app = self._create_app(Settings(recent_messages=["会議の資料を提出", "服薬", "朝会の資料"]))
+        self.assertEqual(app.search_recent_messages("資料"), ["会議の資料を提出", "朝会の資料"])
+        self.assertEqual(app.search_recent_messages(" "), ["会議の資料を提出", "服薬", "朝会の資料"])
+        app.search_var.set("朝会")
+        app._refresh_search_results()
+        app.search_results.insert.assert_called_once_with("end", "朝会の資料")
+        self.assertEqual(app._use_search_result(), "break")
+        app.message_text.insert.assert_called_once_with("1.0", "朝会の資料")
+
+    def test_recent_messages_are_capped(self):
+        app = self._create_app()
+        for i in range(MAX_RECENT_MESSAGES + 5):
+            app._remember_message(f"メッセージ{i}")
+        self.assertEqual(len(app.recent_messages()), MAX_RECENT_MESSAGES)
+        self.assertEqual(app.search_recent_messages("メッセージ0"), [])
+        self.assertEqual(len(app._recent_index), MAX_RECENT_MESSAGES)
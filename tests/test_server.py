@@ -0,0 +1,301 @@
+"""tests/test_server.py — reminder.server のユニットテスト
+
+localhost の空きポートでサーバーを起動し、生の HTTP/1.1 で操作する。
+
+テストクラス一覧:
+    ReminderApiTests  : 作成・一覧・取り消し・スヌーズと利用者ごとの名前空間
+    BulkIngestTests   : NDJSON 一括登録（チャンク転送・行単位のエラー）
+    FireEventTests    : ロングポーリングと SSE による発火イベント配信・他インスタンスでの延期の反映
+    RestartTests      : 再起動時にストアの発火待ちを再登録し、期限切れをまとめて配信する
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from reminder import MAX_SNOOZE_COUNT
+from reminder.server import ReminderServer
+from reminder.store import ReminderStore
+
+
+async def _request(port, method, path, body=None, headers=None, reader_writer=None):
+    """1 リクエストを送り (status, headers, body) を返す。チャンク転送の応答も連結して返す。"""
+    reader, writer = reader_writer or await asyncio.open_connection("127.0.0.1", port)
+    headers = dict(headers or {})
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body).encode("utf-8")
+    if body is not None and "Transfer-Encoding" not in headers:
+        headers["Content-Length"] = str(len(body))
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+    head += "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+    writer.write(head.encode("latin-1") + (body or b""))
+    await writer.drain()
+
+    status_line, *lines = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    response_headers = {}
+    for line in lines:
+        if line:
+            name, _, value = line.partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+    if response_headers.get("transfer-encoding") == "chunked":
+        data = b""
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                await reader.readline()
+                break
+            data += await reader.readexactly(size)
+            await reader.readline()
+    else:
+        data = await reader.readexactly(int(response_headers.get("content-length", "0")))
+    if reader_writer is None:
+        writer.close()
+    return int(status_line.split()[1]), response_headers, data
+
+
+class _ServerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.store = ReminderStore()
+        self.server = ReminderServer(self.store, port=0)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.store.close()
+
+    async def call(self, method, path, body=None, headers=None):
+        status, _headers, data = await _request(self.server.port, method, path, body, headers)
+        return status, json.loads(data) if data else None
+
+
+class ReminderApiTests(_ServerTestCase):
+    async def test_create_list_get(self):
+        status, created = await self.call("POST", "/v1/users/alice/reminders",
+                                          {"message": "会議", "delay_ms": 60_000, "snooze_minutes": 3})
+        self.assertEqual(status, 201)
+        self.assertEqual((created["message"], created["snooze_minutes"], created["state"]), ("会議", 3, "pending"))
+        self.assertAlmostEqual(created["deadline"], time.time() + 60, delta=2)
+        self.assertIn(created["reminder_id"], {r.reminder_id for r in self.server.scheduler.scheduler})
+
+        status, listing = await self.call("GET", "/v1/users/alice/reminders?state=pending")
+        self.assertEqual((status, [r["reminder_id"] for r in listing["reminders"]]), (200, [created["reminder_id"]]))
+        status, single = await self.call("GET", f"/v1/users/alice/reminders/{created['reminder_id']}")
+        self.assertEqual((status, single), (200, created))
+
+    async def test_search_by_query(self):
+        for message in ("会議の資料", "服薬", "資料の提出"):
+            await self.call("POST", "/v1/users/alice/reminders", {"message": message, "delay_ms": 60_000})
+        await self.call("POST", "/v1/users/bob/reminders", {"message": "資料", "delay_ms": 60_000})
+        _status, found = await self.call("GET", "/v1/users/alice/reminders?q=%E8%B3%87%E6%96%99&state=pending")
+        self.assertEqual([r["message"] for r in found["reminders"]], ["会議の資料", "資料の提出"])
+
+    async def test_time_and_at_deadlines(self):
+        at = time.time() + 3600
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "a", "at": at})
+        self.assertEqual(created["deadline"], at)
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "b", "time": "07:30"})
+        self.assertTrue(time.time() < created["deadline"] <= time.time() + 86_400)
+
+    async def test_validation_errors(self):
+        for payload in ({"delay_ms": 10}, {"message": "x"}, {"message": "x", "delay_ms": 1, "at": 1.0},
+                        {"message": "x", "delay_ms": -1}, {"message": "x", "time": "25:00"},
+                        {"message": "x", "delay_ms": 1, "snooze_minutes": 0},
+                        {"message": "x", "delay_ms": True}, {"message": "x", "delay_ms": 1, "snooze_minutes": True},
+                        {"message": "x", "delay_ms": 10 ** 30}, {"message": "x", "at": float("inf")},
+                        {"message": "x", "at": float("nan")}, {"message": "x", "at": 1e300},
+                        {"message": "x", "at": -1e300}, {"message": "x", "at": True}):
+            status, body = await self.call("POST", "/v1/users/alice/reminders", payload)
+            self.assertEqual(status, 400, payload)
+            self.assertIn("error", body)
+        status, _body = await self.call("POST", "/v1/users/alice/reminders", b"{not json")
+        self.assertEqual(status, 400)
+        _status, listed = await self.call("GET", "/v1/users/alice/reminders")
+        self.assertEqual(listed["reminders"], [])
+        self.assertEqual((await self.call("GET", "/v1/nowhere"))[0], 404)
+        self.assertEqual((await self.call("PUT", "/v1/users/alice/reminders"))[0], 405)
+
+    async def test_users_are_namespaced(self):
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "私用", "delay_ms": 60_000})
+        path = f"/v1/users/bob/reminders/{created['reminder_id']}"
+        self.assertEqual((await self.call("GET", path))[0], 404)
+        self.assertEqual((await self.call("DELETE", path))[0], 404)
+        self.assertEqual((await self.call("GET", "/v1/users/bob/reminders"))[1], {"reminders": []})
+
+    async def test_cancel(self):
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "会議", "delay_ms": 60_000})
+        path = f"/v1/users/alice/reminders/{created['reminder_id']}"
+        status, cancelled = await self.call("DELETE", path)
+        self.assertEqual((status, cancelled["state"]), (200, "cancelled"))
+        self.assertEqual(len(self.server.scheduler), 0)
+        self.assertEqual((await self.call("DELETE", path))[0], 409)
+        self.assertEqual((await self.call("POST", path + "/snooze", {}))[0], 409)
+
+    async def test_snooze_pending_and_fired(self):
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "会議", "delay_ms": 60_000})
+        path = f"/v1/users/alice/reminders/{created['reminder_id']}/snooze"
+        status, snoozed = await self.call("POST", path, {"minutes": 10})
+        self.assertEqual((status, snoozed["snooze_count"]), (200, 1))
+        self.assertAlmostEqual(snoozed["deadline"], time.time() + 600, delta=2)
+        self.assertEqual(self.server.scheduler.scheduler.get(created["reminder_id"]).snooze_count, 1)
+
+        # 発火済みのリマインダーもスヌーズで再登録できる
+        self.store.mark_fired(created["reminder_id"])
+        await self.server.scheduler.cancel(created["reminder_id"])
+        status, snoozed = await self.call("POST", path, {})
+        self.assertEqual((status, snoozed["state"], snoozed["snooze_count"]), (200, "pending", 2))
+        self.assertIn(created["reminder_id"], {r.reminder_id for r in self.server.scheduler.scheduler})
+        self.assertEqual((await self.call("POST", path, {"minutes": 0}))[0], 400)
+
+    async def test_snooze_limit(self):
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "会議", "delay_ms": 60_000})
+        path = f"/v1/users/alice/reminders/{created['reminder_id']}/snooze"
+        for _ in range(MAX_SNOOZE_COUNT):
+            self.assertEqual((await self.call("POST", path, {}))[0], 200)
+        self.assertEqual((await self.call("POST", path, {}))[0], 409)
+
+    async def test_timer_registration_errors_are_logged(self):
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "会議", "delay_ms": 60_000})
+        stored = self.store.get_any(created["reminder_id"])
+        # 既にタイマーに載っているものを載せ直そうとすると add_many() が項目ごとのエラーを返す
+        with self.assertLogs(level="WARNING") as logs:
+            await self.server._arm_many([self.server._timer_item(stored, time.time())])
+        self.assertIn("登録済み", logs.output[0])
+
+    async def test_keep_alive_serves_many_requests_on_one_connection(self):
+        connection = await asyncio.open_connection("127.0.0.1", self.server.port)
+        for i in range(50):
+            status, _headers, _data = await _request(
+                self.server.port, "POST", "/v1/users/alice/reminders",
+                {"message": f"r{i}", "delay_ms": 60_000}, reader_writer=connection,
+            )
+            self.assertEqual(status, 201)
+        connection[1].close()
+        self.assertEqual(len(self.store.list_reminders("alice")), 50)
+
+
+class BulkIngestTests(_ServerTestCase):
+    async def test_ndjson_bulk_with_chunked_upload(self):
+        lines = [json.dumps({"message": f"r{i}", "delay_ms": 60_000}) for i in range(1_200)]
+        lines.insert(10, "{broken")
+        lines.insert(20, json.dumps({"message": "", "delay_ms": 1}))
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+        # 行の途中で区切れるよう不揃いなチャンクで送る
+        body = b"".join(f"{len(payload[i:i + 777]):x}\r\n".encode() + payload[i:i + 777] + b"\r\n"
+                        for i in range(0, len(payload), 777)) + b"0\r\n\r\n"
+        status, headers, data = await _request(self.server.port, "POST", "/v1/users/alice/reminders/bulk",
+                                               body, {"Transfer-Encoding": "chunked"})
+        self.assertEqual((status, headers["content-type"].split(";")[0]), (200, "application/x-ndjson"))
+        results = [json.loads(line) for line in data.splitlines()]
+        self.assertEqual([r["line"] for r in results], list(range(1, 1_203)))
+        self.assertEqual([r["line"] for r in results if not r["ok"]], [11, 21])
+        self.assertEqual(len(self.store.list_reminders("alice")), 1_200)
+        self.assertEqual(len(self.server.scheduler), 1_200)
+
+    async def test_bulk_with_content_length(self):
+        body = b'{"message": "a", "delay_ms": 60000}\n{"message": "b", "delay_ms": 60000}'
+        status, _headers, data = await _request(self.server.port, "POST", "/v1/users/bob/reminders/bulk", body)
+        self.assertEqual(status, 200)
+        self.assertEqual([json.loads(line)["ok"] for line in data.splitlines()], [True, True])
+
+
+class FireEventTests(_ServerTestCase):
+    async def test_long_poll_receives_fire_event(self):
+        poll = asyncio.ensure_future(self.call("GET", "/v1/users/alice/events?since=0&timeout=5"))
+        await asyncio.sleep(0.05)
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "会議", "delay_ms": 20})
+        await self.call("POST", "/v1/users/bob/reminders", {"message": "他人", "delay_ms": 0})
+        status, body = await asyncio.wait_for(poll, 5)
+        self.assertEqual(status, 200)
+        self.assertEqual([(e["reminder_id"], e["message"]) for e in body["events"]], [(created["reminder_id"], "会議")])
+        self.assertEqual(body["next"], 1)
+        self.assertEqual((await self.call("GET", f"/v1/users/alice/reminders/{created['reminder_id']}"))[1]["state"],
+                         "fired")
+        # since より前のイベントは即座に返り、新しいものがなければタイムアウトで空を返す
+        self.assertEqual(len((await self.call("GET", "/v1/users/alice/events?since=0"))[1]["events"]), 1)
+        self.assertEqual((await self.call("GET", "/v1/users/alice/events?since=1&timeout=0.05"))[1],
+                         {"events": [], "next": 1})
+
+    async def test_template_params_are_rendered_at_fire_time(self):
+        poll = asyncio.ensure_future(self.call("GET", "/v1/users/alice/events?since=0&timeout=5"))
+        await asyncio.sleep(0.05)
+        status, created = await self.call("POST", "/v1/users/alice/reminders", {
+            "message": "{ticket} のレビュー", "params": {"ticket": "OPS-7"}, "delay_ms": 20,
+        })
+        self.assertEqual(status, 201)
+        self.assertEqual((created["message"], created["template"]), ("OPS-7 のレビュー", "{ticket} のレビュー"))
+        _status, body = await asyncio.wait_for(poll, 5)
+        self.assertEqual([e["message"] for e in body["events"]], ["OPS-7 のレビュー"])
+        status, _body = await self.call("POST", "/v1/users/alice/reminders",
+                                        {"message": "{ticket}", "params": {}, "delay_ms": 20})
+        self.assertEqual(status, 400)
+
+    async def test_timer_snoozed_elsewhere_is_rearmed_to_stored_deadline(self):
+        _status, created = await self.call("POST", "/v1/users/alice/reminders", {"message": "会議", "delay_ms": 30})
+        reminder_id = created["reminder_id"]
+        # 他のインスタンスが延期した（このインスタンスのタイマーは古い期限のまま）
+        self.assertTrue(self.store.reschedule(reminder_id, time.time() + 0.3, 1))
+        await asyncio.sleep(0.1)
+        self.assertEqual((await self.call("GET", f"/v1/users/alice/reminders/{reminder_id}"))[1]["state"], "pending")
+        self.assertEqual(self.server.scheduler.scheduler.get(reminder_id).snooze_count, 1)
+        _status, body = await self.call("GET", "/v1/users/alice/events?since=0&timeout=5")
+        self.assertEqual([(e["reminder_id"], e["snooze_count"]) for e in body["events"]], [(reminder_id, 1)])
+
+    async def test_sse_stream(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        writer.write(b"GET /v1/users/alice/events HTTP/1.1\r\nAccept: text/event-stream\r\n\r\n")
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        self.assertIn(b"text/event-stream", head)
+        await self.call("POST", "/v1/users/alice/reminders", {"message": "一", "delay_ms": 0})
+        await self.call("POST", "/v1/users/alice/reminders", {"message": "二", "delay_ms": 10})
+        events = []
+        while len(events) < 2:
+            block = await asyncio.wait_for(reader.readuntil(b"\n\n"), 5)
+            fields = dict(line.split(": ", 1) for line in block.decode("utf-8").strip().split("\n"))
+            events.append((fields["id"], fields["event"], json.loads(fields["data"])["message"]))
+        writer.close()
+        self.assertEqual(events, [("1", "fire", "一"), ("2", "fire", "二")])
+
+
+class RestartTests(unittest.IsolatedAsyncioTestCase):
+    async def test_restart_rearms_pending_and_fires_overdue(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reminders.db")
+            store = ReminderStore(path)
+            overdue = store.create("alice", "停止中に期限", time.time() - 10)
+            future = store.create("alice", "将来", time.time() + 3600)
+            store.close()
+
+            store = ReminderStore(path)
+            server = ReminderServer(store, port=0)
+            await server.start()
+            try:
+                # 期限切れは起動直後に発火し、将来のものだけがタイマーに残る
+                self.assertEqual([r.reminder_id for r in server.scheduler.scheduler], [future.reminder_id])
+                body = json.loads((await _request(server.port, "GET", "/v1/users/alice/events?since=0&timeout=5"))[2])
+                [event] = body["events"]
+                self.assertEqual(event["kind"], "catchup")
+                self.assertEqual([r["reminder_id"] for r in event["reminders"]], [overdue.reminder_id])
+            finally:
+                await server.close()
+                store.close()
+
+    async def test_out_of_range_row_does_not_block_startup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reminders.db")
+            store = ReminderStore(path)
+            # 検証のなかった版で保存された行
+            store.create("alice", "遠すぎる", 1e300)
+            future = store.create("alice", "将来", time.time() + 3600)
+            store.close()
+
+            store = ReminderStore(path)
+            server = ReminderServer(store, port=0)
+            await server.start()
+            try:
+                self.assertEqual([r.reminder_id for r in server.scheduler.scheduler], [future.reminder_id])
+            finally:
+                await server.close()
+                store.close()
@@ -0,0 +1,87 @@
+"""tests/test_sharding.py — reminder.sharding のユニットテスト
+
+テストクラス一覧:
+    ShardRoutingTests        : shard_for() と ID の符号化
+    ShardedSchedulerTests    : ワーカープロセスを起動しての add / cancel / snooze と発火イベントの集約
+"""
+import queue
+import unittest
+
+from reminder.sharding import FireEvent, ShardedScheduler, _global_id, _split_id, shard_for
+
+
+class ShardRoutingTests(unittest.TestCase):
+    def test_shard_for_is_stable_and_in_range(self):
+        self.assertEqual(shard_for("alice", 4), shard_for("alice", 4))
+        self.assertTrue(all(0 <= shard_for(f"user{i}", 3) < 3 for i in range(100)))
+
+    def test_shard_for_spreads_keys(self):
+        used = {shard_for(f"user{i}", 4) for i in range(100)}
+        self.assertEqual(used, {0, 1, 2, 3})
+
+    def test_global_id_round_trip(self):
+        self.assertEqual(_split_id(_global_id(3, 12345)), (3, 12345))
+
+
+class ShardedSchedulerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.sharded = ShardedScheduler(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sharded.close()
+
+    def _drain(self, count):
+        return [self.sharded.events.get(timeout=10) for _ in range(count)]
+
+    def test_fire_events_are_gathered_from_all_shards(self):
+        owners = [f"user{i}" for i in range(20)]
+        ids = self.sharded.add_many([{"message": f"m-{o}", "owner": o, "delay_ms": 0} for o in owners])
+        events = self._drain(len(owners))
+        self.assertTrue(all(isinstance(e, FireEvent) for e in events))
+        self.assertEqual(sorted(e.reminder_id for e in events), sorted(ids))
+        self.assertEqual({e.shard for e in events}, {0, 1})
+        by_id = {e.reminder_id: e for e in events}
+        for reminder_id, owner in zip(ids, owners):
+            self.assertEqual(by_id[reminder_id].owner, owner)
+            self.assertEqual(by_id[reminder_id].shard, shard_for(owner, 2))
+
+    def test_same_owner_always_lands_on_same_shard(self):
+        ids = [self.sharded.add("x", owner="alice", delay_ms=60_000) for _ in range(3)]
+        self.assertEqual({_split_id(i)[0] for i in ids}, {shard_for("alice", 2)})
+        for reminder_id in ids:
+            self.assertTrue(self.sharded.cancel(reminder_id))
+
+    def test_cancel_and_snooze_route_by_id(self):
+        reminder_id = self.sharded.add("later", owner="bob", delay_ms=60_000)
+        self.assertTrue(self.sharded.snooze(reminder_id, 5))
+        self.assertTrue(self.sharded.cancel(reminder_id))
+        self.assertFalse(self.sharded.cancel(reminder_id))
+        self.assertEqual(self.sharded.pending_counts(), [0, 0])
+        with self.assertRaises(queue.Empty):
+            self.sharded.events.get(timeout=0.2)
+
+    def test_invalid_input_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.sharded.add("   ", delay_ms=0)
+
+    def test_rejected_batch_leaves_nothing_armed_on_its_shard(self):
+        items = [{"message": "ok", "owner": "carol", "delay_ms": 60_000}, {"message": "   ", "owner": "carol"}]
+        with self.assertRaises(ValueError):
+            self.sharded.add_many(items)
+        self.assertEqual(self.sharded.pending_counts(), [0, 0])
+
+    def test_rejected_batch_cancels_what_other_shards_registered(self):
+        owners = {shard_for(f"user{i}", 2): f"user{i}" for i in range(20)}
+        items = [{"message": "ok", "owner": owners[0], "delay_ms": 60_000},
+                 {"message": "ok", "owner": owners[1], "delay_ms": 60_000},
+                 {"message": "   ", "owner": owners[1]}]
+        with self.assertRaises(ValueError):
+            self.sharded.add_many(items)
+        self.assertEqual(self.sharded.pending_counts(), [0, 0])
+        self.assertEqual(self.sharded._pending, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""tests/test_store.py — reminder.store のユニットテスト
+
+テストクラス一覧:
+    ReminderStoreTests : 利用者ごとの名前空間・一括保存・状態遷移・ファイルへの永続化
+"""
+import os
+import tempfile
+import unittest
+
+from reminder.clock import VirtualClock
+from reminder.scheduler import Scheduler
+from reminder.store import STATE_CANCELLED, STATE_FIRED, STATE_PENDING, ReminderStore
+
+
+class ReminderStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = ReminderStore()
+        self.addCleanup(self.store.close)
+
+    def test_users_are_isolated(self):
+        alice = self.store.create("alice", "会議", 100.0)
+        self.store.create("bob", "散歩", 200.0)
+        self.assertEqual([r.message for r in self.store.list_reminders("alice")], ["会議"])
+        self.assertIsNone(self.store.get("bob", alice.reminder_id))
+        self.assertFalse(self.store.cancel("bob", alice.reminder_id))
+        self.assertEqual(self.store.get("alice", alice.reminder_id).state, STATE_PENDING)
+
+    def test_create_many_assigns_unique_ids(self):
+        created = self.store.create_many("alice", [(f"r{i}", float(i), 5) for i in range(100)])
+        self.assertEqual(len({r.reminder_id for r in created}), 100)
+        self.assertEqual(len(self.store.list_reminders("alice", STATE_PENDING)), 100)
+        self.assertEqual(len(self.store.list_reminders("alice", limit=10)), 10)
+
+    def test_pending_is_ordered_by_deadline_across_users(self):
+        self.store.create("alice", "後", 300.0)
+        self.store.create("bob", "先", 100.0)
+        fired = self.store.create("bob", "済", 50.0)
+        self.store.mark_fired(fired.reminder_id)
+        self.assertEqual([r.message for r in self.store.pending()], ["先", "後"])
+
+    def test_pending_columns_and_get_many(self):
+        later = self.store.create("alice", "会議", 300.4)
+        self.store.create("bob", "会議", 100.6)
+        fired = self.store.create("bob", "済", 50.0)
+        self.store.mark_fired(fired.reminder_id)
+        self.store.reschedule(later.reminder_id, 300.4, 2)
+        columns = self.store.pending_columns()
+        self.assertEqual([(r.reminder_id, r.deadline, r.snooze_count) for r in columns],
+                         [(later.reminder_id, 300, 2), (later.reminder_id + 1, 101, 0)])
+        # 同じ本文は 1 つの文字列を共有する
+        self.assertIs(columns.get(later.reminder_id).message, columns.get(later.reminder_id + 1).message)
+        self.assertEqual([r.reminder_id for r in self.store.get_many([fired.reminder_id, 999, later.reminder_id])],
+                         [later.reminder_id, fired.reminder_id])
+
+    def test_pending_columns_skip_out_of_range_deadlines(self):
+        self.store.create("alice", "無限", float("inf"))
+        self.store.create("alice", "遠すぎる", 1e300)
+        kept = self.store.create("alice", "会議", 100.0)
+        self.assertEqual([r.reminder_id for r in self.store.pending_columns()], [kept.reminder_id])
+
+    def test_state_transitions(self):
+        stored = self.store.create("alice", "会議", 100.0)
+        self.assertTrue(self.store.mark_fired(stored.reminder_id))
+        self.assertFalse(self.store.mark_fired(stored.reminder_id))
+        self.assertEqual(self.store.get_any(stored.reminder_id).state, STATE_FIRED)
+        # 発火済みは取り消せないがスヌーズで発火待ちに戻せる
+        self.assertFalse(self.store.cancel("alice", stored.reminder_id))
+        self.assertTrue(self.store.reschedule(stored.reminder_id, 400.0, 1))
+        again = self.store.get("alice", stored.reminder_id)
+        self.assertEqual((again.state, again.deadline, again.snooze_count), (STATE_PENDING, 400.0, 1))
+        self.assertTrue(self.store.cancel("alice", stored.reminder_id))
+        self.assertFalse(self.store.reschedule(stored.reminder_id, 500.0, 2))
+        self.assertEqual(self.store.get("alice", stored.reminder_id).state, STATE_CANCELLED)
+
+    def test_persists_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sub", "reminders.db")
+            store = ReminderStore(path)
+            stored = store.create("alice", "会議", 100.0)
+            store.close()
+            reopened = ReminderStore(path)
+            self.addCleanup(reopened.close)
+            self.assertEqual(reopened.get("alice", stored.reminder_id), stored)
+
+    def test_store_ids_can_key_the_scheduler(self):
+        clock = VirtualClock()
+        scheduler = Scheduler(clock, clock)
+        stored = self.store.create("alice", "会議", 100.0)
+        self.assertEqual(scheduler.add(stored.message, delay_ms=0, reminder_id=stored.reminder_id), stored.reminder_id)
+        with self.assertRaises(ValueError):
+            scheduler.add(stored.message, delay_ms=0, reminder_id=stored.reminder_id)
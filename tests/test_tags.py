@@ -0,0 +1,221 @@
+"""tests/test_tags.py — reminder.tags と各所のタグ単位の一括操作のユニットテスト
+
+テストクラス一覧:
+    NormalizeTagsTests: タグの検証と正規化
+    TagIndexTests     : タグから ID を引く索引の追加・削除
+    SchedulerTagTests : Scheduler のタグ索引が登録・取り消し・発火に追従し、一括で取り消し・延期できる
+    StoreTagTests     : ReminderStore の reminder_tags 表による絞り込み・一括取り消し・一括延期と、
+                        発火待ち以外の行を索引から外すこと
+    ServerTagTests    : HTTP API のタグ指定の一覧と一括取り消し・延期
+"""
+import json
+import time
+import unittest
+
+from reminder.clock import VirtualClock
+from reminder.scheduler import BatchItem, Scheduler
+from reminder.store import STATE_CANCELLED, STATE_PENDING, ReminderStore
+from reminder.tags import MAX_TAG_LENGTH, MAX_TAGS, TagIndex, normalize_tags
+from reminder.time_utils import MAX_SNOOZE_COUNT
+
+from .test_server import _ServerTestCase, _request
+
+
+class NormalizeTagsTests(unittest.TestCase):
+    def test_strips_and_deduplicates_in_order(self):
+        self.assertEqual(normalize_tags([" 仕事 ", "健康", "仕事"]), ("仕事", "健康"))
+        self.assertEqual(normalize_tags(()), ())
+
+    def test_rejects_invalid_tags(self):
+        for tags in ("仕事", 5, {"仕事": 1}, {"仕事"}, [""], ["  "], [1], ["x" * (MAX_TAG_LENGTH + 1)],
+                     [f"t{i}" for i in range(MAX_TAGS + 1)]):
+            with self.assertRaises(ValueError, msg=tags):
+                normalize_tags(tags)
+
+
+class TagIndexTests(unittest.TestCase):
+    def test_add_remove(self):
+        index = TagIndex()
+        index.add(3, ("仕事", "会議"))
+        index.add(1, ("仕事",))
+        self.assertEqual(index.ids("仕事"), [1, 3])
+        self.assertEqual(index.tags(), ["仕事", "会議"])
+        index.remove(3, ("仕事", "会議"))
+        self.assertEqual(index.ids("仕事"), [1])
+        # 空になったタグは残さない
+        self.assertNotIn("会議", index)
+        self.assertEqual(index.ids("会議"), [])
+        index.remove(99, ("存在しない",))
+
+
+class SchedulerTagTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.fired = []
+        self.scheduler = Scheduler(self.clock, self.clock, on_fire=lambda r: self.fired.append(r.reminder_id) or False)
+
+    def test_index_follows_add_cancel_and_fire(self):
+        first = self.scheduler.add("会議", delay_ms=60_000, tags=["仕事"])
+        second = self.scheduler.add("資料", delay_ms=120_000, tags=["仕事", "資料"])
+        self.scheduler.add("服薬", delay_ms=180_000)
+        self.assertEqual([r.reminder_id for r in self.scheduler.tagged("仕事")], [first, second])
+        self.assertEqual(self.scheduler.tagged("仕事")[1].tags, ("仕事", "資料"))
+        self.scheduler.cancel(second)
+        self.assertEqual([r.reminder_id for r in self.scheduler.tagged("仕事")], [first])
+        self.assertEqual(self.scheduler.tagged("資料"), [])
+        self.clock.advance(60_000)
+        self.assertEqual(self.fired, [first])
+        self.assertEqual(self.scheduler.tagged("仕事"), [])
+
+    def test_add_many_indexes_tags(self):
+        results = self.scheduler.add_many([
+            BatchItem("a", delay_ms=1000, tags=["x"]),
+            BatchItem("b", delay_ms=1000, tags=[""]),
+            BatchItem("c", delay_ms=1000, tags=["x", "y"]),
+        ])
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertEqual([r.message for r in self.scheduler.tagged("x")], ["a", "c"])
+
+    def test_cancel_tag(self):
+        ids = [self.scheduler.add(f"m{i}", delay_ms=60_000, tags=["x"] if i % 2 else ["y"]) for i in range(6)]
+        self.assertEqual(self.scheduler.cancel_tag("x"), ids[1::2])
+        self.assertEqual(sorted(r.reminder_id for r in self.scheduler), ids[0::2])
+        self.assertEqual(self.scheduler.cancel_tag("x"), [])
+        self.clock.advance(60_000)
+        self.assertEqual(self.fired, ids[0::2])
+
+    def test_snooze_tag_skips_reminders_at_limit(self):
+        fresh = self.scheduler.add("a", delay_ms=60_000, tags=["x"])
+        spent = self.scheduler.add("b", delay_ms=60_000, snooze_count=MAX_SNOOZE_COUNT, tags=["x"])
+        other = self.scheduler.add("c", delay_ms=60_000)
+        self.assertEqual(self.scheduler.snooze_tag("x", minutes=10), [fresh])
+        self.assertEqual(self.scheduler.get(fresh).snooze_count, 1)
+        self.clock.advance(60_000)
+        self.assertEqual(self.fired, [spent, other])
+        self.clock.advance(540_000)
+        self.assertEqual(self.fired, [spent, other, fresh])
+
+
+class StoreTagTests(unittest.TestCase):
+    def setUp(self):
+        self.store = ReminderStore()
+        self.addCleanup(self.store.close)
+        self.now = time.time()
+
+    def _create(self, user, message, tags, snooze_count=0):
+        stored = self.store.create(user, message, self.now + 60, tags=tags)
+        if snooze_count:
+            self.store.reschedule(stored.reminder_id, stored.deadline, snooze_count)
+        return stored
+
+    def test_tags_round_trip_and_filter(self):
+        created = self._create("alice", "会議", [" 仕事 ", "会議"])
+        self._create("alice", "服薬", [])
+        self._create("bob", "会議", ["仕事"])
+        self.assertEqual(created.tags, ("仕事", "会議"))
+        self.assertEqual(self.store.get("alice", created.reminder_id).tags, ("仕事", "会議"))
+        self.assertEqual(self.store.get("alice", created.reminder_id).to_dict()["tags"], ["仕事", "会議"])
+        self.assertEqual([r.reminder_id for r in self.store.tagged("alice", "仕事")], [created.reminder_id])
+        self.assertEqual(self.store.tagged("alice", "無い"), [])
+        with self.assertRaises(ValueError):
+            self.store.create("alice", "x", self.now, tags="仕事")
+
+    def test_cancel_tag(self):
+        ids = [self._create("alice", f"m{i}", ["x"]).reminder_id for i in range(3)]
+        other = self._create("bob", "m", ["x"])
+        self.store.cancel("alice", ids[0])
+        self.assertEqual(self.store.cancel_tag("alice", "x"), ids[1:])
+        self.assertEqual({r.state for r in self.store.tagged("alice", "x")}, {STATE_CANCELLED})
+        self.assertEqual(self.store.tagged("alice", "x", STATE_PENDING), [])
+        self.assertEqual(self.store.get("bob", other.reminder_id).state, STATE_PENDING)
+
+    def test_snooze_tag(self):
+        fresh = self._create("alice", "a", ["x"])
+        custom = self.store.create("alice", "b", self.now + 60, snooze_minutes=3, tags=["x"])
+        spent = self._create("alice", "c", ["x"], snooze_count=MAX_SNOOZE_COUNT)
+        snoozed = self.store.snooze_tag("alice", "x", self.now, None, MAX_SNOOZE_COUNT)
+        self.assertEqual([r.reminder_id for r in snoozed], [fresh.reminder_id, custom.reminder_id])
+        self.assertAlmostEqual(self.store.get_any(fresh.reminder_id).deadline, self.now + fresh.snooze_minutes * 60)
+        self.assertAlmostEqual(self.store.get_any(custom.reminder_id).deadline, self.now + 180)
+        self.assertEqual(self.store.get_any(custom.reminder_id).snooze_count, 1)
+        self.assertEqual(self.store.get_any(spent.reminder_id).deadline, spent.deadline)
+        snoozed = self.store.snooze_tag("alice", "x", self.now, 10, MAX_SNOOZE_COUNT)
+        self.assertEqual({r.deadline for r in snoozed}, {self.now + 600})
+
+    def _index_ids(self):
+        return sorted(row[0] for row in self.store._conn.execute("SELECT DISTINCT reminder_id FROM reminder_tags"))
+
+    def test_only_pending_reminders_stay_in_tag_index(self):
+        fired, cancelled, missed, pending = (self._create("alice", f"m{i}", ["x", "y"]) for i in range(4))
+        self.assertTrue(self.store.record_fire(fired.reminder_id, fired.deadline, self.now))
+        self.assertTrue(self.store.cancel("alice", cancelled.reminder_id))
+        self.assertEqual(self.store.mark_missed([missed.reminder_id]), 1)
+        self.assertEqual(self._index_ids(), [pending.reminder_id])
+        # 発火待ち以外の状態もタグで引ける
+        self.assertEqual([r.reminder_id for r in self.store.tagged("alice", "x", STATE_CANCELLED)],
+                         [cancelled.reminder_id])
+        self.assertEqual(len(self.store.tagged("alice", "x")), 4)
+        # 発火済みをスヌーズで発火待ちに戻すと索引に入り直す
+        self.assertTrue(self.store.reschedule(fired.reminder_id, self.now + 60, 1))
+        self.assertEqual(self._index_ids(), [fired.reminder_id, pending.reminder_id])
+        self.assertEqual(self.store.cancel_tag("alice", "y"), [fired.reminder_id, pending.reminder_id])
+        self.assertEqual(self._index_ids(), [])
+        late = self._create("alice", "late", ["x"])
+        self.store.mark_missed_before(late.deadline + 1)
+        self.assertEqual(self._index_ids(), [])
+
+
+class ServerTagTests(_ServerTestCase):
+    async def _create(self, user, message, tags):
+        _status, created = await self.call("POST", f"/v1/users/{user}/reminders",
+                                           {"message": message, "delay_ms": 60_000, "tags": tags})
+        return created
+
+    def _armed(self):
+        return sorted(r.reminder_id for r in self.server.scheduler.scheduler)
+
+    async def test_list_by_tag(self):
+        work = await self._create("alice", "会議の資料", ["仕事"])
+        await self._create("alice", "資料を買う", ["私用"])
+        await self._create("bob", "会議", ["仕事"])
+        self.assertEqual(work["tags"], ["仕事"])
+        self.assertEqual(self.server.scheduler.scheduler.get(work["reminder_id"]).tags, ("仕事",))
+        _status, listing = await self.call("GET", "/v1/users/alice/reminders?tag=%E4%BB%95%E4%BA%8B")
+        self.assertEqual([r["reminder_id"] for r in listing["reminders"]], [work["reminder_id"]])
+        _status, listing = await self.call("GET", "/v1/users/alice/reminders?tag=%E4%BB%95%E4%BA%8B&q=%E8%B3%87%E6%96%99")
+        self.assertEqual([r["reminder_id"] for r in listing["reminders"]], [work["reminder_id"]])
+        for tags in ("仕事", 5, {"仕事": 1}):
+            status, body = await self.call("POST", "/v1/users/alice/reminders",
+                                           {"message": "x", "delay_ms": 1, "tags": tags})
+            self.assertEqual(status, 400, tags)
+            self.assertIn("error", body)
+
+    async def test_bulk_reports_wrongly_typed_tags_per_line(self):
+        body = "\n".join(json.dumps({"message": "x", "delay_ms": 60_000, "tags": tags})
+                         for tags in (["仕事"], 5, {"仕事": 1}, ["健康"])).encode("utf-8")
+        status, _headers, data = await _request(self.server.port, "POST", "/v1/users/alice/reminders/bulk", body)
+        self.assertEqual(status, 200)
+        self.assertEqual([json.loads(line)["ok"] for line in data.splitlines()], [True, False, False, True])
+        self.assertEqual(len(self.store.list_reminders("alice")), 2)
+
+    async def test_cancel_and_snooze_by_tag(self):
+        first = await self._create("alice", "a", ["x"])
+        second = await self._create("alice", "b", ["x", "y"])
+        other = await self._create("alice", "c", ["y"])
+        status, snoozed = await self.call("POST", "/v1/users/alice/tags/x/snooze", {"minutes": 10})
+        self.assertEqual(status, 200)
+        self.assertEqual([r["reminder_id"] for r in snoozed["reminders"]], [first["reminder_id"], second["reminder_id"]])
+        self.assertEqual(self.server.scheduler.scheduler.get(first["reminder_id"]).snooze_count, 1)
+        self.assertAlmostEqual(self.store.get_any(second["reminder_id"]).deadline, time.time() + 600, delta=2)
+        self.assertEqual(len(self.server.scheduler), 3)
+
+        status, cancelled = await self.call("POST", "/v1/users/alice/tags/y/cancel")
+        self.assertEqual((status, cancelled), (200, {"cancelled": [second["reminder_id"], other["reminder_id"]]}))
+        self.assertEqual(self._armed(), [first["reminder_id"]])
+        self.assertEqual(self.store.get_any(other["reminder_id"]).state, STATE_CANCELLED)
+        self.assertEqual((await self.call("POST", "/v1/users/alice/tags/x/snooze", {"minutes": 0}))[0], 400)
+        self.assertEqual((await self.call("GET", "/v1/users/alice/tags/x/cancel"))[0], 405)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""tests/test_watchdog.py — reminder.watchdog のユニットテスト
+
+テストクラス一覧:
+    StallWatchdogTests : ハートビート・ストール検出・継続時間の記録
+"""
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from reminder import watchdog
+from reminder.watchdog import StallWatchdog
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class StallWatchdogTests(unittest.TestCase):
+    def setUp(self):
+        self.root = Mock()
+        self.root.after.return_value = "beat-1"
+        self.clock = _FakeClock()
+        self.dog = StallWatchdog(self.root, threshold_s=1.0, heartbeat_ms=250, clock=self.clock)
+
+    def test_no_stall_while_heartbeat_is_fresh(self):
+        self.clock.now += 0.5
+        self.assertFalse(self.dog.check())
+        self.assertEqual(self.dog.stall_count, 0)
+
+    def test_detects_stall_once_per_episode(self):
+        before = watchdog.STALLS_TOTAL.value
+        self.clock.now += 2.0
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertTrue(self.dog.check())
+        self.assertFalse(self.dog.check())
+        self.assertEqual(self.dog.stall_count, 1)
+        self.assertEqual(watchdog.STALLS_TOTAL.value, before + 1)
+        self.assertIn("応答していません", logs.output[0])
+
+    def test_heartbeat_after_stall_records_duration_and_rearms(self):
+        before = watchdog.STALL_DURATION_MS.count
+        self.clock.now += 2.0
+        with self.assertLogs(level="WARNING"):
+            self.dog.check()
+            self.dog._heartbeat()
+        self.assertEqual(watchdog.STALL_DURATION_MS.count, before + 1)
+        self.root.after.assert_called_with(250, self.dog._heartbeat)
+        self.assertFalse(self.dog.check())
+
+    def test_format_main_stack_includes_blocking_function(self):
+        dog = StallWatchdog(self.root)
+        captured = {}
+
+        def blocking_callback():
+            started.set()
+            release.wait(5)
+
+        started, release = threading.Event(), threading.Event()
+        worker = threading.Thread(target=blocking_callback)
+        worker.start()
+        started.wait(5)
+        dog._main_thread_id = worker.ident
+        captured["stack"] = dog.format_main_stack()
+        release.set()
+        worker.join()
+        self.assertIn("blocking_callback", captured["stack"])
+
+    def test_start_and_stop_manage_timer_and_thread(self):
+        dog = StallWatchdog(self.root, heartbeat_ms=10)
+        dog.start()
+        self.root.after.assert_called_once_with(10, dog._heartbeat)
+        time.sleep(0.03)
+        dog.stop()
+        self.root.after_cancel.assert_called_once_with("beat-1")
+        self.assertIsNone(dog._thread)
+
+
+if __name__ == "__main__":
+    unittest.main()